@@ -28,6 +28,7 @@
     'external_dependencies': {
         'python': [
             'requests',
+            'numpy',
         ]
     },
     'data': [
@@ -38,6 +39,7 @@
         # Data
         'data/ai_provider_data.xml',
         'data/ai_config_data.xml',
+        'data/ir_cron_data.xml',
         
         # Views
         'views/menu_views.xml',
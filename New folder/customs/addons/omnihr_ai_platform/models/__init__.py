@@ -1,5 +1,7 @@
 from . import hr_ai_config
 from . import hr_multi_ai_provider
+from . import hr_ai_performance_metric
+from . import hr_ai_provider_reliability
 from . import hr_employee_intelligence
 from . import hr_recruitment_ai
 from . import hr_performance_analytics
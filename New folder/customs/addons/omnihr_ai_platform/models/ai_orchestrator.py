@@ -3,6 +3,8 @@ from odoo.exceptions import UserError
 import json
 import logging
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
 _logger = logging.getLogger(__name__)
@@ -200,7 +202,7 @@ class HRAIOrchestrator(models.TransientModel):
             system_prompt = self._get_chat_system_prompt(session_type)
             
             ai_config = self._get_ai_config()
-            providers = ai_config.get_provider_priority('conversation')
+            providers = ai_config.get_routed_providers('chat_response', ai_config.get_provider_priority('conversation'))
             
             # Use first available provider for chat (real-time requirement)
             result = self._get_single_ai_response('chat_response', prompt, system_prompt, providers[0])
@@ -211,6 +213,7 @@ class HRAIOrchestrator(models.TransientModel):
                 'requires_escalation': result.get('requires_escalation', False),
                 'escalation_reason': result.get('escalation_reason', ''),
                 'suggested_actions': result.get('suggested_actions', []),
+                'provider': result.get('provider'),
             }
             
         except Exception as e:
@@ -232,33 +235,144 @@ class HRAIOrchestrator(models.TransientModel):
     def _get_ai_consensus(self, task_type, prompt, system_prompt):
         """Get consensus from multiple AI providers"""
         ai_config = self._get_ai_config()
-        providers = ai_config.get_provider_priority(task_type)
         
-        # Get responses from multiple providers
+        providers = self.env['hr.multi.ai.provider']
+        for provider_type in ai_config.get_routed_providers(task_type)[:3]:  # Use top 3 providers
+            provider = self._get_ai_provider(provider_type)
+            if provider and provider.health_status == 'healthy':
+                providers |= provider
+        
+        if not providers:
+            raise UserError(_('No AI providers available'))
+        
+        if ai_config.enable_parallel_consensus and len(providers) > 1:
+            responses = self._collect_responses_parallel(providers, prompt, system_prompt, ai_config, task_type)
+        else:
+            responses = self._collect_responses_sequential(providers, prompt, system_prompt, ai_config, task_type)
+        
+        if not responses:
+            raise UserError(_('No AI providers available'))
+        
+        engine = self.env['hr.ai.provider.reliability'].get_consensus_engine()
+        consensus = engine.generate_consensus(
+            responses, task_type=task_type, method='hybrid', min_responses=1
+        )
+        return self._merge_consensus_result(responses, consensus)
+    
+    def _collect_responses_sequential(self, providers, prompt, system_prompt, ai_config, task_type='general'):
+        """Query providers one after another until enough good answers are in"""
+        wanted = min(max(ai_config.consensus_min_responses, 1), len(providers))
         responses = []
-        for provider_type in providers[:3]:  # Use top 3 providers
+        for provider in providers:
+            if len(responses) >= wanted:
+                break
             try:
-                provider = self._get_ai_provider(provider_type)
-                if provider and provider.health_status == 'healthy':
-                    response = provider.execute_request(prompt, system_prompt)
-                    responses.append({
-                        'provider': provider_type,
-                        'response': response,
-                        'confidence': self._extract_confidence(response)
-                    })
+                response = provider.execute_request(prompt, system_prompt, task_type=task_type)
+                responses.append(self._to_consensus_response(provider.provider_type, response))
             except Exception as e:
-                _logger.warning(f"Provider {provider_type} failed: {str(e)}")
-                continue
+                _logger.warning(f"Provider {provider.provider_type} failed: {str(e)}")
+        return responses
+    
+    def _collect_responses_parallel(self, providers, prompt, system_prompt, ai_config, task_type='general'):
+        """Fan the request out to all providers concurrently
         
-        if not responses:
-            raise UserError(_('No AI providers available'))
+        Every provider runs in its own thread on its own cursor. Waiting stops as
+        soon as ``consensus_min_responses`` good answers have arrived, when the
+        config deadline passes, or - per provider - when that provider's own
+        ``timeout`` expires. Late answers are discarded.
+        """
+        wanted = min(max(ai_config.consensus_min_responses, 1), len(providers))
+        started = time.monotonic()
+        deadline = started + ai_config.consensus_timeout
+        max_workers = min(len(providers), ai_config.max_concurrent_requests or len(providers))
+        
+        responses = []
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='omnihr-consensus')
+        try:
+            futures = {}
+            provider_deadlines = {}
+            for provider in providers:
+                future = executor.submit(
+                    self._execute_request_in_thread, provider.id, prompt, system_prompt, task_type
+                )
+                futures[future] = provider.provider_type
+                provider_deadlines[future] = min(
+                    deadline, started + (provider.timeout or ai_config.consensus_timeout)
+                )
+            
+            pending = set(futures)
+            while pending and len(responses) < wanted:
+                timeout = min(provider_deadlines[f] for f in pending) - time.monotonic()
+                if timeout > 0:
+                    done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                
+                for future in done:
+                    provider_type = futures[future]
+                    try:
+                        response = future.result()
+                        responses.append(self._to_consensus_response(provider_type, response))
+                    except Exception as e:
+                        _logger.warning(f"Provider {provider_type} failed: {str(e)}")
+                
+                now = time.monotonic()
+                expired = {f for f in pending if provider_deadlines[f] <= now}
+                for future in expired:
+                    _logger.warning(f"Provider {futures[future]} missed the consensus deadline")
+                pending -= expired
+        finally:
+            # Do not block on stragglers; they finish (and close their cursor) on their own
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        _logger.info(
+            f"Consensus fan-out collected {len(responses)}/{len(providers)} responses "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return responses
+    
+    def _execute_request_in_thread(self, provider_id, prompt, system_prompt, task_type='general'):
+        """Execute a provider request on a dedicated cursor (thread-safe)"""
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            provider = env['hr.multi.ai.provider'].browse(provider_id)
+            return provider.execute_request(prompt, system_prompt, task_type=task_type)
+    
+    def _to_consensus_response(self, provider_type, response):
+        """Convert a provider response into the format expected by ConsensusEngine"""
+        parsed = self._parse_ai_response(response)
+        return {
+            'provider': provider_type,
+            'success': True,
+            'content': parsed,
+            'confidence': self._extract_confidence(parsed),
+            'model': response.get('model'),
+        }
+    
+    def _merge_consensus_result(self, responses, consensus):
+        """Merge the consensus output back into a single structured result
         
-        # Simple consensus: return the response with highest confidence
-        if responses:
+        The highest weighted response supplies the text fields; top-level numeric
+        fields are replaced by their consensus values.
+        """
+        if not consensus.get('success'):
+            _logger.warning(f"Consensus generation failed: {consensus.get('error')}")
             best_response = max(responses, key=lambda x: x['confidence'])
-            return self._parse_ai_response(best_response['response'])
-        else:
-            raise UserError(_('No AI providers available'))
+            return dict(best_response['content'])
+        
+        weighted_result = consensus.get('confidence_weighted_result') or {}
+        best_content = weighted_result.get('best_response')
+        if not isinstance(best_content, dict):
+            best_content = max(responses, key=lambda x: x['confidence'])['content']
+        
+        result = dict(best_content)
+        for key, value in consensus.get('numerical_consensus', {}).items():
+            if key in result and isinstance(result[key], (int, float)) and not isinstance(result[key], bool):
+                result[key] = value
+        
+        result['confidence'] = consensus.get('overall_confidence', result.get('confidence', 0))
+        result['providers_used'] = consensus.get('providers_used', [])
+        return result
     
     def _get_single_ai_response(self, task_type, prompt, system_prompt, preferred_provider=None):
         """Get response from single AI provider"""
@@ -267,14 +381,16 @@ class HRAIOrchestrator(models.TransientModel):
         if preferred_provider:
             providers = [preferred_provider]
         else:
-            providers = ai_config.get_provider_priority(task_type)
+            providers = ai_config.get_routed_providers(task_type)
         
         for provider_type in providers:
             try:
                 provider = self._get_ai_provider(provider_type)
                 if provider and provider.health_status == 'healthy':
-                    response = provider.execute_request(prompt, system_prompt)
-                    return self._parse_ai_response(response)
+                    response = provider.execute_request(prompt, system_prompt, task_type=task_type)
+                    result = self._parse_ai_response(response)
+                    result['provider'] = provider_type
+                    return result
             except Exception as e:
                 _logger.warning(f"Provider {provider_type} failed: {str(e)}")
                 continue
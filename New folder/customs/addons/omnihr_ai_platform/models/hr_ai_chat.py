@@ -107,6 +107,7 @@ class HRAIChat(models.Model):
                 'content': ai_response['content'],
                 'ai_confidence': ai_response.get('confidence', 0),
                 'processing_time': ai_response.get('processing_time', 0),
+                'ai_provider': ai_response.get('provider'),
             })
             
             # Update conversation context
@@ -155,6 +156,7 @@ class HRAIChat(models.Model):
                 'confidence': response.get('confidence', 0),
                 'processing_time': processing_time,
                 'suggested_actions': response.get('suggested_actions', []),
+                'provider': response.get('provider'),
             }
             
         except Exception as e:
@@ -326,6 +328,7 @@ class HRAIChatMessage(models.Model):
     ai_confidence = fields.Float('AI Confidence Score')
     processing_time = fields.Float('Processing Time (seconds)')
     ai_model_version = fields.Char('AI Model Version')
+    ai_provider = fields.Char('AI Provider')
     
     # Message Metadata
     message_intent = fields.Char('Detected Intent')
@@ -351,6 +354,11 @@ class HRAIChatMessage(models.Model):
         self.user_rating = rating
         self.feedback_comment = comment or ''
         
+        # Feed the learned provider reliability (ratings 1-5 mapped to 0-1)
+        self.env['hr.ai.provider.reliability'].sudo().record_rating(
+            self.ai_provider, 'chat_response', (int(rating) - 1) / 4
+        )
+        
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
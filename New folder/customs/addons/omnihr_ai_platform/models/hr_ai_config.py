@@ -29,12 +29,54 @@ class HRAdvancedAIConfig(models.Model):
         default=0.8,
         help='Minimum agreement percentage required for consensus decisions'
     )
-    
+    enable_parallel_consensus = fields.Boolean(
+        'Parallel Consensus Requests',
+        default=True,
+        help='Query consensus providers concurrently instead of one after another'
+    )
+    consensus_min_responses = fields.Integer(
+        'Consensus Early-Exit Responses',
+        default=3,
+        help='Stop waiting for slower providers once this many good answers have arrived'
+    )
+    consensus_timeout = fields.Integer(
+        'Consensus Deadline (seconds)',
+        default=30,
+        help='Maximum time to wait for consensus providers; each provider is also bound by its own timeout'
+    )
+
     # Performance Optimization
     enable_caching = fields.Boolean('Enable AI Response Caching', default=True)
     cache_duration = fields.Integer('Cache Duration (hours)', default=24)
+    cache_backend = fields.Selection([
+        ('memory', 'In-Process (per worker)'),
+        ('disk', 'On-Disk (shared by workers)'),
+    ], 'Cache Storage', default='memory', required=True)
+    cache_max_size_mb = fields.Integer('Cache Size Limit (MB)', default=64)
     max_concurrent_requests = fields.Integer('Max Concurrent AI Requests', default=10)
     
+    # Adaptive Routing
+    enable_adaptive_routing = fields.Boolean(
+        'Adaptive Provider Routing',
+        default=True,
+        help='Route each task type to the fastest provider whose learned reliability is high enough'
+    )
+    routing_min_reliability = fields.Float(
+        'Routing Minimum Reliability',
+        default=0.8,
+        help='Providers whose learned reliability for a task type is below this value are skipped'
+    )
+    routing_max_latency = fields.Float(
+        'Routing Maximum Response Time (s)',
+        default=0.0,
+        help='Providers slower than this on average are skipped (0 = no limit)'
+    )
+    reliability_half_life_days = fields.Float(
+        'Reliability Half-Life (days)',
+        default=7.0,
+        help='Age at which an outcome or rating counts half as much in the learned reliability'
+    )
+    
     # Cost Management
     monthly_budget_limit = fields.Float('Monthly AI Budget Limit ($)', default=1000.0)
     cost_alert_threshold = fields.Float('Budget Alert Threshold (%)', default=80.0)
@@ -48,6 +90,11 @@ class HRAdvancedAIConfig(models.Model):
     # Monitoring & Logging
     enable_detailed_logging = fields.Boolean('Enable Detailed AI Logging', default=True)
     log_retention_days = fields.Integer('Log Retention Days', default=90)
+    metrics_flush_interval = fields.Integer(
+        'Metrics Flush Interval (seconds)',
+        default=60,
+        help='How often each worker writes its aggregated AI performance metrics to the database'
+    )
     
     @api.constrains('consensus_threshold')
     def _check_consensus_threshold(self):
@@ -55,6 +102,22 @@ class HRAdvancedAIConfig(models.Model):
             if not 0.5 <= record.consensus_threshold <= 1.0:
                 raise ValidationError(_('Consensus threshold must be between 0.5 and 1.0'))
     
+    @api.constrains('routing_min_reliability', 'reliability_half_life_days')
+    def _check_adaptive_routing(self):
+        for record in self:
+            if not 0.0 <= record.routing_min_reliability <= 1.0:
+                raise ValidationError(_('Routing minimum reliability must be between 0 and 1'))
+            if record.reliability_half_life_days <= 0:
+                raise ValidationError(_('Reliability half-life must be positive'))
+    
+    @api.constrains('consensus_min_responses', 'consensus_timeout')
+    def _check_consensus_fan_out(self):
+        for record in self:
+            if record.consensus_min_responses < 1:
+                raise ValidationError(_('Consensus early-exit responses must be at least 1'))
+            if record.consensus_timeout <= 0:
+                raise ValidationError(_('Consensus deadline must be positive'))
+
     @api.constrains('provider_priority')
     def _check_provider_priority_json(self):
         for record in self:
@@ -73,6 +136,23 @@ class HRAdvancedAIConfig(models.Model):
             _logger.warning(f"Invalid JSON in provider_priority for config {self.name}")
             return ['openai']
     
+    def get_routed_providers(self, task_type, provider_types=None):
+        """Get providers for a task type, reordered by learned reliability and speed
+        
+        Args:
+            task_type: Task type used for the learned statistics
+            provider_types: Candidate provider types (defaults to the priority of ``task_type``)
+        """
+        provider_types = provider_types or self.get_provider_priority(task_type)
+        if not self.enable_adaptive_routing:
+            return provider_types
+        return self.env['hr.ai.provider.reliability'].rank_providers(
+            task_type,
+            provider_types,
+            min_reliability=self.routing_min_reliability,
+            max_latency=self.routing_max_latency,
+        )
+    
     def check_budget_limit(self, proposed_cost):
         """Check if proposed cost exceeds budget limits"""
         if self.monthly_budget_limit > 0:
@@ -0,0 +1,193 @@
+from odoo import models, fields, api
+import json
+import logging
+from datetime import datetime, timedelta
+
+from psycopg2.extras import execute_values
+
+from ..services.performance_monitor import MetricBucket, PerformanceMonitor
+from .hr_multi_ai_provider import performance_monitor
+
+_logger = logging.getLogger(__name__)
+
+class HRAIPerformanceMetric(models.Model):
+    _name = 'hr.ai.performance.metric'
+    _description = 'AI Provider Performance Metric Bucket'
+    _order = 'period_start desc, provider'
+    _rec_name = 'provider'
+
+    # One row holds the hourly aggregate flushed by one worker; rows of the same
+    # provider and hour are merged by the compaction cron.
+    provider = fields.Char('Provider', required=True, index=True, readonly=True)
+    period_start = fields.Datetime('Period Start', required=True, index=True, readonly=True)
+    requests = fields.Integer('Requests', readonly=True)
+    successes = fields.Integer('Successful Requests', readonly=True)
+    total_response_time = fields.Float('Total Response Time (s)', readonly=True)
+    total_cost = fields.Float('Total Cost ($)', readonly=True)
+    total_tokens = fields.Integer('Total Tokens', readonly=True)
+    bucket = fields.Json('Aggregate', readonly=True, help='Serialized bucket with error, task and latency sketch data')
+
+    @api.model
+    def flush_monitor(self, monitor, interval=60, force=False):
+        """Persist the buckets a worker accumulated since its last flush
+
+        Called on the request path: it is a no-op until ``interval`` seconds have
+        passed, then writes all pending buckets with a single multi-row INSERT on
+        a dedicated cursor, so a rolled back request does not lose metrics. The
+        per task outcomes are folded into ``hr.ai.provider.reliability`` in the
+        same transaction.
+
+        Args:
+            monitor: PerformanceMonitor of the current worker
+            interval: Minimum seconds between two flushes
+            force: Flush regardless of the interval
+
+        Returns:
+            int: Number of buckets written
+        """
+        if not force and not monitor.claim_flush(interval):
+            return 0
+
+        rows = monitor.drain_pending()
+        outcomes = monitor.drain_outcomes()
+        if not rows and not outcomes:
+            return 0
+
+        try:
+            with self.env.registry.cursor() as cr:
+                if rows:
+                    self._insert_buckets(cr, rows)
+                self.env['hr.ai.provider.reliability'].record_outcomes(cr, outcomes)
+        except Exception as e:
+            monitor.restore_pending(rows)
+            monitor.restore_outcomes(outcomes)
+            _logger.error(f"Failed to flush AI performance metrics: {str(e)}")
+            return 0
+        return len(rows)
+
+    @api.model
+    def _insert_buckets(self, cr, rows):
+        """Insert serialized buckets with one multi-row INSERT"""
+        now = fields.Datetime.now()
+        values = [
+            (
+                row['provider'],
+                row['period_start'],
+                row['bucket']['requests'],
+                row['bucket']['successes'],
+                row['bucket']['total_response_time'],
+                row['bucket']['total_cost'],
+                row['bucket']['total_tokens'],
+                json.dumps(row['bucket']),
+                now,
+                now,
+                self.env.uid,
+                self.env.uid,
+            )
+            for row in rows
+        ]
+        execute_values(cr._obj, f"""
+            INSERT INTO {self._table} (
+                provider, period_start, requests, successes, total_response_time,
+                total_cost, total_tokens, bucket, create_date, write_date, create_uid, write_uid
+            ) VALUES %s
+        """, values, template='(%s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s, %s)')
+
+    @api.model
+    def _cron_flush_performance_metrics(self):
+        """Flush this worker's metrics, then compact and purge persisted buckets"""
+        self.flush_monitor(performance_monitor, force=True)
+        self._compact_buckets()
+
+        ai_config = self.env['hr.advanced.ai.config'].search([('active', '=', True)], limit=1)
+        if ai_config.log_retention_days:
+            cutoff = fields.Datetime.now() - timedelta(days=ai_config.log_retention_days)
+            self.search([('period_start', '<', cutoff)]).unlink()
+
+    @api.model
+    def _compact_buckets(self):
+        """Merge the rows of each provider and closed hour into a single row"""
+        current_hour = fields.Datetime.now().replace(minute=0, second=0, microsecond=0)
+        groups = self.read_group(
+            [('period_start', '<', current_hour)],
+            ['provider', 'period_start'],
+            ['provider', 'period_start:hour'],
+            lazy=False,
+        )
+        merged_rows = []
+        stale = self.browse()
+        for group in groups:
+            if group['__count'] < 2:
+                continue
+            records = self.search(group['__domain'])
+            bucket = MetricBucket()
+            for record in records:
+                bucket.merge(MetricBucket.from_dict(record.bucket or {}))
+            merged_rows.append({
+                'provider': records[0].provider,
+                'period_start': records[0].period_start,
+                'bucket': bucket.to_dict(),
+            })
+            stale |= records
+
+        if merged_rows:
+            stale.unlink()
+            self._insert_buckets(self.env.cr, merged_rows)
+            _logger.info(f"Compacted {len(stale)} AI performance metric rows into {len(merged_rows)}")
+
+    @api.model
+    def _get_cluster_monitor(self, time_range=None):
+        """Build a monitor holding the merged numbers of every worker
+
+        Persisted hourly buckets are combined with this worker's not yet
+        flushed buckets, so the result is up to date for the local worker and at
+        most one flush interval behind for the others.
+
+        Args:
+            time_range: Optional timedelta limiting the buckets loaded
+
+        Returns:
+            PerformanceMonitor with hourly resolution
+        """
+        domain = []
+        if time_range:
+            since = (datetime.now() - time_range).replace(minute=0, second=0, microsecond=0)
+            domain.append(('period_start', '>=', since))
+
+        monitor = PerformanceMonitor(resolution='hourly')
+        for row in self.search_read(domain, ['provider', 'period_start', 'bucket'], order='period_start'):
+            monitor.ingest_bucket(row['provider'], row['period_start'], MetricBucket.from_dict(row['bucket'] or {}))
+        for row in performance_monitor.peek_pending():
+            monitor.ingest_bucket(row['provider'], row['period_start'], MetricBucket.from_dict(row['bucket']))
+        return monitor
+
+    @api.model
+    def get_system_performance(self, time_range_hours=None):
+        """Get cluster-wide system performance
+
+        Args:
+            time_range_hours: Optional number of hours to look back
+        """
+        time_range = timedelta(hours=time_range_hours) if time_range_hours else None
+        return self._get_cluster_monitor(time_range).get_system_performance(time_range)
+
+    @api.model
+    def get_provider_comparison(self, time_range_hours=None):
+        """Compare providers on cluster-wide numbers
+
+        Args:
+            time_range_hours: Optional number of hours to look back
+        """
+        time_range = timedelta(hours=time_range_hours) if time_range_hours else None
+        return self._get_cluster_monitor(time_range).get_provider_comparison(time_range)
+
+    @api.model
+    def get_performance_trends(self, period='hourly', days_back=7):
+        """Get cluster-wide performance trends
+
+        Args:
+            period: Trend period ('hourly', 'daily', 'weekly')
+            days_back: Number of days to look back
+        """
+        monitor = self._get_cluster_monitor(timedelta(days=days_back + 7))
+        return monitor.get_performance_trends(period, days_back)
@@ -0,0 +1,204 @@
+from odoo import models, fields, api
+import logging
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+from ..services.consensus_engine import ConsensusEngine
+
+_logger = logging.getLogger(__name__)
+
+class HRAIProviderReliability(models.Model):
+    _name = 'hr.ai.provider.reliability'
+    _description = 'Learned AI Provider Reliability'
+    _order = 'task_type, provider'
+    _rec_name = 'provider'
+
+    # Statistics are exponentially decayed sums: on every update the stored
+    # values are multiplied by 0.5 ** (age / half-life) before the new
+    # observations are added, so old outcomes fade out. Updates are atomic
+    # upserts, so every worker contributes to the same rows.
+    provider = fields.Char('Provider', required=True, index=True, readonly=True)
+    task_type = fields.Char('Task Type', required=True, index=True, readonly=True)
+    request_weight = fields.Float('Decayed Requests', readonly=True)
+    success_weight = fields.Float('Decayed Successes', readonly=True)
+    latency_sum = fields.Float('Decayed Response Time (s)', readonly=True)
+    rating_weight = fields.Float('Decayed Ratings', readonly=True)
+    rating_sum = fields.Float('Decayed Rating Sum', readonly=True)
+    last_update = fields.Datetime('Last Update', readonly=True)
+
+    success_rate = fields.Float('Success Rate', compute='_compute_scores')
+    avg_response_time = fields.Float('Average Response Time (s)', compute='_compute_scores')
+    avg_rating = fields.Float('Average Rating', compute='_compute_scores')
+    reliability = fields.Float('Learned Reliability', compute='_compute_scores')
+
+    _sql_constraints = [
+        ('provider_task_uniq', 'unique(provider, task_type)',
+         'Reliability statistics must be unique per provider and task type!'),
+    ]
+
+    # Decayed requests needed before routing trusts a provider's statistics
+    ROUTING_MIN_EVIDENCE = 5.0
+
+    @api.depends('request_weight', 'success_weight', 'latency_sum', 'rating_weight', 'rating_sum')
+    def _compute_scores(self):
+        for record in self:
+            record.success_rate = record.success_weight / record.request_weight if record.request_weight else 0
+            record.avg_response_time = record.latency_sum / record.request_weight if record.request_weight else 0
+            record.avg_rating = record.rating_sum / record.rating_weight if record.rating_weight else 0
+            engine = ConsensusEngine.from_statistics([record._get_statistic()])
+            record.reliability = engine.provider_strengths.get(record.task_type, {}).get(
+                record.provider, engine.provider_reliability.get(record.provider, 0.5)
+            )
+
+    def _get_statistic(self):
+        self.ensure_one()
+        return {
+            'provider': self.provider,
+            'task_type': self.task_type,
+            'request_weight': self.request_weight,
+            'success_weight': self.success_weight,
+            'latency_sum': self.latency_sum,
+            'rating_weight': self.rating_weight,
+            'rating_sum': self.rating_sum,
+        }
+
+    @api.model
+    def _get_half_life_seconds(self):
+        ai_config = self.env['hr.advanced.ai.config'].search([('active', '=', True)], limit=1)
+        return max(ai_config.reliability_half_life_days or 7.0, 0.01) * 86400
+
+    @api.model
+    def _upsert(self, cr, rows):
+        """Decay the stored statistics and add new observations, atomically
+
+        Args:
+            cr: Cursor to write with
+            rows: Dicts with provider, task_type and any of request_weight,
+                success_weight, latency_sum, rating_weight, rating_sum
+        """
+        if not rows:
+            return
+        half_life = float(self._get_half_life_seconds())
+        now = fields.Datetime.now()
+        columns = ['request_weight', 'success_weight', 'latency_sum', 'rating_weight', 'rating_sum']
+        values = [
+            (row['provider'], row['task_type'], *[float(row.get(c, 0.0)) for c in columns],
+             now, now, now, self.env.uid, self.env.uid)
+            for row in rows
+        ]
+        decay = (
+            f"power(0.5, GREATEST(EXTRACT(EPOCH FROM EXCLUDED.last_update - r.last_update), 0)"
+            f" / {half_life})"
+        )
+        updates = ', '.join(f"{c} = r.{c} * {decay} + EXCLUDED.{c}" for c in columns)
+        execute_values(cr._obj, f"""
+            INSERT INTO {self._table} AS r (
+                provider, task_type, {', '.join(columns)},
+                last_update, create_date, write_date, create_uid, write_uid
+            ) VALUES %s
+            ON CONFLICT (provider, task_type) DO UPDATE SET
+                {updates},
+                last_update = GREATEST(r.last_update, EXCLUDED.last_update),
+                write_date = EXCLUDED.write_date
+        """, values)
+
+    @api.model
+    def record_outcomes(self, cr, outcomes):
+        """Add request outcomes drained from a PerformanceMonitor
+
+        Args:
+            cr: Cursor to write with
+            outcomes: Dicts with provider, task_type, requests, successes and
+                total_response_time
+        """
+        self._upsert(cr, [{
+            'provider': outcome['provider'],
+            'task_type': outcome['task_type'],
+            'request_weight': outcome['requests'],
+            'success_weight': outcome['successes'],
+            'latency_sum': outcome['total_response_time'],
+        } for outcome in outcomes])
+
+    @api.model
+    def record_rating(self, provider, task_type, rating):
+        """Add a user rating of a provider's answer
+
+        Args:
+            provider: Provider type
+            task_type: Task type the answer was produced for
+            rating: Rating between 0 (useless) and 1 (excellent)
+        """
+        if not provider:
+            return
+        self._upsert(self.env.cr, [{
+            'provider': provider,
+            'task_type': task_type,
+            'rating_weight': 1.0,
+            'rating_sum': min(max(float(rating), 0.0), 1.0),
+        }])
+
+    @api.model
+    def _get_current_statistics(self, task_type=None):
+        """Get the statistics decayed to now"""
+        half_life = self._get_half_life_seconds()
+        now = datetime.now()
+        domain = [('task_type', '=', task_type)] if task_type else []
+        statistics = []
+        for record in self.search(domain):
+            age = (now - record.last_update).total_seconds() if record.last_update else 0
+            factor = 0.5 ** (max(age, 0) / half_life)
+            statistic = record._get_statistic()
+            for key in ('request_weight', 'success_weight', 'latency_sum', 'rating_weight', 'rating_sum'):
+                statistic[key] *= factor
+            statistics.append(statistic)
+        return statistics
+
+    @api.model
+    def get_consensus_engine(self):
+        """Get a ConsensusEngine weighted by the learned reliability"""
+        return ConsensusEngine.from_statistics(self._get_current_statistics())
+
+    @api.model
+    def rank_providers(self, task_type, provider_types, min_reliability=0.8, max_latency=0.0):
+        """Order providers for a task: fastest accurate provider first
+
+        Providers with enough history are kept only if their learned
+        reliability reaches ``min_reliability`` and, when ``max_latency`` is
+        set, their average response time stays below it; the kept ones are
+        sorted by average response time. Providers without enough history
+        follow in their configured order so they keep getting traffic. If every
+        provider is filtered out, the configured order is returned unchanged.
+
+        Args:
+            task_type: Task type
+            provider_types: Provider types in configured priority order
+            min_reliability: Minimum learned reliability
+            max_latency: Maximum average response time in seconds (0 = no limit)
+
+        Returns:
+            List of provider types
+        """
+        statistics = {s['provider']: s for s in self._get_current_statistics(task_type)}
+        engine = ConsensusEngine.from_statistics(list(statistics.values()))
+        strengths = engine.provider_strengths.get(task_type, {})
+
+        proven = []
+        unproven = []
+        for provider_type in provider_types:
+            statistic = statistics.get(provider_type)
+            if not statistic or statistic['request_weight'] < self.ROUTING_MIN_EVIDENCE:
+                unproven.append(provider_type)
+                continue
+            reliability = strengths.get(provider_type, engine.provider_reliability.get(provider_type, 0.5))
+            latency = statistic['latency_sum'] / statistic['request_weight']
+            if reliability < min_reliability or (max_latency and latency > max_latency):
+                _logger.info(
+                    f"Routing skips {provider_type} for {task_type}: "
+                    f"reliability {reliability:.2f}, latency {latency:.2f}s"
+                )
+                continue
+            proven.append((latency, provider_type))
+
+        ranked = [provider_type for _latency, provider_type in sorted(proven)] + unproven
+        return ranked or list(provider_types)
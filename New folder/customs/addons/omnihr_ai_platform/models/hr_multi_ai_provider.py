@@ -1,11 +1,24 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
 import logging
+import os
+import threading
 from datetime import datetime, timedelta
 import json
 
+from odoo.tools import config
+
+from ..services.client_registry import client_registry
+from ..services.performance_monitor import PerformanceMonitor
+from ..services.response_cache import DiskCacheBackend, InMemoryCacheBackend, ResponseCache
+
 _logger = logging.getLogger(__name__)
 
+# Shared by all threads of the worker
+performance_monitor = PerformanceMonitor()
+_response_caches = {}
+_response_caches_lock = threading.Lock()
+
 class HRMultiAIProvider(models.Model):
     _name = 'hr.multi.ai.provider'
     _description = 'Multi-AI Provider Configuration'
@@ -47,6 +60,9 @@ class HRMultiAIProvider(models.Model):
         ('offline', 'Offline'),
     ], 'Health Status', default='offline', readonly=True)
     
+    # Fields that change how the SDK client is built
+    _CLIENT_FIELDS = {'provider_type', 'api_key', 'api_endpoint', 'timeout'}
+    
     @api.model_create_multi
     def create(self, vals_list):
         for vals in vals_list:
@@ -58,6 +74,66 @@ class HRMultiAIProvider(models.Model):
                 vals['model_name'] = 'gemini-pro'
         return super().create(vals_list)
     
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & self._CLIENT_FIELDS:
+            for record in self:
+                client_registry.invalidate(record.id)
+        return res
+    
+    def unlink(self):
+        for record in self:
+            client_registry.invalidate(record.id)
+        return super().unlink()
+    
+    @api.model
+    def get_client_pool_stats(self):
+        """Get hit/miss statistics of the pooled SDK clients of this worker"""
+        return client_registry.get_stats()
+    
+    @api.model
+    def get_response_cache_stats(self):
+        """Get response cache hit rate, bytes saved and avoided cost"""
+        stats = performance_monitor.get_cache_performance()
+        stats['caches'] = {
+            f"{backend}:{dbname}": cache.get_stats()
+            for (backend, dbname), cache in _response_caches.items()
+            if dbname == self.env.cr.dbname
+        }
+        return stats
+    
+    def _get_response_cache(self, ai_config):
+        """Get the response cache configured on the active AI configuration"""
+        key = (ai_config.cache_backend or 'memory', self.env.cr.dbname)
+        max_bytes = max(ai_config.cache_max_size_mb, 1) * 1024 * 1024
+        cache = _response_caches.get(key)
+        if cache is None:
+            with _response_caches_lock:
+                cache = _response_caches.get(key)
+                if cache is None:
+                    if key[0] == 'disk':
+                        directory = os.path.join(config.filestore(self.env.cr.dbname), 'ai_response_cache')
+                        backend = DiskCacheBackend(directory, max_bytes=max_bytes)
+                    else:
+                        backend = InMemoryCacheBackend(max_bytes=max_bytes)
+                    cache = ResponseCache(backend, monitor=performance_monitor)
+                    _response_caches[key] = cache
+        cache.backend.max_bytes = max_bytes
+        return cache
+    
+    def _log_performance(self, ai_config, task_type, prompt, response_data):
+        """Record a request in the worker's monitor and flush it when due"""
+        performance_monitor.log_request(self.provider_type, task_type, {'prompt': prompt}, response_data)
+        self.env['hr.ai.performance.metric'].flush_monitor(
+            performance_monitor, interval=ai_config.metrics_flush_interval or 60
+        )
+    
+    def _get_pooled_client(self, factory):
+        """Get the pooled SDK client for this provider, creating it on first use"""
+        self.ensure_one()
+        key = client_registry.make_key(self.provider_type, self.id, self.api_key, self.timeout)
+        return client_registry.get_client(key, factory)
+    
     def test_connection(self):
         """Test connection to AI provider"""
         try:
@@ -121,9 +197,9 @@ class HRMultiAIProvider(models.Model):
         """Test Gemini connection"""
         try:
             import google.generativeai as genai
-            genai.configure(api_key=self.api_key)
             model = genai.GenerativeModel(self.model_name)
-            response = model.generate_content("Test connection")
+            with client_registry.gemini_session(self.api_key, genai.configure):
+                response = model.generate_content("Test connection")
             return bool(response.text)
         except ImportError:
             raise Exception("Google Generative AI library not installed. Please install: pip install google-generativeai")
@@ -131,7 +207,33 @@ class HRMultiAIProvider(models.Model):
             raise Exception(f"Gemini connection failed: {str(e)}")
     
     def execute_request(self, prompt, system_prompt=None, **kwargs):
-        """Execute AI request with error handling and metrics tracking"""
+        """Execute AI request with error handling and metrics tracking
+        
+        Identical requests are answered from the response cache when caching is
+        enabled on the active AI configuration; pass ``use_cache=False`` to force
+        a provider call. Pass ``task_type`` to attribute the request in the
+        performance metrics, which are flushed to ``hr.ai.performance.metric``
+        in batches.
+        """
+        use_cache = kwargs.pop('use_cache', True)
+        task_type = kwargs.pop('task_type', 'general')
+        cache = cache_key = None
+        ai_config = self.env['hr.advanced.ai.config'].search([('active', '=', True)], limit=1)
+        if use_cache and ai_config.enable_caching:
+            cache = self._get_response_cache(ai_config)
+            cache_key = cache.make_key(
+                self.provider_type,
+                self.model_name,
+                kwargs.get('temperature', self.temperature),
+                system_prompt,
+                prompt,
+                max_tokens=kwargs.get('max_tokens', self.max_tokens),
+            )
+            cached_response = cache.get(cache_key, provider=self.provider_type)
+            if cached_response is not None:
+                cached_response['cached'] = True
+                return cached_response
+        
         start_time = datetime.now()
         
         try:
@@ -147,11 +249,31 @@ class HRMultiAIProvider(models.Model):
             # Update metrics
             response_time = (datetime.now() - start_time).total_seconds()
             self._update_success_metrics(response_time, kwargs.get('estimated_cost', 0))
+            self._log_performance(ai_config, task_type, prompt, {
+                'success': True,
+                'response_time': response_time,
+                'tokens_used': sum(v for v in (response.get('usage') or {}).values() if isinstance(v, int)),
+                'cost': kwargs.get('estimated_cost', 0),
+                'model': response.get('model'),
+            })
+            
+            if cache_key:
+                cache.set(
+                    cache_key,
+                    dict(response, cost=kwargs.get('estimated_cost', 0)),
+                    ttl=max(ai_config.cache_duration, 1) * 3600,
+                )
             
             return response
             
         except Exception as e:
             self._update_failure_metrics()
+            self._log_performance(ai_config, task_type, prompt, {
+                'success': False,
+                'response_time': (datetime.now() - start_time).total_seconds(),
+                'error': e,
+                'model': self.model_name,
+            })
             _logger.error(f"AI request failed for provider {self.name}: {str(e)}")
             raise UserError(_('AI request failed: %s') % str(e))
     
@@ -159,7 +281,9 @@ class HRMultiAIProvider(models.Model):
         """Execute OpenAI request"""
         try:
             import openai
-            client = openai.OpenAI(api_key=self.api_key, timeout=self.timeout)
+            client = self._get_pooled_client(
+                lambda: openai.OpenAI(api_key=self.api_key, timeout=self.timeout)
+            )
             
             messages = []
             if system_prompt:
@@ -186,7 +310,9 @@ class HRMultiAIProvider(models.Model):
         """Execute Claude request"""
         try:
             import anthropic
-            client = anthropic.Anthropic(api_key=self.api_key, timeout=self.timeout)
+            client = self._get_pooled_client(
+                lambda: anthropic.Anthropic(api_key=self.api_key, timeout=self.timeout)
+            )
             
             response = client.messages.create(
                 model=self.model_name,
@@ -212,7 +338,6 @@ class HRMultiAIProvider(models.Model):
         """Execute Gemini request"""
         try:
             import google.generativeai as genai
-            genai.configure(api_key=self.api_key)
             model = genai.GenerativeModel(
                 self.model_name,
                 system_instruction=system_prompt
@@ -223,10 +348,12 @@ class HRMultiAIProvider(models.Model):
                 temperature=kwargs.get('temperature', self.temperature),
             )
             
-            response = model.generate_content(
-                prompt,
-                generation_config=generation_config,
-            )
+            # The SDK client is process-wide: keep this key configured until the answer is in
+            with client_registry.gemini_session(self.api_key, genai.configure):
+                response = model.generate_content(
+                    prompt,
+                    generation_config=generation_config,
+                )
             
             return {
                 'content': response.text,
@@ -1,2 +1,4 @@
-# Services module - currently empty
-# AI orchestrator moved to models directory 
\ No newline at end of file
+# Provider services are imported explicitly by the models that use them
+# (e.g. from ..services.consensus_engine import ConsensusEngine) because
+# they depend on optional SDKs (openai, anthropic, google-generativeai).
+# AI orchestrator moved to models directory
\ No newline at end of file
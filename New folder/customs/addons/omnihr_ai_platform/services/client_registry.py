@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+_logger = logging.getLogger(__name__)
+
+
+class AIClientRegistry:
+    """Process-wide registry of reusable AI SDK clients
+
+    SDK clients (``openai.OpenAI``, ``anthropic.Anthropic``) own an HTTP
+    connection pool. Building one per request throws that pool away and pays a
+    new TLS handshake every time, so clients are created once per provider
+    record / API key / timeout and shared by every thread of the worker.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._clients = {}
+        self._lock = threading.RLock()
+        self._gemini_api_key = None
+        # Gemini requests in flight with the configured key, and requests
+        # waiting to switch to another key
+        self._gemini_condition = threading.Condition(self._lock)
+        self._gemini_in_flight = 0
+        self._gemini_waiting = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(provider_type: str, record_id: int, api_key: str, timeout: int) -> Tuple:
+        """Build the registry key for a provider configuration
+
+        The API key is hashed so the registry does not keep a second copy of
+        the secret around.
+
+        Args:
+            provider_type: Provider type (openai, claude, gemini)
+            record_id: ID of the hr.multi.ai.provider record
+            api_key: API key used by the client
+            timeout: Request timeout in seconds
+
+        Returns:
+            Hashable registry key
+        """
+        key_hash = hashlib.sha256((api_key or '').encode()).hexdigest()
+        return (provider_type, record_id, key_hash, timeout)
+
+    def get_client(self, key: Tuple, factory: Callable[[], Any]) -> Any:
+        """Return the pooled client for ``key``, creating it on first use
+
+        Args:
+            key: Registry key from :meth:`make_key`
+            factory: Callable building a new client
+
+        Returns:
+            SDK client instance
+        """
+        client = self._clients.get(key)
+        if client is not None:
+            with self._lock:
+                self.hits += 1
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+
+            # A new key for the same record means its credentials changed
+            for stale_key in [k for k in self._clients if k[:2] == key[:2]]:
+                self._close(self._clients.pop(stale_key))
+                self.evictions += 1
+
+            client = factory()
+            self._clients[key] = client
+            self.misses += 1
+            _logger.info(f"Created pooled {key[0]} client for provider {key[1]}")
+            return client
+
+    @contextmanager
+    def gemini_session(self, api_key: str, configure: Callable[[str], None]):
+        """Run a Gemini request with the SDK configured for ``api_key``
+
+        ``genai.configure`` replaces the SDK's process-wide client, so it only
+        runs when the key changes, and only once no request using the previous
+        key is in flight. Requests sharing the configured key run concurrently;
+        while a request waits for another key, new requests with the current
+        key wait too, so the switch is not starved.
+
+        Args:
+            api_key: API key the request must use
+            configure: ``genai.configure``-compatible callable
+        """
+        with self._gemini_condition:
+            self._gemini_waiting[api_key] += 1
+            try:
+                while not self._gemini_may_enter(api_key):
+                    self._gemini_condition.wait()
+            finally:
+                self._gemini_waiting[api_key] -= 1
+                if not self._gemini_waiting[api_key]:
+                    del self._gemini_waiting[api_key]
+
+            if self._gemini_api_key == api_key:
+                self.hits += 1
+            else:
+                configure(api_key=api_key)
+                self._gemini_api_key = api_key
+                self.misses += 1
+            self._gemini_in_flight += 1
+
+        try:
+            yield
+        finally:
+            with self._gemini_condition:
+                self._gemini_in_flight -= 1
+                if not self._gemini_in_flight:
+                    self._gemini_condition.notify_all()
+
+    def _gemini_may_enter(self, api_key: str) -> bool:
+        """Whether a Gemini request with ``api_key`` may start now"""
+        if not self._gemini_in_flight:
+            return True
+        other_waiting = any(key != api_key for key in self._gemini_waiting)
+        return self._gemini_api_key == api_key and not other_waiting
+
+    def invalidate(self, record_id: int):
+        """Drop and close every client built for a provider record
+
+        Args:
+            record_id: ID of the hr.multi.ai.provider record
+        """
+        with self._lock:
+            for key in [k for k in self._clients if k[1] == record_id]:
+                self._close(self._clients.pop(key))
+                self.evictions += 1
+            self._gemini_api_key = None
+
+    def clear(self):
+        """Close all pooled clients"""
+        with self._lock:
+            for client in self._clients.values():
+                self._close(client)
+            self.evictions += len(self._clients)
+            self._clients.clear()
+            self._gemini_api_key = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics
+
+        Returns:
+            Dict containing hit/miss counters and pool size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'pooled_clients': len(self._clients),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _close(self, client: Any):
+        """Close a client's HTTP connection pool, ignoring failures"""
+        close = getattr(client, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                _logger.warning(f"Failed to close pooled AI client: {str(e)}")
+
+
+client_registry = AIClientRegistry()
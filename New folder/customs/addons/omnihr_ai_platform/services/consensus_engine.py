@@ -1,6 +1,6 @@
 import logging
 import json
-import statistics
+from collections import defaultdict
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import numpy as np
@@ -9,11 +9,139 @@ from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+
+def _weighted_reduce(values: np.ndarray, weights: np.ndarray, parsed: np.ndarray,
+                     per_field: bool = True) -> np.ndarray:
+    """Weighted mean over the response axis of a score matrix
+
+    Works on a single ``(responses, fields)`` matrix or on a stacked
+    ``(tasks, responses, fields)`` batch; missing scores are NaN.
+
+    Args:
+        values: Score matrix
+        weights: Weight of every response, shape ``values.shape[:-1]``
+        parsed: Mask of responses whose content could be parsed
+        per_field: Normalise each field by the weight of the responses that
+            reported it; otherwise by the weight of every parsed response
+
+    Returns:
+        Array of consensus values, one per field (0 where no weight)
+    """
+    present = ~np.isnan(values)
+    row_weights = np.where(parsed, weights, 0.0)[..., None]
+    totals = (np.where(present, values, 0.0) * row_weights).sum(axis=-2)
+    if per_field:
+        denominators = (present * row_weights).sum(axis=-2)
+    else:
+        denominators = np.broadcast_to(row_weights.sum(axis=-2), totals.shape)
+    return np.divide(totals, denominators, out=totals.copy(), where=denominators > 0) * (denominators > 0)
+
+
+def _coefficient_consistency(numbers: np.ndarray) -> np.ndarray:
+    """Consistency (1 - coefficient of variation) of NaN-padded rows of numbers
+
+    Args:
+        numbers: ``(tasks, values)`` array, NaN-padded
+
+    Returns:
+        Consistency per row in [0, 1] (0.5 where fewer than two values)
+    """
+    present = ~np.isnan(numbers)
+    counts = present.sum(axis=-1)
+    filled = np.where(present, numbers, 0.0)
+    means = filled.sum(axis=-1) / np.maximum(counts, 1)
+    squares = (np.where(present, numbers - means[..., None], 0.0) ** 2).sum(axis=-1)
+    stds = np.sqrt(squares / np.maximum(counts - 1, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        consistency = np.clip(1 - stds / np.abs(means), 0.0, 1.0)
+    consistency = np.where(means == 0, np.where(stds == 0, 1.0, 0.0), consistency)
+    return np.where(counts < 2, 0.5, consistency)
+
+
+class ResponseMatrix:
+    """The successful responses of one task flattened into numeric arrays
+
+    Every response is parsed and walked once: numeric scores become a
+    responses x fields matrix (NaN where a response lacks a field), and each
+    weighting scheme becomes a vector. All consensus methods are then NumPy
+    reductions over these arrays; results are memoised so the hybrid method
+    does not recompute them.
+    """
+
+    def __init__(self, responses: List[Dict], contents: List[Any], field_names: List[str],
+                 values: np.ndarray, categories: List[Dict[str, str]],
+                 numbers: List[np.ndarray], weights: Dict[str, np.ndarray]):
+        """Initialize response matrix
+
+        Args:
+            responses: Successful responses, one per row
+            contents: Parsed content of each response (None if unparseable)
+            field_names: Numeric field names, one per column
+            values: Score matrix of shape (responses, fields)
+            categories: Categorical values extracted from each response
+            numbers: Every number found in each response, for consistency
+            weights: Weight vectors ('strength', 'reliability', 'confidence')
+        """
+        self.responses = responses
+        self.contents = contents
+        self.parsed = np.array([content is not None for content in contents], dtype=bool)
+        self.field_names = field_names
+        self.values = values
+        self.categories = categories
+        self.numbers = numbers
+        self.weights = weights
+        self.results = {}
+
+    def scores(self, weight_name: str, per_field: bool = True) -> Dict[str, float]:
+        """Weighted consensus value of every field
+
+        Args:
+            weight_name: Weight vector to use
+            per_field: See :func:`_weighted_reduce`
+
+        Returns:
+            Dict mapping field name to consensus value
+        """
+        key = (weight_name, per_field)
+        if key not in self.results:
+            reduced = _weighted_reduce(self.values, self.weights[weight_name], self.parsed, per_field)
+            self.results[key] = dict(zip(self.field_names, reduced.tolist()))
+        return self.results[key]
+
+    @property
+    def consistency(self) -> float:
+        """Consistency of all numbers across the responses"""
+        if 'consistency' not in self.results:
+            if len(self.responses) < 2:
+                self.results['consistency'] = 1.0
+            else:
+                rows = [n for n in self.numbers if n.size]
+                flat = np.concatenate(rows) if len(rows) >= 2 else np.empty(0)
+                self.results['consistency'] = float(_coefficient_consistency(flat[None, :])[0])
+        return self.results['consistency']
+
+
 class ConsensusEngine:
     """Consensus engine for combining multiple AI provider responses"""
     
-    def __init__(self):
-        """Initialize consensus engine"""
+    # Tasks stacked into one array by generate_consensus_batch
+    BATCH_CHUNK_SIZE = 1000
+    
+    # Weight of the default scores, in observations, when blending learned statistics
+    PRIOR_WEIGHT = 10.0
+    # One user rating counts as this many request outcomes
+    RATING_WEIGHT = 5.0
+    
+    def __init__(self, provider_reliability: Optional[Dict[str, float]] = None,
+                 provider_strengths: Optional[Dict[str, Dict[str, float]]] = None):
+        """Initialize consensus engine
+        
+        Args:
+            provider_reliability: Optional general reliability per provider,
+                overriding the defaults
+            provider_strengths: Optional reliability per task type and provider,
+                overriding the defaults
+        """
         self.consensus_methods = {
             'weighted_average': self._weighted_average_consensus,
             'majority_vote': self._majority_vote_consensus,
@@ -57,11 +185,83 @@ class ConsensusEngine:
                 'gemini': 0.83
             }
         }
+        
+        self.provider_reliability.update(provider_reliability or {})
+        for task_type, strengths in (provider_strengths or {}).items():
+            self.provider_strengths.setdefault(task_type, {}).update(strengths)
+    
+    @classmethod
+    def observed_accuracy(cls, statistic: Dict[str, float]):
+        """Get the accuracy observed in decayed outcome statistics
+        
+        Request success rate and user ratings (0-1) are combined, a rating
+        counting as ``RATING_WEIGHT`` outcomes.
+        
+        Args:
+            statistic: Dict with request_weight, success_weight, rating_weight
+                and rating_sum
+            
+        Returns:
+            Tuple (evidence, accuracy); evidence is 0 when nothing was observed
+        """
+        requests = statistic.get('request_weight') or 0.0
+        ratings = (statistic.get('rating_weight') or 0.0) * cls.RATING_WEIGHT
+        evidence = requests + ratings
+        if evidence <= 0:
+            return 0.0, 0.0
+        
+        accuracy_sum = statistic.get('success_weight') or 0.0
+        if ratings:
+            accuracy_sum += (statistic.get('rating_sum') or 0.0) / statistic['rating_weight'] * ratings
+        return evidence, accuracy_sum / evidence
+    
+    @classmethod
+    def from_statistics(cls, statistics: List[Dict[str, Any]]) -> 'ConsensusEngine':
+        """Build an engine whose weights are learned from outcome statistics
+        
+        Each learned score is a Bayesian blend of the default score (worth
+        ``PRIOR_WEIGHT`` observations) and the observed accuracy, so providers
+        with little history stay close to the defaults.
+        
+        Args:
+            statistics: Dicts with provider, task_type and the decayed
+                statistics accepted by :meth:`observed_accuracy`
+            
+        Returns:
+            ConsensusEngine with learned provider_reliability and provider_strengths
+        """
+        engine = cls()
+        general = defaultdict(lambda: [0.0, 0.0])
+        
+        for statistic in statistics:
+            provider = statistic['provider']
+            task_type = statistic['task_type']
+            evidence, accuracy = cls.observed_accuracy(statistic)
+            if not evidence:
+                continue
+            
+            prior = engine.provider_strengths.get(task_type, {}).get(
+                provider, engine.provider_reliability.get(provider, 0.5)
+            )
+            engine.provider_strengths.setdefault(task_type, {})[provider] = (
+                (prior * cls.PRIOR_WEIGHT + accuracy * evidence) / (cls.PRIOR_WEIGHT + evidence)
+            )
+            general[provider][0] += accuracy * evidence
+            general[provider][1] += evidence
+        
+        for provider, (accuracy_sum, evidence) in general.items():
+            prior = engine.provider_reliability.get(provider, 0.5)
+            engine.provider_reliability[provider] = (
+                (prior * cls.PRIOR_WEIGHT + accuracy_sum) / (cls.PRIOR_WEIGHT + evidence)
+            )
+        
+        return engine
     
     def generate_consensus(self, responses: List[Dict[str, Any]], 
                           task_type: str = 'general',
                           method: str = 'hybrid',
-                          min_responses: int = 2) -> Dict[str, Any]:
+                          min_responses: int = 2,
+                          matrix: Optional[ResponseMatrix] = None) -> Dict[str, Any]:
         """Generate consensus from multiple AI responses
         
         Args:
@@ -69,6 +269,8 @@ class ConsensusEngine:
             task_type: Type of task for provider-specific weighting
             method: Consensus method to use
             min_responses: Minimum number of successful responses required
+            matrix: Prebuilt matrix of the successful responses (see
+                :meth:`generate_consensus_batch`)
             
         Returns:
             Dict containing consensus result and metadata
@@ -86,9 +288,10 @@ class ConsensusEngine:
                     'timestamp': datetime.now().isoformat()
                 }
             
-            # Apply consensus method
+            # Flatten responses once, then apply consensus method
+            matrix = matrix or self._build_matrix(successful_responses, task_type)
             consensus_method = self.consensus_methods.get(method, self._hybrid_consensus)
-            consensus_result = consensus_method(successful_responses, task_type)
+            consensus_result = consensus_method(successful_responses, task_type, matrix)
             
             # Add metadata
             consensus_result.update({
@@ -110,59 +313,119 @@ class ConsensusEngine:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def _weighted_average_consensus(self, responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def generate_consensus_batch(self, tasks: List[Dict[str, Any]],
+                                 method: str = 'hybrid',
+                                 min_responses: int = 2) -> List[Dict[str, Any]]:
+        """Generate consensus for many tasks in one call
+        
+        Tasks of the same type are stacked into tasks x responses x fields
+        arrays, so weighted scores and consistency are computed with one set of
+        NumPy operations per chunk of tasks instead of once per task.
+        
+        Args:
+            tasks: List of dicts with 'responses', an optional 'task_type'
+                (defaults to 'general') and an optional 'key' copied to the result
+            method: Consensus method to use
+            min_responses: Minimum number of successful responses per task
+            
+        Returns:
+            List of consensus results, in the order of ``tasks``
+        """
+        results = [None] * len(tasks)
+        groups = defaultdict(list)
+        for position, task in enumerate(tasks):
+            groups[task.get('task_type') or 'general'].append(position)
+        
+        for task_type, positions in groups.items():
+            for start in range(0, len(positions), self.BATCH_CHUNK_SIZE):
+                chunk = positions[start:start + self.BATCH_CHUNK_SIZE]
+                matrices = {}
+                for position in chunk:
+                    successful = [r for r in tasks[position].get('responses', []) if r.get('success', False)]
+                    if len(successful) >= min_responses:
+                        try:
+                            matrices[position] = self._build_matrix(successful, task_type)
+                        except Exception as e:
+                            _logger.error(f"Failed to build consensus matrix: {str(e)}")
+                
+                try:
+                    self._precompute_batch(list(matrices.values()))
+                except Exception as e:
+                    _logger.error(f"Batch consensus precomputation failed for {task_type}: {str(e)}")
+                
+                for position in chunk:
+                    result = self.generate_consensus(
+                        tasks[position].get('responses', []), task_type, method, min_responses,
+                        matrix=matrices.get(position)
+                    )
+                    if 'key' in tasks[position]:
+                        result['key'] = tasks[position]['key']
+                    results[position] = result
+        
+        return results
+    
+    def _precompute_batch(self, matrices: List[ResponseMatrix]):
+        """Fill the memoised scores and consistency of many matrices at once
+        
+        Args:
+            matrices: Response matrices of tasks sharing a task type
+        """
+        if not matrices:
+            return
+        
+        field_index = {}
+        for matrix in matrices:
+            for name in matrix.field_names:
+                field_index.setdefault(name, len(field_index))
+        columns = [[field_index[name] for name in matrix.field_names] for matrix in matrices]
+        
+        shape = (len(matrices), max(len(matrix.responses) for matrix in matrices))
+        values = np.full(shape + (len(field_index),), np.nan)
+        parsed = np.zeros(shape, dtype=bool)
+        weights = {name: np.zeros(shape) for name in matrices[0].weights}
+        number_rows = [[n for n in matrix.numbers if n.size] for matrix in matrices]
+        numbers = np.full((len(matrices), max([sum(n.size for n in rows) for rows in number_rows] + [1])), np.nan)
+        
+        for t, matrix in enumerate(matrices):
+            rows = len(matrix.responses)
+            values[t][np.ix_(range(rows), columns[t])] = matrix.values
+            parsed[t, :rows] = matrix.parsed
+            for name in weights:
+                weights[name][t, :rows] = matrix.weights[name]
+            if len(number_rows[t]) >= 2:
+                flat = np.concatenate(number_rows[t])
+                numbers[t, :flat.size] = flat
+        
+        for name, per_field in (('strength', True), ('confidence', False), ('reliability', False)):
+            reduced = _weighted_reduce(values, weights[name], parsed, per_field)
+            for t, matrix in enumerate(matrices):
+                matrix.results[(name, per_field)] = dict(zip(matrix.field_names, reduced[t, columns[t]].tolist()))
+        
+        consistency = _coefficient_consistency(numbers)
+        for t, matrix in enumerate(matrices):
+            matrix.results['consistency'] = 1.0 if len(matrix.responses) < 2 else float(consistency[t])
+    
+    def _weighted_average_consensus(self, responses: List[Dict], task_type: str,
+                                    matrix: Optional[ResponseMatrix] = None) -> Dict[str, Any]:
         """Generate consensus using weighted average of numerical values
         
         Args:
             responses: List of successful responses
             task_type: Task type for provider weighting
+            matrix: Prebuilt response matrix (built from ``responses`` if omitted)
             
         Returns:
             Dict containing consensus result
         """
         try:
-            # Extract numerical scores and weights
-            scores = {}
-            weights = {}
-            
-            for response in responses:
-                provider = response.get('provider', 'unknown')
-                weight = self.provider_strengths.get(task_type, {}).get(provider, 0.5)
-                
-                # Extract numerical values from response
-                if isinstance(response.get('content'), dict):
-                    content = response['content']
-                elif isinstance(response.get('content'), str):
-                    try:
-                        content = json.loads(response['content'])
-                    except json.JSONDecodeError:
-                        continue
-                else:
-                    continue
-                
-                # Extract scores based on task type
-                extracted_scores = self._extract_numerical_scores(content, task_type)
-                
-                for key, value in extracted_scores.items():
-                    if key not in scores:
-                        scores[key] = []
-                        weights[key] = []
-                    scores[key].append(value)
-                    weights[key].append(weight)
-            
-            # Calculate weighted averages
-            consensus_scores = {}
-            for key in scores:
-                if scores[key] and weights[key]:
-                    weighted_sum = sum(s * w for s, w in zip(scores[key], weights[key]))
-                    total_weight = sum(weights[key])
-                    consensus_scores[key] = weighted_sum / total_weight if total_weight > 0 else 0
+            matrix = matrix or self._build_matrix(responses, task_type)
+            consensus_scores = matrix.scores('strength')
             
             return {
                 'success': True,
                 'consensus_scores': consensus_scores,
                 'method': 'weighted_average',
-                'confidence': self._calculate_confidence(responses, consensus_scores)
+                'confidence': self._calculate_confidence(responses, consensus_scores, matrix)
             }
             
         except Exception as e:
@@ -171,38 +434,26 @@ class ConsensusEngine:
                 'error': f'Weighted average consensus failed: {str(e)}'
             }
     
-    def _majority_vote_consensus(self, responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def _majority_vote_consensus(self, responses: List[Dict], task_type: str,
+                                 matrix: Optional[ResponseMatrix] = None) -> Dict[str, Any]:
         """Generate consensus using majority vote for categorical values
         
         Args:
             responses: List of successful responses
             task_type: Task type for context
+            matrix: Prebuilt response matrix (built from ``responses`` if omitted)
             
         Returns:
             Dict containing consensus result
         """
         try:
-            # Extract categorical values
-            categorical_values = {}
+            matrix = matrix or self._build_matrix(responses, task_type)
             
-            for response in responses:
-                if isinstance(response.get('content'), dict):
-                    content = response['content']
-                elif isinstance(response.get('content'), str):
-                    try:
-                        content = json.loads(response['content'])
-                    except json.JSONDecodeError:
-                        continue
-                else:
-                    continue
-                
-                # Extract categorical values based on task type
-                extracted_categories = self._extract_categorical_values(content, task_type)
-                
+            # Collect categorical values
+            categorical_values = {}
+            for extracted_categories in matrix.categories:
                 for key, value in extracted_categories.items():
-                    if key not in categorical_values:
-                        categorical_values[key] = []
-                    categorical_values[key].append(value)
+                    categorical_values.setdefault(key, []).append(value)
             
             # Calculate majority votes
             consensus_categories = {}
@@ -227,7 +478,7 @@ class ConsensusEngine:
                 'success': True,
                 'consensus_categories': consensus_categories,
                 'method': 'majority_vote',
-                'confidence': self._calculate_confidence(responses, consensus_categories)
+                'confidence': self._calculate_confidence(responses, consensus_categories, matrix)
             }
             
         except Exception as e:
@@ -236,40 +487,24 @@ class ConsensusEngine:
                 'error': f'Majority vote consensus failed: {str(e)}'
             }
     
-    def _confidence_weighted_consensus(self, responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def _confidence_weighted_consensus(self, responses: List[Dict], task_type: str,
+                                       matrix: Optional[ResponseMatrix] = None) -> Dict[str, Any]:
         """Generate consensus weighted by response confidence scores
         
+        Each response is weighted by its own confidence times the reliability
+        of its provider.
+        
         Args:
             responses: List of successful responses
             task_type: Task type for context
+            matrix: Prebuilt response matrix (built from ``responses`` if omitted)
             
         Returns:
             Dict containing consensus result
         """
         try:
-            weighted_responses = []
-            
-            for response in responses:
-                # Extract confidence from response
-                confidence = self._extract_confidence(response)
-                provider = response.get('provider', 'unknown')
-                
-                # Combine response confidence with provider reliability
-                provider_reliability = self.provider_reliability.get(provider, 0.5)
-                combined_weight = confidence * provider_reliability
-                
-                weighted_responses.append({
-                    'response': response,
-                    'weight': combined_weight,
-                    'confidence': confidence,
-                    'provider_reliability': provider_reliability
-                })
-            
-            # Sort by weight and use top responses for consensus
-            weighted_responses.sort(key=lambda x: x['weight'], reverse=True)
-            
-            # Use weighted average with confidence weights
-            return self._apply_confidence_weights(weighted_responses, task_type)
+            matrix = matrix or self._build_matrix(responses, task_type)
+            return self._apply_confidence_weights(matrix, 'confidence')
             
         except Exception as e:
             return {
@@ -277,37 +512,24 @@ class ConsensusEngine:
                 'error': f'Confidence weighted consensus failed: {str(e)}'
             }
     
-    def _provider_reliability_consensus(self, responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def _provider_reliability_consensus(self, responses: List[Dict], task_type: str,
+                                        matrix: Optional[ResponseMatrix] = None) -> Dict[str, Any]:
         """Generate consensus based on provider reliability scores
         
+        Uses the task-specific provider strength when known, the general
+        provider reliability otherwise.
+        
         Args:
             responses: List of successful responses
             task_type: Task type for provider-specific reliability
+            matrix: Prebuilt response matrix (built from ``responses`` if omitted)
             
         Returns:
             Dict containing consensus result
         """
         try:
-            # Weight responses by provider reliability
-            weighted_responses = []
-            
-            for response in responses:
-                provider = response.get('provider', 'unknown')
-                
-                # Get task-specific reliability or general reliability
-                task_reliability = self.provider_strengths.get(task_type, {}).get(provider)
-                general_reliability = self.provider_reliability.get(provider, 0.5)
-                reliability = task_reliability if task_reliability is not None else general_reliability
-                
-                weighted_responses.append({
-                    'response': response,
-                    'weight': reliability,
-                    'provider': provider,
-                    'reliability': reliability
-                })
-            
-            # Generate consensus using reliability weights
-            return self._apply_reliability_weights(weighted_responses, task_type)
+            matrix = matrix or self._build_matrix(responses, task_type)
+            return self._apply_reliability_weights(matrix)
             
         except Exception as e:
             return {
@@ -315,21 +537,27 @@ class ConsensusEngine:
                 'error': f'Provider reliability consensus failed: {str(e)}'
             }
     
-    def _hybrid_consensus(self, responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def _hybrid_consensus(self, responses: List[Dict], task_type: str,
+                          matrix: Optional[ResponseMatrix] = None) -> Dict[str, Any]:
         """Generate consensus using hybrid approach combining multiple methods
         
+        All methods share one response matrix, so responses are parsed once.
+        
         Args:
             responses: List of successful responses
             task_type: Task type for context
+            matrix: Prebuilt response matrix (built from ``responses`` if omitted)
             
         Returns:
             Dict containing consensus result
         """
         try:
+            matrix = matrix or self._build_matrix(responses, task_type)
+            
             # Apply multiple consensus methods
-            weighted_avg = self._weighted_average_consensus(responses, task_type)
-            majority_vote = self._majority_vote_consensus(responses, task_type)
-            confidence_weighted = self._confidence_weighted_consensus(responses, task_type)
+            weighted_avg = self._weighted_average_consensus(responses, task_type, matrix)
+            majority_vote = self._majority_vote_consensus(responses, task_type, matrix)
+            confidence_weighted = self._confidence_weighted_consensus(responses, task_type, matrix)
             
             # Combine results intelligently
             hybrid_result = {
@@ -356,6 +584,83 @@ class ConsensusEngine:
                 'error': f'Hybrid consensus failed: {str(e)}'
             }
     
+    def _parse_content(self, response: Dict) -> Any:
+        """Get the parsed content of a response, or None if it cannot be parsed"""
+        content = response.get('content')
+        if isinstance(content, dict):
+            return content
+        if isinstance(content, str):
+            try:
+                return json.loads(content)
+            except json.JSONDecodeError:
+                return None
+        return None
+    
+    def _collect_numbers(self, content: Any) -> List[float]:
+        """Collect every number found anywhere in a response content"""
+        numbers = []
+        stack = [content]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, (int, float)):
+                numbers.append(float(obj))
+            elif isinstance(obj, dict):
+                stack.extend(reversed(list(obj.values())))
+            elif isinstance(obj, list):
+                stack.extend(reversed(obj))
+        return numbers
+    
+    def _build_matrix(self, responses: List[Dict], task_type: str) -> ResponseMatrix:
+        """Flatten responses into a ResponseMatrix
+        
+        Args:
+            responses: List of successful responses
+            task_type: Task type for field extraction and provider weighting
+            
+        Returns:
+            ResponseMatrix over the responses
+        """
+        contents = []
+        rows = []
+        categories = []
+        numbers = []
+        field_index = {}
+        
+        for response in responses:
+            content = self._parse_content(response)
+            contents.append(content)
+            if content is None:
+                rows.append({})
+                categories.append({})
+                numbers.append(np.empty(0))
+                continue
+            
+            scores = self._extract_numerical_scores(content, task_type)
+            for key in scores:
+                field_index.setdefault(key, len(field_index))
+            rows.append(scores)
+            categories.append(self._extract_categorical_values(content, task_type))
+            numbers.append(np.array(self._collect_numbers(content), dtype=float))
+        
+        values = np.full((len(responses), len(field_index)), np.nan)
+        for row, scores in enumerate(rows):
+            for key, value in scores.items():
+                values[row, field_index[key]] = value
+        
+        providers = [r.get('provider', 'unknown') for r in responses]
+        task_strengths = self.provider_strengths.get(task_type, {})
+        general = np.array([self.provider_reliability.get(p, 0.5) for p in providers], dtype=float)
+        weights = {
+            'strength': np.array([task_strengths.get(p, 0.5) for p in providers], dtype=float),
+            'reliability': np.array([
+                task_strengths[p] if task_strengths.get(p) is not None else general[i]
+                for i, p in enumerate(providers)
+            ], dtype=float),
+            'confidence': np.array([self._extract_confidence(r) for r in responses], dtype=float) * general,
+        }
+        
+        return ResponseMatrix(responses, contents, list(field_index), values, categories, numbers, weights)
+    
     def _extract_numerical_scores(self, content: Dict, task_type: str) -> Dict[str, float]:
         """Extract numerical scores from response content
         
@@ -475,81 +780,58 @@ class ConsensusEngine:
         
         return min(base_confidence, 1.0)
     
-    def _apply_confidence_weights(self, weighted_responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def _apply_confidence_weights(self, matrix: ResponseMatrix, weight_name: str = 'confidence',
+                                  rank: bool = True) -> Dict[str, Any]:
         """Apply confidence weights to generate consensus
         
+        Scores are normalised by the total weight of all parsed responses.
+        
         Args:
-            weighted_responses: List of responses with weights
-            task_type: Task type for context
+            matrix: Response matrix
+            weight_name: Weight vector to use
+            rank: Order responses by weight, so the highest weighted response is
+                the best response; otherwise keep the response order
             
         Returns:
             Consensus result
         """
-        if not weighted_responses:
+        if not matrix.responses:
             return {'success': False, 'error': 'No weighted responses available'}
         
-        # Use the highest confidence response as base
-        best_response = weighted_responses[0]['response']
-        
-        # Calculate weighted average of numerical scores
-        all_scores = {}
-        total_weight = 0
-        
-        for wr in weighted_responses:
-            weight = wr['weight']
-            response = wr['response']
-            
-            if isinstance(response.get('content'), dict):
-                content = response['content']
-            elif isinstance(response.get('content'), str):
-                try:
-                    content = json.loads(response['content'])
-                except json.JSONDecodeError:
-                    continue
-            else:
-                continue
-            
-            scores = self._extract_numerical_scores(content, task_type)
-            
-            for key, value in scores.items():
-                if key not in all_scores:
-                    all_scores[key] = 0
-                all_scores[key] += value * weight
-            
-            total_weight += weight
+        weights = matrix.weights[weight_name]
         
-        # Normalize scores
-        if total_weight > 0:
-            for key in all_scores:
-                all_scores[key] /= total_weight
+        # Stable descending order, so ties keep the original response order
+        order = np.argsort(-weights, kind='stable') if rank else np.arange(len(weights))
+        best_response = matrix.responses[int(order[0])]
         
         return {
             'success': True,
-            'consensus_scores': all_scores,
+            'consensus_scores': matrix.scores(weight_name, per_field=False),
             'best_response': best_response.get('content'),
-            'confidence_weights': [wr['weight'] for wr in weighted_responses],
-            'total_weight': total_weight
+            'confidence_weights': weights[order].tolist(),
+            'total_weight': float(weights[matrix.parsed].sum())
         }
     
-    def _apply_reliability_weights(self, weighted_responses: List[Dict], task_type: str) -> Dict[str, Any]:
+    def _apply_reliability_weights(self, matrix: ResponseMatrix) -> Dict[str, Any]:
         """Apply reliability weights to generate consensus
         
         Args:
-            weighted_responses: List of responses with reliability weights
-            task_type: Task type for context
+            matrix: Response matrix
             
         Returns:
             Consensus result
         """
         # Similar to confidence weights but using reliability scores
-        return self._apply_confidence_weights(weighted_responses, task_type)
+        return self._apply_confidence_weights(matrix, 'reliability', rank=False)
     
-    def _calculate_confidence(self, responses: List[Dict], consensus_result: Dict) -> float:
+    def _calculate_confidence(self, responses: List[Dict], consensus_result: Dict,
+                              matrix: Optional[ResponseMatrix] = None) -> float:
         """Calculate overall confidence in consensus result
         
         Args:
             responses: Original responses
             consensus_result: Generated consensus
+            matrix: Prebuilt response matrix, to reuse its consistency score
             
         Returns:
             Confidence score (0-1)
@@ -566,7 +848,7 @@ class ConsensusEngine:
         diversity_bonus = len(providers) * 0.1
         
         # Adjust based on response consistency
-        consistency_bonus = self._calculate_consistency(responses) * 0.2
+        consistency_bonus = self._calculate_consistency(responses, matrix) * 0.2
         
         total_confidence = base_confidence + diversity_bonus + consistency_bonus
         return min(total_confidence, 1.0)
@@ -592,11 +874,16 @@ class ConsensusEngine:
         
         return sum(confidences) / len(confidences) if confidences else 0.0
     
-    def _calculate_consistency(self, responses: List[Dict]) -> float:
+    def _calculate_consistency(self, responses: List[Dict],
+                               matrix: Optional[ResponseMatrix] = None) -> float:
         """Calculate consistency score across responses
         
+        Uses the coefficient of variation of every number found in the
+        responses: the lower the spread, the higher the consistency.
+        
         Args:
             responses: List of responses to analyze
+            matrix: Prebuilt response matrix (built from ``responses`` if omitted)
             
         Returns:
             Consistency score (0-1)
@@ -604,56 +891,8 @@ class ConsensusEngine:
         if len(responses) < 2:
             return 1.0
         
-        # Extract numerical values for consistency check
-        all_values = []
-        for response in responses:
-            if isinstance(response.get('content'), dict):
-                content = response['content']
-            elif isinstance(response.get('content'), str):
-                try:
-                    content = json.loads(response['content'])
-                except json.JSONDecodeError:
-                    continue
-            else:
-                continue
-            
-            values = []
-            def extract_numbers(obj):
-                if isinstance(obj, (int, float)):
-                    values.append(float(obj))
-                elif isinstance(obj, dict):
-                    for v in obj.values():
-                        extract_numbers(v)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        extract_numbers(item)
-            
-            extract_numbers(content)
-            if values:
-                all_values.append(values)
-        
-        if not all_values or len(all_values) < 2:
-            return 0.5
-        
-        # Calculate coefficient of variation for consistency
-        try:
-            # Flatten all values
-            flat_values = [v for sublist in all_values for v in sublist]
-            if len(flat_values) < 2:
-                return 0.5
-            
-            mean_val = statistics.mean(flat_values)
-            std_val = statistics.stdev(flat_values)
-            
-            if mean_val == 0:
-                return 1.0 if std_val == 0 else 0.0
-            
-            cv = std_val / abs(mean_val)
-            consistency = max(0, 1 - cv)  # Lower CV = higher consistency
-            return min(consistency, 1.0)
-            
-        except (statistics.StatisticsError, ZeroDivisionError):
-            return 0.5
+        matrix = matrix or self._build_matrix(responses, 'general')
+        return matrix.consistency
     
     def _generate_final_recommendation(self, responses: List[Dict], 
                                      hybrid_result: Dict, task_type: str) -> Dict[str, Any]:
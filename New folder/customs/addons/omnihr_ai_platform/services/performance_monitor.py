@@ -0,0 +1,1183 @@
+import logging
+import json
+import math
+import time
+from typing import Dict, List, Any, Optional, Union
+from datetime import datetime, timedelta
+from collections import defaultdict, deque
+import threading
+from odoo import api, models, fields, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch style)
+
+    Values are counted in logarithmic bins, so any quantile is within
+    ``relative_accuracy`` of the true value, two sketches merge by adding their
+    bin counts, and memory is capped at ``max_bins`` bins.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 512):
+        """Initialize quantile sketch
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+            max_bins: Maximum number of bins kept in memory
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Add a value to the sketch"""
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 1e-9:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: 'QuantileSketch'):
+        """Merge another sketch with the same accuracy into this one"""
+        if not other.count:
+            return
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the two lowest bins together to respect ``max_bins``"""
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Estimated value (0 for an empty sketch)
+        """
+        if not self.count:
+            return 0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0)
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to a JSON-compatible dict"""
+        return {
+            'bins': {str(index): count for index, count in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Rebuild a sketch serialized with :meth:`to_dict`"""
+        sketch = cls()
+        sketch.bins = {int(index): count for index, count in (data.get('bins') or {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data.get('count', 0)
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+
+class MetricBucket:
+    """Aggregated request metrics for one provider over one time slot"""
+
+    MAX_DISTINCT_ERRORS = 50
+
+    __slots__ = ('requests', 'successes', 'total_response_time', 'total_cost',
+                 'total_tokens', 'errors', 'task_types', 'sketch')
+
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.total_response_time = 0.0
+        self.total_cost = 0.0
+        self.total_tokens = 0
+        self.errors = defaultdict(int)
+        self.task_types = defaultdict(int)
+        self.sketch = QuantileSketch()
+
+    def add(self, record: Dict[str, Any]):
+        """Add a request record to the bucket"""
+        self.requests += 1
+        if record['success']:
+            self.successes += 1
+        elif record['error']:
+            self._count_error(record['error'], 1)
+        self.total_response_time += record['response_time']
+        self.total_cost += record['cost']
+        self.total_tokens += record['tokens_used']
+        self.task_types[record['task_type']] += 1
+        self.sketch.add(record['response_time'])
+
+    def merge(self, other: 'MetricBucket'):
+        """Merge another bucket into this one"""
+        self.requests += other.requests
+        self.successes += other.successes
+        self.total_response_time += other.total_response_time
+        self.total_cost += other.total_cost
+        self.total_tokens += other.total_tokens
+        for error, count in other.errors.items():
+            self._count_error(error, count)
+        for task_type, count in other.task_types.items():
+            self.task_types[task_type] += count
+        self.sketch.merge(other.sketch)
+
+    def _count_error(self, error: Any, count: int):
+        error_type = type(error).__name__ if isinstance(error, Exception) else str(error)[:100]
+        if error_type not in self.errors and len(self.errors) >= self.MAX_DISTINCT_ERRORS:
+            error_type = 'other'
+        self.errors[error_type] += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the bucket to a JSON-compatible dict"""
+        return {
+            'requests': self.requests,
+            'successes': self.successes,
+            'total_response_time': self.total_response_time,
+            'total_cost': self.total_cost,
+            'total_tokens': self.total_tokens,
+            'errors': dict(self.errors),
+            'task_types': dict(self.task_types),
+            'sketch': self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MetricBucket':
+        """Rebuild a bucket serialized with :meth:`to_dict`"""
+        bucket = cls()
+        bucket.requests = data.get('requests', 0)
+        bucket.successes = data.get('successes', 0)
+        bucket.total_response_time = data.get('total_response_time', 0.0)
+        bucket.total_cost = data.get('total_cost', 0.0)
+        bucket.total_tokens = data.get('total_tokens', 0)
+        for error, count in (data.get('errors') or {}).items():
+            bucket._count_error(error, count)
+        bucket.task_types.update(data.get('task_types') or {})
+        bucket.sketch = QuantileSketch.from_dict(data.get('sketch') or {})
+        return bucket
+
+    @property
+    def failures(self) -> int:
+        return self.requests - self.successes
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.requests if self.requests else 0
+
+    @property
+    def avg_response_time(self) -> float:
+        return self.total_response_time / self.requests if self.requests else 0
+
+
+class TimeRing:
+    """Fixed-size ring of time-slotted MetricBuckets
+
+    Slot ``i`` of the ring holds period ``index % size``; a slot is reset when
+    a newer period lands on it, so memory never grows with uptime.
+    """
+
+    def __init__(self, size: int, index_of, start_of):
+        """Initialize time ring
+
+        Args:
+            size: Number of periods kept
+            index_of: Callable mapping a datetime to its integer period index
+            start_of: Callable mapping a period index to its start datetime
+        """
+        self.size = size
+        self.index_of = index_of
+        self.start_of = start_of
+        self.slots = [None] * size
+
+    def add(self, timestamp: datetime, record: Dict[str, Any]):
+        """Add a record to the period containing ``timestamp``"""
+        index = self.index_of(timestamp)
+        position = index % self.size
+        slot = self.slots[position]
+        if slot is None or slot[0] != index:
+            slot = (index, MetricBucket())
+            self.slots[position] = slot
+        slot[1].add(record)
+
+    def add_bucket(self, timestamp: datetime, bucket: MetricBucket):
+        """Merge an aggregated bucket into the period containing ``timestamp``"""
+        index = self.index_of(timestamp)
+        position = index % self.size
+        slot = self.slots[position]
+        if slot is None or slot[0] != index:
+            if slot is not None and slot[0] > index:
+                # Older than anything the ring still keeps
+                return
+            slot = (index, MetricBucket())
+            self.slots[position] = slot
+        slot[1].merge(bucket)
+
+    def buckets(self, since: datetime, until: datetime):
+        """Yield ``(index, bucket)`` for the kept periods between two datetimes"""
+        last = self.index_of(until)
+        first = max(self.index_of(since), last - self.size + 1)
+        for index in range(first, last + 1):
+            slot = self.slots[index % self.size]
+            if slot is not None and slot[0] == index:
+                yield index, slot[1]
+
+
+def _minute_index(dt):
+    return (dt.toordinal() * 24 + dt.hour) * 60 + dt.minute
+
+
+def _minute_start(index):
+    hours, minute = divmod(index, 60)
+    days, hour = divmod(hours, 24)
+    return datetime.fromordinal(days).replace(hour=hour, minute=minute)
+
+
+def _hour_index(dt):
+    return dt.toordinal() * 24 + dt.hour
+
+
+def _hour_start(index):
+    days, hour = divmod(index, 24)
+    return datetime.fromordinal(days).replace(hour=hour)
+
+
+def _week_start(index):
+    # Ordinals of Sundays are multiples of 7, matching the '%U' week numbering
+    return datetime.fromordinal(max(index * 7, 1))
+
+
+class ProviderStats:
+    """Streaming aggregates of one provider, guarded by their own lock"""
+
+    # (name, number of periods, period length, index function, start function)
+    GRANULARITIES = (
+        ('minute', 60, timedelta(minutes=1), _minute_index, _minute_start),
+        ('hourly', 24 * 31, timedelta(hours=1), _hour_index, _hour_start),
+        ('daily', 366, timedelta(days=1), lambda dt: dt.toordinal(), datetime.fromordinal),
+        ('weekly', 104, timedelta(weeks=1), lambda dt: dt.toordinal() // 7, _week_start),
+    )
+
+    def __init__(self, resolution: str = 'minute'):
+        """Initialize provider aggregates
+
+        Args:
+            resolution: Finest granularity kept; aggregates rebuilt from hourly
+                buckets use 'hourly' so short ranges are not served from an
+                empty minute ring
+        """
+        names = [granularity[0] for granularity in self.GRANULARITIES]
+        self.granularities = self.GRANULARITIES[names.index(resolution):]
+        self.lock = threading.Lock()
+        self.totals = MetricBucket()
+        self.rings = {
+            name: TimeRing(size, index_of, start_of)
+            for name, size, _length, index_of, start_of in self.granularities
+        }
+        self.response_times = deque(maxlen=1000)
+        self.success_rate_history = deque(maxlen=100)
+        self.last_updated = datetime.now()
+
+    def add(self, record: Dict[str, Any]):
+        """Add a request record (caller holds ``lock``)"""
+        self.totals.add(record)
+        for ring in self.rings.values():
+            ring.add(record['timestamp'], record)
+        self.response_times.append(record['response_time'])
+        self.success_rate_history.append(self.totals.success_rate)
+        self.last_updated = record['timestamp']
+
+    def add_bucket(self, timestamp: datetime, bucket: MetricBucket):
+        """Merge an aggregated bucket starting at ``timestamp`` (caller holds ``lock``)"""
+        self.totals.merge(bucket)
+        for ring in self.rings.values():
+            ring.add_bucket(timestamp, bucket)
+        self.last_updated = max(self.last_updated, timestamp)
+
+    def window(self, time_range: Optional[timedelta], now: datetime) -> MetricBucket:
+        """Merge the buckets covering ``time_range`` (caller holds ``lock``)
+
+        The finest granularity that spans the whole range is used; ranges longer
+        than every ring fall back to the all-time totals.
+        """
+        merged = MetricBucket()
+        if time_range is None:
+            merged.merge(self.totals)
+            return merged
+        for name, size, length, _index_of, _start_of in self.granularities:
+            if time_range <= length * size:
+                for _index, bucket in self.rings[name].buckets(now - time_range, now):
+                    merged.merge(bucket)
+                return merged
+        merged.merge(self.totals)
+        return merged
+
+
+class PerformanceMonitor:
+    """Performance monitoring service for the OmniHR AI Platform
+
+    Metrics are kept as streaming aggregates: per-provider all-time totals plus
+    fixed-size rings of minute, hourly, daily and weekly buckets, each with a
+    mergeable quantile sketch of response times. Logging a request touches a
+    constant number of buckets under that provider's own lock, and reads merge
+    a bounded number of buckets, so cost and memory do not grow with uptime.
+
+    Requests are also accumulated into hourly "pending" buckets that a metrics
+    store can drain periodically (see :meth:`drain_pending`), so several worker
+    processes can persist and merge their numbers without a write per request.
+    Per provider and task type outcomes are drained the same way (see
+    :meth:`drain_outcomes`) to feed learned provider reliability.
+    """
+
+    def __init__(self, max_history_size: int = 10000, resolution: str = 'minute'):
+        """Initialize performance monitor
+
+        Args:
+            max_history_size: Maximum number of raw records kept for inspection
+            resolution: Finest granularity of the provider aggregates
+        """
+        self.max_history_size = max_history_size
+        self.resolution = resolution
+        # Guards the provider registry and cache metrics; per-provider data
+        # is guarded by ProviderStats.lock
+        self.lock = threading.Lock()
+        self._system_lock = threading.Lock()
+
+        # Recent raw records (bounded, for inspection only)
+        self.request_history = deque(maxlen=max_history_size)
+        self.provider_stats = {}
+
+        # System-wide metrics
+        self.system_metrics = self._new_system_metrics()
+
+        # Performance thresholds
+        self.thresholds = {
+            'response_time_warning': 5.0,  # seconds
+            'response_time_critical': 10.0,  # seconds
+            'success_rate_warning': 0.9,  # 90%
+            'success_rate_critical': 0.8,  # 80%
+            'cost_per_request_warning': 0.1,  # $0.10
+            'cost_per_request_critical': 0.5,  # $0.50
+            'token_efficiency_warning': 0.7,  # tokens used / max tokens
+            'token_efficiency_critical': 0.9
+        }
+
+        # Alert history
+        self.alerts = deque(maxlen=1000)
+
+        # Response cache metrics
+        self.cache_metrics = defaultdict(self._new_cache_metrics)
+
+        # Hourly buckets not yet persisted, keyed by (provider, hour index)
+        self._pending = {}
+        # Outcomes not yet persisted: (provider, task type) -> [requests, successes, response time]
+        self._pending_outcomes = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _new_system_metrics() -> Dict[str, Any]:
+        return {
+            'total_requests': 0,
+            'total_successful': 0,
+            'total_failed': 0,
+            'total_cost': 0,
+            'total_tokens': 0,
+            'uptime_start': datetime.now(),
+            'last_health_check': None,
+            'consensus_accuracy': deque(maxlen=1000),
+            'user_satisfaction': deque(maxlen=1000)
+        }
+
+    def _get_provider_stats(self, provider: str, create: bool = True) -> Optional[ProviderStats]:
+        """Get (or create) the aggregates of a provider"""
+        stats = self.provider_stats.get(provider)
+        if stats is None and create:
+            with self.lock:
+                stats = self.provider_stats.setdefault(provider, ProviderStats(self.resolution))
+        return stats
+
+    def log_request(self, provider: str, task_type: str, request_data: Dict[str, Any],
+                   response_data: Dict[str, Any]):
+        """Log a request and response for performance tracking
+
+        Args:
+            provider: AI provider name
+            task_type: Type of task performed
+            request_data: Request information
+            response_data: Response information
+        """
+        try:
+            timestamp = datetime.now()
+
+            # Create request record
+            record = {
+                'timestamp': timestamp,
+                'provider': provider,
+                'task_type': task_type,
+                'success': response_data.get('success', False),
+                'response_time': response_data.get('response_time', 0) or 0,
+                'tokens_used': response_data.get('tokens_used', 0) or 0,
+                'cost': response_data.get('cost', 0) or 0,
+                'error': response_data.get('error'),
+                'model': response_data.get('model'),
+                'request_size': len(str(request_data)),
+                'response_size': len(str(response_data))
+            }
+
+            # Add to history (deque appends are atomic)
+            self.request_history.append(record)
+
+            # Update provider metrics and trends
+            stats = self._get_provider_stats(provider)
+            with stats.lock:
+                stats.add(record)
+                success_rate = stats.totals.success_rate
+                avg_cost = stats.totals.total_cost / stats.totals.requests
+
+            # Queue for the metrics store
+            with self._pending_lock:
+                key = (provider, _hour_index(timestamp))
+                bucket = self._pending.get(key)
+                if bucket is None:
+                    bucket = self._pending[key] = MetricBucket()
+                bucket.add(record)
+                outcome = self._pending_outcomes.setdefault((provider, task_type), [0, 0, 0.0])
+                outcome[0] += 1
+                outcome[1] += 1 if record['success'] else 0
+                outcome[2] += record['response_time']
+
+            # Update system metrics
+            self._update_system_metrics(record)
+
+            # Check for alerts
+            self._check_alerts(provider, record, success_rate, avg_cost)
+
+        except Exception as e:
+            _logger.error(f"Failed to log request: {str(e)}")
+
+    def ingest_bucket(self, provider: str, period_start: datetime, bucket: MetricBucket):
+        """Merge an aggregated bucket (e.g. loaded from a metrics store)
+
+        Ingested buckets update the provider aggregates and system counters but
+        are not queued for flushing again.
+
+        Args:
+            provider: AI provider name
+            period_start: Start of the period the bucket covers
+            bucket: Aggregated metrics
+        """
+        stats = self._get_provider_stats(provider)
+        with stats.lock:
+            stats.add_bucket(period_start, bucket)
+        with self._system_lock:
+            self.system_metrics['total_requests'] += bucket.requests
+            self.system_metrics['total_successful'] += bucket.successes
+            self.system_metrics['total_failed'] += bucket.failures
+            self.system_metrics['total_cost'] += bucket.total_cost
+            self.system_metrics['total_tokens'] += bucket.total_tokens
+            self.system_metrics['uptime_start'] = min(self.system_metrics['uptime_start'], period_start)
+
+    def claim_flush(self, interval: float) -> bool:
+        """Claim the next flush if ``interval`` seconds passed since the last one
+
+        Only one caller per interval gets True, so concurrent request threads
+        do not flush at the same time.
+        """
+        with self._pending_lock:
+            now = time.monotonic()
+            if now - self._last_flush < interval:
+                return False
+            self._last_flush = now
+            return True
+
+    def peek_pending(self) -> List[Dict[str, Any]]:
+        """Get a copy of the not yet persisted buckets, without draining them"""
+        with self._pending_lock:
+            return [
+                {'provider': provider, 'period_start': _hour_start(index), 'bucket': bucket.to_dict()}
+                for (provider, index), bucket in self._pending.items()
+            ]
+
+    def drain_pending(self) -> List[Dict[str, Any]]:
+        """Take the buckets accumulated since the last drain
+
+        Returns:
+            List of dicts with provider, period_start (hour) and the serialized bucket
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        return [
+            {'provider': provider, 'period_start': _hour_start(index), 'bucket': bucket.to_dict()}
+            for (provider, index), bucket in pending.items()
+        ]
+
+    def restore_pending(self, rows: List[Dict[str, Any]]):
+        """Put drained buckets back after a failed flush"""
+        with self._pending_lock:
+            for row in rows:
+                key = (row['provider'], _hour_index(row['period_start']))
+                bucket = self._pending.get(key)
+                if bucket is None:
+                    bucket = self._pending[key] = MetricBucket()
+                bucket.merge(MetricBucket.from_dict(row['bucket']))
+
+    def drain_outcomes(self) -> List[Dict[str, Any]]:
+        """Take the per provider and task type outcomes accumulated since the last drain
+
+        Returns:
+            List of dicts with provider, task_type, requests, successes and
+            total_response_time
+        """
+        with self._pending_lock:
+            outcomes, self._pending_outcomes = self._pending_outcomes, {}
+        return [
+            {
+                'provider': provider,
+                'task_type': task_type,
+                'requests': requests,
+                'successes': successes,
+                'total_response_time': total_response_time,
+            }
+            for (provider, task_type), (requests, successes, total_response_time) in outcomes.items()
+        ]
+
+    def restore_outcomes(self, outcomes: List[Dict[str, Any]]):
+        """Put drained outcomes back after a failed flush"""
+        with self._pending_lock:
+            for row in outcomes:
+                outcome = self._pending_outcomes.setdefault((row['provider'], row['task_type']), [0, 0, 0.0])
+                outcome[0] += row['requests']
+                outcome[1] += row['successes']
+                outcome[2] += row['total_response_time']
+
+    @staticmethod
+    def _new_cache_metrics() -> Dict[str, Any]:
+        return {
+            'hits': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'tokens_saved': 0,
+            'cost_avoided': 0.0
+        }
+
+    def log_cache_event(self, provider: str, hit: bool, bytes_saved: int = 0,
+                        cost_avoided: float = 0.0, tokens_saved: int = 0):
+        """Log a response cache lookup
+
+        Args:
+            provider: AI provider name
+            hit: Whether the response was served from cache
+            bytes_saved: Size of the cached response
+            cost_avoided: Cost of the provider call that was avoided
+            tokens_saved: Tokens of the provider call that was avoided
+        """
+        try:
+            with self.lock:
+                metrics = self.cache_metrics[provider]
+                if hit:
+                    metrics['hits'] += 1
+                    metrics['bytes_saved'] += bytes_saved
+                    metrics['tokens_saved'] += tokens_saved
+                    metrics['cost_avoided'] += cost_avoided
+                else:
+                    metrics['misses'] += 1
+        except Exception as e:
+            _logger.error(f"Failed to log cache event: {str(e)}")
+
+    def get_cache_performance(self) -> Dict[str, Any]:
+        """Get response cache effectiveness
+
+        Returns:
+            Hit rate, bytes saved and avoided cost per provider and in total
+        """
+        with self.lock:
+            providers = {}
+            totals = self._new_cache_metrics()
+            for provider, metrics in self.cache_metrics.items():
+                lookups = metrics['hits'] + metrics['misses']
+                providers[provider] = dict(metrics, hit_rate=metrics['hits'] / lookups if lookups else 0)
+                for key in totals:
+                    totals[key] += metrics[key]
+            lookups = totals['hits'] + totals['misses']
+            totals['hit_rate'] = totals['hits'] / lookups if lookups else 0
+            return {
+                'providers': providers,
+                'total': totals,
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _update_system_metrics(self, record: Dict[str, Any]):
+        """Update system-wide metrics
+
+        Args:
+            record: Request record
+        """
+        with self._system_lock:
+            self.system_metrics['total_requests'] += 1
+            if record['success']:
+                self.system_metrics['total_successful'] += 1
+            else:
+                self.system_metrics['total_failed'] += 1
+
+            self.system_metrics['total_cost'] += record['cost']
+            self.system_metrics['total_tokens'] += record['tokens_used']
+
+    def _check_alerts(self, provider: str, record: Dict[str, Any],
+                      success_rate: float, avg_cost: float):
+        """Check for performance alerts
+
+        Args:
+            provider: Provider name
+            record: Request record
+            success_rate: Provider success rate including this record
+            avg_cost: Provider average cost per request including this record
+        """
+        alerts = []
+
+        # Response time alerts
+        if record['response_time'] > self.thresholds['response_time_critical']:
+            alerts.append({
+                'type': 'critical',
+                'category': 'response_time',
+                'provider': provider,
+                'message': f"Critical response time: {record['response_time']:.2f}s",
+                'value': record['response_time'],
+                'threshold': self.thresholds['response_time_critical']
+            })
+        elif record['response_time'] > self.thresholds['response_time_warning']:
+            alerts.append({
+                'type': 'warning',
+                'category': 'response_time',
+                'provider': provider,
+                'message': f"High response time: {record['response_time']:.2f}s",
+                'value': record['response_time'],
+                'threshold': self.thresholds['response_time_warning']
+            })
+
+        # Success rate alerts
+        if success_rate < self.thresholds['success_rate_critical']:
+            alerts.append({
+                'type': 'critical',
+                'category': 'success_rate',
+                'provider': provider,
+                'message': f"Critical success rate: {success_rate:.2%}",
+                'value': success_rate,
+                'threshold': self.thresholds['success_rate_critical']
+            })
+        elif success_rate < self.thresholds['success_rate_warning']:
+            alerts.append({
+                'type': 'warning',
+                'category': 'success_rate',
+                'provider': provider,
+                'message': f"Low success rate: {success_rate:.2%}",
+                'value': success_rate,
+                'threshold': self.thresholds['success_rate_warning']
+            })
+
+        # Cost alerts
+        if avg_cost > self.thresholds['cost_per_request_critical']:
+            alerts.append({
+                'type': 'critical',
+                'category': 'cost',
+                'provider': provider,
+                'message': f"High cost per request: ${avg_cost:.4f}",
+                'value': avg_cost,
+                'threshold': self.thresholds['cost_per_request_critical']
+            })
+        elif avg_cost > self.thresholds['cost_per_request_warning']:
+            alerts.append({
+                'type': 'warning',
+                'category': 'cost',
+                'provider': provider,
+                'message': f"Elevated cost per request: ${avg_cost:.4f}",
+                'value': avg_cost,
+                'threshold': self.thresholds['cost_per_request_warning']
+            })
+
+        # Log alerts
+        for alert in alerts:
+            alert['timestamp'] = record['timestamp']
+            self.alerts.append(alert)
+            _logger.warning(f"Performance alert: {alert['message']}")
+
+    def _provider_window(self, provider: str, time_range: Optional[timedelta]) -> Optional[MetricBucket]:
+        """Get a merged snapshot of a provider's metrics over ``time_range``"""
+        stats = self._get_provider_stats(provider, create=False)
+        if stats is None:
+            return None
+        with stats.lock:
+            return stats.window(time_range, datetime.now())
+
+    def get_provider_performance(self, provider: str,
+                               time_range: Optional[timedelta] = None) -> Dict[str, Any]:
+        """Get performance metrics for a specific provider
+
+        Args:
+            provider: Provider name
+            time_range: Optional time range for filtering
+
+        Returns:
+            Provider performance metrics
+        """
+        try:
+            bucket = self._provider_window(provider, time_range)
+            if bucket is None:
+                return {
+                    'provider': provider,
+                    'error': 'Provider not found',
+                    'timestamp': datetime.now().isoformat()
+                }
+
+            if not bucket.requests:
+                return {
+                    'provider': provider,
+                    'error': 'No data available for time range',
+                    'timestamp': datetime.now().isoformat()
+                }
+
+            return dict(self._summarize(bucket), **{
+                'provider': provider,
+                'time_range': str(time_range) if time_range else 'all_time',
+                'error_distribution': dict(bucket.errors),
+                'task_type_distribution': dict(bucket.task_types),
+                'performance_grade': self._calculate_performance_grade(bucket),
+                'timestamp': datetime.now().isoformat()
+            })
+
+        except Exception as e:
+            _logger.error(f"Failed to get provider performance: {str(e)}")
+            return {
+                'provider': provider,
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _summarize(self, bucket: MetricBucket) -> Dict[str, Any]:
+        """Turn an aggregated bucket into the common metrics dict"""
+        return {
+            'total_requests': bucket.requests,
+            'successful_requests': bucket.successes,
+            'failed_requests': bucket.failures,
+            'success_rate': bucket.success_rate,
+            'average_response_time': bucket.avg_response_time,
+            'median_response_time': bucket.sketch.quantile(0.5),
+            'p95_response_time': bucket.sketch.quantile(0.95),
+            'p99_response_time': bucket.sketch.quantile(0.99),
+            'total_cost': bucket.total_cost,
+            'average_cost_per_request': bucket.total_cost / bucket.requests if bucket.requests else 0,
+            'total_tokens': bucket.total_tokens,
+            'average_tokens_per_request': bucket.total_tokens / bucket.requests if bucket.requests else 0,
+        }
+
+    def get_system_performance(self, time_range: Optional[timedelta] = None) -> Dict[str, Any]:
+        """Get system-wide performance metrics
+
+        Args:
+            time_range: Optional time range for filtering
+
+        Returns:
+            System performance metrics
+        """
+        try:
+            merged = MetricBucket()
+            provider_counts = {}
+            for provider in list(self.provider_stats):
+                bucket = self._provider_window(provider, time_range)
+                if bucket and bucket.requests:
+                    merged.merge(bucket)
+                    provider_counts[provider] = bucket.requests
+
+            if not merged.requests:
+                return {
+                    'error': 'No data available for time range',
+                    'timestamp': datetime.now().isoformat()
+                }
+
+            uptime = datetime.now() - self.system_metrics['uptime_start']
+            hours = uptime.total_seconds() / 3600
+
+            return dict(self._summarize(merged), **{
+                'time_range': str(time_range) if time_range else 'all_time',
+                'uptime': str(uptime),
+                'requests_per_hour': merged.requests / hours if hours > 0 else 0,
+                'cost_per_hour': merged.total_cost / hours if hours > 0 else 0,
+                'provider_distribution': provider_counts,
+                'task_type_distribution': dict(merged.task_types),
+                'system_health': self._calculate_system_health(merged, len(provider_counts)),
+                'cache_hits': sum(m['hits'] for m in self.cache_metrics.values()),
+                'cache_cost_avoided': sum(m['cost_avoided'] for m in self.cache_metrics.values()),
+                'timestamp': datetime.now().isoformat()
+            })
+
+        except Exception as e:
+            _logger.error(f"Failed to get system performance: {str(e)}")
+            return {
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def get_performance_trends(self, period: str = 'hourly',
+                             days_back: int = 7) -> Dict[str, Any]:
+        """Get performance trends over time
+
+        Args:
+            period: Trend period ('hourly', 'daily', 'weekly')
+            days_back: Number of days to look back (bounded by the ring size)
+
+        Returns:
+            Performance trends data
+        """
+        try:
+            time_formats = {
+                'hourly': '%Y-%m-%d-%H',
+                'daily': '%Y-%m-%d',
+                'weekly': '%Y-W%U',
+            }
+            if period not in time_formats:
+                return {'error': 'Invalid period. Use hourly, daily, or weekly'}
+
+            now = datetime.now()
+            cutoff_time = now - timedelta(days=days_back)
+
+            trends = defaultdict(dict)
+            for provider in list(self.provider_stats):
+                stats = self._get_provider_stats(provider, create=False)
+                with stats.lock:
+                    ring = stats.rings[period]
+                    for index, bucket in ring.buckets(cutoff_time, now):
+                        time_key = ring.start_of(index).strftime(time_formats[period])
+                        trends[time_key][provider] = {
+                            'requests': bucket.requests,
+                            'success_rate': bucket.success_rate,
+                            'avg_response_time': bucket.avg_response_time,
+                            'p95_response_time': bucket.sketch.quantile(0.95),
+                            'total_cost': bucket.total_cost,
+                            'total_tokens': bucket.total_tokens
+                        }
+
+            return {
+                'period': period,
+                'days_back': days_back,
+                'trends': dict(trends),
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            _logger.error(f"Failed to get performance trends: {str(e)}")
+            return {
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def get_alerts(self, severity: Optional[str] = None,
+                  time_range: Optional[timedelta] = None) -> List[Dict[str, Any]]:
+        """Get performance alerts
+
+        Args:
+            severity: Optional severity filter ('warning', 'critical')
+            time_range: Optional time range for filtering
+
+        Returns:
+            List of alerts
+        """
+        try:
+            alerts = list(self.alerts)
+
+            # Filter by time range
+            if time_range:
+                cutoff_time = datetime.now() - time_range
+                alerts = [a for a in alerts if a['timestamp'] > cutoff_time]
+
+            # Filter by severity
+            if severity:
+                alerts = [a for a in alerts if a['type'] == severity]
+
+            # Newest first
+            alerts.reverse()
+
+            return alerts
+
+        except Exception as e:
+            _logger.error(f"Failed to get alerts: {str(e)}")
+            return []
+
+    def get_provider_comparison(self, time_range: Optional[timedelta] = None) -> Dict[str, Any]:
+        """Compare performance across providers
+
+        Args:
+            time_range: Optional time range for filtering
+
+        Returns:
+            Provider comparison data
+        """
+        try:
+            providers = list(self.provider_stats.keys())
+            comparison = {}
+
+            for provider in providers:
+                performance = self.get_provider_performance(provider, time_range)
+                if 'error' not in performance:
+                    comparison[provider] = {
+                        'success_rate': performance['success_rate'],
+                        'avg_response_time': performance['average_response_time'],
+                        'p95_response_time': performance['p95_response_time'],
+                        'avg_cost_per_request': performance['average_cost_per_request'],
+                        'total_requests': performance['total_requests'],
+                        'performance_grade': performance['performance_grade']
+                    }
+
+            # Calculate rankings
+            rankings = {
+                'success_rate': sorted(comparison.items(),
+                                     key=lambda x: x[1]['success_rate'], reverse=True),
+                'response_time': sorted(comparison.items(),
+                                      key=lambda x: x[1]['avg_response_time']),
+                'cost_efficiency': sorted(comparison.items(),
+                                        key=lambda x: x[1]['avg_cost_per_request']),
+                'overall_performance': sorted(comparison.items(),
+                                            key=lambda x: x[1]['performance_grade'], reverse=True)
+            }
+
+            return {
+                'time_range': str(time_range) if time_range else 'all_time',
+                'comparison': comparison,
+                'rankings': rankings,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            _logger.error(f"Failed to get provider comparison: {str(e)}")
+            return {
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _calculate_performance_grade(self, bucket: MetricBucket) -> str:
+        """Calculate performance grade for a provider
+
+        Args:
+            bucket: Aggregated metrics of the provider
+
+        Returns:
+            Performance grade (A, B, C, D, F)
+        """
+        if not bucket.requests:
+            return 'N/A'
+
+        # Calculate metrics
+        success_rate = bucket.success_rate
+        avg_response_time = bucket.avg_response_time
+
+        # Grade based on success rate and response time
+        score = 0
+
+        # Success rate component (60% of grade)
+        if success_rate >= 0.95:
+            score += 60
+        elif success_rate >= 0.90:
+            score += 50
+        elif success_rate >= 0.85:
+            score += 40
+        elif success_rate >= 0.80:
+            score += 30
+        else:
+            score += 20
+
+        # Response time component (40% of grade)
+        if avg_response_time <= 2.0:
+            score += 40
+        elif avg_response_time <= 5.0:
+            score += 30
+        elif avg_response_time <= 10.0:
+            score += 20
+        else:
+            score += 10
+
+        # Convert to letter grade
+        if score >= 90:
+            return 'A'
+        elif score >= 80:
+            return 'B'
+        elif score >= 70:
+            return 'C'
+        elif score >= 60:
+            return 'D'
+        else:
+            return 'F'
+
+    def _calculate_system_health(self, bucket: MetricBucket, provider_count: int) -> Dict[str, Any]:
+        """Calculate overall system health
+
+        Args:
+            bucket: Aggregated metrics of all providers
+            provider_count: Number of providers that served requests
+
+        Returns:
+            System health metrics
+        """
+        if not bucket.requests:
+            return {'status': 'unknown', 'score': 0}
+
+        # Calculate health metrics
+        success_rate = bucket.success_rate
+        avg_response_time = bucket.avg_response_time
+
+        # Calculate health score
+        health_score = 0
+
+        # Success rate (50% of health)
+        if success_rate >= 0.95:
+            health_score += 50
+        elif success_rate >= 0.90:
+            health_score += 40
+        elif success_rate >= 0.85:
+            health_score += 30
+        else:
+            health_score += 20
+
+        # Response time (30% of health)
+        if avg_response_time <= 2.0:
+            health_score += 30
+        elif avg_response_time <= 5.0:
+            health_score += 25
+        elif avg_response_time <= 10.0:
+            health_score += 15
+        else:
+            health_score += 5
+
+        # Provider diversity (20% of health)
+        if provider_count >= 3:
+            health_score += 20
+        elif provider_count >= 2:
+            health_score += 15
+        else:
+            health_score += 5
+
+        # Determine status
+        if health_score >= 90:
+            status = 'excellent'
+        elif health_score >= 80:
+            status = 'good'
+        elif health_score >= 70:
+            status = 'fair'
+        elif health_score >= 60:
+            status = 'poor'
+        else:
+            status = 'critical'
+
+        return {
+            'status': status,
+            'score': health_score,
+            'success_rate': success_rate,
+            'avg_response_time': avg_response_time,
+            'provider_count': provider_count
+        }
+
+    def reset_metrics(self, provider: Optional[str] = None):
+        """Reset performance metrics
+
+        Args:
+            provider: Optional provider to reset (if None, reset all)
+        """
+        try:
+            with self.lock:
+                if provider:
+                    if provider in self.provider_stats:
+                        del self.provider_stats[provider]
+                        _logger.info(f"Reset metrics for provider: {provider}")
+                else:
+                    self.provider_stats.clear()
+                    with self._system_lock:
+                        self.system_metrics = self._new_system_metrics()
+                    self.request_history.clear()
+                    self.alerts.clear()
+                    self.cache_metrics.clear()
+                    with self._pending_lock:
+                        self._pending.clear()
+                        self._pending_outcomes.clear()
+                    _logger.info("Reset all performance metrics")
+
+        except Exception as e:
+            _logger.error(f"Failed to reset metrics: {str(e)}")
+
+    def export_metrics(self, format: str = 'json') -> Union[str, Dict[str, Any]]:
+        """Export performance metrics
+
+        Args:
+            format: Export format ('json', 'dict')
+
+        Returns:
+            Exported metrics
+        """
+        try:
+            with self._system_lock:
+                system_metrics = {
+                    key: list(value) if isinstance(value, deque) else value
+                    for key, value in self.system_metrics.items()
+                }
+
+            provider_metrics = {}
+            for provider in list(self.provider_stats):
+                stats = self._get_provider_stats(provider, create=False)
+                with stats.lock:
+                    provider_metrics[provider] = dict(self._summarize(stats.totals), **{
+                        'error_types': dict(stats.totals.errors),
+                        'response_times': list(stats.response_times),
+                        'success_rate_history': list(stats.success_rate_history),
+                        'last_updated': stats.last_updated
+                    })
+
+            with self.lock:
+                cache_metrics = {p: dict(m) for p, m in self.cache_metrics.items()}
+
+            export_data = {
+                'system_metrics': system_metrics,
+                'provider_metrics': provider_metrics,
+                'recent_alerts': list(self.alerts)[-100:],  # Last 100 alerts
+                'cache_metrics': cache_metrics,
+                'export_timestamp': datetime.now().isoformat()
+            }
+
+            if format == 'json':
+                return json.dumps(export_data, indent=2, default=str)
+            else:
+                return export_data
+
+        except Exception as e:
+            _logger.error(f"Failed to export metrics: {str(e)}")
+            return {'error': str(e)}
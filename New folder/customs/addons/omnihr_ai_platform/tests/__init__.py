@@ -0,0 +1,3 @@
+# Tests for OmniHR AI Platform module
+from . import test_performance_monitor
+from . import test_rate_limiter
@@ -0,0 +1,177 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+from odoo.tests.common import BaseCase
+from odoo.tests import tagged
+
+from odoo.addons.omnihr_ai_platform.services.performance_monitor import (
+    MetricBucket, QuantileSketch, TimeRing, _minute_index, _minute_start,
+)
+
+
+def _exact_quantile(values, q):
+    """Value of rank ``q * (n - 1)`` rounded down, as estimated by the sketch"""
+    values = sorted(values)
+    return values[math.floor(q * (len(values) - 1))]
+
+
+def _record(response_time, success=True):
+    return {
+        'success': success,
+        'error': None if success else 'Timeout',
+        'response_time': response_time,
+        'cost': 0.01,
+        'tokens_used': 100,
+        'task_type': 'analysis',
+    }
+
+
+@tagged('post_install', '-at_install')
+class TestQuantileSketch(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(42)
+        self.values = [rng.lognormvariate(0, 1.5) for _ in range(10000)]
+
+    def assertQuantilesAccurate(self, sketch, values, quantiles=(0.5, 0.9, 0.99)):
+        for q in quantiles:
+            exact = _exact_quantile(values, q)
+            self.assertLessEqual(
+                abs(sketch.quantile(q) - exact), sketch.relative_accuracy * exact + 1e-12,
+                f"Quantile {q} out of the relative error bound")
+
+    def test_quantile_error_bound(self):
+        """Quantiles are within the relative accuracy of the exact values"""
+        for accuracy in (0.01, 0.05):
+            sketch = QuantileSketch(relative_accuracy=accuracy)
+            for value in self.values:
+                sketch.add(value)
+            self.assertEqual(sketch.count, len(self.values))
+            self.assertQuantilesAccurate(sketch, self.values, (0, 0.25, 0.5, 0.75, 0.9, 0.99, 1))
+
+    def test_merge(self):
+        """Merged sketches estimate the same quantiles as one sketch of all values"""
+        whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for i, value in enumerate(self.values):
+            whole.add(value)
+            (first if i % 3 else second).add(value)
+        first.merge(second)
+        first.merge(QuantileSketch())
+        
+        self.assertEqual(first.count, whole.count)
+        self.assertEqual(first.bins, whole.bins)
+        for q in (0.5, 0.9, 0.99):
+            self.assertEqual(first.quantile(q), whole.quantile(q))
+
+    def test_collapse_keeps_high_quantiles(self):
+        """Capping the bins folds the lowest ones and keeps high quantiles accurate"""
+        uncapped = QuantileSketch(relative_accuracy=0.01, max_bins=len(self.values))
+        sketch = QuantileSketch(relative_accuracy=0.01, max_bins=300)
+        for value in self.values:
+            uncapped.add(value)
+            sketch.add(value)
+        self.assertGreater(len(uncapped.bins), 300)
+        
+        
+        self.assertLessEqual(len(sketch.bins), 300)
+        self.assertEqual(sum(sketch.bins.values()) + sketch.zero_count, len(self.values))
+        self.assertQuantilesAccurate(sketch, self.values, (0.9, 0.99))
+        
+        merged = QuantileSketch(relative_accuracy=0.01, max_bins=300)
+        merged.merge(sketch)
+        merged.merge(sketch)
+        self.assertLessEqual(len(merged.bins), 300)
+        self.assertEqual(merged.count, 2 * len(self.values))
+
+    def test_zero_values(self):
+        """Zero response times are counted apart from the logarithmic bins"""
+        sketch = QuantileSketch()
+        for value in [0] * 50 + [1.0] * 50:
+            sketch.add(value)
+        
+        self.assertEqual(sketch.zero_count, 50)
+        self.assertEqual(sketch.quantile(0.25), 0)
+        self.assertAlmostEqual(sketch.quantile(0.75), 1.0, delta=sketch.relative_accuracy)
+
+    def test_empty(self):
+        self.assertEqual(QuantileSketch().quantile(0.5), 0)
+        self.assertEqual(QuantileSketch.from_dict({}).count, 0)
+
+    def test_serialization(self):
+        """A sketch survives a round trip through its dict form"""
+        sketch = QuantileSketch()
+        for value in self.values[:1000] + [0]:
+            sketch.add(value)
+        restored = QuantileSketch.from_dict(sketch.to_dict())
+        
+        self.assertEqual(restored.bins, sketch.bins)
+        self.assertEqual(restored.zero_count, sketch.zero_count)
+        self.assertEqual(restored.count, sketch.count)
+        for q in (0, 0.5, 0.99, 1):
+            self.assertEqual(restored.quantile(q), sketch.quantile(q))
+
+
+@tagged('post_install', '-at_install')
+class TestTimeRing(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ring = TimeRing(5, _minute_index, _minute_start)
+        self.start = datetime(2024, 1, 1, 12, 0)
+
+    def minute(self, offset):
+        return self.start + timedelta(minutes=offset, seconds=30)
+
+    def test_index_round_trip(self):
+        self.assertEqual(_minute_start(_minute_index(self.minute(7))), self.start + timedelta(minutes=7))
+
+    def test_buckets_per_period(self):
+        """Records of the same period share a bucket"""
+        self.ring.add(self.minute(0), _record(1.0))
+        self.ring.add(self.minute(0), _record(3.0, success=False))
+        self.ring.add(self.minute(2), _record(2.0))
+        
+        buckets = dict(self.ring.buckets(self.minute(0), self.minute(4)))
+        self.assertEqual(sorted(buckets), [_minute_index(self.minute(0)), _minute_index(self.minute(2))])
+        first = buckets[_minute_index(self.minute(0))]
+        self.assertEqual(first.requests, 2)
+        self.assertEqual(first.failures, 1)
+        self.assertEqual(first.errors, {'Timeout': 1})
+        self.assertAlmostEqual(first.avg_response_time, 2.0)
+
+    def test_expiry(self):
+        """Periods older than the ring size are overwritten and no longer yielded"""
+        for offset in range(8):
+            self.ring.add(self.minute(offset), _record(1.0))
+        
+        indexes = [index for index, bucket in self.ring.buckets(self.minute(0), self.minute(7))]
+        self.assertEqual(indexes, [_minute_index(self.minute(offset)) for offset in range(3, 8)])
+        for index, bucket in self.ring.buckets(self.minute(0), self.minute(7)):
+            self.assertEqual(bucket.requests, 1)
+        
+        # A slot reused by a newer period starts from an empty bucket
+        self.ring.add(self.minute(10), _record(1.0))
+        indexes = [index for index, bucket in self.ring.buckets(self.minute(0), self.minute(10))]
+        self.assertEqual(indexes, [_minute_index(self.minute(offset)) for offset in (6, 7, 10)])
+        
+        # Slots left over from periods before the window are skipped
+        self.assertEqual(list(self.ring.buckets(self.minute(12), self.minute(14))), [])
+
+    def test_add_bucket_ignores_stale_periods(self):
+        """Merging a bucket older than the kept periods does not evict newer data"""
+        self.ring.add(self.minute(7), _record(1.0))
+        stale = MetricBucket()
+        stale.add(_record(5.0))
+        
+        self.ring.add_bucket(self.minute(2), stale)
+        buckets = dict(self.ring.buckets(self.minute(0), self.minute(7)))
+        self.assertEqual(list(buckets), [_minute_index(self.minute(7))])
+        self.assertEqual(buckets[_minute_index(self.minute(7))].requests, 1)
+        
+        self.ring.add_bucket(self.minute(7), stale)
+        self.ring.add_bucket(self.minute(6), stale)
+        buckets = dict(self.ring.buckets(self.minute(0), self.minute(7)))
+        self.assertEqual(buckets[_minute_index(self.minute(7))].requests, 2)
+        self.assertEqual(buckets[_minute_index(self.minute(6))].requests, 1)
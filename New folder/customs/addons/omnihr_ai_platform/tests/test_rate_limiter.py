@@ -0,0 +1,177 @@
+import threading
+import time
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase
+from odoo.tests import tagged
+
+from odoo.addons.omnihr_ai_platform.services.rate_limiter import (
+    MINUTE, InMemoryRateLimitBackend, RateLimiter,
+)
+
+@tagged('post_install', '-at_install')
+class TestInMemoryRateLimitBackend(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.backend = InMemoryRateLimitBackend()
+
+    def test_window_expiry(self):
+        """Entries leave the window once they are older than its span"""
+        self.backend.add('requests', MINUTE, 1000.0, 1)
+        self.backend.add('requests', MINUTE, 1030.0, 2)
+        
+        self.assertEqual(self.backend.total('requests', MINUTE, 1059.0), 3)
+        # The first entry expires exactly one span after it was added
+        self.assertEqual(self.backend.total('requests', MINUTE, 1060.0), 2)
+        self.assertEqual(self.backend.total('requests', MINUTE, 1090.0), 0)
+
+    def test_windows_are_independent(self):
+        """Each named window keeps its own entries and span"""
+        self.backend.add('requests', MINUTE, 1000.0, 1)
+        self.backend.add('tokens', MINUTE * 2, 1000.0, 500)
+        
+        self.assertEqual(self.backend.total('requests', MINUTE, 1070.0), 0)
+        self.assertEqual(self.backend.total('tokens', MINUTE * 2, 1070.0), 500)
+
+    def test_release_time(self):
+        """The release time is when enough of the oldest entries have expired"""
+        self.backend.add('tokens', MINUTE, 1000.0, 100)
+        self.backend.add('tokens', MINUTE, 1020.0, 100)
+        
+        self.assertAlmostEqual(self.backend.release_time('tokens', MINUTE, 1030.0, 50), 30.0)
+        self.assertAlmostEqual(self.backend.release_time('tokens', MINUTE, 1030.0, 150), 50.0)
+        # More than the window holds is never released within the span
+        self.assertEqual(self.backend.release_time('tokens', MINUTE, 1030.0, 300), MINUTE)
+
+    def test_release(self):
+        """Releasing takes from the newest entries since a time, never below zero"""
+        self.backend.add('tokens', MINUTE, 1000.0, 100)
+        self.backend.add('tokens', MINUTE, 1020.0, 100)
+        self.backend.add('tokens', MINUTE, 1040.0, 100)
+        
+        self.backend.release('tokens', MINUTE, 1045.0, 150, 1020.0)
+        self.assertEqual(self.backend.total('tokens', MINUTE, 1045.0), 150)
+        # The entry of 1000 was left untouched and expires first
+        self.assertEqual(self.backend.total('tokens', MINUTE, 1065.0), 50)
+        self.assertEqual(self.backend.total('tokens', MINUTE, 1085.0), 0)
+        
+        self.backend.add('tokens', MINUTE, 1090.0, 100)
+        self.backend.release('tokens', MINUTE, 1095.0, 500, 1000.0)
+        self.assertEqual(self.backend.total('tokens', MINUTE, 1095.0), 0)
+
+
+@tagged('post_install', '-at_install')
+class TestRateLimiter(BaseCase):
+
+    def at(self, timestamp):
+        return patch('odoo.addons.omnihr_ai_platform.services.rate_limiter.time.time',
+                     return_value=timestamp)
+
+    def test_acquire_within_limits(self):
+        """Requests are reserved until a per minute limit is reached"""
+        limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000, requests_per_day=100)
+        
+        self.assertTrue(limiter.acquire(100))
+        self.assertTrue(limiter.acquire(100))
+        self.assertFalse(limiter.acquire(100))
+        self.assertFalse(limiter.check(100))
+        
+        usage = limiter.get_usage()
+        self.assertEqual(usage['requests_last_minute'], 2)
+        self.assertEqual(usage['tokens_last_minute'], 200)
+        self.assertEqual(usage['requests_remaining'], 0)
+
+    def test_token_limit(self):
+        """A request is refused when its tokens would exceed the minute budget"""
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000, requests_per_day=100)
+        
+        self.assertTrue(limiter.acquire(800))
+        self.assertFalse(limiter.acquire(300))
+        self.assertTrue(limiter.acquire(200))
+
+    def test_request_larger_than_limit(self):
+        """A request that can never fit is refused right away, even without timeout"""
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000, requests_per_day=100)
+        
+        started = time.monotonic()
+        self.assertFalse(limiter.acquire(2000, block=True))
+        self.assertFalse(limiter.acquire(2000, block=True, timeout=5))
+        self.assertIsNone(limiter.reserve(2000, block=True))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(limiter.get_usage()['requests_last_minute'], 0)
+
+    def test_usage_correction_outlived_by_reservation(self):
+        """Unused tokens are taken back from the reservation, so usage never goes negative"""
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000, requests_per_day=100)
+        with self.at(1000.0):
+            reserved_at = limiter.reserve(1000)
+        self.assertEqual(reserved_at, 1000.0)
+        
+        # The request used 400 tokens
+        with self.at(1030.0):
+            limiter.record_usage(-600, reserved_at)
+            self.assertEqual(limiter.get_usage()['tokens_last_minute'], 400)
+            self.assertTrue(limiter.acquire(600))
+            self.assertFalse(limiter.acquire(1))
+        
+        # Only the reservation left the window: the 600 tokens of 1030 still count
+        with self.at(1061.0):
+            self.assertEqual(limiter.get_usage()['tokens_last_minute'], 600)
+            self.assertFalse(limiter.acquire(500))
+            self.assertTrue(limiter.acquire(400))
+
+    def test_usage_correction_after_reservation_expired(self):
+        """A correction arriving after its reservation left the window frees nothing"""
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000, requests_per_day=100)
+        with self.at(1000.0):
+            reserved_at = limiter.reserve(800)
+        with self.at(1050.0):
+            self.assertTrue(limiter.acquire(200))
+        
+        with self.at(1070.0):
+            limiter.record_usage(-600, reserved_at)
+            self.assertEqual(limiter.get_usage()['tokens_last_minute'], 200)
+            self.assertEqual(limiter.get_usage()['tokens_last_hour'], 400)
+            self.assertFalse(limiter.acquire(900))
+
+    def test_blocking_acquire_gives_up_before_timeout(self):
+        """A blocking acquire fails right away when capacity frees up after the timeout"""
+        limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000, requests_per_day=100)
+        self.assertTrue(limiter.acquire())
+        
+        started = time.monotonic()
+        self.assertFalse(limiter.acquire(block=True, timeout=2))
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_blocking_acquire_waits_for_expiry(self):
+        """A blocking acquire succeeds once the oldest request leaves the window"""
+        limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000, requests_per_day=100)
+        # Reserve a request that leaves the minute window in 0.3 seconds
+        with patch('odoo.addons.omnihr_ai_platform.services.rate_limiter.time.time',
+                   return_value=time.time() - MINUTE + 0.3):
+            self.assertTrue(limiter.acquire())
+        
+        started = time.monotonic()
+        self.assertTrue(limiter.acquire(block=True, timeout=5))
+        self.assertGreater(time.monotonic() - started, 0.1)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_blocking_acquire_woken_by_usage_correction(self):
+        """Correcting a reservation downwards wakes blocked requests"""
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000, requests_per_day=100)
+        reserved_at = limiter.reserve(1000)
+        self.assertIsNotNone(reserved_at)
+        
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(limiter.acquire(500, block=True)))
+        waiter.start()
+        time.sleep(0.1)
+        self.assertEqual(results, [])
+        
+        # The first request used 400 tokens instead of the 1000 reserved
+        limiter.record_usage(-600, reserved_at)
+        waiter.join(5)
+        
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(results, [True])
@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+_logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+
+class InMemoryRateLimitBackend:
+    """Sliding-window counters kept in the memory of the current worker
+
+    Each window is a deque of ``(timestamp, amount)`` entries plus a running
+    total. Expired entries are popped from the left, so every entry is added
+    and removed exactly once (amortised O(1) per call).
+    """
+
+    def __init__(self):
+        """Initialize in-memory backend"""
+        self._windows = {}
+
+    def _expire(self, name: str, span: int, now: float):
+        window = self._windows.setdefault(name, {'entries': deque(), 'total': 0.0})
+        entries = window['entries']
+        cutoff = now - span
+        while entries and entries[0][0] <= cutoff:
+            window['total'] -= entries.popleft()[1]
+        return window
+
+    def total(self, name: str, span: int, now: float) -> float:
+        """Get the amount recorded in the window ending at ``now``"""
+        return self._expire(name, span, now)['total']
+
+    def add(self, name: str, span: int, now: float, amount: float):
+        """Record ``amount`` in the window"""
+        window = self._expire(name, span, now)
+        window['entries'].append((now, amount))
+        window['total'] += amount
+
+    def release_time(self, name: str, span: int, now: float, excess: float) -> float:
+        """Get the seconds until at least ``excess`` has left the window"""
+        window = self._expire(name, span, now)
+        freed = 0.0
+        for timestamp, amount in window['entries']:
+            freed += amount
+            if freed >= excess:
+                return max(0.0, timestamp + span - now)
+        return float(span)
+
+    def release(self, name: str, span: int, now: float, amount: float, since: float):
+        """Remove up to ``amount`` from the entries recorded since ``since``
+
+        The newest entries are reduced first: they leave the window last, so
+        the freed capacity never returns earlier than the original reservation
+        would have, and the total never goes below zero.
+        """
+        window = self._expire(name, span, now)
+        entries = window['entries']
+        while amount > 0 and entries and entries[-1][0] >= since:
+            timestamp, recorded = entries.pop()
+            taken = min(recorded, amount)
+            amount -= taken
+            window['total'] -= taken
+            if recorded > taken:
+                entries.append((timestamp, recorded - taken))
+
+
+class RedisRateLimitBackend:
+    """Sliding-window counters shared by all workers through Redis
+
+    Uses the sliding-window-counter approximation (current and previous fixed
+    window, weighted by overlap), which costs two keys and O(1) work per window.
+    Check and record are not atomic across workers, so the quota is enforced
+    softly under heavy contention.
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', prefix: str = 'omnihr:ratelimit'):
+        """Initialize Redis backend
+
+        Args:
+            url: Redis connection URL
+            prefix: Key prefix, e.g. one per provider and API key
+        """
+        try:
+            import redis
+        except ImportError:
+            raise Exception("Redis library not installed. Please install: pip install redis")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _counts(self, name: str, span: int, now: float):
+        current_slot = int(now // span)
+        keys = [f"{self.prefix}:{name}:{current_slot}", f"{self.prefix}:{name}:{current_slot - 1}"]
+        current, previous = self.client.mget(keys)
+        elapsed = (now % span) / span
+        return float(current or 0), float(previous or 0), elapsed, keys[0]
+
+    def total(self, name: str, span: int, now: float) -> float:
+        """Get the approximate amount recorded in the window ending at ``now``"""
+        current, previous, elapsed, _key = self._counts(name, span, now)
+        return current + previous * (1 - elapsed)
+
+    def add(self, name: str, span: int, now: float, amount: float):
+        """Record ``amount`` in the window"""
+        key = f"{self.prefix}:{name}:{int(now // span)}"
+        pipe = self.client.pipeline()
+        pipe.incrbyfloat(key, amount)
+        pipe.expire(key, span * 2)
+        pipe.execute()
+
+    def release_time(self, name: str, span: int, now: float, excess: float) -> float:
+        """Get the seconds until at least ``excess`` has left the window"""
+        current, previous, elapsed, _key = self._counts(name, span, now)
+        remaining = span * (1 - elapsed)
+        if previous > 0 and excess <= previous * (1 - elapsed):
+            # The previous window's share decays linearly until the slot rolls over
+            return excess * span / previous
+        return remaining
+
+    def release(self, name: str, span: int, now: float, amount: float, since: float):
+        """Remove up to ``amount`` recorded since ``since``, without going below zero"""
+        current_slot = int(now // span)
+        slots = [slot for slot in (current_slot - 1, current_slot) if slot >= int(since // span)]
+        if not slots:
+            return
+        keys = [f"{self.prefix}:{name}:{slot}" for slot in slots]
+        pipe = self.client.pipeline()
+        for key, value in zip(keys, self.client.mget(keys)):
+            taken = min(float(value or 0), amount)
+            if taken > 0:
+                pipe.incrbyfloat(key, -taken)
+                amount -= taken
+        pipe.execute()
+
+
+class RateLimiter:
+    """Sliding-window rate limiter for requests/minute, tokens/minute and requests/day
+
+    One instance can be shared by several service objects (and, with a shared
+    backend, by several workers) to enforce a single quota. All operations are
+    thread-safe.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int,
+                 requests_per_day: int, backend: Optional[Any] = None):
+        """Initialize rate limiter
+
+        Args:
+            requests_per_minute: Maximum requests in any 60 second window
+            tokens_per_minute: Maximum tokens in any 60 second window
+            requests_per_day: Maximum requests in any 24 hour window
+            backend: Counter backend (defaults to InMemoryRateLimitBackend)
+        """
+        self.limits = {
+            'requests_per_minute': requests_per_minute,
+            'tokens_per_minute': tokens_per_minute,
+            'requests_per_day': requests_per_day,
+        }
+        self.backend = backend or InMemoryRateLimitBackend()
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    @classmethod
+    def from_limits(cls, rate_limits: Dict[str, int], backend: Optional[Any] = None) -> 'RateLimiter':
+        """Build a limiter from a service ``rate_limits`` dict"""
+        return cls(
+            rate_limits['requests_per_minute'],
+            rate_limits['tokens_per_minute'],
+            rate_limits['requests_per_day'],
+            backend=backend,
+        )
+
+    def _wait_time(self, tokens: float, now: float) -> Optional[float]:
+        """Seconds until a request of ``tokens`` fits every window
+
+        Returns 0 if it fits now, and None if it is larger than a limit and can
+        never fit.
+        """
+        checks = [
+            ('requests', MINUTE, 1, self.limits['requests_per_minute']),
+            ('tokens', MINUTE, tokens, self.limits['tokens_per_minute']),
+            ('requests_day', DAY, 1, self.limits['requests_per_day']),
+        ]
+        wait = 0.0
+        for name, span, amount, limit in checks:
+            used = self.backend.total(name, span, now)
+            if used + amount > limit:
+                if amount > limit:
+                    return None
+                wait = max(wait, self.backend.release_time(name, span, now, used + amount - limit))
+        return wait
+
+    def _record(self, tokens: float, now: float, count_request: bool = True):
+        if count_request:
+            self.backend.add('requests', MINUTE, now, 1)
+            self.backend.add('requests_hour', HOUR, now, 1)
+            self.backend.add('requests_day', DAY, now, 1)
+        if tokens:
+            self.backend.add('tokens', MINUTE, now, tokens)
+            self.backend.add('tokens_hour', HOUR, now, tokens)
+
+    def check(self, tokens: float = 0) -> bool:
+        """Check whether a request of ``tokens`` is allowed right now, without reserving it"""
+        with self._lock:
+            return self._wait_time(tokens, time.time()) == 0
+
+    def acquire(self, tokens: float = 0, block: bool = False, timeout: Optional[float] = None) -> bool:
+        """Reserve one request and ``tokens`` tokens
+
+        Args:
+            tokens: Estimated tokens of the request
+            block: Wait until the request is allowed instead of failing
+            timeout: Maximum seconds to wait when blocking (None = no limit)
+
+        Returns:
+            bool: True if the request was reserved, False otherwise
+        """
+        return self.reserve(tokens, block=block, timeout=timeout) is not None
+
+    def reserve(self, tokens: float = 0, block: bool = False,
+                timeout: Optional[float] = None) -> Optional[float]:
+        """Reserve one request and ``tokens`` tokens, like :meth:`acquire`
+
+        Requests larger than a limit are refused right away, even when blocking.
+
+        Returns:
+            float: Reservation time to pass to :meth:`record_usage`, None if
+            the request was not reserved
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = time.time()
+                wait = self._wait_time(tokens, now)
+                if wait == 0:
+                    self._record(tokens, now)
+                    return now
+                if wait is None or not block:
+                    return None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or wait > remaining:
+                        return None
+                    wait = min(wait, remaining)
+                # Woken early when usage is corrected downwards
+                self._released.wait(wait)
+
+    def record_usage(self, tokens: float, reserved_at: Optional[float] = None):
+        """Correct the token reservation of an acquired request
+
+        Extra tokens are recorded now. Unused tokens are taken back from the
+        reservation, or nothing is done once the reservation has left the
+        window, so a correction never frees capacity used by other requests.
+
+        Args:
+            tokens: Actual tokens minus the tokens passed to :meth:`acquire`
+            reserved_at: Reservation time returned by :meth:`reserve`
+                (None = any time in the current windows)
+        """
+        if not tokens:
+            return
+        with self._lock:
+            now = time.time()
+            if tokens > 0:
+                self._record(tokens, now, count_request=False)
+                return
+            for name, span in (('tokens', MINUTE), ('tokens_hour', HOUR)):
+                cutoff = now - span
+                if reserved_at is None:
+                    self.backend.release(name, span, now, -tokens, cutoff)
+                elif reserved_at > cutoff:
+                    self.backend.release(name, span, now, -tokens, reserved_at)
+            self._released.notify_all()
+
+    def get_usage(self) -> Dict[str, Any]:
+        """Get current usage of every window
+
+        Returns:
+            Dict containing usage and remaining capacity
+        """
+        with self._lock:
+            now = time.time()
+            requests_minute = self.backend.total('requests', MINUTE, now)
+            tokens_minute = self.backend.total('tokens', MINUTE, now)
+            requests_day = self.backend.total('requests_day', DAY, now)
+            return {
+                'requests_last_minute': int(requests_minute),
+                'tokens_last_minute': int(tokens_minute),
+                'requests_last_hour': int(self.backend.total('requests_hour', HOUR, now)),
+                'tokens_last_hour': int(self.backend.total('tokens_hour', HOUR, now)),
+                'requests_last_day': int(requests_day),
+                'requests_remaining': max(0, int(self.limits['requests_per_minute'] - requests_minute)),
+                'tokens_remaining': max(0, int(self.limits['tokens_per_minute'] - tokens_minute)),
+                'daily_requests_remaining': max(0, int(self.limits['requests_per_day'] - requests_day)),
+            }
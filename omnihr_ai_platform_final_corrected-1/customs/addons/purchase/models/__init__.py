@@ -1,6 +1,7 @@
 from . import ai_service_manager
 from . import vendor_creation_request
 from . import vendor_suggestion
+from . import vendor_product_stats
 from . import purchase_approval
 from . import ai_processing_queue
 from . import ai_settings
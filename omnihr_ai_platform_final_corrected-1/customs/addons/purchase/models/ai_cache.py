@@ -1,6 +1,22 @@
-from datetime import timedelta
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone
+from psycopg2.extras import execute_values
 from odoo import api, fields, models, _
 
+_logger = logging.getLogger(__name__)
+
+# First cache tier, shared by the threads of a worker:
+# {(dbname, cache key): (expiry timestamp, serialized response)}
+_response_lru = OrderedDict()
+# Hits served since the last flush: {(dbname, cache key): [hits, last access]}
+_pending_hits = {}
+_cache_lock = threading.Lock()
+_last_hit_flush = [time.monotonic()]
+
 class AIResponseCache(models.Model):
     _name = 'ai.response.cache'
     _description = 'AI Response Cache'
@@ -12,17 +28,177 @@ class AIResponseCache(models.Model):
     provider = fields.Char('AI Provider')
     usage_type = fields.Char('Usage Type')
     hit_count = fields.Integer('Hit Count', default=0)
-    last_accessed = fields.Datetime('Last Accessed', default=fields.Datetime.now)
-    
+    last_accessed = fields.Datetime('Last Accessed', default=fields.Datetime.now, index=True)
+
+    _sql_constraints = [
+        ('cache_key_uniq', 'unique(cache_key)', 'Cache key must be unique!'),
+    ]
+
+    # Responses kept in memory by each worker
+    LRU_MAX_ENTRIES = 1024
+    # Seconds a response is served from memory before the table is read again
+    LRU_TTL = 300
+    # Seconds between two writes of the hit counts collected by a worker
+    HIT_FLUSH_INTERVAL = 60
+
+    def init(self):
+        # Keep the newest row of keys cached twice before the unique constraint
+        self.env.cr.execute(f"""
+            DELETE FROM {self._table} older
+             USING {self._table} newer
+             WHERE older.cache_key = newer.cache_key
+               AND older.id < newer.id
+        """)
+
+    @api.model
+    def get_response(self, cache_key):
+        """Get a cached response, from memory when possible
+
+        Returns:
+            dict: The response, or None if not cached or expired
+        """
+        key = (self.env.cr.dbname, cache_key)
+        now = time.time()
+        with _cache_lock:
+            entry = _response_lru.get(key)
+            if entry and entry[0] > now:
+                _response_lru.move_to_end(key)
+        if entry and entry[0] > now:
+            self._record_hit(key)
+            return json.loads(entry[1])
+
+        self.env.cr.execute(f"""
+            SELECT response_data, expiry_date
+              FROM {self._table}
+             WHERE cache_key = %s AND expiry_date > %s
+        """, (cache_key, fields.Datetime.now()))
+        row = self.env.cr.fetchone()
+        if not row:
+            return None
+
+        response_data, expiry_date = row
+        self._remember(key, response_data, expiry_date)
+        self._record_hit(key)
+        return json.loads(response_data)
+
+    @api.model
+    def store_response(self, cache_key, response, expiry_date, provider=None, usage_type=None):
+        """Cache a response, replacing any previous response of the same key"""
+        response_data = json.dumps(response)
+        now = fields.Datetime.now()
+        self.env.cr.execute(f"""
+            INSERT INTO {self._table} AS cache (
+                cache_key, response_data, expiry_date, provider, usage_type, hit_count,
+                last_accessed, create_date, write_date, create_uid, write_uid
+            ) VALUES (%s, %s, %s, %s, %s, 0, %s, %s, %s, %s, %s)
+            ON CONFLICT (cache_key) DO UPDATE SET
+                response_data = EXCLUDED.response_data,
+                expiry_date = EXCLUDED.expiry_date,
+                provider = EXCLUDED.provider,
+                usage_type = EXCLUDED.usage_type,
+                last_accessed = EXCLUDED.last_accessed,
+                write_date = EXCLUDED.write_date,
+                write_uid = EXCLUDED.write_uid
+        """, (cache_key, response_data, expiry_date, provider, usage_type,
+              now, now, now, self.env.uid, self.env.uid))
+        self._remember((self.env.cr.dbname, cache_key), response_data, expiry_date)
+
+    @api.model
+    def _remember(self, key, response_data, expiry_date):
+        """Put a response in the memory tier, evicting the least recently used"""
+        expiry = min(
+            expiry_date.replace(tzinfo=timezone.utc).timestamp(),
+            time.time() + self.LRU_TTL,
+        )
+        with _cache_lock:
+            _response_lru[key] = (expiry, response_data)
+            _response_lru.move_to_end(key)
+            while len(_response_lru) > self.LRU_MAX_ENTRIES:
+                _response_lru.popitem(last=False)
+
+    @api.model
+    def _record_hit(self, key):
+        """Count a hit in memory; counts are written in batches"""
+        now = fields.Datetime.now()
+        with _cache_lock:
+            hits = _pending_hits.setdefault(key, [0, now])
+            hits[0] += 1
+            hits[1] = now
+            due = time.monotonic() - _last_hit_flush[0] >= self.HIT_FLUSH_INTERVAL
+        if due:
+            self._flush_hit_counts()
+
+    @api.model
+    def _flush_hit_counts(self):
+        """Write the hit counts collected by this worker with one statement
+
+        A dedicated cursor is used, so cache reads never lock rows in the
+        caller's transaction.
+        """
+        dbname = self.env.cr.dbname
+        with _cache_lock:
+            _last_hit_flush[0] = time.monotonic()
+            keys = [key for key in _pending_hits if key[0] == dbname]
+            hits = [(key[1], *_pending_hits.pop(key)) for key in keys]
+        if not hits:
+            return 0
+
+        try:
+            with self.env.registry.cursor() as cr:
+                execute_values(cr._obj, f"""
+                    UPDATE {self._table} AS cache
+                       SET hit_count = cache.hit_count + hits.count,
+                           last_accessed = GREATEST(cache.last_accessed, hits.accessed)
+                      FROM (VALUES %s) AS hits (cache_key, count, accessed)
+                     WHERE cache.cache_key = hits.cache_key
+                """, hits, template='(%s, %s, %s::timestamp)')
+        except Exception as e:
+            _logger.warning(f"Failed to write AI cache hit counts: {str(e)}")
+            return 0
+        return len(hits)
+
     @api.model
-    def cleanup_expired(self):
-        """Remove expired cache entries"""
-        expired = self.search([('expiry_date', '<', fields.Datetime.now())])
-        count = len(expired)
-        expired.unlink()
+    def clear_memory_cache(self):
+        """Drop the responses this worker keeps in memory"""
+        dbname = self.env.cr.dbname
+        with _cache_lock:
+            for key in [key for key in _response_lru if key[0] == dbname]:
+                del _response_lru[key]
+
+    @api.model
+    def cleanup_expired(self, max_entries=None):
+        """Remove expired cache entries, then the least used ones over capacity
+
+        Args:
+            max_entries: Number of entries to keep; defaults to the AI settings
+
+        Returns:
+            int: Number of entries removed
+        """
+        self._flush_hit_counts()
+        if max_entries is None:
+            max_entries = self.env['purchase.ai.settings'].get_settings().cache_max_entries
+
+        self.env.cr.execute(f"DELETE FROM {self._table} WHERE expiry_date < %s", (fields.Datetime.now(),))
+        count = self.env.cr.rowcount
+
+        if max_entries:
+            self.env.cr.execute(f"""
+                DELETE FROM {self._table}
+                 WHERE id IN (
+                    SELECT id FROM {self._table}
+                  ORDER BY last_accessed DESC NULLS LAST, id DESC
+                    OFFSET %s
+                 )
+            """, (max_entries,))
+            count += self.env.cr.rowcount
+
+        if count:
+            self.invalidate_model()
+            _logger.info(f"Removed {count} AI cache entries")
         return count
 
     def increment_hit_count(self):
         """Increment hit count when cache is accessed"""
-        self.hit_count += 1
-        self.last_accessed = fields.Datetime.now() 
\ No newline at end of file
+        for record in self:
+            record._record_hit((self.env.cr.dbname, record.cache_key))
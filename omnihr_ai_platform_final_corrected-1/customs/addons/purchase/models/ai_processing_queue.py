@@ -4,6 +4,9 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 import json
 import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
 
 _logger = logging.getLogger(__name__)
@@ -28,6 +31,8 @@ class AIProcessingQueue(models.Model):
         ('market_analysis', 'Market Analysis'),
         ('compliance_check', 'Compliance Check'),
         ('performance_analysis', 'Performance Analysis'),
+        ('ai_call', 'Deferred AI Call'),
+        ('po_risk_assessment', 'Purchase Order Risk Assessment'),
     ], string='Request Type', required=True)
     
     priority = fields.Selection([
@@ -73,6 +78,10 @@ class AIProcessingQueue(models.Model):
     retry_count = fields.Integer(string='Retry Count', default=0)
     max_retries = fields.Integer(string='Max Retries', default=3)
     
+    # Lease held by the runner processing the item
+    lease_owner = fields.Char(string='Lease Owner', copy=False)
+    lease_expires = fields.Datetime(string='Lease Expires', copy=False, index=True)
+    
     # User Context
     user_id = fields.Many2one('res.users', string='Requested By', default=lambda self: self.env.user)
     company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
@@ -190,43 +199,199 @@ class AIProcessingQueue(models.Model):
             values['progress_message'] = message
         self.write(values)
 
+    # Seconds an item may be processed before another runner takes it over
+    LEASE_DURATION = 600
+    # Seconds a runner keeps claiming items before leaving the rest to the next run
+    RUNNER_TIME_BUDGET = 240
+    # Pending hours worth one priority level
+    PRIORITY_AGING_HOURS = 4
+    # Items of a request type processed at the same time; others use the thread count
+    REQUEST_TYPE_CONCURRENCY = {
+        'document_analysis': 2,
+        'vendor_enrichment': 2,
+    }
+
     @api.model
     def process_queue(self, limit=10):
-        """Process pending queue items"""
-        pending_items = self.search([
-            ('state', '=', 'pending'),
-            ('scheduled_date', '<=', fields.Datetime.now())
-        ], limit=limit, order='priority desc, create_date asc')
+        """Process pending queue items with a pool of threads
         
-        for item in pending_items:
-            try:
-                item._process_item()
-            except Exception as e:
-                _logger.error(f"Error processing queue item {item.id}: {str(e)}")
-                item.action_mark_failed(str(e))
+        Items are claimed with a lease using ``FOR UPDATE SKIP LOCKED``, so
+        several runners can work on the queue. Each item is processed and
+        committed on its own cursor. Claims continue while items are pending,
+        up to ``limit`` items or the runner's time budget.
+        
+        Args:
+            limit: Maximum number of items processed by this run
+        
+        Returns:
+            int: Number of items processed
+        """
+        self._recover_expired_leases()
+        
+        threads = max(self.env['purchase.ai.settings'].get_settings().max_concurrent_ai_calls or 1, 1)
+        # Test cursors cannot be shared with other threads
+        inline = self.env.registry.in_test_mode()
+        
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.RUNNER_TIME_BUDGET
+        processed = 0
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ai_queue') as executor:
+            while True:
+                claimed = []
+                slots = min(threads - len(running), limit - processed - len(running))
+                if slots > 0 and time.monotonic() < deadline:
+                    claimed = self._claim_items(slots, owner, list(running.values()))
+                
+                for item_id, request_type in claimed:
+                    if inline:
+                        self._run_item(item_id, owner)
+                        processed += 1
+                    else:
+                        running[executor.submit(self._run_item, item_id, owner)] = request_type
+                
+                if not running:
+                    if claimed:
+                        continue
+                    break
+                
+                done, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    processed += 1
+                    if future.exception():
+                        _logger.error(f"AI queue runner error: {future.exception()}")
+        
+        return processed
+
+    @api.model
+    def _claim_items(self, count, owner, running_types=()):
+        """Lease pending items to a runner and commit the lease
+        
+        Items are taken by priority, aged by their waiting time, while keeping
+        each request type under its concurrency limit across all runners.
+        
+        Returns:
+            list of (item id, request type)
+        """
+        now = fields.Datetime.now()
+        busy = {request_type: count for request_type, count in self._read_group([
+            ('state', '=', 'processing'),
+            ('lease_expires', '>', now),
+            ('lease_owner', '!=', owner)
+        ], ['request_type'], ['__count'])}
+        for request_type in running_types:
+            busy[request_type] = busy.get(request_type, 0) + 1
+        
+        self.env.cr.execute(f"""
+            SELECT id, request_type
+              FROM {self._table}
+             WHERE state = 'pending'
+               AND (scheduled_date IS NULL OR scheduled_date <= %(now)s)
+          ORDER BY CASE priority WHEN 'urgent' THEN 3 WHEN 'high' THEN 2 WHEN 'medium' THEN 1 ELSE 0 END
+                   + EXTRACT(EPOCH FROM (%(now)s - create_date)) / %(aging)s DESC,
+                   id
+             LIMIT %(limit)s
+               FOR UPDATE SKIP LOCKED
+        """, {'now': now, 'aging': self.PRIORITY_AGING_HOURS * 3600.0, 'limit': count * 5})
+        
+        claimed = []
+        for item_id, request_type in self.env.cr.fetchall():
+            if len(claimed) >= count:
+                break
+            limit = self.REQUEST_TYPE_CONCURRENCY.get(request_type)
+            if limit and busy.get(request_type, 0) >= limit:
+                continue
+            busy[request_type] = busy.get(request_type, 0) + 1
+            claimed.append((item_id, request_type))
+        
+        if claimed:
+            self.browse([item_id for item_id, _request_type in claimed]).write({
+                'state': 'processing',
+                'started_date': now,
+                'lease_owner': owner,
+                'lease_expires': now + timedelta(seconds=self.LEASE_DURATION),
+                'progress': 0.0,
+                'progress_message': 'Starting processing...',
+            })
+        # Release the rows not claimed and publish the leases
+        self.env.cr.commit()
+        return claimed
+
+    @api.model
+    def _run_item(self, item_id, owner):
+        """Process a leased item on a cursor of its own, committed at the end"""
+        if self.env.registry.in_test_mode():
+            return self.browse(item_id)._process_leased_item(owner)
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, dict(self.env.context))
+            env['ai.processing.queue'].browse(item_id)._process_leased_item(owner)
+
+    def _process_leased_item(self, owner):
+        self.ensure_one()
+        # The lease may have expired and the item been taken over
+        if self.lease_owner != owner or self.state != 'processing':
+            return
+        self._process_item()
+        self.write({'lease_owner': False, 'lease_expires': False})
+
+    @api.model
+    def _recover_expired_leases(self):
+        """Put back items whose runner died or overran its lease"""
+        now = fields.Datetime.now()
+        expired = self.search([
+            ('state', '=', 'processing'),
+            '|', ('lease_expires', '<', now),
+            '&', ('lease_expires', '=', False),
+            ('started_date', '<', now - timedelta(seconds=self.LEASE_DURATION))
+        ])
+        for item in expired:
+            _logger.warning(f"Lease of AI queue item {item.id} expired")
+            values = {'lease_owner': False, 'lease_expires': False}
+            if item.retry_count >= item.max_retries:
+                values.update({
+                    'state': 'failed',
+                    'completed_date': now,
+                    'error_message': 'Processing lease expired',
+                    'progress_message': 'Processing failed',
+                })
+            else:
+                values.update({
+                    'state': 'pending',
+                    'retry_count': item.retry_count + 1,
+                    'started_date': False,
+                    'progress': 0.0,
+                    'progress_message': f'Retry attempt {item.retry_count + 1} after lease expiry',
+                })
+            item.write(values)
+        if expired:
+            self.env.cr.commit()
 
     def _process_item(self):
         """Process individual queue item"""
         self.ensure_one()
-        self.action_start_processing()
+        if self.state == 'pending':
+            self.action_start_processing()
         
         try:
-            if self.model_name and self.method_name:
-                # Call specific model method
-                target_model = self.env[self.model_name]
-                if self.record_id:
-                    target_record = target_model.browse(self.record_id)
-                    method = getattr(target_record, self.method_name)
+            # Failures only roll back the item's own work
+            with self.env.cr.savepoint():
+                if self.model_name and self.method_name:
+                    # Call specific model method
+                    target_model = self.env[self.model_name]
+                    if self.record_id:
+                        target_record = target_model.browse(self.record_id)
+                        method = getattr(target_record, self.method_name)
+                    else:
+                        method = getattr(target_model, self.method_name)
+                    
+                    input_data = self.get_input_data_dict()
+                    result = method(**input_data)
                 else:
-                    method = getattr(target_model, self.method_name)
-                
-                input_data = self.get_input_data_dict()
-                result = method(**input_data)
-                self.action_mark_completed(result)
-            else:
-                # Generic processing based on request type
-                result = self._process_by_type()
-                self.action_mark_completed(result)
+                    # Generic processing based on request type
+                    result = self._process_by_type()
+            self.action_mark_completed(result)
                 
         except Exception as e:
             _logger.error(f"Error in queue item processing: {str(e)}")
@@ -296,20 +461,35 @@ class AIProcessingQueue(models.Model):
 
     @api.model
     def get_queue_statistics(self):
-        """Get queue processing statistics"""
-        stats = {}
-        for state in ['pending', 'processing', 'completed', 'failed']:
-            stats[state] = self.search_count([('state', '=', state)])
+        """Get queue processing statistics
+        
+        Besides the item count of each state, reports the backlog (pending
+        items by request type and age of the oldest one) and the throughput
+        (items finished during the last hour and day).
+        """
+        now = fields.Datetime.now()
+        stats = {state: 0 for state in ['pending', 'processing', 'completed', 'failed']}
+        for state, count in self._read_group([], ['state'], ['__count']):
+            stats[state] = count
         
         # Average processing time for completed items
-        completed_items = self.search([
+        [[avg_processing_time]] = self._read_group([
             ('state', '=', 'completed'),
             ('processing_time', '>', 0)
-        ])
+        ], [], ['processing_time:avg'])
+        stats['avg_processing_time'] = avg_processing_time or 0.0
         
-        if completed_items:
-            stats['avg_processing_time'] = sum(completed_items.mapped('processing_time')) / len(completed_items)
-        else:
-            stats['avg_processing_time'] = 0.0
+        # Backlog
+        backlog = self._read_group([('state', '=', 'pending')], ['request_type'], ['__count', 'create_date:min'])
+        stats['backlog_by_type'] = {request_type: count for request_type, count, _oldest in backlog}
+        oldest = min((oldest for _request_type, _count, oldest in backlog), default=None)
+        stats['oldest_pending_age'] = (now - oldest).total_seconds() if oldest else 0.0
+        
+        # Throughput
+        for key, period in [('throughput_last_hour', timedelta(hours=1)), ('throughput_last_day', timedelta(days=1))]:
+            stats[key] = dict(self._read_group([
+                ('state', 'in', ['completed', 'failed']),
+                ('completed_date', '>=', now - period)
+            ], ['state'], ['__count']))
         
-        return stats 
\ No newline at end of file
+        return stats
\ No newline at end of file
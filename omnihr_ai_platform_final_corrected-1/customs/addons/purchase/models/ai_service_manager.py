@@ -7,11 +7,32 @@ from datetime import datetime, timedelta
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools import config
+import random
 import threading
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 _logger = logging.getLogger(__name__)
 
+# Threads racing a primary service against its fallback
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='purchase_ai_hedge')
+
+
+class AICallDeferred(UserError):
+    """The call ran out of time budget and was handed off to the AI processing queue"""
+
+    def __init__(self, message, queue_item_id):
+        super().__init__(message)
+        self.queue_item_id = queue_item_id
+
+
+def _call_provider_isolated(registry, uid, service_id, prompt, context, files):
+    """Call a provider from a hedging thread, with a cursor of its own"""
+    with registry.cursor() as cr:
+        env = api.Environment(cr, uid, {})
+        return env['purchase.ai.service'].browse(service_id)._call_provider(prompt, context, files)
+
+
 class AIServiceManager(models.Model):
     _name = 'purchase.ai.service'
     _description = 'AI Service Manager with Multi-Provider Support'
@@ -67,9 +88,24 @@ class AIServiceManager(models.Model):
     max_tokens = fields.Integer('Max Tokens', default=4000)
     timeout = fields.Integer('Timeout (seconds)', default=30)
     
+    # Resilience
+    call_time_budget = fields.Float('Call Time Budget (seconds)', default=60.0,
+                                    help="Total time a call may spend on retries and fallbacks before it is queued")
+    circuit_failure_threshold = fields.Integer('Circuit Failure Threshold', default=5,
+                                               help="Consecutive failures after which calls skip this service")
+    circuit_reset_timeout = fields.Integer('Circuit Reset Timeout (seconds)', default=60,
+                                           help="Time before a single trial call is let through an open circuit")
+    hedge_latency_threshold = fields.Float('Hedging Latency Threshold (seconds)', default=0.0,
+                                           help="When the 95th percentile response time exceeds this, the fallback "
+                                                "service is raced after this delay (0 = never)")
+    
     # Rate limiting tracking (in-memory)
     _rate_limit_tracker = defaultdict(list)
     _lock = threading.Lock()
+    
+    # Circuit breaker and latency tracking (in-memory)
+    _circuit_tracker = {}
+    _latency_tracker = defaultdict(lambda: deque(maxlen=100))
 
     @api.constrains('temperature')
     def _check_temperature(self):
@@ -119,34 +155,25 @@ class AIServiceManager(models.Model):
 
     def _get_cached_response(self, cache_key):
         """Get cached response if available and not expired"""
-        cache = self.env['ai.cache'].search([
-            ('cache_key', '=', cache_key),
-            ('expires_at', '>', fields.Datetime.now())
-        ], limit=1)
-        
-        if cache:
-            _logger.info(f"Using cached AI response for key: {cache_key}")
-            cache.hit_count += 1
-            return json.loads(cache.response_data)
-        return None
+        response = self.env['ai.response.cache'].sudo().get_response(cache_key)
+        if response is not None:
+            _logger.debug(f"Using cached AI response for key: {cache_key}")
+        return response
 
     def _cache_response(self, cache_key, response_data):
         """Cache the AI response"""
         settings = self.env['purchase.ai.settings'].get_settings()
-        if not settings.enable_response_caching:
+        if not settings.cache_ai_responses:
             return
             
-        expires_at = fields.Datetime.now() + timedelta(hours=settings.cache_expiry_hours)
+        expires_at = fields.Datetime.now() + timedelta(hours=settings.cache_duration_hours)
         
-        self.env['ai.cache'].create({
-            'cache_key': cache_key,
-            'response_data': json.dumps(response_data),
-            'expires_at': expires_at,
-            'ai_service_id': self.id,
-        })
+        self.env['ai.response.cache'].sudo().store_response(
+            cache_key, response_data, expires_at, provider=self.provider, usage_type=self.usage_type
+        )
 
     @api.model
-    def call_ai_service(self, usage_type, prompt, context=None, files=None):
+    def call_ai_service(self, usage_type, prompt, context=None, files=None, defer=True):
         """Main entry point for AI service calls"""
         # Find best available service for this usage type
         service = self.search([
@@ -157,69 +184,228 @@ class AIServiceManager(models.Model):
         if not service:
             raise UserError(_("No active AI service found for usage type: %s") % usage_type)
         
-        return service.call_ai(prompt, context, files)
+        return service.call_ai(prompt, context, files, defer=defer)
 
-    def call_ai(self, prompt, context=None, files=None, attempt=1):
-        """Call AI service with retry logic and caching"""
-        start_time = time.time()
+    def call_ai(self, prompt, context=None, files=None, attempt=1, deadline=None, tried_ids=None, defer=True):
+        """Call AI service with retry logic and caching
         
-        try:
-            # Check rate limits
-            self._check_rate_limit()
-            
-            # Check cache first
-            cache_key = self._get_cache_key(prompt, context)
-            cached_response = self._get_cached_response(cache_key)
-            if cached_response:
-                return cached_response
-            
-            # Make API call based on provider
-            if self.provider == 'claude':
-                response = self._call_claude(prompt, context, files)
-            elif self.provider == 'openai':
-                response = self._call_openai(prompt, context, files)
-            elif self.provider == 'gemini':
-                response = self._call_gemini(prompt, context, files)
-            elif self.provider == 'azure_openai':
-                response = self._call_azure_openai(prompt, context, files)
-            elif self.provider == 'huggingface':
-                response = self._call_huggingface(prompt, context, files)
-            else:
-                raise UserError(_("Unsupported AI provider: %s") % self.provider)
-            
-            # Update performance metrics
-            response_time = time.time() - start_time
-            self._update_metrics(True, response_time, response.get('tokens_used', 0))
-            
-            # Cache the response
-            self._cache_response(cache_key, response)
-            
-            # Log the request
-            self._log_request(prompt, context, response, True)
-            
-            return response
-            
-        except Exception as e:
-            _logger.error(f"AI call failed on attempt {attempt} for {self.provider}: {e}")
-            
-            # Update failure metrics
-            self._update_metrics(False, time.time() - start_time, 0)
+        Retries use jittered exponential backoff within a total time budget.
+        Services whose circuit is open are skipped for their fallback. When the
+        budget runs out, the call is handed off to the AI processing queue
+        (raising AICallDeferred) instead of blocking the worker; with
+        ``defer=False`` the last error is raised instead.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + (self.call_time_budget or 60.0)
+        tried_ids = (tried_ids or set()) | {self.id}
+        
+        # Check cache first; cached responses do not count against rate limits
+        cache_key = self._get_cache_key(prompt, context)
+        cached_response = self._get_cached_response(cache_key)
+        if cached_response:
+            return cached_response
+        
+        fallback = self._get_fallback_service().filtered(lambda service: service.id not in tried_ids)
+        last_error = None
+        
+        while attempt <= self.max_retries and self._circuit_allows():
+            start_time = time.time()
+            try:
+                # Check rate limits
+                self._check_rate_limit()
+                
+                service, response = self._call_with_hedging(prompt, context, files, fallback, deadline)
+                
+                # Update performance metrics
+                response_time = time.time() - start_time
+                service._update_metrics(True, response_time, response.get('tokens_used', 0))
+                
+                # Cache the response
+                service._cache_response(cache_key, response)
+                
+                # Log the request
+                service._log_request(prompt, context, response, True)
+                
+                return response
+                
+            except Exception as e:
+                _logger.error(f"AI call failed on attempt {attempt} for {self.provider}: {e}")
+                last_error = e
+                self._record_circuit_result(False)
+                
+                # Update failure metrics
+                self._update_metrics(False, time.time() - start_time, 0)
+                
+                # Log the failed request
+                self._log_request(prompt, context, {'error': str(e)}, False)
             
-            # Log the failed request
-            self._log_request(prompt, context, {'error': str(e)}, False)
+            attempt += 1
+            if attempt > self.max_retries:
+                break
             
-            # Retry logic
-            if attempt < self.max_retries:
-                time.sleep(self.retry_delay * attempt)  # Exponential backoff
-                return self.call_ai(prompt, context, files, attempt + 1)
-            else:
-                # Try fallback service
-                fallback = self._get_fallback_service()
-                if fallback and fallback.id != self.id:
-                    _logger.info(f"Trying fallback service: {fallback.name}")
-                    return fallback.call_ai(prompt, context, files, 1)
-                
-                raise UserError(_("AI service failed after %d attempts: %s") % (self.max_retries, str(e)))
+            # Full jitter backoff, never sleeping past the budget
+            delay = random.uniform(0, self.retry_delay * 2 ** (attempt - 2))
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+        
+        # Try fallback service
+        if fallback and time.monotonic() < deadline:
+            _logger.info(f"Trying fallback service: {fallback.name}")
+            return fallback.call_ai(prompt, context, files, 1, deadline=deadline, tried_ids=tried_ids, defer=defer)
+        
+        error = str(last_error) if last_error else _("circuit open")
+        if defer and time.monotonic() >= deadline - self.retry_delay:
+            return self._defer_call(prompt, context, files, error)
+        raise UserError(_("AI service failed after %d attempts: %s") % (self.max_retries, error))
+
+    def _call_provider(self, prompt, context=None, files=None):
+        """Make the API call based on provider"""
+        if self.provider == 'claude':
+            return self._call_claude(prompt, context, files)
+        elif self.provider == 'openai':
+            return self._call_openai(prompt, context, files)
+        elif self.provider == 'gemini':
+            return self._call_gemini(prompt, context, files)
+        elif self.provider == 'azure_openai':
+            return self._call_azure_openai(prompt, context, files)
+        elif self.provider == 'huggingface':
+            return self._call_huggingface(prompt, context, files)
+        else:
+            raise UserError(_("Unsupported AI provider: %s") % self.provider)
+
+    def _call_with_hedging(self, prompt, context, files, fallback, deadline):
+        """Call this service, racing the fallback when this one is slow
+        
+        Hedging only kicks in when the service's 95th percentile response time
+        exceeds its threshold: the fallback is then started if this service has
+        not answered within the threshold, and the first answer wins.
+        
+        Returns:
+            tuple: (service that answered, response)
+        """
+        threshold = self.hedge_latency_threshold
+        if not fallback or not threshold or self._get_tail_latency() <= threshold:
+            start_time = time.monotonic()
+            response = self._call_provider(prompt, context, files)
+            self._record_latency(time.monotonic() - start_time)
+            self._record_circuit_result(True)
+            return self, response
+        
+        # Values read before leaving the request thread
+        registry, uid = self.env.registry, self.env.uid
+        services = {}
+        
+        def submit(service):
+            start_time = time.monotonic()
+            future = _hedge_executor.submit(
+                _call_provider_isolated, registry, uid, service.id, prompt, context, files
+            )
+            services[future] = (service, start_time)
+            return future
+        
+        pending = {submit(self)}
+        done, pending = wait(pending, timeout=threshold)
+        if not done:
+            _logger.info(f"Hedging slow service {self.name} with {fallback.name}")
+            pending.add(submit(fallback))
+        
+        last_error = None
+        while True:
+            for future in done:
+                service, start_time = services[future]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    if service == fallback:
+                        fallback._record_circuit_result(False)
+                    continue
+                service._record_latency(time.monotonic() - start_time)
+                service._record_circuit_result(True)
+                return service, response
+            if not pending:
+                raise last_error
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(_("No AI service answered within the time budget"))
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+    def _defer_call(self, prompt, context, files, error):
+        """Hand a call that ran out of time budget off to the AI processing queue
+        
+        The queue item is committed on its own cursor, so it survives the
+        rollback of the caller's transaction.
+        """
+        with self.env.registry.cursor() as cr:
+            env = self.env(cr=cr)
+            item = env['ai.processing.queue'].sudo().create({
+                'name': _("Deferred %s call") % self.name,
+                'request_type': 'ai_call',
+                'ai_service_id': self.id,
+                'model_name': self._name,
+                'record_id': self.id,
+                'method_name': 'call_ai',
+                'input_data': json.dumps({
+                    'prompt': prompt,
+                    'context': context,
+                    'files': files,
+                    'defer': False,
+                }, default=str),
+                'scheduled_date': fields.Datetime.now() + timedelta(seconds=self.circuit_reset_timeout or 60),
+                'error_message': error,
+            })
+            item_id = item.id
+        
+        _logger.warning(f"AI call to {self.name} out of time budget, queued as item {item_id}: {error}")
+        raise AICallDeferred(
+            _("The AI service is not answering; the request was queued and will be processed later."),
+            item_id,
+        )
+
+    def _circuit_allows(self):
+        """Check if the circuit breaker lets a call through
+        
+        An open circuit lets a single trial call through once the reset
+        timeout has passed; its outcome closes or reopens the circuit.
+        """
+        with self._lock:
+            state = self._circuit_tracker.get(f"{self.id}_{self.provider}")
+            if not state or not state['open_until']:
+                return True
+            now = time.time()
+            if now < state['open_until']:
+                return False
+            # Half-open: block other calls while the trial is running
+            state['open_until'] = now + (self.circuit_reset_timeout or 60)
+            return True
+
+    def _record_circuit_result(self, success):
+        """Record a call outcome in the circuit breaker"""
+        with self._lock:
+            key = f"{self.id}_{self.provider}"
+            state = self._circuit_tracker.setdefault(key, {'failures': 0, 'open_until': 0})
+            if success:
+                state['failures'] = 0
+                state['open_until'] = 0
+                return
+            state['failures'] += 1
+            if state['failures'] >= (self.circuit_failure_threshold or 1):
+                if not state['open_until']:
+                    _logger.warning(f"Opening circuit of AI service {self.name} after {state['failures']} failures")
+                state['open_until'] = time.time() + (self.circuit_reset_timeout or 60)
+
+    def _record_latency(self, response_time):
+        with self._lock:
+            self._latency_tracker[f"{self.id}_{self.provider}"].append(response_time)
+
+    def _get_tail_latency(self):
+        """Get the 95th percentile of recent response times"""
+        with self._lock:
+            samples = sorted(self._latency_tracker[f"{self.id}_{self.provider}"])
+        if not samples:
+            return 0.0
+        return samples[min(int(len(samples) * 0.95), len(samples) - 1)]
 
     def _get_fallback_service(self):
         """Get fallback service for this usage type"""
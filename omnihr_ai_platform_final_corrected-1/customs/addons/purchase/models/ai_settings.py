@@ -31,6 +31,8 @@ class PurchaseAISettings(models.Model):
                                        help="Cache AI responses to reduce API calls")
     cache_duration_hours = fields.Integer('Cache Duration (Hours)', default=24,
                                          help="How long to cache AI responses")
+    cache_max_entries = fields.Integer('Max Cached Responses', default=10000,
+                                      help="Least recently used responses beyond this number are evicted (0 = no limit)")
     
     # Performance settings
     max_concurrent_ai_calls = fields.Integer('Max Concurrent AI Calls', default=5,
@@ -115,6 +117,7 @@ class PurchaseAISettings(models.Model):
         cache_records = self.env['ai.response.cache'].search([])
         count = len(cache_records)
         cache_records.unlink()
+        self.env['ai.response.cache'].clear_memory_cache()
         
         return {
             'type': 'ir.actions.client',
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 from datetime import timedelta
@@ -10,7 +11,12 @@ class PurchaseOrder(models.Model):
     _inherit = 'purchase.order'
 
     # AI-powered fields
-    ai_risk_score = fields.Float('AI Risk Score', compute='_compute_ai_risk_score', store=True)
+    ai_risk_score = fields.Float('AI Risk Score', readonly=True, copy=False)
+    ai_risk_fingerprint = fields.Char('AI Risk Inputs Fingerprint', compute='_compute_ai_risk_fingerprint', store=True,
+                                      help="Hash of the vendor, lines and amounts the risk assessment depends on")
+    ai_risk_assessed_fingerprint = fields.Char('Assessed Fingerprint', readonly=True, copy=False)
+    ai_risk_queued_fingerprint = fields.Char('Queued Fingerprint', readonly=True, copy=False)
+    ai_risk_outdated = fields.Boolean('AI Risk Outdated', compute='_compute_ai_risk_outdated')
     ai_risk_breakdown = fields.Json('Risk Breakdown', readonly=True)
     ai_alternative_vendors = fields.Many2many(
         'res.partner', 'purchase_alternative_vendor_rel', 
@@ -37,29 +43,162 @@ class PurchaseOrder(models.Model):
     approval_notes = fields.Text('Approval Notes')
     risk_mitigation_actions = fields.Text('Risk Mitigation Actions')
 
-    @api.depends('partner_id', 'order_line', 'amount_total')
-    def _compute_ai_risk_score(self):
-        """Compute AI risk score for the purchase order"""
+    # States in which orders are risk assessed
+    AI_RISK_STATES = ['draft', 'sent', 'to approve']
+    # Order fields whose changes may change the risk fingerprint
+    AI_RISK_TRIGGER_FIELDS = {'partner_id', 'currency_id', 'order_line', 'state'}
+
+    @api.depends('partner_id', 'currency_id', 'amount_total',
+                 'order_line.product_id', 'order_line.product_qty', 'order_line.price_unit')
+    def _compute_ai_risk_fingerprint(self):
         for order in self:
             if not order.partner_id or not order.order_line:
-                order.ai_risk_score = 0.0
+                order.ai_risk_fingerprint = False
                 continue
+            inputs = {
+                'partner': order.partner_id.id,
+                'currency': order.currency_id.id,
+                'amount_total': order.amount_total,
+                'lines': sorted(
+                    (line.product_id.id, line.product_qty, line.price_unit)
+                    for line in order.order_line
+                ),
+            }
+            order.ai_risk_fingerprint = hashlib.sha256(
+                json.dumps(inputs, sort_keys=True, default=str).encode()
+            ).hexdigest()
+
+    @api.depends('ai_risk_fingerprint', 'ai_risk_assessed_fingerprint')
+    def _compute_ai_risk_outdated(self):
+        for order in self:
+            order.ai_risk_outdated = order.ai_risk_fingerprint != order.ai_risk_assessed_fingerprint
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        orders = super().create(vals_list)
+        orders._schedule_ai_risk_assessment()
+        return orders
+
+    def write(self, vals):
+        result = super().write(vals)
+        if self.AI_RISK_TRIGGER_FIELDS.intersection(vals):
+            self._schedule_ai_risk_assessment()
+        return result
+
+    def _schedule_ai_risk_assessment(self):
+        """Queue the risk assessment of orders whose inputs changed, at commit
+        
+        Changes are collected for the whole transaction, so an order edited
+        several times is queued once with its final fingerprint.
+        """
+        if not self:
+            return
+        data = self.env.cr.precommit.data
+        key = 'purchase.order.ai_risk_changed'
+        if key not in data:
+            data[key] = set()
             
-            try:
-                # Prepare AI prompt for risk assessment
-                prompt = order._prepare_ai_risk_prompt()
-                
-                # Call AI service for risk assessment
-                response = self.env['purchase.ai.service'].call_ai_service(
-                    'risk_assessment', prompt
-                )
-                
-                # Process AI response
-                order._process_ai_risk_response(response)
-                
-            except Exception as e:
-                _logger.warning(f"AI risk assessment failed for PO {order.name}: {e}")
-                order.ai_risk_score = 0.5  # Default neutral risk
+            @self.env.cr.precommit.add
+            def queue_assessments():
+                orders = self.browse(data.pop(key, set())).exists()
+                orders.sudo()._queue_ai_risk_assessment()
+                # Precommit hooks run after the final flush of the transaction
+                self.env.flush_all()
+        data[key].update(self.ids)
+
+    def _queue_ai_risk_assessment(self, trigger=False):
+        """Queue a risk assessment for each order whose fingerprint is not assessed yet
+        
+        Args:
+            trigger: Run the queue right away instead of at its next scheduled run
+        
+        Returns:
+            int: Number of assessments queued
+        """
+        orders = self.filtered(lambda order: (
+            order.state in self.AI_RISK_STATES
+            and order.ai_risk_fingerprint
+            and order.ai_risk_fingerprint not in (order.ai_risk_assessed_fingerprint, order.ai_risk_queued_fingerprint)
+        ))
+        if not orders:
+            return 0
+        
+        self.env['ai.processing.queue'].create([{
+            'name': _('Risk assessment of %s') % order.name,
+            'request_type': 'po_risk_assessment',
+            'model_name': 'purchase.order',
+            'record_id': order.id,
+            'method_name': '_run_ai_risk_assessment',
+            'input_data': json.dumps({'fingerprint': order.ai_risk_fingerprint}),
+        } for order in orders])
+        for order in orders:
+            order.ai_risk_queued_fingerprint = order.ai_risk_fingerprint
+        
+        if trigger:
+            cron = self.env.ref('purchase_ai.cron_process_ai_queue', raise_if_not_found=False)
+            if cron:
+                cron._trigger()
+        return len(orders)
+
+    def _run_ai_risk_assessment(self, fingerprint=None, force=False):
+        """Assess the risk of an order with the AI service and store the result
+        
+        Queued assessments whose fingerprint is no longer current are skipped,
+        since a newer assessment was queued for the new inputs.
+        
+        Args:
+            fingerprint: Fingerprint the assessment was queued for
+            force: Assess even if the current fingerprint is already assessed
+        """
+        self.ensure_one()
+        if fingerprint and fingerprint != self.ai_risk_fingerprint:
+            return {'skipped': 'outdated'}
+        if not force and self.ai_risk_fingerprint == self.ai_risk_assessed_fingerprint:
+            return {'skipped': 'up to date'}
+        
+        if not self.partner_id or not self.order_line:
+            self.write({'ai_risk_score': 0.0, 'ai_risk_assessed_fingerprint': self.ai_risk_fingerprint})
+            return {'risk_score': 0.0}
+        
+        try:
+            # Prepare AI prompt for risk assessment
+            prompt = self._prepare_ai_risk_prompt()
+            
+            # Call AI service for risk assessment
+            response = self.env['purchase.ai.service'].call_ai_service(
+                'risk_assessment', prompt, defer=False
+            )
+            
+            # Process AI response
+            self._process_ai_risk_response(response)
+            self.ai_risk_assessed_fingerprint = self.ai_risk_fingerprint
+            
+        except Exception as e:
+            _logger.warning(f"AI risk assessment failed for PO {self.name}: {e}")
+            self.ai_risk_score = 0.5  # Default neutral risk
+            # Allow the same inputs to be queued again
+            self.ai_risk_queued_fingerprint = False
+            return {'error': str(e)}
+        
+        return {'risk_score': self.ai_risk_score}
+
+    def action_queue_ai_risk_assessment(self):
+        """Queue the risk assessment of the selected orders
+        
+        The AI processing queue scores them concurrently; orders whose inputs
+        did not change since their last assessment keep their stored score.
+        """
+        count = self._queue_ai_risk_assessment(trigger=True)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('AI Risk Assessment'),
+                'message': _('%d purchase orders queued for AI risk assessment') % count,
+                'type': 'info',
+                'sticky': False,
+            }
+        }
 
     @api.depends('ai_risk_score')
     def _compute_requires_ai_approval(self):
@@ -381,8 +520,8 @@ class PurchaseOrder(models.Model):
         self.ai_alternative_vendors = [(5, 0, 0)]
         self.ai_approval_status = 'pending'
         
-        # Trigger recomputation
-        self._compute_ai_risk_score()
+        # Explicit request: assess right away
+        self._run_ai_risk_assessment(force=True)
         
         return {
             'type': 'ir.actions.client',
@@ -444,4 +583,26 @@ class PurchaseOrder(models.Model):
             'view_mode': 'form',
             'target': 'new',
             'context': {'default_purchase_order_id': self.id}
-        } 
\ No newline at end of file
+        } 
+
+
+class PurchaseOrderLine(models.Model):
+    _inherit = 'purchase.order.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.order_id._schedule_ai_risk_assessment()
+        return lines
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {'product_id', 'product_qty', 'price_unit'}.intersection(vals):
+            self.order_id._schedule_ai_risk_assessment()
+        return result
+
+    def unlink(self):
+        orders = self.order_id
+        result = super().unlink()
+        orders._schedule_ai_risk_assessment()
+        return result
@@ -0,0 +1,238 @@
+import logging
+from datetime import timedelta
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+class VendorProductStats(models.Model):
+    _name = 'purchase.vendor.product.stats'
+    _description = 'Vendor Purchase History per Product'
+    _order = 'product_id, order_count desc'
+
+    product_id = fields.Many2one('product.product', 'Product', required=True, ondelete='cascade', index=True)
+    vendor_id = fields.Many2one('res.partner', 'Vendor', required=True, ondelete='cascade', index=True)
+
+    # All confirmed purchases
+    order_count = fields.Integer('Orders', readonly=True)
+    line_count = fields.Integer('Order Lines', readonly=True)
+    total_qty = fields.Float('Total Quantity', readonly=True)
+    avg_price = fields.Float('Average Price', readonly=True)
+    price_trend = fields.Float('Price Trend (per month)', readonly=True,
+                               help="Relative change of the unit price over 30 days, from a linear regression")
+    first_order_date = fields.Datetime('First Order', readonly=True)
+    last_order_date = fields.Datetime('Last Order', readonly=True)
+
+    # Receipts
+    delivered_count = fields.Integer('Delivered Lines', readonly=True)
+    avg_lead_time = fields.Float('Average Lead Time (days)', readonly=True)
+    lead_time_p90 = fields.Float('90th Percentile Lead Time (days)', readonly=True)
+    on_time_rate = fields.Float('On-Time Rate', readonly=True, help="Share of deliveries received by their planned date")
+
+    # Purchases of the last year, and last six months for volumes
+    recent_line_count = fields.Integer('Recent Order Lines', readonly=True)
+    recent_avg_price = fields.Float('Recent Average Price', readonly=True)
+    recent_max_qty = fields.Float('Recent Maximum Quantity', readonly=True)
+    recent_delivered_count = fields.Integer('Recent Delivered Lines', readonly=True)
+    recent_on_time_rate = fields.Float('Recent On-Time Rate', readonly=True)
+
+    refreshed_at = fields.Datetime('Refreshed At', readonly=True, index=True)
+
+    _sql_constraints = [
+        ('product_vendor_uniq', 'unique(product_id, vendor_id)', 'Statistics must be unique per product and vendor!'),
+    ]
+
+    # Days covered by the recent price and delivery statistics
+    RECENT_DAYS = 365
+    # Days covered by the recent volume statistics
+    RECENT_VOLUME_DAYS = 180
+    # Statistics older than this are refreshed when read, so the recent windows move
+    MAX_AGE = timedelta(days=1)
+    # Fields copied from the statistics rows into the dictionaries read by the scoring
+    STATS_FIELDS = [
+        'vendor_id', 'order_count', 'line_count', 'total_qty', 'avg_price', 'price_trend',
+        'first_order_date', 'last_order_date', 'delivered_count', 'avg_lead_time',
+        'lead_time_p90', 'on_time_rate', 'recent_line_count', 'recent_avg_price',
+        'recent_max_qty', 'recent_delivered_count', 'recent_on_time_rate',
+    ]
+
+    @api.model
+    def get_product_stats(self, product_ids):
+        """Get the vendor statistics of products, refreshing the stale ones
+
+        Args:
+            product_ids: Ids of product.product
+
+        Returns:
+            dict: {product id: {vendor id: statistics dict}}
+        """
+        product_ids = list(set(product_ids))
+        if not product_ids:
+            return {}
+
+        rows = self._read_stats(product_ids)
+
+        # Products never purchased have no rows; refreshing them is a cheap empty query
+        threshold = fields.Datetime.now() - self.MAX_AGE
+        fresh = {row['product_id'] for row in rows if row['refreshed_at'] >= threshold}
+        stale = [product_id for product_id in product_ids if product_id not in fresh]
+        if stale:
+            self.refresh_products(stale)
+            stale_ids = set(stale)
+            rows = [row for row in rows if row['product_id'] not in stale_ids] + self._read_stats(stale)
+
+        stats = {product_id: {} for product_id in product_ids}
+        for row in rows:
+            stats[row.pop('product_id')][row['vendor_id']] = row
+        return stats
+
+    @api.model
+    def _read_stats(self, product_ids):
+        self.env.cr.execute(f"""
+            SELECT product_id, {', '.join(self.STATS_FIELDS)}, refreshed_at
+              FROM {self._table}
+             WHERE product_id IN %s
+        """, (tuple(product_ids),))
+        return self.env.cr.dictfetchall()
+
+    @api.model
+    def refresh_products(self, product_ids):
+        """Recompute the vendor statistics of products from their confirmed purchases
+
+        All vendors of all products are aggregated by one grouped query.
+
+        Returns:
+            int: Number of statistics rows written
+        """
+        product_ids = tuple(set(product_ids))
+        if not product_ids:
+            return 0
+
+        now = fields.Datetime.now()
+        # Receipt dates come with the stock integration of purchase
+        if 'effective_date' in self.env['purchase.order']._fields:
+            delivery = """
+                EXTRACT(EPOCH FROM po.effective_date - po.date_order) / 86400,
+                po.effective_date <= COALESCE(line.date_planned, po.date_order + INTERVAL '30 days')
+            """
+        else:
+            delivery = "NULL::float, NULL::boolean"
+
+        self.env.cr.execute(f"""
+            INSERT INTO {self._table} AS stats (
+                product_id, vendor_id, order_count, line_count, total_qty, avg_price, price_trend,
+                first_order_date, last_order_date, delivered_count, avg_lead_time, lead_time_p90,
+                on_time_rate, recent_line_count, recent_avg_price, recent_max_qty,
+                recent_delivered_count, recent_on_time_rate, refreshed_at,
+                create_date, write_date, create_uid, write_uid
+            )
+            SELECT line.product_id,
+                   po.partner_id,
+                   COUNT(DISTINCT po.id),
+                   COUNT(*),
+                   SUM(line.product_qty),
+                   AVG(line.price_unit),
+                   COALESCE(regr_slope(line.price_unit, EXTRACT(EPOCH FROM po.date_order) / 86400) * 30
+                            / NULLIF(AVG(line.price_unit), 0), 0),
+                   MIN(po.date_order),
+                   MAX(po.date_order),
+                   COUNT(delivery.lead_time),
+                   AVG(delivery.lead_time),
+                   percentile_cont(0.9) WITHIN GROUP (ORDER BY delivery.lead_time),
+                   AVG(delivery.on_time::int),
+                   COUNT(*) FILTER (WHERE po.date_order >= %(recent)s),
+                   AVG(line.price_unit) FILTER (WHERE po.date_order >= %(recent)s),
+                   MAX(line.product_qty) FILTER (WHERE po.date_order >= %(recent_volume)s),
+                   COUNT(delivery.lead_time) FILTER (WHERE po.date_order >= %(recent)s),
+                   AVG(delivery.on_time::int) FILTER (WHERE po.date_order >= %(recent)s),
+                   %(now)s, %(now)s, %(now)s, %(uid)s, %(uid)s
+              FROM purchase_order_line line
+              JOIN purchase_order po ON po.id = line.order_id
+             CROSS JOIN LATERAL (SELECT {delivery}) AS delivery (lead_time, on_time)
+             WHERE line.product_id IN %(product_ids)s
+               AND line.display_type IS NULL
+               AND po.partner_id IS NOT NULL
+               AND po.state IN ('purchase', 'done')
+          GROUP BY line.product_id, po.partner_id
+            ON CONFLICT (product_id, vendor_id) DO UPDATE SET
+                order_count = EXCLUDED.order_count,
+                line_count = EXCLUDED.line_count,
+                total_qty = EXCLUDED.total_qty,
+                avg_price = EXCLUDED.avg_price,
+                price_trend = EXCLUDED.price_trend,
+                first_order_date = EXCLUDED.first_order_date,
+                last_order_date = EXCLUDED.last_order_date,
+                delivered_count = EXCLUDED.delivered_count,
+                avg_lead_time = EXCLUDED.avg_lead_time,
+                lead_time_p90 = EXCLUDED.lead_time_p90,
+                on_time_rate = EXCLUDED.on_time_rate,
+                recent_line_count = EXCLUDED.recent_line_count,
+                recent_avg_price = EXCLUDED.recent_avg_price,
+                recent_max_qty = EXCLUDED.recent_max_qty,
+                recent_delivered_count = EXCLUDED.recent_delivered_count,
+                recent_on_time_rate = EXCLUDED.recent_on_time_rate,
+                refreshed_at = EXCLUDED.refreshed_at,
+                write_date = EXCLUDED.write_date,
+                write_uid = EXCLUDED.write_uid
+        """, {
+            'product_ids': product_ids,
+            'recent': now - timedelta(days=self.RECENT_DAYS),
+            'recent_volume': now - timedelta(days=self.RECENT_VOLUME_DAYS),
+            'now': now,
+            'uid': self.env.uid,
+        })
+        count = self.env.cr.rowcount
+
+        # Vendors whose purchases were all cancelled since the last refresh
+        self.env.cr.execute(f"""
+            DELETE FROM {self._table}
+             WHERE product_id IN %s AND refreshed_at < %s
+        """, (product_ids, now))
+        self.invalidate_model()
+        return count
+
+    @api.model
+    def _mark_products_changed(self, product_ids):
+        """Refresh the statistics of products once the current transaction is done
+
+        Products are collected for the whole transaction, so confirming or
+        receiving many orders refreshes each product once.
+        """
+        if not product_ids:
+            return
+        data = self.env.cr.precommit.data
+        key = 'purchase.vendor.product.stats.changed'
+        if key not in data:
+            data[key] = set()
+
+            @self.env.cr.precommit.add
+            def refresh_changed():
+                products = data.pop(key, set())
+                try:
+                    # Statistics must never prevent purchases from being saved
+                    with self.env.cr.savepoint():
+                        self.sudo().refresh_products(products)
+                except Exception as e:
+                    _logger.warning(f"Failed to refresh vendor statistics of {len(products)} products: {str(e)}")
+        data[key].update(product_ids)
+
+
+class PurchaseOrder(models.Model):
+    _inherit = 'purchase.order'
+
+    def write(self, vals):
+        result = super().write(vals)
+        # Confirmed, done or cancelled orders change the vendor statistics
+        if 'state' in vals or 'partner_id' in vals:
+            self._mark_vendor_stats_changed()
+        return result
+
+    def _compute_effective_date(self):
+        # Defined with the stock integration of purchase: receipts change lead times
+        if hasattr(super(), '_compute_effective_date'):
+            super()._compute_effective_date()
+        self.filtered(lambda order: isinstance(order.id, int))._mark_vendor_stats_changed()
+
+    def _mark_vendor_stats_changed(self):
+        orders = self.filtered(lambda order: order.state in ('purchase', 'done', 'cancel'))
+        product_ids = orders.order_line.product_id.ids
+        self.env['purchase.vendor.product.stats']._mark_products_changed(product_ids)
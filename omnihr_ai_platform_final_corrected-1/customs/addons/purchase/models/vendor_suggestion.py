@@ -1,9 +1,9 @@
 import json
 import logging
 import numpy as np
-from datetime import datetime, timedelta
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools import split_every
 from odoo.addons.queue_job.job import job
 
 _logger = logging.getLogger(__name__)
@@ -13,6 +13,9 @@ class VendorSuggestion(models.Model):
     _description = 'AI-Powered Vendor Suggestion with Detailed Scoring'
     _order = 'ai_score desc, create_date desc'
 
+    # Vendors described to the AI service with their purchase history
+    HISTORY_VENDOR_LIMIT = 20
+
     # Core relationship fields
     product_id = fields.Many2one('product.product', string='Product', required=True, ondelete='cascade')
     vendor_id = fields.Many2one('res.partner', string='Vendor', required=True, ondelete='cascade')
@@ -81,9 +84,24 @@ class VendorSuggestion(models.Model):
 
     @api.depends('vendor_id', 'product_id')
     def _compute_historical_data(self):
-        """Compute historical performance data"""
-        for record in self:
-            if not record.vendor_id or not record.product_id:
+        """Compute historical performance data from the vendor statistics"""
+        records = self.filtered(lambda r: r.vendor_id and r.product_id)
+        (self - records).update({
+            'historical_orders': 0,
+            'avg_delivery_time': 0.0,
+            'on_time_delivery_rate': 0.0,
+            'quality_rating': 0.0,
+            'avg_price': 0.0,
+        })
+        if not records:
+            return
+        
+        stats = self.env['purchase.vendor.product.stats'].get_product_stats(records.product_id.ids)
+        feedback = self._get_feedback_counts(records.vendor_id.ids, records.product_id.ids)
+        
+        for record in records:
+            vendor_stats = stats[record.product_id.id].get(record.vendor_id.id)
+            if not vendor_stats:
                 record.historical_orders = 0
                 record.avg_delivery_time = 0.0
                 record.on_time_delivery_rate = 0.0
@@ -91,63 +109,43 @@ class VendorSuggestion(models.Model):
                 record.avg_price = 0.0
                 continue
             
-            # Get historical purchase orders
-            purchase_lines = self.env['purchase.order.line'].search([
-                ('partner_id', '=', record.vendor_id.id),
-                ('product_id', '=', record.product_id.id),
-                ('order_id.state', 'in', ['purchase', 'done']),
-            ])
-            
-            record.historical_orders = len(purchase_lines)
-            
-            if purchase_lines:
-                # Calculate average delivery time
-                delivered_lines = purchase_lines.filtered(lambda l: l.order_id.effective_date)
-                if delivered_lines:
-                    delivery_times = []
-                    for line in delivered_lines:
-                        if line.order_id.date_order and line.order_id.effective_date:
-                            delta = line.order_id.effective_date - line.order_id.date_order
-                            delivery_times.append(delta.days)
-                    
-                    if delivery_times:
-                        record.avg_delivery_time = sum(delivery_times) / len(delivery_times)
-                        
-                        # Calculate on-time delivery rate (assuming 30 days is expected)
-                        on_time_count = sum(1 for days in delivery_times if days <= 30)
-                        record.on_time_delivery_rate = (on_time_count / len(delivery_times)) * 100
-                
-                # Calculate average price
-                prices = purchase_lines.mapped('price_unit')
-                if prices:
-                    record.avg_price = sum(prices) / len(prices)
-                
-                # Get quality rating from vendor feedback
-                record.quality_rating = record._get_quality_rating()
+            record.historical_orders = vendor_stats['line_count']
+            record.avg_delivery_time = vendor_stats['avg_lead_time'] or 0.0
+            record.on_time_delivery_rate = (vendor_stats['on_time_rate'] or 0.0) * 100
+            record.avg_price = vendor_stats['avg_price'] or 0.0
+            record.quality_rating = self._feedback_rating(feedback.get((record.vendor_id.id, record.product_id.id)))
 
     def _get_quality_rating(self):
         """Get quality rating from vendor feedback system"""
-        # This would integrate with a vendor feedback/rating system
-        # For now, return a computed value based on historical performance
-        feedback_records = self.env['vendor.suggestion.feedback'].search([
-            ('suggestion_id.vendor_id', '=', self.vendor_id.id),
-            ('suggestion_id.product_id', '=', self.product_id.id),
-            ('rating', '!=', False)
-        ])
-        
-        if feedback_records:
-            ratings = []
-            for feedback in feedback_records:
-                if feedback.rating == 'positive':
-                    ratings.append(5.0)
-                elif feedback.rating == 'neutral':
-                    ratings.append(3.0)
-                else:  # negative
-                    ratings.append(1.0)
-            
-            return sum(ratings) / len(ratings) if ratings else 3.0
+        feedback = self._get_feedback_counts(self.vendor_id.ids, self.product_id.ids)
+        return self._feedback_rating(feedback.get((self.vendor_id.id, self.product_id.id)))
+
+    @api.model
+    def _get_feedback_counts(self, vendor_ids, product_ids):
+        """Count the feedback ratings of vendor and product pairs with one grouped query
         
-        return 3.0  # Default neutral rating
+        Returns:
+            dict: {(vendor id, product id): {rating: count}}
+        """
+        counts = {}
+        if not vendor_ids or not product_ids:
+            return counts
+        for vendor, product, rating, count in self.env['vendor.suggestion.feedback']._read_group([
+            ('vendor_id', 'in', vendor_ids),
+            ('product_id', 'in', product_ids),
+            ('rating', '!=', False),
+        ], ['vendor_id', 'product_id', 'rating'], ['__count']):
+            counts.setdefault((vendor.id, product.id), {})[rating] = count
+        return counts
+
+    @api.model
+    def _feedback_rating(self, rating_counts):
+        """Average feedback rating on a 1-5 scale; neutral without feedback"""
+        if not rating_counts:
+            return 3.0  # Default neutral rating
+        values = {'positive': 5.0, 'neutral': 3.0, 'negative': 1.0}
+        total = sum(rating_counts.values())
+        return sum(values[rating] * count for rating, count in rating_counts.items()) / total
 
     @api.model
     def generate_suggestions_for_product(self, product_id, context=None):
@@ -197,10 +195,12 @@ class VendorSuggestion(models.Model):
             # Parse AI response
             ai_suggestions = self._parse_ai_suggestions(response, product)
             
-            # Enhance with historical data and scoring
+            # Enhance with historical data and scoring, read once for all vendors
+            vendors = self.env['res.partner'].browse([s['vendor_id'] for s in ai_suggestions])
+            history = self._get_scoring_history(product, vendors)
             enhanced_suggestions = []
             for ai_suggestion in ai_suggestions:
-                enhanced = self._enhance_suggestion_with_data(ai_suggestion, product, context)
+                enhanced = self._enhance_suggestion_with_data(ai_suggestion, product, context, history)
                 if enhanced:
                     enhanced_suggestions.append(enhanced)
             
@@ -302,56 +302,30 @@ class VendorSuggestion(models.Model):
 
     def _get_historical_vendors(self, product):
         """Get historical vendor performance data"""
-        # Get vendors who have supplied this product
-        purchase_lines = self.env['purchase.order.line'].search([
-            ('product_id', '=', product.id),
-            ('order_id.state', 'in', ['purchase', 'done']),
-        ], limit=50)  # Limit for performance
-        
-        vendor_data = {}
-        for line in purchase_lines:
-            vendor_id = line.partner_id.id
-            if vendor_id not in vendor_data:
-                vendor_data[vendor_id] = {
-                    'vendor_name': line.partner_id.name,
-                    'vendor_id': vendor_id,
-                    'orders': [],
-                    'total_quantity': 0,
-                    'avg_price': 0,
-                    'delivery_performance': []
-                }
-            
-            order_data = {
-                'date': line.order_id.date_order.isoformat() if line.order_id.date_order else None,
-                'quantity': line.product_qty,
-                'price': line.price_unit,
-                'delivery_date': line.order_id.effective_date.isoformat() if line.order_id.effective_date else None,
+        stats = self.env['purchase.vendor.product.stats'].get_product_stats(product.ids)[product.id]
+        # Most recently used vendors first, limited to keep the prompt small
+        vendor_stats = sorted(stats.values(), key=lambda row: row['last_order_date'], reverse=True)
+        vendor_stats = vendor_stats[:self.HISTORY_VENDOR_LIMIT]
+        vendors = self.env['res.partner'].browse([row['vendor_id'] for row in vendor_stats])
+        
+        vendor_data = []
+        for vendor, row in zip(vendors, vendor_stats):
+            data = {
+                'vendor_name': vendor.name,
+                'vendor_id': vendor.id,
+                'order_count': row['order_count'],
+                'total_quantity': row['total_qty'],
+                'avg_price': row['avg_price'],
+                'price_trend_per_month': row['price_trend'],
+                'last_order_date': row['last_order_date'].isoformat(),
             }
-            
-            vendor_data[vendor_id]['orders'].append(order_data)
-            vendor_data[vendor_id]['total_quantity'] += line.product_qty
-        
-        # Calculate aggregated metrics
-        for vendor_id, data in vendor_data.items():
-            if data['orders']:
-                prices = [order['price'] for order in data['orders']]
-                data['avg_price'] = sum(prices) / len(prices)
-                
-                # Calculate delivery performance
-                delivered_orders = [order for order in data['orders'] if order['delivery_date']]
-                if delivered_orders:
-                    delivery_times = []
-                    for order in delivered_orders:
-                        if order['date'] and order['delivery_date']:
-                            order_date = datetime.fromisoformat(order['date'].replace('Z', '+00:00'))
-                            delivery_date = datetime.fromisoformat(order['delivery_date'].replace('Z', '+00:00'))
-                            delivery_times.append((delivery_date - order_date).days)
-                    
-                    if delivery_times:
-                        data['avg_delivery_days'] = sum(delivery_times) / len(delivery_times)
-                        data['on_time_rate'] = sum(1 for days in delivery_times if days <= 30) / len(delivery_times)
-        
-        return list(vendor_data.values())
+            if row['delivered_count']:
+                data['avg_delivery_days'] = row['avg_lead_time']
+                data['p90_delivery_days'] = row['lead_time_p90']
+                data['on_time_rate'] = row['on_time_rate']
+            vendor_data.append(data)
+        
+        return vendor_data
 
     def _get_company_preferences(self):
         """Get company procurement preferences"""
@@ -450,7 +424,7 @@ class VendorSuggestion(models.Model):
         
         return None
 
-    def _enhance_suggestion_with_data(self, suggestion_data, product, context):
+    def _enhance_suggestion_with_data(self, suggestion_data, product, context, history=None):
         """Enhance AI suggestion with real data and calculations"""
         vendor_id = suggestion_data.get('vendor_id')
         if not vendor_id:
@@ -461,7 +435,7 @@ class VendorSuggestion(models.Model):
             return None
         
         # Calculate real scoring factors
-        real_scoring = self._calculate_real_scoring_factors(vendor, product)
+        real_scoring = self._calculate_real_scoring_factors(vendor, product, history)
         
         # Merge AI scoring with real data
         ai_scoring = suggestion_data.get('scoring_factors', {})
@@ -496,27 +470,67 @@ class VendorSuggestion(models.Model):
             'last_updated': fields.Datetime.now(),
         }
 
-    def _calculate_real_scoring_factors(self, vendor, product):
+    def _get_scoring_history(self, product, vendors):
+        """Read the purchase history scored for vendors of a product
+        
+        Statistics come from purchase.vendor.product.stats; relationships and
+        feedback are aggregated with one grouped query each, so every scoring
+        factor is then a dictionary lookup.
+        
+        Returns:
+            dict: 'stats' and 'feedback' by vendor id, 'relationships' as
+            (first order date, order count) by vendor id, and 'market_price',
+            the average recent price paid to all vendors of the product
+        """
+        stats = self.env['purchase.vendor.product.stats'].get_product_stats(product.ids)[product.id]
+        
+        recent_lines = sum(row['recent_line_count'] for row in stats.values())
+        market_price = sum(
+            row['recent_avg_price'] * row['recent_line_count']
+            for row in stats.values() if row['recent_line_count']
+        ) / recent_lines if recent_lines else 0.0
+        
+        relationships = {}
+        if vendors:
+            relationships = {
+                vendor.id: (first_order_date, count)
+                for vendor, first_order_date, count in self.env['purchase.order']._read_group([
+                    ('partner_id', 'in', vendors.ids),
+                    ('state', 'in', ['purchase', 'done']),
+                ], ['partner_id'], ['date_order:min', '__count'])
+            }
+        
+        feedback = self._get_feedback_counts(vendors.ids, product.ids)
+        return {
+            'stats': stats,
+            'market_price': market_price,
+            'relationships': relationships,
+            'feedback': {vendor_id: counts for (vendor_id, product_id), counts in feedback.items()},
+        }
+
+    def _calculate_real_scoring_factors(self, vendor, product, history=None):
         """Calculate real scoring factors based on historical data"""
+        if history is None:
+            history = self._get_scoring_history(product, vendor)
         scoring = {}
         
         # Price competitiveness
-        scoring['price_competitiveness'] = self._calculate_price_competitiveness(vendor, product)
+        scoring['price_competitiveness'] = self._calculate_price_competitiveness(vendor, product, history)
         
         # Quality history
-        scoring['quality_history'] = self._calculate_quality_score(vendor, product)
+        scoring['quality_history'] = self._calculate_quality_score(vendor, product, history)
         
         # Delivery reliability
-        scoring['delivery_reliability'] = self._calculate_delivery_score(vendor, product)
+        scoring['delivery_reliability'] = self._calculate_delivery_score(vendor, product, history)
         
         # Relationship score
-        scoring['relationship_score'] = self._calculate_relationship_score(vendor)
+        scoring['relationship_score'] = self._calculate_relationship_score(vendor, history)
         
         # Compliance rating
         scoring['compliance_rating'] = self._calculate_compliance_score(vendor)
         
         # Capacity match
-        scoring['capacity_match'] = self._calculate_capacity_score(vendor, product)
+        scoring['capacity_match'] = self._calculate_capacity_score(vendor, product, history)
         
         # Geographic proximity
         scoring['geographic_proximity'] = self._calculate_geographic_score(vendor)
@@ -526,30 +540,17 @@ class VendorSuggestion(models.Model):
         
         return scoring
 
-    def _calculate_price_competitiveness(self, vendor, product):
+    def _calculate_price_competitiveness(self, vendor, product, history=None):
         """Calculate price competitiveness score"""
-        # Get recent prices from this vendor
-        recent_lines = self.env['purchase.order.line'].search([
-            ('partner_id', '=', vendor.id),
-            ('product_id', '=', product.id),
-            ('create_date', '>=', fields.Datetime.now() - timedelta(days=365)),
-        ], limit=10)
-        
-        if not recent_lines:
-            return 0.5  # Neutral score for no data
-        
-        vendor_avg_price = sum(recent_lines.mapped('price_unit')) / len(recent_lines)
+        history = history or self._get_scoring_history(product, vendor)
+        vendor_stats = history['stats'].get(vendor.id)
         
-        # Get market average price
-        all_recent_lines = self.env['purchase.order.line'].search([
-            ('product_id', '=', product.id),
-            ('create_date', '>=', fields.Datetime.now() - timedelta(days=365)),
-        ], limit=50)
-        
-        if not all_recent_lines:
-            return 0.5
+        # Recent prices from this vendor
+        if not vendor_stats or not vendor_stats['recent_line_count']:
+            return 0.5  # Neutral score for no data
         
-        market_avg_price = sum(all_recent_lines.mapped('price_unit')) / len(all_recent_lines)
+        vendor_avg_price = vendor_stats['recent_avg_price']
+        market_avg_price = history['market_price']
         
         if market_avg_price == 0:
             return 0.5
@@ -568,65 +569,46 @@ class VendorSuggestion(models.Model):
         else:
             return 0.2  # More than 20% expensive
 
-    def _calculate_quality_score(self, vendor, product):
+    def _calculate_quality_score(self, vendor, product, history=None):
         """Calculate quality score based on feedback and returns"""
-        # Get feedback scores
-        feedback_records = self.env['vendor.suggestion.feedback'].search([
-            ('suggestion_id.vendor_id', '=', vendor.id),
-            ('suggestion_id.product_id', '=', product.id),
-        ])
+        history = history or self._get_scoring_history(product, vendor)
+        rating_counts = history['feedback'].get(vendor.id)
         
-        if feedback_records:
-            positive_count = len(feedback_records.filtered(lambda f: f.rating == 'positive'))
-            total_count = len(feedback_records)
-            return positive_count / total_count if total_count > 0 else 0.5
+        if rating_counts:
+            return rating_counts.get('positive', 0) / sum(rating_counts.values())
         
         return 0.5  # Neutral score for no feedback
 
-    def _calculate_delivery_score(self, vendor, product):
+    def _calculate_delivery_score(self, vendor, product, history=None):
         """Calculate delivery reliability score"""
-        # Get recent orders
-        recent_orders = self.env['purchase.order'].search([
-            ('partner_id', '=', vendor.id),
-            ('order_line.product_id', '=', product.id),
-            ('state', 'in', ['purchase', 'done']),
-            ('date_order', '>=', fields.Datetime.now() - timedelta(days=365)),
-        ])
+        history = history or self._get_scoring_history(product, vendor)
+        vendor_stats = history['stats'].get(vendor.id)
         
-        if not recent_orders:
+        # Deliveries of the last year
+        if not vendor_stats or not vendor_stats['recent_delivered_count']:
             return 0.5
         
-        on_time_count = 0
-        total_count = 0
-        
-        for order in recent_orders:
-            if order.effective_date and order.date_planned:
-                total_count += 1
-                if order.effective_date <= order.date_planned:
-                    on_time_count += 1
-        
-        return on_time_count / total_count if total_count > 0 else 0.5
+        return vendor_stats['recent_on_time_rate']
 
-    def _calculate_relationship_score(self, vendor):
+    def _calculate_relationship_score(self, vendor, history=None):
         """Calculate relationship strength score"""
         # Factors: years of relationship, order frequency, communication quality
-        first_order = self.env['purchase.order'].search([
-            ('partner_id', '=', vendor.id),
-            ('state', 'in', ['purchase', 'done']),
-        ], order='date_order asc', limit=1)
-        
-        if not first_order:
+        if history is None:
+            history = {'relationships': {}}
+            for partner, first_order_date, count in self.env['purchase.order']._read_group([
+                ('partner_id', '=', vendor.id),
+                ('state', 'in', ['purchase', 'done']),
+            ], ['partner_id'], ['date_order:min', '__count']):
+                history['relationships'][partner.id] = (first_order_date, count)
+        
+        if vendor.id not in history['relationships']:
             return 0.3  # New vendor
+        first_order_date, total_orders = history['relationships'][vendor.id]
         
         # Years of relationship
-        years = (fields.Datetime.now() - first_order.date_order).days / 365.25
+        years = (fields.Datetime.now() - first_order_date).days / 365.25
         
         # Order frequency (orders per year)
-        total_orders = self.env['purchase.order'].search_count([
-            ('partner_id', '=', vendor.id),
-            ('state', 'in', ['purchase', 'done']),
-        ])
-        
         orders_per_year = total_orders / max(years, 1)
         
         # Score based on relationship length and frequency
@@ -647,20 +629,16 @@ class VendorSuggestion(models.Model):
         
         return matches / len(compliance_categories) if compliance_categories else 0.5
 
-    def _calculate_capacity_score(self, vendor, product):
+    def _calculate_capacity_score(self, vendor, product, history=None):
         """Calculate capacity match score"""
-        # Get recent order volumes
-        recent_lines = self.env['purchase.order.line'].search([
-            ('partner_id', '=', vendor.id),
-            ('product_id', '=', product.id),
-            ('create_date', '>=', fields.Datetime.now() - timedelta(days=180)),
-        ])
+        history = history or self._get_scoring_history(product, vendor)
+        vendor_stats = history['stats'].get(vendor.id)
         
-        if not recent_lines:
+        # Recent order volumes
+        if not vendor_stats or vendor_stats['recent_max_qty'] is None:
             return 0.5
         
-        max_quantity = max(recent_lines.mapped('product_qty'))
-        avg_quantity = sum(recent_lines.mapped('product_qty')) / len(recent_lines)
+        max_quantity = vendor_stats['recent_max_qty']
         
         # Score based on demonstrated capacity
         if max_quantity >= 1000:
@@ -743,12 +721,13 @@ class VendorSuggestion(models.Model):
         # Rule-based fallback suggestions
         suggestions = []
         
-        # Get vendors who have supplied this product before
-        recent_vendors = self.env['purchase.order.line'].search([
-            ('product_id', '=', product.id),
-            ('order_id.state', 'in', ['purchase', 'done']),
-            ('create_date', '>=', fields.Datetime.now() - timedelta(days=365)),
-        ]).mapped('partner_id')
+        # Get vendors who have supplied this product in the last year, most used first
+        stats = self.env['purchase.vendor.product.stats'].get_product_stats(product.ids)[product.id]
+        recent_stats = sorted(
+            (row for row in stats.values() if row['recent_line_count']),
+            key=lambda row: row['recent_line_count'], reverse=True,
+        )
+        recent_vendors = self.env['res.partner'].browse([row['vendor_id'] for row in recent_stats])
         
         for vendor in recent_vendors[:5]:  # Limit to top 5
             suggestions.append({
@@ -807,6 +786,10 @@ class VendorSuggestion(models.Model):
             ('purchase_ok', '=', True),
         ])
         
+        # Refresh the vendor statistics of all products with a few grouped queries
+        for product_ids in split_every(1000, products_to_update.ids):
+            self.env['purchase.vendor.product.stats'].get_product_stats(product_ids)
+        
         for product in products_to_update:
             try:
                 self.generate_suggestions_for_product(product.id)
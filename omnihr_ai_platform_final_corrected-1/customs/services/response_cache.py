@@ -0,0 +1,346 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_logger = logging.getLogger(__name__)
+
+
+class InMemoryCacheBackend:
+    """LRU cache backend kept in the memory of the current worker
+
+    Entries are serialized payloads, so the byte cap is exact. The least
+    recently used entries are evicted first once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """Initialize in-memory backend
+
+        Args:
+            max_bytes: Maximum total payload size
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a payload, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: bytes, ttl: int):
+        """Store a payload for ``ttl`` seconds"""
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, payload)
+            self.current_bytes += len(payload)
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str):
+        """Remove a payload"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        """Remove all payloads"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str):
+        _expires_at, payload = self._entries.pop(key)
+        self.current_bytes -= len(payload)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
+
+
+class DiskCacheBackend:
+    """On-disk cache backend shared by every worker using the same directory
+
+    Each entry is one file holding its expiry timestamp and payload. Writes go
+    through a temporary file and ``os.replace`` so readers never see partial
+    entries. Reads refresh the file's mtime, which drives LRU eviction.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """Initialize disk backend
+
+        Args:
+            directory: Cache directory
+            max_bytes: Maximum total size of the directory
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._approx_bytes = self._scan_size()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a payload, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at = float(f.readline())
+                payload = f.read()
+        except (OSError, ValueError):
+            return None
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def set(self, key: str, payload: bytes, ttl: int):
+        """Store a payload for ``ttl`` seconds"""
+        if len(payload) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(f"{time.time() + ttl}\n".encode())
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            _logger.warning(f"Failed to write AI response cache entry: {str(e)}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._approx_bytes += len(payload)
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        """Remove a payload"""
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove all payloads"""
+        with self._lock:
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    try:
+                        os.unlink(os.path.join(root, name))
+                    except OSError:
+                        continue
+            self._approx_bytes = 0
+
+    def _evict(self):
+        """Delete least recently used files until the store is back under 90% of the cap"""
+        entries = []
+        total = 0
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        target = self.max_bytes * 0.9
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._approx_bytes = total
+        _logger.info(f"AI response cache evicted down to {total} bytes")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        return {
+            'backend': 'disk',
+            'directory': self.directory,
+            'bytes': self._approx_bytes,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+
+class ResponseCache:
+    """Content-addressed cache for AI provider responses
+
+    Responses are keyed by a hash of provider, model, temperature, system prompt,
+    prompt and any other generation parameter, so identical requests are served
+    without calling the provider again. Storage is pluggable (in-process LRU or
+    a shared on-disk store). Hits and misses are reported to an optional
+    PerformanceMonitor.
+    """
+
+    def __init__(self, backend: Optional[Any] = None, ttl: int = 86400,
+                 monitor: Optional[Any] = None):
+        """Initialize response cache
+
+        Args:
+            backend: Storage backend (defaults to InMemoryCacheBackend)
+            ttl: Default time-to-live in seconds
+            monitor: Optional PerformanceMonitor receiving cache events
+        """
+        self.backend = backend or InMemoryCacheBackend()
+        self.ttl = ttl
+        self.monitor = monitor
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'cost_avoided': 0.0,
+        }
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float,
+                 system_prompt: Optional[str], prompt: str, **params) -> str:
+        """Build the content-addressed key of a request
+
+        Args:
+            provider: Provider name
+            model: Model name
+            temperature: Sampling temperature
+            system_prompt: Optional system prompt
+            prompt: User prompt
+            **params: Other parameters affecting the output (e.g. max_tokens)
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        material = json.dumps({
+            'provider': provider,
+            'model': model,
+            'temperature': round(float(temperature or 0), 4),
+            'system_prompt': system_prompt or '',
+            'prompt_hash': hashlib.sha256((prompt or '').encode()).hexdigest(),
+            'params': params,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str, provider: str = 'unknown') -> Optional[Dict[str, Any]]:
+        """Get a cached response
+
+        Args:
+            key: Key from :meth:`make_key`
+            provider: Provider name, for statistics
+
+        Returns:
+            Cached response dict, or None on a miss
+        """
+        payload = self.backend.get(key)
+        if payload is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            if self.monitor:
+                self.monitor.log_cache_event(provider, hit=False)
+            return None
+
+        try:
+            response = json.loads(payload)
+        except (ValueError, TypeError):
+            self.backend.delete(key)
+            return None
+
+        cost_avoided = float(response.get('cost', 0) or 0)
+        with self._lock:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += len(payload)
+            self.stats['cost_avoided'] += cost_avoided
+        if self.monitor:
+            self.monitor.log_cache_event(
+                provider, hit=True, bytes_saved=len(payload), cost_avoided=cost_avoided,
+                tokens_saved=response.get('tokens_used', 0) or 0
+            )
+        return response
+
+    def set(self, key: str, response: Dict[str, Any], ttl: Optional[int] = None):
+        """Store a response
+
+        Args:
+            key: Key from :meth:`make_key`
+            response: JSON-serializable response dict
+            ttl: Optional time-to-live overriding the default
+        """
+        try:
+            payload = json.dumps(response, default=str).encode()
+        except (TypeError, ValueError) as e:
+            _logger.warning(f"AI response not cacheable: {str(e)}")
+            return
+        self.backend.set(key, payload, ttl or self.ttl)
+
+    def invalidate(self, key: str):
+        """Remove a cached response"""
+        self.backend.delete(key)
+
+    def clear(self):
+        """Remove all cached responses"""
+        self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics
+
+        Returns:
+            Dict containing hit rate, bytes saved and avoided cost
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['backend'] = self.backend.get_stats()
+        return stats
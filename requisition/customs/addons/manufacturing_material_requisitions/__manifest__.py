@@ -66,6 +66,7 @@ This module is fully Odoo 18 compliant with modern UI components and security fe
         'quality_control',
         'maintenance',
         'mail',
+        'bus',
         'web',
         'account'
     ],
@@ -76,6 +77,7 @@ This module is fully Odoo 18 compliant with modern UI components and security fe
         
         # Data
         'data/requisition_sequence.xml',
+        'data/cron_data.xml',
         'data/email_templates.xml',
         'data/requisition_categories.xml',
         
@@ -141,6 +143,9 @@ This module is fully Odoo 18 compliant with modern UI components and security fe
         'static/description/banner.png',
         'static/description/icon.png',
     ],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'installable': True,
     'auto_install': False,
     'application': True,
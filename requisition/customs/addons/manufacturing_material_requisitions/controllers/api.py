@@ -380,12 +380,8 @@ class ManufacturingRequisitionAPI(http.Controller):
             search_term = kwargs.get('search_term', '')
             limit = int(kwargs.get('limit', 20))
             
-            domain = [
-                '|', ('name', 'ilike', search_term),
-                ('default_code', 'ilike', search_term)
-            ]
-            
-            products = request.env['product.product'].search(domain, limit=limit)
+            products = request.env['product.product']._search_fuzzy(search_term, limit=limit)
+            availability = request.env['product.product']._get_availability_snapshot()
             
             data = []
             for product in products:
@@ -396,7 +392,7 @@ class ManufacturingRequisitionAPI(http.Controller):
                     'barcode': product.barcode,
                     'uom_name': product.uom_id.name,
                     'standard_price': product.standard_price,
-                    'qty_available': product.qty_available,
+                    'qty_available': availability.get(product.id, 0.0),
                     'categ_id': product.categ_id.id,
                     'categ_name': product.categ_id.name,
                 })
@@ -433,74 +429,8 @@ class ManufacturingRequisitionAPI(http.Controller):
                 date_to = datetime.now().date()
                 date_from = date_to - timedelta(days=30)
             
-            # Get analytics data
-            analytics = request.env['manufacturing.requisition.analytics'].search([
-                ('requisition_date', '>=', date_from),
-                ('requisition_date', '<=', date_to)
-            ])
-            
-            # Calculate KPIs
-            total_requisitions = len(analytics)
-            completed_requisitions = len(analytics.filtered(lambda r: r.state == 'completed'))
-            avg_cycle_time = sum(analytics.mapped('total_cycle_time')) / total_requisitions if total_requisitions else 0
-            total_cost = sum(analytics.mapped('total_cost'))
-            on_time_delivery_count = len(analytics.filtered(lambda r: r.on_time_delivery))
-            
-            # Get emergency requisitions
-            emergency_count = len(analytics.filtered(lambda r: r.requisition_type == 'emergency'))
-            
-            # Get top products
-            product_data = {}
-            for record in analytics:
-                if record.product_id.id not in product_data:
-                    product_data[record.product_id.id] = {
-                        'name': record.product_id.name,
-                        'count': 0,
-                        'total_cost': 0
-                    }
-                product_data[record.product_id.id]['count'] += 1
-                product_data[record.product_id.id]['total_cost'] += record.total_cost
-            
-            top_products = sorted(product_data.values(), key=lambda x: x['count'], reverse=True)[:10]
-            
-            # Get department performance
-            dept_data = {}
-            for record in analytics:
-                if record.department_id:
-                    dept_id = record.department_id.id
-                    if dept_id not in dept_data:
-                        dept_data[dept_id] = {
-                            'name': record.department_id.name,
-                            'count': 0,
-                            'avg_cycle_time': 0,
-                            'total_cost': 0
-                        }
-                    dept_data[dept_id]['count'] += 1
-                    dept_data[dept_id]['total_cost'] += record.total_cost
-            
-            # Calculate average cycle times for departments
-            for dept_id, dept_info in dept_data.items():
-                dept_analytics = analytics.filtered(lambda r: r.department_id.id == dept_id)
-                dept_info['avg_cycle_time'] = sum(dept_analytics.mapped('total_cycle_time')) / len(dept_analytics)
-            
-            data = {
-                'period': {
-                    'date_from': date_from.isoformat() if hasattr(date_from, 'isoformat') else str(date_from),
-                    'date_to': date_to.isoformat() if hasattr(date_to, 'isoformat') else str(date_to)
-                },
-                'kpis': {
-                    'total_requisitions': total_requisitions,
-                    'completed_requisitions': completed_requisitions,
-                    'completion_rate': (completed_requisitions / total_requisitions * 100) if total_requisitions else 0,
-                    'avg_cycle_time': avg_cycle_time,
-                    'total_cost': total_cost,
-                    'on_time_delivery_rate': (on_time_delivery_count / total_requisitions * 100) if total_requisitions else 0,
-                    'emergency_count': emergency_count,
-                    'emergency_rate': (emergency_count / total_requisitions * 100) if total_requisitions else 0
-                },
-                'top_products': top_products,
-                'department_performance': list(dept_data.values())
-            }
+            # Shared snapshot, recomputed at most once per cache period
+            data = request.env['manufacturing.requisition.dashboard'].get_api_dashboard(date_from, date_to)
             
             return {
                 'success': True,
@@ -528,44 +458,23 @@ class ManufacturingRequisitionAPI(http.Controller):
             # Get machines for current user or all if admin
             user = auth_result['user']
             if user.has_group('manufacturing_material_requisitions.group_manufacturing_manager'):
-                machines = request.env['maintenance.equipment'].search([])
+                domain = []
             else:
-                machines = request.env['maintenance.equipment'].search([
-                    ('operator_ids', 'in', [user.id])
-                ])
+                domain = [('operator_ids', 'in', [user.id])]
             
-            data = []
-            for machine in machines:
-                # Get pending requisitions
-                pending_requisitions = request.env['shop.floor.requisition'].search_count([
-                    ('machine_id', '=', machine.id),
-                    ('state', 'not in', ['completed', 'cancelled'])
-                ])
-                
-                # Get current downtime
-                current_downtime = request.env['maintenance.downtime'].search([
-                    ('equipment_id', '=', machine.id),
-                    ('end_time', '=', False)
-                ], limit=1)
-                
-                data.append({
-                    'id': machine.id,
-                    'name': machine.name,
-                    'category': machine.category_id.name if machine.category_id else None,
-                    'location': machine.location,
-                    'maintenance_state': machine.maintenance_state,
-                    'last_maintenance': machine.last_maintenance_date.isoformat() if machine.last_maintenance_date else None,
-                    'next_maintenance': machine.next_action_date.isoformat() if machine.next_action_date else None,
-                    'pending_requisitions': pending_requisitions,
-                    'is_down': bool(current_downtime),
-                    'downtime_start': current_downtime.start_time.isoformat() if current_downtime else None,
-                    'work_center': machine.workcenter_id.name if machine.workcenter_id else None,
-                })
+            # Delta polling: only machines changed since the previous watermark
+            since = kwargs.get('since')
+            if not since and request.httprequest.if_modified_since:
+                since = request.httprequest.if_modified_since.replace(tzinfo=None)
+            
+            status = request.env['maintenance.equipment'].get_fleet_status(domain, since=since)
+            data = status['machines']
             
             return {
                 'success': True,
                 'data': data,
-                'count': len(data)
+                'count': len(data),
+                'watermark': status['watermark'],
             }
             
         except Exception as e:
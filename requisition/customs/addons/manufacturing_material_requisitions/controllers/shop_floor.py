@@ -132,11 +132,12 @@ class ShopFloorController(http.Controller):
             barcode = kwargs.get('barcode')
             terminal_id = kwargs.get('terminal_id')
             
+            terminal = request.env['shop.floor.terminal']
+            if terminal_id:
+                terminal = terminal.browse(int(terminal_id))
+            
             # Find product by barcode
-            product = request.env['product.product'].search([
-                '|', ('barcode', '=', barcode),
-                ('default_code', '=', barcode)
-            ], limit=1)
+            product = request.env['product.product']._lookup_barcode(barcode)
             
             if not product:
                 return {
@@ -144,19 +145,21 @@ class ShopFloorController(http.Controller):
                     'message': f'Product not found for barcode: {barcode}'
                 }
             
-            # Get stock information
+            # Get stock information from the snapshot of the terminal's location
+            availability = request.env['product.product']._get_availability_snapshot(
+                terminal.work_center_id.default_location_src_id
+            )
             stock_info = {
                 'product_id': product.id,
                 'product_name': product.name,
                 'default_code': product.default_code,
-                'qty_available': product.qty_available,
+                'qty_available': availability.get(product.id, 0.0),
                 'uom_name': product.uom_id.name,
                 'standard_price': product.standard_price,
             }
             
             # Log scan activity
-            if terminal_id:
-                terminal = request.env['shop.floor.terminal'].browse(int(terminal_id))
+            if terminal:
                 terminal.last_activity = request.env.cr.now()
             
             return {
@@ -256,33 +259,16 @@ class ShopFloorController(http.Controller):
             if not machine.exists():
                 return {'success': False, 'message': 'Machine not found'}
             
-            # Get current maintenance requests
-            maintenance_requests = request.env['maintenance.request'].search([
-                ('equipment_id', '=', machine.id),
-                ('stage_id.done', '=', False)
-            ])
-            
-            # Get pending requisitions
-            pending_requisitions = request.env['shop.floor.requisition'].search([
-                ('machine_id', '=', machine.id),
-                ('state', 'not in', ['completed', 'cancelled'])
-            ])
-            
-            # Get downtime information
-            current_downtime = request.env['maintenance.downtime'].search([
-                ('equipment_id', '=', machine.id),
-                ('end_time', '=', False)
-            ], limit=1)
-            
+            [status] = machine._get_status_data()
             status_data = {
-                'machine_name': machine.name,
-                'maintenance_state': machine.maintenance_state,
-                'last_maintenance': machine.last_maintenance_date.isoformat() if machine.last_maintenance_date else None,
-                'next_maintenance': machine.next_action_date.isoformat() if machine.next_action_date else None,
-                'maintenance_requests_count': len(maintenance_requests),
-                'pending_requisitions_count': len(pending_requisitions),
-                'is_down': bool(current_downtime),
-                'downtime_start': current_downtime.start_time.isoformat() if current_downtime else None,
+                'machine_name': status['name'],
+                'maintenance_state': status['maintenance_state'],
+                'last_maintenance': status['last_maintenance'],
+                'next_maintenance': status['next_maintenance'],
+                'maintenance_requests_count': status['maintenance_requests'],
+                'pending_requisitions_count': status['pending_requisitions'],
+                'is_down': status['is_down'],
+                'downtime_start': status['downtime_start'],
             }
             
             return {
@@ -297,6 +283,38 @@ class ShopFloorController(http.Controller):
                 'message': f'Status error: {str(e)}'
             }
 
+    @http.route('/shop_floor/machines/status', type='json', auth='user')
+    def get_fleet_status(self, **kwargs):
+        """Get the status of many machines for andon boards
+        
+        Boards pass back the returned watermark as ``since`` to receive only the
+        machines changed in the meantime. Terminals may also subscribe to the
+        ``manufacturing_machine_status`` bus channel to be told which machines
+        changed instead of polling.
+        """
+        try:
+            domain = []
+            if kwargs.get('machine_ids'):
+                domain.append(('id', 'in', [int(machine_id) for machine_id in kwargs['machine_ids']]))
+            if kwargs.get('work_center_id'):
+                domain.append(('workcenter_id', '=', int(kwargs['work_center_id'])))
+            
+            status = request.env['maintenance.equipment'].get_fleet_status(domain, since=kwargs.get('since'))
+            
+            return {
+                'success': True,
+                'machines': status['machines'],
+                'watermark': status['watermark'],
+                'channel': request.env['maintenance.equipment'].STATUS_CHANNEL,
+            }
+            
+        except Exception as e:
+            _logger.error(f"Fleet status error: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Status error: {str(e)}'
+            }
+
     @http.route('/shop_floor/approve/<int:requisition_id>', type='http', auth='user', methods=['POST'])
     def approve_shop_floor_requisition(self, requisition_id, **kwargs):
         """Approve shop floor requisition"""
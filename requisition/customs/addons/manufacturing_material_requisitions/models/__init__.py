@@ -8,4 +8,5 @@ from . import maintenance_integration
 from . import requisition_analytics
 from . import requisition_ai
 from . import requisition_scheduling
-from . import api_integration 
\ No newline at end of file
+from . import api_integration 
+from . import product_lookup
\ No newline at end of file
@@ -4,8 +4,14 @@ import json
 import hmac
 import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from psycopg2.extras import execute_values
+
+from odoo.tools import split_every
+
 _logger = logging.getLogger(__name__)
 
 # Handle requests import gracefully
@@ -16,6 +22,58 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     _logger.warning("requests library not available. API integration features will be limited.")
 
+# One pooled HTTP session per worker thread, reused across outbox runs
+_http_sessions = threading.local()
+
+# Upper bound of concurrent HTTP calls of one integration (and of the connection pool)
+MAX_CONCURRENT_REQUESTS = 32
+
+
+def _get_http_session():
+    """Get the pooled HTTP session of the current thread"""
+    session = getattr(_http_sessions, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _http_sessions.session = session
+    return session
+
+
+def _post_concurrently(session, url, headers, payloads, max_workers):
+    """POST JSON payloads with a bounded number of requests in flight
+    
+    Only does HTTP, so it is safe to run outside of the ORM thread.
+    
+    Args:
+        session: HTTP session shared by the calls
+        url: Target URL
+        headers: Request headers
+        payloads: JSON serializable payloads
+        max_workers: Maximum number of requests in flight
+    
+    Returns:
+        list of (success, error, response body) tuples in payload order
+    """
+    def post(payload):
+        try:
+            response = session.post(url, headers=headers, json=payload, timeout=30)
+        except Exception as e:
+            return False, str(e), None
+        if response.status_code not in [200, 201]:
+            return False, f'HTTP {response.status_code}: {response.text}', None
+        try:
+            return True, '', response.json()
+        except ValueError:
+            return True, '', None
+    
+    max_workers = max(1, min(max_workers or 1, MAX_CONCURRENT_REQUESTS, len(payloads)))
+    if max_workers == 1:
+        return [post(payload) for payload in payloads]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(post, payloads))
+
 
 class RequisitionAPIIntegration(models.Model):
     _name = 'manufacturing.requisition.api.integration'
@@ -90,6 +148,21 @@ class RequisitionAPIIntegration(models.Model):
     error_count = fields.Integer(string='Error Count', readonly=True)
     last_error = fields.Text(string='Last Error', readonly=True)
     
+    # Bulk Synchronization
+    push_mode = fields.Selection([
+        ('single', 'One Request per Requisition'),
+        ('batch', 'Batched Requests')
+    ], string='Push Mode', default='single',
+        help='Batched requests post lists of requisitions to the /requisitions/batch endpoint')
+    push_batch_size = fields.Integer(string='Push Batch Size', default=100)
+    max_concurrent_requests = fields.Integer(string='Max Concurrent Requests', default=4,
+                                             help='Maximum number of push requests in flight (at most 32)')
+    pull_page_size = fields.Integer(string='Pull Page Size', default=500)
+    push_watermark = fields.Datetime(string='Push Watermark', readonly=True,
+                                     help='Requisitions modified after this time are pushed by the next full sync')
+    pull_watermark = fields.Datetime(string='Pull Watermark', readonly=True,
+                                     help='Start of the last successful pull')
+    
     # Logs
     log_ids = fields.One2many('manufacturing.requisition.api.log', 'integration_id', string='API Logs')
     
@@ -152,11 +225,12 @@ class RequisitionAPIIntegration(models.Model):
             if not self.active:
                 return False
             
+            session = _get_http_session()
             if self.sync_direction in ['push', 'bidirectional']:
-                result = self._push_requisitions(requisition_ids)
+                result = self._push_requisitions(requisition_ids, session=session)
                 
             if self.sync_direction in ['pull', 'bidirectional']:
-                result = self._pull_requisitions()
+                result = self._pull_requisitions(session=session)
             
             self.last_sync = fields.Datetime.now()
             self.sync_count += 1
@@ -170,71 +244,215 @@ class RequisitionAPIIntegration(models.Model):
             _logger.error(f"API sync error for {self.name}: {str(e)}")
             return False
     
-    def _push_requisitions(self, requisition_ids=None):
-        """Push requisitions to external system"""
+    # Requisitions mapped and sent per round trip to the database
+    PUSH_CHUNK_SIZE = 1000
+    # Changes committed late with an earlier write date are pushed by the next sync
+    PUSH_WATERMARK_OVERLAP = timedelta(minutes=5)
+    
+    def _push_requisitions(self, requisition_ids=None, session=None):
+        """Push requisitions to external system
+        
+        Without ``requisition_ids`` every open requisition modified since the
+        push watermark is pushed, oldest change first. The watermark then
+        moves to the start of the push minus an overlap, and the requisitions
+        that failed are retried through the outbox with backoff.
+        
+        Args:
+            requisition_ids: Requisitions to push, all pending changes if omitted
+            session: Optional pooled HTTP session
+        
+        Returns:
+            dict mapping the ids of requisitions that failed to the error
+        """
         if not REQUESTS_AVAILABLE:
             return False
-            
-        if not requisition_ids:
-            # Get all requisitions that need syncing
-            domain = [('state', 'in', ['submitted', 'approved', 'in_progress'])]
-            if hasattr(self.env['manufacturing.material.requisition'], 'last_api_sync'):
-                domain.append(('write_date', '>', self.last_sync or '1900-01-01'))
-            
-            requisitions = self.env['manufacturing.material.requisition'].search(domain)
+        
+        Requisition = self.env['manufacturing.material.requisition']
+        session = session or _get_http_session()
+        headers = self._get_headers()
+        
+        started = self.env.cr.now()
+        if requisition_ids:
+            requisitions = Requisition.browse(requisition_ids).exists()
         else:
-            requisitions = self.env['manufacturing.material.requisition'].browse(requisition_ids)
+            # Get all requisitions changed since the last push
+            domain = [('state', 'in', ['submitted', 'approved', 'in_progress'])]
+            if self.push_watermark:
+                domain.append(('write_date', '>', self.push_watermark))
+            requisitions = Requisition.search(domain, order='write_date, id')
         
-        for requisition in requisitions:
-            data = self._map_requisition_to_external(requisition)
-            
-            try:
-                headers = self._get_headers()
-                response = requests.post(
-                    f"{self.api_url}/requisitions",
-                    headers=headers,
-                    json=data,
-                    timeout=30
+        failures = {}
+        for chunk in split_every(self.PUSH_CHUNK_SIZE, requisitions.ids, Requisition.browse):
+            failures.update(self._push_chunk(chunk, session, headers))
+        
+        if not requisition_ids:
+            if failures:
+                # A requisition the endpoint keeps rejecting must not hold the watermark
+                self._queue_push_retries(failures)
+            watermark = started - self.PUSH_WATERMARK_OVERLAP
+            self.push_watermark = max(watermark, self.push_watermark) if self.push_watermark else watermark
+        
+        return failures
+    
+    def _queue_push_retries(self, failures):
+        """Retry failed pushes through the outbox, which backs off and gives up
+        
+        Args:
+            failures: dict mapping requisition ids to their push error
+        """
+        Outbox = self.env['manufacturing.requisition.api.outbox'].sudo()
+        queued = set(Outbox.search([
+            ('integration_id', '=', self.id),
+            ('event_kind', '=', 'sync'),
+            ('state', '=', 'pending'),
+            ('requisition_id', 'in', list(failures))
+        ]).mapped('requisition_id'))
+        requisitions = self.env['manufacturing.material.requisition'].browse(
+            [requisition_id for requisition_id in failures if requisition_id not in queued]
+        )
+        events = Outbox.create([{
+            'integration_id': self.id,
+            'event_kind': 'sync',
+            'event_type': 'update',
+            'requisition_id': requisition.id,
+            'requisition_name': requisition.name,
+        } for requisition in requisitions])
+        for event in events:
+            event._schedule_retry(failures[event.requisition_id])
+    
+    def _push_chunk(self, requisitions, session, headers):
+        """Push a chunk of requisitions and record the results in bulk
+        
+        Returns:
+            dict mapping the ids of requisitions that failed to the error
+        """
+        payloads = [self._map_requisition_to_external(requisition) for requisition in requisitions]
+        
+        if self.push_mode == 'batch':
+            results = self._post_batches(session, headers, payloads)
+        else:
+            results = [
+                (success, error, body.get('id') if isinstance(body, dict) else None)
+                for success, error, body in _post_concurrently(
+                    session, f"{self.api_url}/requisitions", headers, payloads, self.max_concurrent_requests
                 )
-                
-                if response.status_code in [200, 201]:
-                    self._create_log('success', f'Pushed requisition {requisition.name}')
-                    # Update external reference if available
-                    if 'id' in response.json():
-                        requisition.external_reference = response.json()['id']
+            ]
+        
+        failures = {}
+        references = []
+        logs = []
+        for requisition, (success, error, external_id) in zip(requisitions, results):
+            if success:
+                references.append((requisition.id, str(external_id) if external_id else None))
+            else:
+                failures[requisition.id] = error
+                logs.append(('error', f'Failed to push {requisition.name}: {error}'))
+        
+        if references:
+            self._store_push_results(references)
+            logs.insert(0, ('success', f'Pushed {len(references)} requisitions'))
+        self._create_logs(logs)
+        return failures
+    
+    def _post_batches(self, session, headers, payloads):
+        """Push payloads as lists to the batch endpoint
+        
+        The endpoint receives ``{"requisitions": [...]}`` and answers with a
+        list (or ``{"data": [...]}``) of per-requisition results in the same
+        order, each optionally carrying an ``id`` or an ``error``.
+        
+        Returns:
+            list of (success, error, external id) tuples in payload order
+        """
+        batch_size = max(self.push_batch_size, 1)
+        batches = [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+        responses = _post_concurrently(
+            session, f"{self.api_url}/requisitions/batch", headers,
+            [{'requisitions': batch} for batch in batches], self.max_concurrent_requests
+        )
+        
+        results = []
+        for batch, (success, error, body) in zip(batches, responses):
+            if not success:
+                results += [(False, error, None)] * len(batch)
+                continue
+            items = body.get('data', []) if isinstance(body, dict) else body or []
+            for i in range(len(batch)):
+                item = items[i] if i < len(items) and isinstance(items[i], dict) else {}
+                if item.get('error'):
+                    results.append((False, str(item['error']), None))
                 else:
-                    self._create_log('error', f'Failed to push {requisition.name}: {response.text}')
-                    
-            except Exception as e:
-                self._create_log('error', f'Exception pushing {requisition.name}: {str(e)}')
+                    results.append((True, '', item.get('id')))
+        return results
     
-    def _pull_requisitions(self):
-        """Pull requisitions from external system"""
+    def _store_push_results(self, references):
+        """Set external references and sync time of pushed requisitions
+        
+        Written with a single UPDATE that bypasses the ORM, so write_date
+        (the push watermark) is untouched and no outbox events are queued.
+        
+        Args:
+            references: List of (requisition id, external id or None)
+        """
+        Requisition = self.env['manufacturing.material.requisition']
+        Requisition.flush_model(['external_reference', 'last_api_sync'])
+        now = fields.Datetime.now()
+        execute_values(self.env.cr._obj, f"""
+            UPDATE {Requisition._table} AS r
+            SET external_reference = COALESCE(v.reference, r.external_reference),
+                last_api_sync = v.synced
+            FROM (VALUES %s) AS v(id, reference, synced)
+            WHERE r.id = v.id
+        """, [(requisition_id, reference, now) for requisition_id, reference in references],
+            template='(%s, %s::varchar, %s::timestamp)')
+        Requisition.browse([requisition_id for requisition_id, _reference in references]).invalidate_recordset(
+            ['external_reference', 'last_api_sync']
+        )
+    
+    def _pull_requisitions(self, session=None):
+        """Pull requisitions changed since the pull watermark, page by page
+        
+        Pages are requested with ``limit`` and followed through the
+        ``next_cursor`` of each response; servers that do not paginate answer
+        with a single page.
+        """
         if not REQUESTS_AVAILABLE:
             return False
-            
+        
+        http = session or _get_http_session()
+        started = fields.Datetime.now()
         try:
             headers = self._get_headers()
             # Add timestamp filter if available
-            params = {}
-            if self.last_sync:
-                params['modified_since'] = self.last_sync.isoformat()
+            params = {'limit': max(self.pull_page_size, 1)}
+            watermark = self.pull_watermark or self.last_sync
+            if watermark:
+                params['modified_since'] = watermark.isoformat()
             
-            response = requests.get(
-                f"{self.api_url}/requisitions",
-                headers=headers,
-                params=params,
-                timeout=30
-            )
+            pulled = 0
+            while True:
+                response = http.get(
+                    f"{self.api_url}/requisitions",
+                    headers=headers,
+                    params=params,
+                    timeout=30
+                )
+                
+                if response.status_code != 200:
+                    self._create_log('error', f'Failed to pull requisitions: {response.text}')
+                    return False
+                
+                page = response.json()
+                external_requisitions = page.get('data', [])
+                self._create_or_update_requisitions(external_requisitions)
+                pulled += len(external_requisitions)
+                
+                if not page.get('next_cursor') or not external_requisitions:
+                    break
+                params['cursor'] = page['next_cursor']
             
-            if response.status_code == 200:
-                external_requisitions = response.json()
-                for ext_req in external_requisitions.get('data', []):
-                    self._create_or_update_requisition(ext_req)
-                    
-                self._create_log('success', f'Pulled {len(external_requisitions.get("data", []))} requisitions')
-            else:
-                self._create_log('error', f'Failed to pull requisitions: {response.text}')
+            self.pull_watermark = started
+            self._create_log('success', f'Pulled {pulled} requisitions')
                 
         except Exception as e:
             self._create_log('error', f'Exception pulling requisitions: {str(e)}')
@@ -276,27 +494,73 @@ class RequisitionAPIIntegration(models.Model):
         
         return data
     
-    def _create_or_update_requisition(self, external_data):
-        """Create or update requisition from external data"""
-        external_id = external_data.get('external_id')
+    def _create_or_update_requisitions(self, external_requisitions):
+        """Create or update a page of requisitions from external data"""
+        if not external_requisitions:
+            return
         
-        # Check if requisition exists
-        existing = self.env['manufacturing.material.requisition'].search([
-            ('external_reference', '=', external_id)
-        ], limit=1)
+        Requisition = self.env['manufacturing.material.requisition']
+        external_ids = [str(data.get('external_id')) for data in external_requisitions if data.get('external_id')]
+        existing = {
+            requisition.external_reference: requisition
+            for requisition in Requisition.search([('external_reference', 'in', external_ids)])
+        }
+        lookups = self._build_external_lookups(external_requisitions)
         
-        # Map external data to Odoo format
-        vals = self._map_external_to_requisition(external_data)
+        logs = []
+        new_vals = []
+        for external_data in external_requisitions:
+            # Map external data to Odoo format
+            vals = self._map_external_to_requisition(external_data, lookups)
+            requisition = existing.get(str(external_data.get('external_id')))
+            if requisition:
+                requisition.write(vals)
+                logs.append(('success', f'Updated requisition {requisition.name} from external system'))
+            else:
+                new_vals.append(vals)
         
-        if existing:
-            existing.write(vals)
-            self._create_log('success', f'Updated requisition {existing.name} from external system')
-        else:
-            new_req = self.env['manufacturing.material.requisition'].create(vals)
-            self._create_log('success', f'Created requisition {new_req.name} from external system')
+        for new_req in Requisition.create(new_vals):
+            logs.append(('success', f'Created requisition {new_req.name} from external system'))
+        self._create_logs(logs)
+    
+    def _build_external_lookups(self, external_requisitions):
+        """Load the products and departments referenced by external data at once"""
+        codes = set()
+        names = set()
+        for external_data in external_requisitions:
+            for line_data in external_data.get('lines', []):
+                if line_data.get('product_code'):
+                    codes.add(line_data['product_code'])
+                if line_data.get('product_name'):
+                    names.add(line_data['product_name'])
+        departments = {
+            external_data['department'] for external_data in external_requisitions if external_data.get('department')
+        }
+        
+        products = self.env['product.product'].search([
+            '|', ('default_code', 'in', list(codes)),
+                 ('name', 'in', list(names))
+        ]) if codes or names else self.env['product.product']
+        lookups = {'product_by_code': {}, 'product_by_name': {}, 'department_by_name': {}}
+        for product in products:
+            lookups['product_by_code'].setdefault(product.default_code, product)
+            lookups['product_by_name'].setdefault(product.name, product)
+        if departments:
+            for dept in self.env['hr.department'].search([('name', 'in', list(departments))]):
+                lookups['department_by_name'].setdefault(dept.name, dept)
+        return lookups
     
-    def _map_external_to_requisition(self, external_data):
-        """Map external data to Odoo requisition format"""
+    def _map_external_to_requisition(self, external_data, lookups=None):
+        """Map external data to Odoo requisition format
+        
+        Args:
+            external_data: Requisition data of the external system
+            lookups: Products and departments from _build_external_lookups,
+                loaded for this requisition if omitted
+        """
+        if lookups is None:
+            lookups = self._build_external_lookups([external_data])
+        
         vals = {
             'external_reference': external_data.get('external_id'),
             'name': external_data.get('name', 'Imported Requisition'),
@@ -312,17 +576,17 @@ class RequisitionAPIIntegration(models.Model):
         
         # Handle department
         if external_data.get('department'):
-            dept = self.env['hr.department'].search([('name', '=', external_data['department'])], limit=1)
+            dept = lookups['department_by_name'].get(external_data['department'])
             if dept:
                 vals['department_id'] = dept.id
         
         # Handle lines
         line_vals = []
         for line_data in external_data.get('lines', []):
-            product = self.env['product.product'].search([
-                '|', ('default_code', '=', line_data.get('product_code')),
-                     ('name', '=', line_data.get('product_name'))
-            ], limit=1)
+            product = (
+                lookups['product_by_code'].get(line_data.get('product_code'))
+                or lookups['product_by_name'].get(line_data.get('product_name'))
+            )
             
             if product:
                 line_vals.append((0, 0, {
@@ -340,12 +604,23 @@ class RequisitionAPIIntegration(models.Model):
     
     def _create_log(self, log_type, message):
         """Create API log entry"""
-        self.env['manufacturing.requisition.api.log'].create({
+        self._create_logs([(log_type, message)])
+    
+    def _create_logs(self, entries):
+        """Create API log entries with a single insert
+        
+        Args:
+            entries: List of (log_type, message)
+        """
+        if not entries:
+            return
+        timestamp = fields.Datetime.now()
+        self.env['manufacturing.requisition.api.log'].create([{
             'integration_id': self.id,
             'log_type': log_type,
             'message': message,
-            'timestamp': fields.Datetime.now()
-        })
+            'timestamp': timestamp
+        } for log_type, message in entries])
     
     def send_webhook(self, event_type, requisition_id):
         """Send webhook notification"""
@@ -353,42 +628,91 @@ class RequisitionAPIIntegration(models.Model):
             self._create_log('warning', 'Cannot send webhook: requests library not available')
             return
             
-        if not self.webhook_enabled or not self.webhook_url:
-            return
-        
-        if self.webhook_events != 'all' and self.webhook_events != event_type:
+        if not self._is_webhook_subscribed(event_type):
             return
         
         try:
             requisition = self.env['manufacturing.material.requisition'].browse(requisition_id)
-            data = {
-                'event': event_type,
-                'timestamp': fields.Datetime.now().isoformat(),
-                'requisition': self._map_requisition_to_external(requisition)
-            }
-            
-            headers = {'Content-Type': 'application/json'}
-            
-            # Add signature if secret is configured
-            if self.webhook_secret:
-                payload = json.dumps(data, sort_keys=True)
-                signature = hmac.new(
-                    self.webhook_secret.encode(),
-                    payload.encode(),
-                    hashlib.sha256
-                ).hexdigest()
-                headers['X-Webhook-Signature'] = f'sha256={signature}'
-            
-            response = requests.post(self.webhook_url, headers=headers, json=data, timeout=30)
-            
-            if response.status_code == 200:
-                self._create_log('webhook', f'Webhook sent for {event_type} on {requisition.name}')
-            else:
-                self._create_log('error', f'Webhook failed for {event_type}: {response.text}')
-                
+            self._post_webhook(self._build_webhook_payload(event_type, requisition))
         except Exception as e:
             self._create_log('error', f'Webhook exception: {str(e)}')
     
+    def _is_webhook_subscribed(self, event_type):
+        """Check whether this integration wants webhooks for an event type"""
+        if not self.webhook_enabled or not self.webhook_url:
+            return False
+        return self.webhook_events == 'all' or self.webhook_events == event_type
+    
+    def _build_webhook_payload(self, event_type, requisition):
+        """Build the webhook body for an event on a requisition"""
+        return {
+            'event': event_type,
+            'timestamp': fields.Datetime.now().isoformat(),
+            'requisition': self._map_requisition_to_external(requisition)
+        }
+    
+    def _post_webhook(self, data, session=None):
+        """Post a webhook body to the webhook URL
+        
+        Args:
+            data: Webhook body
+            session: Optional pooled HTTP session
+        
+        Returns:
+            tuple (success, message)
+        """
+        payload = json.dumps(data, sort_keys=True, default=str)
+        headers = {'Content-Type': 'application/json'}
+        
+        # Add signature if secret is configured
+        if self.webhook_secret:
+            signature = hmac.new(
+                self.webhook_secret.encode(),
+                payload.encode(),
+                hashlib.sha256
+            ).hexdigest()
+            headers['X-Webhook-Signature'] = f'sha256={signature}'
+        
+        response = (session or requests).post(self.webhook_url, headers=headers, data=payload, timeout=30)
+        
+        event_type = data.get('event')
+        requisition_name = data.get('requisition', {}).get('name')
+        if response.status_code == 200:
+            self._create_log('webhook', f'Webhook sent for {event_type} on {requisition_name}')
+            return True, ''
+        
+        self._create_log('error', f'Webhook failed for {event_type}: {response.text}')
+        return False, f'HTTP {response.status_code}: {response.text}'
+    
+    def _dispatch_outbox(self, events):
+        """Send pending outbox events of this integration
+        
+        Args:
+            events: manufacturing.requisition.api.outbox records of this integration
+        """
+        self.ensure_one()
+        session = _get_http_session()
+        
+        sync_events = events.filtered(lambda e: e.event_kind == 'sync')
+        if sync_events:
+            failures = self._push_requisitions(sync_events.mapped('requisition_id'), session=session) or {}
+            sync_events.filtered(lambda e: e.requisition_id not in failures).write({'state': 'done'})
+            for event in sync_events.filtered(lambda e: e.requisition_id in failures):
+                event._schedule_retry(failures[event.requisition_id])
+        
+        sent = self.env['manufacturing.requisition.api.outbox']
+        for event in events.filtered(lambda e: e.event_kind == 'webhook'):
+            try:
+                success, message = self._post_webhook(event.payload, session)
+            except Exception as e:
+                self._create_log('error', f'Webhook exception: {str(e)}')
+                success, message = False, str(e)
+            if success:
+                sent |= event
+            else:
+                event._schedule_retry(message)
+        sent.write({'state': 'done'})
+    
     @api.onchange('active')
     def _onchange_active(self):
         """Warn user if requests is not available"""
@@ -490,6 +814,167 @@ class RequisitionAPILog(models.Model):
         old_logs.unlink()
 
 
+class RequisitionAPIOutbox(models.Model):
+    _name = 'manufacturing.requisition.api.outbox'
+    _description = 'API Integration Outbox'
+    _order = 'id'
+    _rec_name = 'requisition_name'
+
+    # Events are written in the transaction that changes the requisition and
+    # sent afterwards by a cron, so saving never waits on a remote endpoint.
+    integration_id = fields.Many2one('manufacturing.requisition.api.integration', 
+                                    string='Integration', required=True, ondelete='cascade', index=True)
+    event_kind = fields.Selection([
+        ('sync', 'Synchronization'),
+        ('webhook', 'Webhook')
+    ], string='Kind', required=True)
+    event_type = fields.Selection([
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete')
+    ], string='Event', required=True)
+    requisition_id = fields.Integer(string='Requisition ID', required=True, index=True)
+    requisition_name = fields.Char(string='Requisition')
+    payload = fields.Json(string='Payload')
+    
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Sent'),
+        ('superseded', 'Superseded'),
+        ('failed', 'Failed')
+    ], string='Status', required=True, default='pending', index=True)
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    next_attempt = fields.Datetime(string='Next Attempt', default=fields.Datetime.now, index=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+    
+    BATCH_SIZE = 500
+    MAX_ATTEMPTS = 8
+    RETRY_DELAY = 60  # Seconds before the first retry, doubled on every failure
+    
+    @api.model
+    def _enqueue(self, integrations, requisitions, event_type):
+        """Queue sync and webhook events for requisitions
+        
+        Args:
+            integrations: Active auto-sync integrations
+            requisitions: manufacturing.material.requisition records
+            event_type: 'create', 'update' or 'delete'
+        """
+        vals_list = []
+        for integration in integrations:
+            # Deleted requisitions are announced by webhook only
+            if integration.sync_frequency == 'realtime' and event_type != 'delete':
+                vals_list += [{
+                    'integration_id': integration.id,
+                    'event_kind': 'sync',
+                    'event_type': event_type,
+                    'requisition_id': requisition.id,
+                    'requisition_name': requisition.name,
+                } for requisition in requisitions]
+            
+            # Webhook bodies are captured now, the record may be gone when they are sent
+            if integration._is_webhook_subscribed(event_type):
+                vals_list += [{
+                    'integration_id': integration.id,
+                    'event_kind': 'webhook',
+                    'event_type': event_type,
+                    'requisition_id': requisition.id,
+                    'requisition_name': requisition.name,
+                    'payload': json.loads(json.dumps(
+                        integration._build_webhook_payload(event_type, requisition), default=str
+                    )),
+                } for requisition in requisitions]
+        
+        if vals_list:
+            self.create(vals_list)
+            cron = self.env.ref('manufacturing_material_requisitions.ir_cron_process_api_outbox',
+                                raise_if_not_found=False)
+            if cron:
+                cron._trigger()
+    
+    @api.model
+    def _cron_process_outbox(self):
+        """Send due events, one batch per integration"""
+        # Events of archived integrations wait for their reactivation
+        events = self.search([
+            ('state', '=', 'pending'),
+            ('next_attempt', '<=', fields.Datetime.now()),
+            ('integration_id.active', '=', True),
+        ], limit=self.BATCH_SIZE)
+        fetched = len(events)
+        events = events._supersede()
+        
+        for integration, integration_events in events.grouped('integration_id').items():
+            try:
+                with self.env.cr.savepoint():
+                    integration._dispatch_outbox(integration_events)
+            except Exception as e:
+                _logger.error(f"Outbox dispatch failed for {integration.name}: {str(e)}")
+                self.env.invalidate_all()
+                integration_events.filtered(lambda event: event.state == 'pending')._schedule_retry(str(e))
+            # Keep the outcome of sent events even if a later integration fails
+            self.env.cr.commit()
+        
+        # Reschedule right away while a backlog remains
+        if fetched == self.BATCH_SIZE:
+            self.env.ref('manufacturing_material_requisitions.ir_cron_process_api_outbox')._trigger()
+        
+        self._cleanup_sent_events()
+    
+    def _supersede(self):
+        """Drop events made obsolete by a newer pending event
+        
+        A newer sync event of the same requisition replaces older ones, since
+        the push sends the current data; a newer update or delete webhook
+        replaces older update webhooks. Create and delete webhooks are always
+        sent.
+        
+        Returns:
+            The events that still have to be sent
+        """
+        if not self:
+            return self
+        newer = self.search([
+            ('state', '=', 'pending'),
+            ('id', '>', max(self.ids)),
+            ('requisition_id', 'in', list(set(self.mapped('requisition_id'))))
+        ])
+        
+        batch_ids = set(self.ids)
+        seen = set()
+        superseded = self.browse()
+        for event in (self | newer).sorted('id', reverse=True):
+            key = (event.integration_id.id, event.event_kind, event.requisition_id)
+            replaceable = event.event_kind == 'sync' or event.event_type == 'update'
+            if key in seen and replaceable and event.id in batch_ids:
+                superseded |= event
+            seen.add(key)
+        
+        superseded.write({'state': 'superseded'})
+        return self - superseded
+    
+    def _schedule_retry(self, error):
+        """Record a failed attempt and back off exponentially"""
+        now = fields.Datetime.now()
+        for event in self:
+            attempts = event.attempts + 1
+            vals = {'attempts': attempts, 'last_error': error}
+            if attempts >= self.MAX_ATTEMPTS:
+                vals['state'] = 'failed'
+            else:
+                vals['next_attempt'] = now + timedelta(seconds=self.RETRY_DELAY * 2 ** (attempts - 1))
+            event.write(vals)
+    
+    @api.model
+    def _cleanup_sent_events(self):
+        """Remove sent and superseded events older than 7 days"""
+        cutoff_date = fields.Datetime.now() - timedelta(days=7)
+        self.search([
+            ('state', 'in', ['done', 'superseded']),
+            ('write_date', '<', cutoff_date)
+        ]).unlink()
+
+
 # Extend the main requisition model to support API integration
 class ManufacturingRequisition(models.Model):
     _inherit = 'manufacturing.material.requisition'
@@ -502,42 +987,40 @@ class ManufacturingRequisition(models.Model):
     def create(self, vals_list):
         """Override create to trigger API sync"""
         records = super().create(vals_list)
-        for record in records:
-            if record.api_sync_enabled:
-                self._trigger_api_sync('create', record.id)
+        records._trigger_api_sync('create')
         return records
     
     def write(self, vals):
         """Override write to trigger API sync"""
         result = super().write(vals)
-        if self.api_sync_enabled and any(key in vals for key in ['state', 'priority', 'line_ids']):
-            for record in self:
-                self._trigger_api_sync('update', record.id)
+        if any(key in vals for key in ['state', 'priority', 'line_ids']):
+            self._trigger_api_sync('update')
         return result
     
     def unlink(self):
         """Override unlink to trigger API sync"""
-        for record in self:
-            if record.api_sync_enabled:
-                self._trigger_api_sync('delete', record.id)
+        self._trigger_api_sync('delete')
         return super().unlink()
     
-    def _trigger_api_sync(self, event_type, requisition_id):
-        """Trigger API synchronization"""
+    def _trigger_api_sync(self, event_type):
+        """Queue API synchronization and webhooks in the outbox
+        
+        The events are stored in the current transaction and sent by the
+        outbox cron, so they are only sent if the change is committed.
+        """
         # Only trigger if requests is available
         if not REQUESTS_AVAILABLE:
             return
+        
+        requisitions = self.filtered('api_sync_enabled')
+        if not requisitions:
+            return
             
         # Find active integrations
-        integrations = self.env['manufacturing.requisition.api.integration'].search([
+        integrations = self.env['manufacturing.requisition.api.integration'].sudo().search([
             ('active', '=', True),
             ('auto_sync', '=', True)
         ])
         
-        for integration in integrations:
-            if integration.sync_frequency == 'realtime':
-                # Immediate sync
-                integration.sync_requisitions([requisition_id])
-            
-            # Send webhook notification
-            integration.send_webhook(event_type, requisition_id) 
\ No newline at end of file
+        if integrations:
+            self.env['manufacturing.requisition.api.outbox'].sudo()._enqueue(integrations, requisitions, event_type)
\ No newline at end of file
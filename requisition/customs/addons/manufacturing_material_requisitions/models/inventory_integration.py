@@ -2,8 +2,10 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import split_every
 from datetime import datetime, timedelta
 import logging
+import time
 
 _logger = logging.getLogger(__name__)
 
@@ -44,6 +46,8 @@ class InventoryIntegration(models.Model):
     
     # Monitoring
     last_check_date = fields.Datetime('Last Check Date', default=fields.Datetime.now)
+    auto_requisition_pending = fields.Boolean('Auto Requisition Check Pending', copy=False, index=True,
+                                              help='Stock changed; the auto-requisition rule is evaluated by a scheduled action')
     next_check_date = fields.Datetime('Next Check Date', compute='_compute_next_check_date', store=True)
     check_frequency = fields.Selection([
         ('hourly', 'Hourly'),
@@ -82,6 +86,13 @@ class InventoryIntegration(models.Model):
     mrp_production_ids = fields.Many2many('mrp.production', string='Related Productions')
     work_center_ids = fields.Many2many('mrp.workcenter', string='Related Work Centers')
     
+    # Seconds stock changes are collected before auto-requisition rules are evaluated
+    AUTO_REQUISITION_DEBOUNCE = 60
+    # Integrations evaluated and committed together by cron_check_stock_levels
+    CHECK_BATCH_SIZE = 500
+    # Seconds cron_check_stock_levels runs before handing the rest to a new run
+    CHECK_TIME_BUDGET = 240
+    
     @api.model
     def create(self, vals):
         if vals.get('name', _('New')) == _('New'):
@@ -90,37 +101,125 @@ class InventoryIntegration(models.Model):
     
     @api.depends('product_id', 'location_id')
     def _compute_stock_levels(self):
+        levels = self._get_stock_levels()
         for record in self:
-            if record.product_id and record.location_id:
-                quants = self.env['stock.quant'].search([
-                    ('product_id', '=', record.product_id.id),
-                    ('location_id', '=', record.location_id.id)
-                ])
-                
-                record.current_stock = sum(quants.mapped('quantity'))
-                record.available_stock = sum(quants.mapped('available_quantity'))
-                record.reserved_stock = sum(quants.mapped('reserved_quantity'))
-                
-                # Calculate incoming/outgoing stock
-                incoming_moves = self.env['stock.move'].search([
-                    ('product_id', '=', record.product_id.id),
-                    ('location_dest_id', '=', record.location_id.id),
-                    ('state', 'in', ['confirmed', 'assigned', 'partially_available'])
-                ])
-                record.incoming_stock = sum(incoming_moves.mapped('product_uom_qty'))
-                
-                outgoing_moves = self.env['stock.move'].search([
-                    ('product_id', '=', record.product_id.id),
-                    ('location_id', '=', record.location_id.id),
-                    ('state', 'in', ['confirmed', 'assigned', 'partially_available'])
-                ])
-                record.outgoing_stock = sum(outgoing_moves.mapped('product_uom_qty'))
-            else:
-                record.current_stock = 0
-                record.available_stock = 0
-                record.reserved_stock = 0
-                record.incoming_stock = 0
-                record.outgoing_stock = 0
+            values = levels.get((record.product_id.id, record.location_id.id), {})
+            record.current_stock = values.get('current_stock', 0)
+            record.available_stock = values.get('available_stock', 0)
+            record.reserved_stock = values.get('reserved_stock', 0)
+            record.incoming_stock = values.get('incoming_stock', 0)
+            record.outgoing_stock = values.get('outgoing_stock', 0)
+    
+    def _get_stock_levels(self):
+        """Get the stock levels of all product/location pairs with grouped queries
+        
+        Returns:
+            dict mapping (product_id, location_id) to a dict with current,
+            available, reserved, incoming and outgoing stock
+        """
+        pairs = {
+            (record.product_id.id, record.location_id.id)
+            for record in self if record.product_id and record.location_id
+        }
+        if not pairs:
+            return {}
+        
+        product_ids = list({product_id for product_id, _location_id in pairs})
+        location_ids = list({location_id for _product_id, location_id in pairs})
+        levels = {pair: {} for pair in pairs}
+        
+        for product, location, quantity, reserved in self.env['stock.quant']._read_group([
+            ('product_id', 'in', product_ids),
+            ('location_id', 'in', location_ids)
+        ], ['product_id', 'location_id'], ['quantity:sum', 'reserved_quantity:sum']):
+            if (product.id, location.id) in levels:
+                levels[product.id, location.id].update({
+                    'current_stock': quantity,
+                    'available_stock': quantity - reserved,
+                    'reserved_stock': reserved,
+                })
+        
+        # Calculate incoming/outgoing stock
+        for location_field, key in [('location_dest_id', 'incoming_stock'), ('location_id', 'outgoing_stock')]:
+            for product, location, quantity in self.env['stock.move']._read_group([
+                ('product_id', 'in', product_ids),
+                (location_field, 'in', location_ids),
+                ('state', 'in', ['confirmed', 'assigned', 'partially_available'])
+            ], ['product_id', location_field], ['product_uom_qty:sum']):
+                if (product.id, location.id) in levels:
+                    levels[product.id, location.id][key] = quantity
+        
+        return levels
+    
+    @api.model
+    def _mark_stock_changed(self, pairs):
+        """Queue product/location pairs whose stock changed
+        
+        The pairs are collected for the whole transaction and the matching
+        integrations are recomputed once, just before commit.
+        
+        Args:
+            pairs: Iterable of (product_id, location_id)
+        """
+        data = self.env.cr.precommit.data
+        key = 'manufacturing.inventory.integration.stock_changed'
+        if key not in data:
+            data[key] = set()
+            
+            @self.env.cr.precommit.add
+            def recompute_stock_levels():
+                self.sudo()._recompute_stock_levels(data.pop(key, set()))
+        data[key].update(pairs)
+    
+    @api.model
+    def _recompute_stock_levels(self, pairs):
+        """Recompute the integrations of changed product/location pairs"""
+        if not pairs:
+            return
+        
+        integrations = self.search([
+            ('product_id', 'in', list({product_id for product_id, _location_id in pairs})),
+            ('location_id', 'in', list({location_id for _product_id, location_id in pairs}))
+        ]).filtered(lambda r: (r.product_id.id, r.location_id.id) in pairs)
+        
+        integrations._compute_stock_levels()
+        integrations._schedule_auto_requisition_check()
+        self.env.flush_all()
+    
+    def _schedule_auto_requisition_check(self):
+        """Evaluate auto-requisition rules later, once per burst of stock changes"""
+        pending = self.filtered(lambda r: r.auto_requisition_enabled and not r.auto_requisition_pending)
+        if not pending:
+            return
+        
+        pending.auto_requisition_pending = True
+        cron = self.env.ref('manufacturing_material_requisitions.ir_cron_inventory_auto_requisition',
+                            raise_if_not_found=False)
+        if cron:
+            cron._trigger(at=fields.Datetime.now() + timedelta(seconds=self.AUTO_REQUISITION_DEBOUNCE))
+    
+    @api.model
+    def cron_process_auto_requisitions(self):
+        """Evaluate auto-requisition rules of integrations whose stock changed"""
+        integrations = self.search([('auto_requisition_pending', '=', True)])
+        integrations.auto_requisition_pending = False
+        
+        try:
+            with self.env.cr.savepoint():
+                integrations._check_auto_requisition()
+        except Exception as e:
+            _logger.error(f'Error checking auto-requisition of {len(integrations)} integrations: {str(e)}')
+            self.env.invalidate_all()
+            # Isolate the failing integrations
+            for integration in integrations:
+                try:
+                    with self.env.cr.savepoint():
+                        integration._check_auto_requisition()
+                except Exception as e:
+                    _logger.error(f'Error checking auto-requisition for {integration.name}: {str(e)}')
+                    self.env.invalidate_all()
+        
+        return True
     
     @api.depends('current_stock', 'min_stock_level', 'max_stock_level', 'reorder_point', 'safety_stock')
     def _compute_stock_status(self):
@@ -167,18 +266,11 @@ class InventoryIntegration(models.Model):
     
     @api.depends('product_id', 'location_id')
     def _compute_consumption_analytics(self):
+        consumption = self._get_consumption()
         for record in self:
             if record.product_id and record.location_id:
                 # Calculate average consumption over last 30 days
-                thirty_days_ago = fields.Datetime.now() - timedelta(days=30)
-                moves = self.env['stock.move'].search([
-                    ('product_id', '=', record.product_id.id),
-                    ('location_id', '=', record.location_id.id),
-                    ('state', '=', 'done'),
-                    ('date', '>=', thirty_days_ago)
-                ])
-                
-                total_consumed = sum(moves.mapped('product_uom_qty'))
+                total_consumed = consumption.get((record.product_id.id, record.location_id.id), 0)
                 record.average_consumption = total_consumed / 30.0
                 
                 # Calculate stock turnover
@@ -193,19 +285,40 @@ class InventoryIntegration(models.Model):
                 record.stock_turnover = 0
                 record.days_of_stock = 0
     
+    def _get_consumption(self, days=30):
+        """Get the quantity moved out of each product/location pair with one grouped query
+        
+        Returns:
+            dict mapping (product_id, location_id) to the quantity of done moves
+            leaving the location during the last ``days`` days
+        """
+        records = self.filtered(lambda r: r.product_id and r.location_id)
+        if not records:
+            return {}
+        
+        return {
+            (product.id, location.id): quantity
+            for product, location, quantity in self.env['stock.move']._read_group([
+                ('product_id', 'in', records.product_id.ids),
+                ('location_id', 'in', records.location_id.ids),
+                ('state', '=', 'done'),
+                ('date', '>=', fields.Datetime.now() - timedelta(days=days))
+            ], ['product_id', 'location_id'], ['product_uom_qty:sum'])
+        }
+    
     def action_check_stock_levels(self):
         """Manual stock level check"""
         self._compute_stock_levels()
         self.last_check_date = fields.Datetime.now()
         
         # Trigger auto-requisition if needed
-        if self.auto_requisition_enabled:
-            self._check_auto_requisition()
+        self.filtered('auto_requisition_enabled')._check_auto_requisition()
         
         return True
     
     def _check_auto_requisition(self):
         """Check if auto-requisition should be triggered"""
+        to_reorder = self.browse()
         for record in self:
             should_create = False
             
@@ -217,19 +330,25 @@ class InventoryIntegration(models.Model):
                 should_create = True
             
             if should_create:
-                record._create_auto_requisition()
+                to_reorder |= record
+        
+        # Pending requisitions are read once for all the qualifying integrations
+        to_reorder._create_auto_requisition()
     
     def _create_auto_requisition(self):
         """Create automatic requisition"""
+        # Products that already have a pending requisition
+        pending_products = {
+            product.id
+            for [product] in self.env['manufacturing.material.requisition.line']._read_group([
+                ('requisition_id.state', 'in', ['draft', 'submitted', 'approved', 'in_progress']),
+                ('requisition_id.department_id', '=', self.env.user.department_id.id),
+                ('product_id', 'in', self.product_id.ids)
+            ], ['product_id'])
+        }
+        
         for record in self:
-            # Check if there's already a pending requisition
-            existing_requisition = self.env['manufacturing.material.requisition'].search([
-                ('state', 'in', ['draft', 'submitted', 'approved', 'in_progress']),
-                ('line_ids.product_id', '=', record.product_id.id),
-                ('department_id', '=', self.env.user.department_id.id)
-            ], limit=1)
-            
-            if not existing_requisition:
+            if record.product_id.id not in pending_products:
                 quantity = record.auto_requisition_quantity or (record.max_stock_level - record.current_stock)
                 
                 requisition_vals = {
@@ -254,21 +373,49 @@ class InventoryIntegration(models.Model):
                 if record.state in ['critical', 'out_of_stock']:
                     requisition.action_submit()
                 
+                pending_products.add(record.product_id.id)
+                
                 _logger.info(f'Auto-requisition created: {requisition.name} for product {record.product_id.name}')
     
     @api.model
     def cron_check_stock_levels(self):
-        """Cron job to check stock levels"""
+        """Cron job to check stock levels
+        
+        Due integrations are evaluated in batches with grouped queries and each
+        batch is committed. Once the time budget is spent, the remaining
+        integrations are left to a new run of the scheduled action.
+        """
         integrations = self.search([
             ('next_check_date', '<=', fields.Datetime.now()),
             ('auto_requisition_enabled', '=', True)
         ])
         
-        for integration in integrations:
+        deadline = time.monotonic() + self.CHECK_TIME_BUDGET
+        for batch in split_every(self.CHECK_BATCH_SIZE, integrations.ids, self.browse):
+            if time.monotonic() > deadline:
+                cron = self.env.ref('manufacturing_material_requisitions.ir_cron_check_stock_levels',
+                                    raise_if_not_found=False)
+                if cron:
+                    cron._trigger()
+                break
+            
             try:
-                integration.action_check_stock_levels()
+                with self.env.cr.savepoint():
+                    batch.action_check_stock_levels()
             except Exception as e:
-                _logger.error(f'Error checking stock levels for {integration.name}: {str(e)}')
+                _logger.error(f'Error checking stock levels of {len(batch)} integrations: {str(e)}')
+                self.env.invalidate_all()
+                # Isolate the failing integrations
+                for integration in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            integration.action_check_stock_levels()
+                    except Exception as e:
+                        _logger.error(f'Error checking stock levels for {integration.name}: {str(e)}')
+                        self.env.invalidate_all()
+            
+            self.env.cr.commit()
+            self.env.invalidate_all()
         
         return True
     
@@ -315,16 +462,12 @@ class StockMoveExtension(models.Model):
         """Override to trigger inventory integration updates"""
         result = super(StockMoveExtension, self)._action_done(cancel_backorder)
         
-        # Update related inventory integrations
+        # Update related inventory integrations at commit
+        pairs = set()
         for move in self:
-            integrations = self.env['manufacturing.inventory.integration'].search([
-                ('product_id', '=', move.product_id.id),
-                ('location_id', 'in', [move.location_id.id, move.location_dest_id.id])
-            ])
-            
-            for integration in integrations:
-                integration._compute_stock_levels()
-                integration._check_auto_requisition()
+            pairs.add((move.product_id.id, move.location_id.id))
+            pairs.add((move.product_id.id, move.location_dest_id.id))
+        self.env['manufacturing.inventory.integration']._mark_stock_changed(pairs)
         
         return result
 
@@ -342,14 +485,7 @@ class StockQuantExtension(models.Model):
             product_id, location_id, quantity, lot_id, package_id, owner_id, in_date
         )
         
-        # Update related inventory integrations
-        integrations = self.env['manufacturing.inventory.integration'].search([
-            ('product_id', '=', product_id.id),
-            ('location_id', '=', location_id.id)
-        ])
-        
-        for integration in integrations:
-            integration._compute_stock_levels()
-            integration._check_auto_requisition()
+        # Update related inventory integrations at commit
+        self.env['manufacturing.inventory.integration']._mark_stock_changed([(product_id.id, location_id.id)])
         
         return result 
\ No newline at end of file
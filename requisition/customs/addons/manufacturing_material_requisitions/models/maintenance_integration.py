@@ -350,6 +350,11 @@ class MaintenanceIntegration(models.Model):
 class MaintenanceEquipmentExtension(models.Model):
     _inherit = 'maintenance.equipment'
     
+    # Bus channel terminals subscribe to for machine status changes
+    STATUS_CHANNEL = 'manufacturing_machine_status'
+    # Seconds a status watermark is moved back to catch transactions committed late
+    STATUS_WATERMARK_OVERLAP = 60
+    
     requisition_ids = fields.One2many('manufacturing.material.requisition', 'machine_id', 'Material Requisitions')
     requisition_count = fields.Integer('Requisition Count', compute='_compute_requisition_count')
     
@@ -364,6 +369,126 @@ class MaintenanceEquipmentExtension(models.Model):
         action['domain'] = [('machine_id', '=', self.id)]
         action['context'] = {'default_machine_id': self.id}
         return action
+    
+    def write(self, vals):
+        result = super().write(vals)
+        self._notify_status_changed()
+        return result
+    
+    @api.model
+    def get_fleet_status(self, domain=None, since=None):
+        """Get the status of many machines with a constant number of queries
+        
+        Args:
+            domain: Domain of the machines (all machines when empty)
+            since: Optional watermark returned by a previous call; only the
+                machines whose status may have changed since are returned
+        
+        Returns:
+            dict with the machine statuses and the watermark of the next call
+        """
+        watermark = self.env.cr.now()
+        machines = self.search(domain or [])
+        if since:
+            machines = machines._filter_changed_since(
+                fields.Datetime.to_datetime(since) - timedelta(seconds=self.STATUS_WATERMARK_OVERLAP)
+            )
+        
+        return {
+            'machines': machines._get_status_data(),
+            'watermark': fields.Datetime.to_string(watermark),
+        }
+    
+    def _filter_changed_since(self, since):
+        """Keep the machines changed, or with requisitions or downtimes changed, since a date"""
+        changed_ids = set(self.filtered_domain([('write_date', '>', since)]).ids)
+        for model, machine_field in [
+            ('shop.floor.requisition', 'machine_id'),
+            ('maintenance.downtime', 'equipment_id'),
+            ('maintenance.request', 'equipment_id')
+        ]:
+            changed_ids.update(machine.id for [machine] in self.env[model]._read_group([
+                (machine_field, 'in', self.ids),
+                ('write_date', '>', since)
+            ], [machine_field]))
+        return self.filtered(lambda machine: machine.id in changed_ids)
+    
+    def _get_status_data(self):
+        """Get the status of the machines using grouped queries
+        
+        Returns:
+            list of dicts, one per machine
+        """
+        if not self:
+            return []
+        
+        pending_requisitions = dict(self.env['shop.floor.requisition']._read_group([
+            ('machine_id', 'in', self.ids),
+            ('state', 'not in', ['completed', 'cancelled'])
+        ], ['machine_id'], ['__count']))
+        
+        maintenance_requests = dict(self.env['maintenance.request']._read_group([
+            ('equipment_id', 'in', self.ids),
+            ('stage_id.done', '=', False)
+        ], ['equipment_id'], ['__count']))
+        
+        downtime_starts = dict(self.env['maintenance.downtime']._read_group([
+            ('equipment_id', 'in', self.ids),
+            ('end_time', '=', False)
+        ], ['equipment_id'], ['start_time:min']))
+        
+        data = []
+        for machine in self:
+            downtime_start = downtime_starts.get(machine)
+            data.append({
+                'id': machine.id,
+                'name': machine.name,
+                'category': machine.category_id.name if machine.category_id else None,
+                'location': machine.location,
+                'maintenance_state': machine.maintenance_state,
+                'last_maintenance': machine.last_maintenance_date.isoformat() if machine.last_maintenance_date else None,
+                'next_maintenance': machine.next_action_date.isoformat() if machine.next_action_date else None,
+                'maintenance_requests': maintenance_requests.get(machine, 0),
+                'pending_requisitions': pending_requisitions.get(machine, 0),
+                'is_down': machine in downtime_starts,
+                'downtime_start': downtime_start.isoformat() if downtime_start else None,
+                'work_center': machine.workcenter_id.name if machine.workcenter_id else None,
+            })
+        return data
+    
+    def _notify_status_changed(self):
+        """Announce machine status changes on the bus, once per transaction
+        
+        Terminals subscribed to the status channel receive the changed machine
+        ids after commit and fetch their new status with get_fleet_status.
+        """
+        if not self:
+            return
+        
+        data = self.env.cr.precommit.data
+        key = 'maintenance.equipment.status_changed'
+        if key not in data:
+            data[key] = set()
+            
+            @self.env.cr.precommit.add
+            def send_status_changed():
+                machine_ids = data.pop(key, set())
+                if machine_ids:
+                    self.env['bus.bus']._sendone(self.STATUS_CHANNEL, 'machine_status/changed', {
+                        'machine_ids': sorted(machine_ids),
+                    })
+        data[key].update(self.ids)
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+    
+    def _build_bus_channel_list(self, channels):
+        # Only internal users may follow machine status changes
+        status_channel = self.env['maintenance.equipment'].STATUS_CHANNEL
+        if status_channel in channels and not self.env.user._is_internal():
+            channels = [channel for channel in channels if channel != status_channel]
+        return super()._build_bus_channel_list(channels)
 
 class MaintenanceRequestExtension(models.Model):
     _inherit = 'maintenance.request'
@@ -275,32 +275,41 @@ class ManufacturingMaterialRequisition(models.Model):
             
             record.risk_score = min(risk_score, 10)  # Cap at 10
     
-    @api.model
-    def create(self, vals):
-        if vals.get('name', _('New')) == _('New'):
-            vals['name'] = self.env['ir.sequence'].next_by_code('manufacturing.material.requisition') or _('New')
-        
-        # Auto-set destination location based on manufacturing order
-        if vals.get('manufacturing_order_id') and not vals.get('dest_location_id'):
-            production = self.env['mrp.production'].browse(vals['manufacturing_order_id'])
-            vals['dest_location_id'] = production.location_dest_id.id
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Prefetch the manufacturing orders and work centers of the whole batch
+        productions = self.env['mrp.production'].browse(
+            [vals['manufacturing_order_id'] for vals in vals_list if vals.get('manufacturing_order_id')]
+        )
+        workstations = self.env['mrp.workcenter'].browse(
+            [vals['workstation_id'] for vals in vals_list if vals.get('workstation_id')]
+        )
         
-        # Auto-set department based on work center
-        if vals.get('workstation_id') and not vals.get('department_id'):
-            workstation = self.env['mrp.workcenter'].browse(vals['workstation_id'])
-            if workstation.department_id:
-                vals['department_id'] = workstation.department_id.id
+        for vals in vals_list:
+            if vals.get('name', _('New')) == _('New'):
+                vals['name'] = self.env['ir.sequence'].next_by_code('manufacturing.material.requisition') or _('New')
+            
+            # Auto-set destination location based on manufacturing order
+            if vals.get('manufacturing_order_id') and not vals.get('dest_location_id'):
+                production = productions.browse(vals['manufacturing_order_id'])
+                vals['dest_location_id'] = production.location_dest_id.id
+            
+            # Auto-set department based on work center
+            if vals.get('workstation_id') and not vals.get('department_id'):
+                workstation = workstations.browse(vals['workstation_id'])
+                if workstation.department_id:
+                    vals['department_id'] = workstation.department_id.id
         
-        requisition = super().create(vals)
+        requisitions = super().create(vals_list)
         
         # Trigger AI analysis if enabled
         if self.env.company.enable_ai_requisition_analysis:
-            requisition._trigger_ai_analysis()
+            requisitions._trigger_ai_analysis()
         
         # Send notifications
-        requisition._send_creation_notification()
+        requisitions._send_creation_notification()
         
-        return requisition
+        return requisitions
     
     def write(self, vals):
         # Track state changes
@@ -487,22 +496,27 @@ class ManufacturingMaterialRequisition(models.Model):
     
     def _trigger_ai_analysis(self):
         """Trigger AI analysis for requisition optimization"""
-        try:
-            ai_service = self.env['manufacturing.requisition.ai']
-            recommendations = ai_service.analyze_requisition(self.id)
-            self.ai_recommendations = json.dumps(recommendations)
-            
-            # Predict approval time
-            self.predicted_approval_time = ai_service.predict_approval_time(self.id)
-            
-        except Exception as e:
-            _logger.warning(f"AI analysis failed for requisition {self.name}: {str(e)}")
+        ai_service = self.env['manufacturing.requisition.ai']
+        for record in self:
+            try:
+                recommendations = ai_service.analyze_requisition(record.id)
+                record.ai_recommendations = json.dumps(recommendations)
+                
+                # Predict approval time
+                record.predicted_approval_time = ai_service.predict_approval_time(record.id)
+                
+            except Exception as e:
+                _logger.warning(f"AI analysis failed for requisition {record.name}: {str(e)}")
     
     def _send_creation_notification(self):
-        """Send notification when requisition is created"""
+        """Send notification when requisition is created
+        
+        A single requisition is mailed right away; the mails of a batch are
+        rendered together and left to the mail queue.
+        """
         template = self.env.ref('manufacturing_material_requisitions.email_template_requisition_created', False)
-        if template:
-            template.send_mail(self.id, force_send=True)
+        if template and self:
+            template.send_mail_batch(self.ids, force_send=len(self) == 1)
     
     def _send_approval_notification(self):
         """Send notification for approval"""
@@ -1,9 +1,12 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 from datetime import datetime, timedelta
+from collections import defaultdict
 import json
 import logging
 
+import numpy as np
+
 _logger = logging.getLogger(__name__)
 
 
@@ -26,10 +29,13 @@ class MRPRequisitionIntegration(models.Model):
             ('requisition_analyzed', '=', False)
         ])
         
+        # Load stock, reservations, alternatives and supplier history once for all orders
+        index = self._build_shortage_index(production_orders)
+        
         for production in production_orders:
             try:
                 # Analyze material requirements
-                material_analysis = self._analyze_material_requirements(production)
+                material_analysis = self._analyze_material_requirements(production, index)
                 
                 if material_analysis['shortages']:
                     requisition = self._create_mrp_requisition(production, material_analysis)
@@ -44,8 +50,86 @@ class MRPRequisitionIntegration(models.Model):
                 _logger.error(f"MRP analysis failed for production {production.name}: {str(e)}")
                 continue
     
-    def _analyze_material_requirements(self, production):
-        """Detailed analysis of material requirements for production order"""
+    def _build_shortage_index(self, productions):
+        """Load the data needed to analyze material shortages of production orders
+
+        Quants, reservations, stocked alternatives and supplier history of all
+        raw materials are fetched with a few grouped queries and indexed in
+        memory, so analyzing an order does not query the database per move.
+
+        Args:
+            productions: mrp.production records to analyze
+
+        Returns:
+            dict of in-memory indexes used by _analyze_material_requirements
+        """
+        moves = productions.move_raw_ids.filtered(lambda m: m.state not in ['done', 'cancel'])
+        products = moves.product_id
+        source_locations = productions.location_src_id
+        
+        # Internal locations of every warehouse the orders consume from
+        location_domain = [('warehouse_id', 'in', source_locations.warehouse_id.ids)]
+        if any(not location.warehouse_id for location in source_locations):
+            location_domain = ['|', ('warehouse_id', '=', False)] + location_domain
+        locations = self.env['stock.location'].search([('usage', '=', 'internal')] + location_domain)
+        locations_by_warehouse = defaultdict(list)
+        for location in locations:
+            locations_by_warehouse[location.warehouse_id.id].append(location)
+        
+        stock = defaultdict(dict)
+        for product, location, quantity in self.env['stock.quant']._read_group([
+            ('product_id', 'in', products.ids),
+            ('location_id', 'in', locations.ids),
+            ('quantity', '>', 0)
+        ], ['product_id', 'location_id'], ['quantity:sum']):
+            stock[product.id][location.id] = quantity
+        
+        reserved = {}
+        for product, location, quantity in self.env['stock.move']._read_group([
+            ('product_id', 'in', products.ids),
+            ('location_id', 'in', source_locations.ids),
+            ('state', 'in', ['waiting', 'confirmed', 'assigned']),
+            ('date', '<=', fields.Datetime.now() + timedelta(days=7))  # Within a week
+        ], ['product_id', 'location_id'], ['product_uom_qty:sum']):
+            reserved[product.id, location.id] = quantity
+        
+        # On hand quantity of variants and same-category products (alternative candidates)
+        on_hand = {
+            product.id: quantity
+            for product, quantity in self.env['stock.quant']._read_group([
+                ('location_id.usage', '=', 'internal'),
+                '|',
+                ('product_id.product_tmpl_id', 'in', products.product_tmpl_id.ids),
+                ('product_id.categ_id', 'in', products.categ_id.ids)
+            ], ['product_id'], ['quantity:sum'])
+            if quantity > 0
+        }
+        similar_by_category = defaultdict(list)
+        for product in self.env['product.product'].search([('id', 'in', list(on_hand))]):
+            similar_by_category[product.categ_id.id].append(product)
+        
+        suppliers = products.seller_ids.partner_id
+        
+        return {
+            'locations': locations_by_warehouse,
+            'stock': stock,
+            'reserved': reserved,
+            'on_hand': on_hand,
+            'similar': similar_by_category,
+            'last_purchase': self._get_last_purchase_dates(products, suppliers),
+            'supplier_scores': self._get_supplier_performance_scores(suppliers),
+        }
+    
+    def _analyze_material_requirements(self, production, index=None):
+        """Detailed analysis of material requirements for production order
+        
+        Args:
+            production: mrp.production record
+            index: Indexes from _build_shortage_index, built for this order if omitted
+        """
+        if index is None:
+            index = self._build_shortage_index(production)
+        
         analysis = {
             'shortages': [],
             'alternatives': [],
@@ -56,26 +140,26 @@ class MRPRequisitionIntegration(models.Model):
         
         for move in production.move_raw_ids.filtered(lambda m: m.state not in ['done', 'cancel']):
             # Get multi-location stock levels
-            stock_levels = self._get_multilocation_stock(move.product_id, production.location_src_id)
+            stock_levels = self._get_multilocation_stock(move.product_id, production.location_src_id, index)
             
             # Calculate net requirement considering reserved stock
-            reserved_qty = self._get_reserved_quantity(move.product_id, production.location_src_id)
+            reserved_qty = self._get_reserved_quantity(move.product_id, production.location_src_id, index)
             available_qty = stock_levels['total_available'] - reserved_qty
             
             if available_qty < move.product_uom_qty:
                 shortage_qty = move.product_uom_qty - available_qty
                 
                 # Get alternative products
-                alternatives = self._find_alternative_products(move.product_id)
+                alternatives = self._find_alternative_products(move.product_id, index)
                 
                 # Get supplier information
-                suppliers = self._get_preferred_suppliers(move.product_id)
+                suppliers = self._get_preferred_suppliers(move.product_id, index)
                 
                 # Calculate procurement lead time
                 lead_time = self._calculate_procurement_lead_time(move.product_id, shortage_qty)
                 
                 # Check if this affects critical path
-                critical_path_impact = self._check_critical_path_impact(production, move, lead_time)
+                critical_path_impact = self._check_critical_path_impact(production, move, lead_time, index)
                 
                 shortage_info = {
                     'product_id': move.product_id.id,
@@ -121,26 +205,17 @@ class MRPRequisitionIntegration(models.Model):
         
         return analysis
     
-    def _get_multilocation_stock(self, product, primary_location):
+    def _get_multilocation_stock(self, product, primary_location, index):
         """Get stock levels across all available locations"""
-        # Get all internal locations in the same warehouse
-        warehouse = primary_location.warehouse_id
-        locations = self.env['stock.location'].search([
-            ('usage', '=', 'internal'),
-            ('warehouse_id', '=', warehouse.id)
-        ])
+        # All internal locations in the same warehouse
+        locations = index['locations'].get(primary_location.warehouse_id.id, [])
+        product_stock = index['stock'].get(product.id, {})
         
         stock_by_location = {}
         total_available = 0
         
         for location in locations:
-            quants = self.env['stock.quant'].search([
-                ('product_id', '=', product.id),
-                ('location_id', '=', location.id),
-                ('quantity', '>', 0)
-            ])
-            
-            location_qty = sum(quants.mapped('quantity'))
+            location_qty = product_stock.get(location.id, 0)
             if location_qty > 0:
                 stock_by_location[location.name] = {
                     'quantity': location_qty,
@@ -154,20 +229,14 @@ class MRPRequisitionIntegration(models.Model):
             'by_location': stock_by_location
         }
     
-    def _get_reserved_quantity(self, product, location):
+    def _get_reserved_quantity(self, product, location, index):
         """Get quantity already reserved for other orders"""
-        reserved_moves = self.env['stock.move'].search([
-            ('product_id', '=', product.id),
-            ('location_id', '=', location.id),
-            ('state', 'in', ['waiting', 'confirmed', 'assigned']),
-            ('date', '<=', fields.Datetime.now() + timedelta(days=7))  # Within a week
-        ])
-        
-        return sum(reserved_moves.mapped('product_uom_qty'))
+        return index['reserved'].get((product.id, location.id), 0)
     
-    def _find_alternative_products(self, product):
+    def _find_alternative_products(self, product, index):
         """Find alternative products that can be used"""
         alternatives = []
+        on_hand = index['on_hand']
         
         # Check product variants
         variants = product.product_tmpl_id.product_variant_ids.filtered(
@@ -175,35 +244,33 @@ class MRPRequisitionIntegration(models.Model):
         )
         
         for variant in variants:
-            if variant.qty_available > 0:
+            if on_hand.get(variant.id, 0) > 0:
                 alternatives.append({
                     'product_id': variant.id,
                     'name': variant.name,
-                    'available_qty': variant.qty_available,
+                    'available_qty': on_hand[variant.id],
                     'price_difference': variant.standard_price - product.standard_price,
                     'type': 'variant'
                 })
         
         # Check products with same category and similar attributes
-        similar_products = self.env['product.product'].search([
-            ('categ_id', '=', product.categ_id.id),
-            ('id', '!=', product.id),
-            ('active', '=', True),
-            ('qty_available', '>', 0)
-        ], limit=5)
+        similar_products = [
+            similar for similar in index['similar'].get(product.categ_id.id, [])
+            if similar.id != product.id
+        ][:5]
         
         for similar in similar_products:
             alternatives.append({
                 'product_id': similar.id,
                 'name': similar.name,
-                'available_qty': similar.qty_available,
+                'available_qty': on_hand[similar.id],
                 'price_difference': similar.standard_price - product.standard_price,
                 'type': 'similar'
             })
         
         return alternatives[:3]  # Return top 3 alternatives
     
-    def _get_preferred_suppliers(self, product):
+    def _get_preferred_suppliers(self, product, index):
         """Get preferred suppliers with pricing and lead time"""
         suppliers = []
         
@@ -215,8 +282,8 @@ class MRPRequisitionIntegration(models.Model):
                 'min_qty': seller.min_qty,
                 'lead_time': seller.delay,
                 'currency': seller.currency_id.name,
-                'last_purchase_date': self._get_last_purchase_date(product, seller.partner_id),
-                'performance_score': self._get_supplier_performance_score(seller.partner_id, product)
+                'last_purchase_date': index['last_purchase'].get((product.id, seller.partner_id.id), False),
+                'performance_score': index['supplier_scores'].get(seller.partner_id.id, 5.0)
             })
         
         return suppliers
@@ -242,7 +309,7 @@ class MRPRequisitionIntegration(models.Model):
         
         return base_lead_time
     
-    def _check_critical_path_impact(self, production, move, lead_time):
+    def _check_critical_path_impact(self, production, move, lead_time, index):
         """Check if material shortage affects critical path"""
         # Calculate days until production start
         days_until_production = (production.date_planned_start - fields.Datetime.now()).days
@@ -252,7 +319,7 @@ class MRPRequisitionIntegration(models.Model):
             return True
         
         # Check if this is a critical component (no alternatives, high cost)
-        if move.product_id.standard_price > 1000 and not self._find_alternative_products(move.product_id):
+        if move.product_id.standard_price > 1000 and not self._find_alternative_products(move.product_id, index):
             return True
         
         # Check if this operation is on critical path
@@ -271,43 +338,66 @@ class MRPRequisitionIntegration(models.Model):
         else:
             return 24  # Different warehouse - 1 day
     
-    def _get_last_purchase_date(self, product, supplier):
-        """Get last purchase date from supplier"""
-        last_po_line = self.env['purchase.order.line'].search([
-            ('product_id', '=', product.id),
-            ('partner_id', '=', supplier.id),
-            ('state', 'in', ['purchase', 'done'])
-        ], order='date_order desc', limit=1)
-        
-        return last_po_line.date_order if last_po_line else False
-    
-    def _get_supplier_performance_score(self, supplier, product):
-        """Get supplier performance score for this product"""
-        # Get recent purchase orders
-        recent_pos = self.env['purchase.order'].search([
-            ('partner_id', '=', supplier.id),
-            ('state', 'in', ['purchase', 'done']),
-            ('date_order', '>=', fields.Date.today() - timedelta(days=365))
-        ])
-        
-        if not recent_pos:
-            return 5.0  # Default score
+    def _get_last_purchase_dates(self, products, suppliers):
+        """Get the last confirmed purchase date per product and supplier
+        
+        Returns:
+            dict mapping (product_id, partner_id) to the last order date
+        """
+        if not products or not suppliers:
+            return {}
+        
+        self.env['purchase.order'].flush_model(['partner_id', 'state', 'date_order'])
+        self.env['purchase.order.line'].flush_model(['order_id', 'product_id'])
+        self.env.cr.execute("""
+            SELECT pol.product_id, po.partner_id, MAX(po.date_order)
+            FROM purchase_order_line pol
+            JOIN purchase_order po ON po.id = pol.order_id
+            WHERE pol.product_id IN %s
+              AND po.partner_id IN %s
+              AND po.state IN ('purchase', 'done')
+            GROUP BY pol.product_id, po.partner_id
+        """, (tuple(products.ids), tuple(suppliers.ids)))
         
-        # Calculate performance metrics
-        on_time_deliveries = 0
-        total_deliveries = 0
-        
-        for po in recent_pos:
-            for picking in po.picking_ids.filtered(lambda p: p.state == 'done'):
-                total_deliveries += 1
-                if picking.date_done <= po.date_planned:
-                    on_time_deliveries += 1
+        return {
+            (product_id, partner_id): date_order
+            for product_id, partner_id, date_order in self.env.cr.fetchall()
+        }
+    
+    def _get_supplier_performance_scores(self, suppliers):
+        """Get on-time delivery scores of suppliers over the last year
         
-        if total_deliveries == 0:
-            return 5.0
+        Returns:
+            dict mapping partner_id to a score out of 10; suppliers without
+            deliveries are missing and default to 5.0
+        """
+        if not suppliers:
+            return {}
+        
+        self.env['purchase.order'].flush_model(['partner_id', 'state', 'date_order', 'date_planned'])
+        self.env['stock.move'].flush_model(['purchase_line_id', 'picking_id'])
+        self.env['stock.picking'].flush_model(['state', 'date_done'])
+        self.env.cr.execute("""
+            SELECT partner_id, COUNT(*), COUNT(*) FILTER (WHERE date_done <= date_planned)
+            FROM (
+                SELECT DISTINCT po.id AS order_id, sp.id AS picking_id,
+                       po.partner_id, po.date_planned, sp.date_done
+                FROM purchase_order po
+                JOIN purchase_order_line pol ON pol.order_id = po.id
+                JOIN stock_move sm ON sm.purchase_line_id = pol.id
+                JOIN stock_picking sp ON sp.id = sm.picking_id
+                WHERE po.partner_id IN %s
+                  AND po.state IN ('purchase', 'done')
+                  AND po.date_order >= %s
+                  AND sp.state = 'done'
+            ) deliveries
+            GROUP BY partner_id
+        """, (tuple(suppliers.ids), fields.Date.today() - timedelta(days=365)))
         
-        on_time_rate = on_time_deliveries / total_deliveries
-        return round(on_time_rate * 10, 1)  # Score out of 10
+        return {
+            partner_id: round(on_time_deliveries / total_deliveries * 10, 1)  # Score out of 10
+            for partner_id, total_deliveries, on_time_deliveries in self.env.cr.fetchall()
+        }
     
     def _create_mrp_requisition(self, production, analysis):
         """Create requisition based on MRP analysis"""
@@ -448,10 +538,8 @@ class MRPRequisitionIntegration(models.Model):
         
         reorder_suggestions = []
         
-        for product in active_bom_products:
-            # Calculate dynamic reorder point
-            reorder_analysis = self._calculate_dynamic_reorder_point(product)
-            
+        # Calculate dynamic reorder points for all products at once
+        for reorder_analysis in self._calculate_dynamic_reorder_points(active_bom_products):
             if reorder_analysis['should_reorder']:
                 reorder_suggestions.append(reorder_analysis)
                 
@@ -463,162 +551,191 @@ class MRPRequisitionIntegration(models.Model):
     
     def _calculate_dynamic_reorder_point(self, product):
         """Calculate dynamic reorder point based on manufacturing demand"""
+        return self._calculate_dynamic_reorder_points(product)[0]
+    
+    def _calculate_dynamic_reorder_points(self, products):
+        """Calculate dynamic reorder points of several products
+        
+        Demand and consumption are aggregated for all products with one query
+        each; safety stock and order quantities are computed on arrays.
+        
+        Args:
+            products: product.product records
+        
+        Returns:
+            list of reorder analysis dicts, in the order of ``products``
+        """
+        if not products:
+            return []
+        
         # Get upcoming manufacturing demand
-        upcoming_demand = self._get_upcoming_manufacturing_demand(product)
+        upcoming_demand = self._get_upcoming_manufacturing_demand(products)
         
         # Get historical consumption
-        historical_consumption = self._get_historical_consumption(product)
+        historical_consumption = self._get_historical_consumption(products)
         
         # Calculate safety stock
-        safety_stock = self._calculate_manufacturing_safety_stock(product, historical_consumption)
+        safety_stock = self._calculate_manufacturing_safety_stock(products, historical_consumption)
         
         # Calculate lead time demand
-        lead_time = product.seller_ids[0].delay if product.seller_ids else 7
-        daily_demand = historical_consumption.get('daily_average', 0)
-        lead_time_demand = daily_demand * lead_time
+        lead_time = self._get_supplier_lead_times(products)
+        lead_time_demand = historical_consumption['daily_average'] * lead_time
         
         # Dynamic reorder point
         reorder_point = safety_stock + lead_time_demand + upcoming_demand['next_7_days']
         
-        current_stock = product.qty_available
+        current_stock = np.array(products.mapped('qty_available'), dtype=float)
+        suggested_qty = self._calculate_optimal_order_quantity(products, upcoming_demand)
         
-        return {
+        return [{
             'product_id': product.id,
             'product_name': product.name,
-            'current_stock': current_stock,
-            'reorder_point': reorder_point,
-            'safety_stock': safety_stock,
-            'lead_time_demand': lead_time_demand,
-            'upcoming_demand': upcoming_demand,
-            'should_reorder': current_stock < reorder_point,
-            'suggested_qty': self._calculate_optimal_order_quantity(product, upcoming_demand),
-            'urgency': 'high' if current_stock < safety_stock else 'medium'
-        }
-    
-    def _get_upcoming_manufacturing_demand(self, product):
-        """Get upcoming manufacturing demand for product"""
-        # Get confirmed production orders
-        upcoming_productions = self.env['mrp.production'].search([
-            ('state', 'in', ['confirmed', 'progress']),
-            ('date_planned_start', '<=', fields.Datetime.now() + timedelta(days=30))
-        ])
-        
-        demand_7_days = 0
-        demand_30_days = 0
-        
-        for production in upcoming_productions:
-            for move in production.move_raw_ids:
-                if move.product_id.id == product.id:
-                    if production.date_planned_start <= fields.Datetime.now() + timedelta(days=7):
-                        demand_7_days += move.product_uom_qty
-                    demand_30_days += move.product_uom_qty
-        
+            'current_stock': float(current_stock[i]),
+            'reorder_point': float(reorder_point[i]),
+            'safety_stock': float(safety_stock[i]),
+            'lead_time_demand': float(lead_time_demand[i]),
+            'upcoming_demand': {
+                'next_7_days': float(upcoming_demand['next_7_days'][i]),
+                'next_30_days': float(upcoming_demand['next_30_days'][i]),
+            },
+            'should_reorder': bool(current_stock[i] < reorder_point[i]),
+            'suggested_qty': float(suggested_qty[i]),
+            'urgency': 'high' if current_stock[i] < safety_stock[i] else 'medium'
+        } for i, product in enumerate(products)]
+    
+    def _get_supplier_lead_times(self, products):
+        """Get the lead time in days of each product's main vendor (7 without vendor)"""
+        return np.array([
+            product.seller_ids[0].delay if product.seller_ids else 7
+            for product in products
+        ], dtype=float)
+    
+    def _get_upcoming_manufacturing_demand(self, products):
+        """Get upcoming manufacturing demand for products
+        
+        Returns:
+            dict with 'next_7_days' and 'next_30_days' arrays aligned with ``products``
+        """
+        now = fields.Datetime.now()
+        demand = {product_id: (0.0, 0.0) for product_id in products.ids}
+        
+        # Raw material moves of confirmed production orders, summed per product
+        self.env['mrp.production'].flush_model(['state', 'date_planned_start'])
+        self.env['stock.move'].flush_model(['raw_material_production_id', 'product_id', 'product_uom_qty'])
+        self.env.cr.execute("""
+            SELECT sm.product_id,
+                   SUM(sm.product_uom_qty) FILTER (WHERE mp.date_planned_start <= %s),
+                   SUM(sm.product_uom_qty)
+            FROM stock_move sm
+            JOIN mrp_production mp ON mp.id = sm.raw_material_production_id
+            WHERE mp.state IN ('confirmed', 'progress')
+              AND mp.date_planned_start <= %s
+              AND sm.product_id IN %s
+            GROUP BY sm.product_id
+        """, (now + timedelta(days=7), now + timedelta(days=30), tuple(products.ids)))
+        
+        for product_id, demand_7_days, demand_30_days in self.env.cr.fetchall():
+            demand[product_id] = (demand_7_days or 0.0, demand_30_days or 0.0)
+        
+        values = np.array([demand[product_id] for product_id in products.ids], dtype=float).reshape(-1, 2)
         return {
-            'next_7_days': demand_7_days,
-            'next_30_days': demand_30_days
+            'next_7_days': values[:, 0],
+            'next_30_days': values[:, 1]
         }
     
-    def _get_historical_consumption(self, product):
-        """Get historical consumption patterns"""
-        # Get stock moves for the last 6 months
+    def _get_historical_consumption(self, products):
+        """Get historical consumption patterns
+        
+        Returns:
+            dict of arrays aligned with ``products``: 'daily_average',
+            'monthly_average', 'monthly_variance' and 'months_data'
+        """
+        # Monthly consumption in production over the last 6 months
         six_months_ago = fields.Date.today() - timedelta(days=180)
         
-        consumption_moves = self.env['stock.move'].search([
-            ('product_id', '=', product.id),
+        groups = self.env['stock.move']._read_group([
+            ('product_id', 'in', products.ids),
             ('state', '=', 'done'),
             ('date', '>=', six_months_ago),
             ('location_dest_id.usage', '=', 'production')  # Consumed in production
-        ])
-        
-        if not consumption_moves:
-            return {'daily_average': 0, 'monthly_variance': 0}
-        
-        # Calculate monthly consumption
-        monthly_consumption = {}
-        for move in consumption_moves:
-            month_key = move.date.strftime('%Y-%m')
-            if month_key not in monthly_consumption:
-                monthly_consumption[month_key] = 0
-            monthly_consumption[month_key] += move.product_uom_qty
-        
-        if not monthly_consumption:
-            return {'daily_average': 0, 'monthly_variance': 0}
-        
-        # Calculate statistics
-        consumptions = list(monthly_consumption.values())
-        avg_monthly = sum(consumptions) / len(consumptions)
-        daily_average = avg_monthly / 30  # Approximate daily consumption
-        
-        # Calculate variance
-        if len(consumptions) > 1:
-            variance = sum((x - avg_monthly) ** 2 for x in consumptions) / len(consumptions)
-        else:
-            variance = 0
+        ], ['product_id', 'date:month'], ['product_uom_qty:sum'])
+        
+        # One row per product, one column per month; months without moves stay NaN
+        rows = {product_id: i for i, product_id in enumerate(products.ids)}
+        months = sorted({month for _product, month, _qty in groups})
+        columns = {month: j for j, month in enumerate(months)}
+        series = np.full((len(rows), len(months)), np.nan)
+        for product, month, quantity in groups:
+            series[rows[product.id], columns[month]] = quantity
+        
+        observed = ~np.isnan(series)
+        months_data = observed.sum(axis=1)
+        totals = np.where(observed, series, 0.0).sum(axis=1)
+        avg_monthly = totals / np.maximum(months_data, 1)
+        variance = np.where(observed, (series - avg_monthly[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(months_data, 1)
         
         return {
-            'daily_average': daily_average,
+            'daily_average': avg_monthly / 30,  # Approximate daily consumption
             'monthly_average': avg_monthly,
             'monthly_variance': variance,
-            'months_data': len(consumptions)
+            'months_data': months_data
         }
     
-    def _calculate_manufacturing_safety_stock(self, product, consumption_data):
+    def _calculate_manufacturing_safety_stock(self, products, consumption_data):
         """Calculate safety stock for manufacturing environment"""
-        if consumption_data['daily_average'] == 0:
-            return product.reordering_min_qty or 0
+        daily_average = consumption_data['daily_average']
+        min_qty = np.array(products.mapped('reordering_min_qty'), dtype=float)
         
         # Service level factor (95% service level = 1.65)
         service_level_factor = 1.65
         
         # Lead time in days
-        lead_time = product.seller_ids[0].delay if product.seller_ids else 7
+        lead_time = self._get_supplier_lead_times(products)
         
-        # Demand variability (standard deviation)
-        if consumption_data['monthly_variance'] > 0:
-            monthly_std = consumption_data['monthly_variance'] ** 0.5
-            daily_std = monthly_std / 30
-        else:
-            # Use 20% of average as default variability
-            daily_std = consumption_data['daily_average'] * 0.2
+        # Demand variability (standard deviation), 20% of average when unknown
+        daily_std = np.where(
+            consumption_data['monthly_variance'] > 0,
+            np.sqrt(consumption_data['monthly_variance']) / 30,
+            daily_average * 0.2
+        )
         
         # Safety stock formula: Z * σ * √L
-        safety_stock = service_level_factor * daily_std * (lead_time ** 0.5)
+        safety_stock = service_level_factor * daily_std * np.sqrt(lead_time)
         
         # Ensure minimum safety stock
-        min_safety_stock = product.reordering_min_qty or consumption_data['daily_average'] * 3
+        min_safety_stock = np.where(min_qty != 0, min_qty, daily_average * 3)
         
-        return max(safety_stock, min_safety_stock)
+        return np.where(daily_average == 0, min_qty, np.maximum(safety_stock, min_safety_stock))
     
-    def _calculate_optimal_order_quantity(self, product, demand_data):
-        """Calculate optimal order quantity using EOQ model"""
+    def _calculate_optimal_order_quantity(self, products, demand_data):
+        """Calculate optimal order quantities using EOQ model"""
         # Annual demand
         annual_demand = demand_data['next_30_days'] * 12  # Approximate annual demand
-        
-        if annual_demand == 0:
-            return product.reordering_max_qty or 1
+        max_qty = np.array(products.mapped('reordering_max_qty'), dtype=float)
         
         # Ordering cost (estimated)
         ordering_cost = 50  # Default ordering cost
         
         # Holding cost (estimated as 20% of product cost per year)
-        holding_cost = product.standard_price * 0.2
-        
-        if holding_cost == 0:
-            return product.reordering_max_qty or annual_demand / 12
+        holding_cost = np.array(products.mapped('standard_price'), dtype=float) * 0.2
         
         # EOQ formula: √(2 * D * S / H)
-        eoq = ((2 * annual_demand * ordering_cost) / holding_cost) ** 0.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            eoq = np.sqrt((2 * annual_demand * ordering_cost) / holding_cost)
         
         # Ensure minimum order quantity
-        if product.seller_ids:
-            min_qty = product.seller_ids[0].min_qty
-            eoq = max(eoq, min_qty)
+        min_qty = np.array([
+            product.seller_ids[0].min_qty if product.seller_ids else 0
+            for product in products
+        ], dtype=float)
+        eoq = np.maximum(eoq, min_qty)
         
         # Ensure maximum order quantity
-        if product.reordering_max_qty:
-            eoq = min(eoq, product.reordering_max_qty)
+        eoq = np.round(np.where(max_qty != 0, np.minimum(eoq, max_qty), eoq), 2)
         
-        return round(eoq, 2)
+        # Fallbacks without demand or without cost
+        eoq = np.where(holding_cost == 0, np.where(max_qty != 0, max_qty, annual_demand / 12), eoq)
+        return np.where(annual_demand == 0, np.where(max_qty != 0, max_qty, 1), eoq)
     
     def _create_automatic_reorder_requisition(self, reorder_analysis):
         """Create automatic requisition for reorder"""
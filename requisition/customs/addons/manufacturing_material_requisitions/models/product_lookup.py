@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api, tools
+from odoo.tools import SQL
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Barcode index shared by the threads of a worker:
+# {dbname: (generation, {barcode or internal reference: product id})}
+_barcode_indexes = {}
+_barcode_index_lock = threading.Lock()
+
+# Stock availability snapshots shared by the threads of a worker:
+# {cache key: (expiry, {product id: quantity})}
+_availability_cache = {}
+_availability_cache_lock = threading.Lock()
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    # Bumped after every commit changing barcodes, seen by all workers
+    _BARCODE_GENERATION_SEQUENCE = 'manufacturing_product_barcode_generation'
+    # Fields whose changes invalidate the barcode index
+    BARCODE_INDEX_FIELDS = {'barcode', 'default_code', 'active'}
+    # Seconds a stock availability snapshot is served to terminals
+    AVAILABILITY_CACHE_TTL = 15
+    AVAILABILITY_CACHE_MAX_ENTRIES = 128
+
+    def init(self):
+        super().init()
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % self._BARCODE_GENERATION_SEQUENCE)
+        # Fuzzy internal reference lookup; product names are trigram indexed by product
+        if self.env.registry.has_trigram:
+            tools.create_index(self.env.cr, 'product_product_default_code_trgm_idx', self._table,
+                               ['default_code gin_trgm_ops'], method='gin')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        self._invalidate_barcode_index()
+        return products
+
+    def write(self, vals):
+        result = super().write(vals)
+        if self.BARCODE_INDEX_FIELDS.intersection(vals):
+            self._invalidate_barcode_index()
+        return result
+
+    def unlink(self):
+        self._invalidate_barcode_index()
+        return super().unlink()
+
+    @api.model
+    def _invalidate_barcode_index(self):
+        """Rebuild the barcode index of every worker once the current transaction commits"""
+        cr = self.env.cr
+        if cr.postcommit.data.get('product_barcode_index_invalidated'):
+            return
+        cr.postcommit.data['product_barcode_index_invalidated'] = True
+        registry = self.env.registry
+        sequence = self._BARCODE_GENERATION_SEQUENCE
+
+        @cr.postcommit.add
+        def bump_generation():
+            with registry.cursor() as generation_cr:
+                generation_cr.execute("SELECT nextval('%s')" % sequence)
+
+    @api.model
+    def _get_barcode_index(self):
+        """Get the barcode index of this worker, rebuilt when a barcode changed"""
+        self.env.cr.execute("SELECT last_value FROM %s" % self._BARCODE_GENERATION_SEQUENCE)
+        generation = self.env.cr.fetchone()[0]
+
+        dbname = self.env.cr.dbname
+        entry = _barcode_indexes.get(dbname)
+        if entry and entry[0] == generation:
+            return entry[1]
+
+        with _barcode_index_lock:
+            # Another request may have rebuilt it while this one waited
+            entry = _barcode_indexes.get(dbname)
+            if entry and entry[0] == generation:
+                return entry[1]
+
+            self.env.cr.execute(SQL(
+                "SELECT id, barcode, default_code FROM %s WHERE active ORDER BY id DESC",
+                SQL.identifier(self._table)
+            ))
+            index = {}
+            codes = {}
+            for product_id, barcode, default_code in self.env.cr.fetchall():
+                if barcode:
+                    index[barcode] = product_id
+                if default_code:
+                    codes[default_code] = product_id
+            # Barcodes win over internal references
+            index = {**codes, **index}
+            _barcode_indexes[dbname] = (generation, index)
+            _logger.info(f"Built barcode index of {len(index)} codes")
+        return index
+
+    @api.model
+    def _lookup_barcode(self, barcode):
+        """Find the product of a barcode or internal reference
+
+        Returns:
+            product.product record, empty if unknown or not accessible
+        """
+        product_id = self._get_barcode_index().get(barcode) if barcode else None
+        if not product_id:
+            return self.browse()
+        # Apply access rules to the cached id
+        return self.search([('id', '=', product_id)], limit=1)
+
+    @api.model
+    def _search_fuzzy(self, term, limit=20):
+        """Search products by name or internal reference, tolerating typos
+
+        Substring matches come first; when there are fewer than ``limit``, the
+        products whose name or reference is most similar to ``term`` are added.
+        Candidates are found through the trigram indexes with the pg_trgm
+        ``<%`` operator (word similarity of at least
+        ``pg_trgm.word_similarity_threshold``, 0.6 by default), then ranked by
+        word similarity.
+        """
+        products = self.search(['|', ('name', 'ilike', term), ('default_code', 'ilike', term)], limit=limit)
+        if not term or len(products) >= limit or not self.env.registry.has_trigram:
+            return products
+
+        # Same expression as the trigram index of translated names
+        template_name = SQL("(jsonb_path_query_array(template.name, '$.*')::text)")
+        # SQL() does not support escaped '%', so the operator is inserted
+        # already escaped for the query parameters
+        similar = SQL("<%%")
+        self.env.cr.execute(SQL("""
+            WITH candidates AS (
+                SELECT product.id
+                  FROM product_product product
+                 WHERE %(term)s %(similar)s product.default_code
+                 UNION
+                SELECT product.id
+                  FROM product_template template
+                  JOIN product_product product ON product.product_tmpl_id = template.id
+                 WHERE %(term)s %(similar)s %(name)s
+            )
+            SELECT product.id
+              FROM candidates
+              JOIN product_product product ON product.id = candidates.id
+              JOIN product_template template ON template.id = product.product_tmpl_id
+             WHERE product.active
+          ORDER BY GREATEST(word_similarity(%(term)s, COALESCE(product.default_code, '')),
+                            word_similarity(%(term)s, %(name)s)) DESC
+             LIMIT %(limit)s
+        """, term=term, similar=similar, name=template_name, limit=limit * 2))
+        similar_ids = [row[0] for row in self.env.cr.fetchall() if row[0] not in products.ids]
+
+        # Apply access rules, keeping the similarity order
+        allowed = set(self.search([('id', 'in', similar_ids)]).ids)
+        similar_ids = [product_id for product_id in similar_ids if product_id in allowed]
+        return products + self.browse(similar_ids[:limit - len(products)])
+
+    @api.model
+    def _get_availability_snapshot(self, location=None):
+        """Get the on hand quantity of every product, cached for a few seconds
+
+        Args:
+            location: Optional stock.location; its internal children are
+                included. Defaults to all internal locations of the companies
+
+        Returns:
+            dict mapping product id to on hand quantity
+        """
+        cache_key = (self.env.cr.dbname, tuple(self.env.companies.ids), location.id if location else None)
+        entry = _availability_cache.get(cache_key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        domain = [('location_id.usage', '=', 'internal'), ('company_id', 'in', self.env.companies.ids)]
+        if location:
+            domain.append(('location_id', 'child_of', location.id))
+        snapshot = {
+            product.id: quantity
+            for product, quantity in self.env['stock.quant']._read_group(
+                domain, ['product_id'], ['quantity:sum']
+            )
+        }
+
+        now = time.monotonic()
+        with _availability_cache_lock:
+            if len(_availability_cache) >= self.AVAILABILITY_CACHE_MAX_ENTRIES:
+                for expired in [k for k, v in _availability_cache.items() if v[0] <= now]:
+                    del _availability_cache[expired]
+            _availability_cache[cache_key] = (now + self.AVAILABILITY_CACHE_TTL, snapshot)
+        return snapshot
@@ -2,12 +2,22 @@
 
 from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
+from odoo.tools.sql import table_kind, TableKind
 from datetime import datetime, timedelta
 import logging
 import json
+import threading
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Dashboard snapshots shared by the threads of a worker:
+# {cache key: (expiry, generation, snapshot)}
+_dashboard_cache = {}
+_dashboard_cache_lock = threading.Lock()
+_dashboard_key_locks = {}
+
 class RequisitionAnalytics(models.Model):
     _name = 'manufacturing.requisition.analytics'
     _description = 'Manufacturing Requisition Analytics'
@@ -85,12 +95,38 @@ class RequisitionAnalytics(models.Model):
     on_time_delivery = fields.Boolean('On Time Delivery', readonly=True)
     budget_variance = fields.Float('Budget Variance (%)', readonly=True)
     
+    # Optional materialized mode: the rows live in a real table refreshed from
+    # changed requisitions instead of a view recomputed on every read
+    MATERIALIZED_PARAM = 'manufacturing_material_requisitions.analytics_materialized'
+    REFRESHED_PARAM = 'manufacturing_material_requisitions.analytics_refreshed_at'
+    MATERIALIZED_INDEXES = ['requisition_id', 'requisition_date', 'department_id', 'product_id', 'state']
+    # Changes are re-read this far back so transactions committing late are not missed
+    REFRESH_OVERLAP = timedelta(minutes=10)
+    
     def init(self):
+        if self._is_materialized():
+            self._create_materialized_table()
+            return
+        
+        if table_kind(self.env.cr, self._table) == TableKind.Regular:
+            self._drop_materialized_table()
         tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""
             CREATE OR REPLACE VIEW %s AS (
+                %s
+            )
+        """ % (self._table, self._query()))
+    
+    def _query(self, id_expression='row_number() OVER ()', condition='TRUE'):
+        """SELECT computing the analytics rows
+        
+        Args:
+            id_expression: SQL expression of the row id
+            condition: Additional SQL condition on the requisitions (alias mr)
+        """
+        return """
                 SELECT
-                    row_number() OVER () AS id,
+                    %s AS id,
                     mr.id AS requisition_id,
                     DATE(mr.create_date) AS requisition_date,
                     DATE(mr.completion_date) AS completion_date,
@@ -132,9 +168,143 @@ class RequisitionAnalytics(models.Model):
                 LEFT JOIN product_template pt ON pp.product_tmpl_id = pt.id
                 LEFT JOIN res_partner rp ON mr.vendor_id = rp.id
                 LEFT JOIN manufacturing_quality_integration qi ON mr.id = qi.requisition_id
-                WHERE mr.create_date IS NOT NULL
-            )
-        """ % self._table)
+                WHERE mr.create_date IS NOT NULL AND (%s)
+        """ % (id_expression, condition)
+    
+    @api.model
+    def _is_materialized(self):
+        return tools.str2bool(
+            self.env['ir.config_parameter'].sudo().get_param(self.MATERIALIZED_PARAM, 'False')
+        )
+    
+    @api.model
+    def _create_materialized_table(self):
+        """Replace the view by an indexed table and fill it"""
+        cr = self.env.cr
+        if table_kind(cr, self._table) == TableKind.Regular:
+            return
+        
+        tools.drop_view_if_exists(cr, self._table)
+        cr.execute("CREATE SEQUENCE IF NOT EXISTS %s_id_seq" % self._table)
+        cr.execute("CREATE TABLE %s AS (%s) WITH NO DATA" % (
+            self._table, self._query("nextval('%s_id_seq')" % self._table)
+        ))
+        cr.execute("ALTER TABLE %s ADD PRIMARY KEY (id)" % self._table)
+        for column in self.MATERIALIZED_INDEXES:
+            cr.execute("CREATE INDEX %s_%s_index ON %s (%s)" % (self._table, column, self._table, column))
+        self._refresh_materialized(full=True)
+        _logger.info("Requisition analytics materialized in table %s", self._table)
+    
+    @api.model
+    def _drop_materialized_table(self):
+        """Drop the materialized table so the view can be recreated"""
+        cr = self.env.cr
+        cr.execute("DROP TABLE IF EXISTS %s" % self._table)
+        cr.execute("DROP SEQUENCE IF EXISTS %s_id_seq" % self._table)
+        self.env['ir.config_parameter'].sudo().set_param(self.REFRESHED_PARAM, False)
+    
+    @api.model
+    def _refresh_materialized(self, full=False):
+        """Bring the materialized table up to date
+        
+        The incremental refresh recomputes the rows of requisitions (and
+        quality integrations) written since the last refresh and drops the
+        rows of deleted requisitions; the full refresh recomputes everything.
+        Both run in the caller's transaction, so readers keep seeing the
+        previous rows until it commits.
+        
+        Args:
+            full: Rebuild all rows instead of the changed ones
+        """
+        cr = self.env.cr
+        params = self.env['ir.config_parameter'].sudo()
+        self.env.flush_all()
+        
+        cr.execute("SELECT now() AT TIME ZONE 'UTC'")
+        started = cr.fetchone()[0]
+        refreshed_at = params.get_param(self.REFRESHED_PARAM)
+        id_expression = "nextval('%s_id_seq')" % self._table
+        
+        if full or not refreshed_at:
+            cr.execute("DELETE FROM %s" % self._table)
+            cr.execute("INSERT INTO %s %s" % (self._table, self._query(id_expression)))
+        else:
+            changed = """
+                mr.id IN (
+                    SELECT id FROM manufacturing_requisition WHERE write_date >= %(since)s
+                    UNION
+                    SELECT requisition_id FROM manufacturing_quality_integration WHERE write_date >= %(since)s
+                )
+            """
+            since = fields.Datetime.to_datetime(refreshed_at) - self.REFRESH_OVERLAP
+            cr.execute("""
+                DELETE FROM %s t
+                WHERE t.requisition_id IN (SELECT mr.id FROM manufacturing_requisition mr WHERE %s)
+                   OR NOT EXISTS (SELECT 1 FROM manufacturing_requisition mr WHERE mr.id = t.requisition_id)
+            """ % (self._table, changed), {'since': since})
+            cr.execute("INSERT INTO %s %s" % (self._table, self._query(id_expression, changed)), {'since': since})
+        
+        params.set_param(self.REFRESHED_PARAM, fields.Datetime.to_string(started))
+    
+    @api.model
+    def _cron_refresh_analytics(self, full=False):
+        """Apply the configured mode and refresh the materialized rows"""
+        materialized = table_kind(self.env.cr, self._table) == TableKind.Regular
+        if self._is_materialized() != materialized:
+            # Mode switched through the system parameter
+            self.init()
+        elif materialized:
+            self._refresh_materialized(full=full)
+    
+    # Raw aggregates behind every requisition KPI; rates are derived from them
+    # by RequisitionKPI._kpis_from_aggregates
+    _KPI_AGGREGATES = """
+        COUNT(*) AS total_requisitions,
+        COUNT(*) FILTER (WHERE {t}.state = 'completed') AS completed_requisitions,
+        COUNT(*) FILTER (WHERE {t}.state = 'cancelled') AS cancelled_requisitions,
+        COUNT(*) FILTER (WHERE {t}.state IS NULL OR {t}.state NOT IN ('completed', 'cancelled')) AS pending_requisitions,
+        COALESCE(AVG({t}.total_cycle_time) FILTER (WHERE {t}.total_cycle_time > 0), 0)::float AS average_cycle_time,
+        COALESCE(SUM({t}.total_cycle_time)::float / NULLIF(COUNT(*), 0), 0) AS average_cycle_time_all,
+        COALESCE(AVG({t}.approval_time_days) FILTER (WHERE {t}.approval_time_days > 0), 0)::float AS average_approval_time,
+        COUNT(*) FILTER (WHERE {t}.on_time_delivery) AS on_time_deliveries,
+        COALESCE(SUM({t}.total_cost), 0)::float AS total_cost,
+        COALESCE(SUM({t}.quantity_required), 0)::float AS total_quantity,
+        COALESCE(AVG({t}.budget_variance) FILTER (WHERE {t}.budget_variance != 0), 0)::float AS budget_variance_avg,
+        COUNT(*) FILTER (WHERE {t}.quality_approved) AS quality_approved_count,
+        COALESCE(AVG({t}.quality_score) FILTER (WHERE {t}.quality_score > 0), 0)::float AS average_quality_score,
+        COUNT(*) FILTER (WHERE {t}.priority = 'emergency') AS emergency_requisitions,
+        COUNT(*) FILTER (WHERE {t}.priority IN ('high', 'urgent', 'emergency')) AS high_priority_requisitions,
+        COUNT(*) FILTER (WHERE {t}.priority IN ('high', 'urgent', 'emergency') AND {t}.state = 'completed') AS high_priority_completed
+    """
+    
+    @api.model
+    def _get_kpi_aggregates(self, domain, groupby=()):
+        """Compute the KPI aggregates of analytics rows in a single query
+        
+        Args:
+            domain: Search domain on analytics rows (period, department, priority...)
+            groupby: Optional groupby specifications as for read_group, e.g.
+                ['department_id'] or ['requisition_date:month']
+        
+        Returns:
+            list of dicts, one per group, holding the group values under their
+            groupby specification and the aggregates of _KPI_AGGREGATES
+        """
+        query = self._search(domain)
+        groupby_terms = [self._read_group_groupby(spec, query) for spec in groupby]
+        if groupby_terms:
+            query.groupby = SQL(', ').join(groupby_terms)
+        
+        self.env.cr.execute(query.select(
+            *[SQL('%s AS %s', term, SQL.identifier(f'group_{i}')) for i, term in enumerate(groupby_terms)],
+            SQL(self._KPI_AGGREGATES.format(t=f'"{self._table}"')),
+        ))
+        
+        rows = self.env.cr.dictfetchall()
+        for row in rows:
+            for i, spec in enumerate(groupby):
+                row[spec] = row.pop(f'group_{i}')
+        return rows
 
 class RequisitionKPI(models.Model):
     _name = 'manufacturing.requisition.kpi'
@@ -188,65 +358,37 @@ class RequisitionKPI(models.Model):
         if department_id:
             domain.append(('department_id', '=', department_id))
         
-        analytics = self.env['manufacturing.requisition.analytics'].search(domain)
-        
-        if not analytics:
+        aggregates = self.env['manufacturing.requisition.analytics']._get_kpi_aggregates(domain)
+        return self._kpis_from_aggregates(aggregates[0]) if aggregates else {}
+    
+    @api.model
+    def _kpis_from_aggregates(self, aggregates):
+        """Turn a row of _get_kpi_aggregates into KPI values"""
+        total_requisitions = aggregates['total_requisitions']
+        if not total_requisitions:
             return {}
         
-        # Volume Metrics
-        total_requisitions = len(analytics)
-        completed_requisitions = len(analytics.filtered(lambda x: x.state == 'completed'))
-        cancelled_requisitions = len(analytics.filtered(lambda x: x.state == 'cancelled'))
-        pending_requisitions = len(analytics.filtered(lambda x: x.state not in ['completed', 'cancelled']))
-        
-        # Performance Metrics
-        completed_analytics = analytics.filtered(lambda x: x.total_cycle_time > 0)
-        average_cycle_time = sum(completed_analytics.mapped('total_cycle_time')) / len(completed_analytics) if completed_analytics else 0
-        
-        approved_analytics = analytics.filtered(lambda x: x.approval_time_days > 0)
-        average_approval_time = sum(approved_analytics.mapped('approval_time_days')) / len(approved_analytics) if approved_analytics else 0
-        
-        on_time_deliveries = len(analytics.filtered(lambda x: x.on_time_delivery))
-        on_time_delivery_rate = (on_time_deliveries / total_requisitions) * 100 if total_requisitions > 0 else 0
-        
-        completion_rate = (completed_requisitions / total_requisitions) * 100 if total_requisitions > 0 else 0
-        
-        # Cost Metrics
-        total_cost = sum(analytics.mapped('total_cost'))
-        average_cost_per_requisition = total_cost / total_requisitions if total_requisitions > 0 else 0
-        
-        budget_variances = analytics.filtered(lambda x: x.budget_variance != 0).mapped('budget_variance')
-        budget_variance_avg = sum(budget_variances) / len(budget_variances) if budget_variances else 0
-        
-        # Quality Metrics
-        quality_approved_count = len(analytics.filtered(lambda x: x.quality_approved))
-        quality_approval_rate = (quality_approved_count / total_requisitions) * 100 if total_requisitions > 0 else 0
-        
-        quality_scores = analytics.filtered(lambda x: x.quality_score > 0).mapped('quality_score')
-        average_quality_score = sum(quality_scores) / len(quality_scores) if quality_scores else 0
-        
-        # Emergency Metrics
-        emergency_requisitions = len(analytics.filtered(lambda x: x.priority == 'emergency'))
-        high_priority_requisitions = len(analytics.filtered(lambda x: x.priority in ['high', 'urgent', 'emergency']))
-        high_priority_completed = len(analytics.filtered(lambda x: x.priority in ['high', 'urgent', 'emergency'] and x.state == 'completed'))
-        high_priority_completion_rate = (high_priority_completed / high_priority_requisitions) * 100 if high_priority_requisitions > 0 else 0
+        high_priority_requisitions = aggregates['high_priority_requisitions']
         
         return {
             'total_requisitions': total_requisitions,
-            'completed_requisitions': completed_requisitions,
-            'cancelled_requisitions': cancelled_requisitions,
-            'pending_requisitions': pending_requisitions,
-            'average_cycle_time': average_cycle_time,
-            'average_approval_time': average_approval_time,
-            'on_time_delivery_rate': on_time_delivery_rate,
-            'completion_rate': completion_rate,
-            'total_cost': total_cost,
-            'average_cost_per_requisition': average_cost_per_requisition,
-            'budget_variance_avg': budget_variance_avg,
-            'quality_approval_rate': quality_approval_rate,
-            'average_quality_score': average_quality_score,
-            'emergency_requisitions': emergency_requisitions,
-            'high_priority_completion_rate': high_priority_completion_rate,
+            'completed_requisitions': aggregates['completed_requisitions'],
+            'cancelled_requisitions': aggregates['cancelled_requisitions'],
+            'pending_requisitions': aggregates['pending_requisitions'],
+            'average_cycle_time': aggregates['average_cycle_time'],
+            'average_approval_time': aggregates['average_approval_time'],
+            'on_time_delivery_rate': (aggregates['on_time_deliveries'] / total_requisitions) * 100,
+            'completion_rate': (aggregates['completed_requisitions'] / total_requisitions) * 100,
+            'total_cost': aggregates['total_cost'],
+            'average_cost_per_requisition': aggregates['total_cost'] / total_requisitions,
+            'budget_variance_avg': aggregates['budget_variance_avg'],
+            'quality_approval_rate': (aggregates['quality_approved_count'] / total_requisitions) * 100,
+            'average_quality_score': aggregates['average_quality_score'],
+            'emergency_requisitions': aggregates['emergency_requisitions'],
+            'high_priority_completion_rate': (
+                (aggregates['high_priority_completed'] / high_priority_requisitions) * 100
+                if high_priority_requisitions > 0 else 0
+            ),
         }
     
     @api.model
@@ -257,11 +399,16 @@ class RequisitionKPI(models.Model):
         period_start = today.replace(day=1)
         period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
         
-        # Get all departments
-        departments = self.env['hr.department'].search([])
+        # Get the KPIs of all departments at once
+        aggregates = self.env['manufacturing.requisition.analytics']._get_kpi_aggregates([
+            ('requisition_date', '>=', period_start),
+            ('requisition_date', '<=', period_end),
+            ('department_id', '!=', False)
+        ], ['department_id'])
+        kpis_by_department = {row['department_id']: self._kpis_from_aggregates(row) for row in aggregates}
         
-        for department in departments:
-            kpi_data = self.calculate_kpis(period_start, period_end, department.id)
+        for department in self.env['hr.department'].browse(list(kpis_by_department)):
+            kpi_data = kpis_by_department[department.id]
             
             if kpi_data.get('total_requisitions', 0) > 0:
                 kpi_vals = {
@@ -336,6 +483,73 @@ class RequisitionDashboard(models.Model):
     # Computed Dashboard Data
     dashboard_data = fields.Text('Dashboard Data', compute='_compute_dashboard_data')
     
+    # Snapshots are reused for this many seconds unless a requisition changes
+    DASHBOARD_CACHE_TTL = 30
+    DASHBOARD_CACHE_MAX_ENTRIES = 256
+    # Bumped after every commit touching requisitions, seen by all workers
+    _GENERATION_SEQUENCE = 'manufacturing_requisition_dashboard_generation'
+    
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % self._GENERATION_SEQUENCE)
+    
+    @api.model
+    def _get_cache_generation(self):
+        self.env.cr.execute("SELECT last_value FROM %s" % self._GENERATION_SEQUENCE)
+        return self.env.cr.fetchone()[0]
+    
+    @api.model
+    def _invalidate_dashboard_cache(self):
+        """Expire all dashboard snapshots once the current transaction commits"""
+        cr = self.env.cr
+        if cr.postcommit.data.get('requisition_dashboard_invalidated'):
+            return
+        cr.postcommit.data['requisition_dashboard_invalidated'] = True
+        registry = self.env.registry
+        sequence = self._GENERATION_SEQUENCE
+        
+        @cr.postcommit.add
+        def bump_generation():
+            with registry.cursor() as generation_cr:
+                generation_cr.execute("SELECT nextval('%s')" % sequence)
+    
+    @api.model
+    def _get_cached_snapshot(self, key, compute):
+        """Get a dashboard snapshot from the cache or compute it
+        
+        Concurrent requests for the same key wait for a single computation
+        instead of each running the queries. Snapshots are shared by the users
+        of the same companies, so they must not depend on record rules.
+        
+        Args:
+            key: Tuple identifying the snapshot (date range, department...)
+            compute: Callable returning the snapshot
+        """
+        cache_key = (self.env.cr.dbname, tuple(self.env.companies.ids)) + tuple(key)
+        generation = self._get_cache_generation()
+        
+        entry = _dashboard_cache.get(cache_key)
+        if entry and entry[0] > time.monotonic() and entry[1] == generation:
+            return entry[2]
+        
+        with _dashboard_cache_lock:
+            key_lock = _dashboard_key_locks.setdefault(cache_key, threading.Lock())
+        
+        with key_lock:
+            # Another request may have computed it while this one waited
+            entry = _dashboard_cache.get(cache_key)
+            if entry and entry[0] > time.monotonic() and entry[1] == generation:
+                return entry[2]
+            
+            snapshot = compute()
+            now = time.monotonic()
+            with _dashboard_cache_lock:
+                if len(_dashboard_cache) >= self.DASHBOARD_CACHE_MAX_ENTRIES:
+                    for expired in [k for k, v in _dashboard_cache.items() if v[0] <= now]:
+                        del _dashboard_cache[expired]
+                        _dashboard_key_locks.pop(expired, None)
+                _dashboard_cache[cache_key] = (now + self.DASHBOARD_CACHE_TTL, generation, snapshot)
+        return snapshot
+    
     @api.depends('date_range', 'date_from', 'date_to', 'department_id')
     def _compute_dashboard_data(self):
         for record in self:
@@ -368,9 +582,19 @@ class RequisitionDashboard(models.Model):
             return self.date_from or today, self.date_to or today
     
     def _get_dashboard_data(self):
-        """Get dashboard data"""
+        """Get dashboard data as JSON"""
         date_from, date_to = self._get_date_range()
-        
+        dashboard_data = self._get_cached_snapshot(
+            ('dashboard', date_from, date_to, self.department_id.id),
+            lambda: self._compute_dashboard_snapshot(date_from, date_to)
+        )
+        # Alerts list requisitions under the record rules of the current user,
+        # so they are never part of the shared snapshot
+        dashboard_data = dict(dashboard_data, alerts=self._get_alerts())
+        return json.dumps(dashboard_data, default=str)
+    
+    def _compute_dashboard_snapshot(self, date_from, date_to):
+        """Compute dashboard data"""
         # Get analytics data
         domain = [
             ('requisition_date', '>=', date_from),
@@ -380,8 +604,6 @@ class RequisitionDashboard(models.Model):
         if self.department_id:
             domain.append(('department_id', '=', self.department_id.id))
         
-        analytics = self.env['manufacturing.requisition.analytics'].search(domain)
-        
         # Calculate KPIs
         kpi_model = self.env['manufacturing.requisition.kpi']
         kpis = kpi_model.calculate_kpis(date_from, date_to, self.department_id.id if self.department_id else None)
@@ -389,19 +611,15 @@ class RequisitionDashboard(models.Model):
         # Get trend data (last 6 months)
         trend_data = self._get_trend_data(date_from, date_to)
         
-        # Get alerts
-        alerts = self._get_alerts()
-        
         # Get top products
-        top_products = self._get_top_products(analytics)
+        top_products = self._get_top_products(domain)
         
         # Get vendor performance
-        vendor_performance = self._get_vendor_performance(analytics)
+        vendor_performance = self._get_vendor_performance(domain)
         
         dashboard_data = {
             'kpis': kpis,
             'trend_data': trend_data,
-            'alerts': alerts,
             'top_products': top_products,
             'vendor_performance': vendor_performance,
             'date_range': {
@@ -410,40 +628,114 @@ class RequisitionDashboard(models.Model):
             }
         }
         
-        return str(dashboard_data)
+        return dashboard_data
+    
+    @api.model
+    def get_api_dashboard(self, date_from, date_to):
+        """Get the analytics dashboard served by the API, cached per period"""
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        return self._get_cached_snapshot(
+            ('api', date_from, date_to),
+            lambda: self._compute_api_dashboard(date_from, date_to)
+        )
+    
+    @api.model
+    def _compute_api_dashboard(self, date_from, date_to):
+        """Compute the API dashboard with grouped aggregates"""
+        analytics = self.env['manufacturing.requisition.analytics']
+        domain = [
+            ('requisition_date', '>=', date_from),
+            ('requisition_date', '<=', date_to)
+        ]
+        
+        # Calculate KPIs
+        totals = analytics._get_kpi_aggregates(domain)[0]
+        total_requisitions = totals['total_requisitions']
+        completed_requisitions = totals['completed_requisitions']
+        emergency_count = analytics._get_kpi_aggregates(
+            domain + [('requisition_type', '=', 'emergency')]
+        )[0]['total_requisitions']
+        
+        # Get top products
+        product_rows = sorted(
+            analytics._get_kpi_aggregates(domain, ['product_id']),
+            key=lambda x: x['total_requisitions'], reverse=True
+        )[:10]
+        products = self.env['product.product'].browse([row['product_id'] for row in product_rows if row['product_id']])
+        product_names = {product.id: product.name for product in products}
+        top_products = [{
+            'name': product_names.get(row['product_id'], False),
+            'count': row['total_requisitions'],
+            'total_cost': row['total_cost']
+        } for row in product_rows]
+        
+        # Get department performance
+        department_rows = analytics._get_kpi_aggregates(domain + [('department_id', '!=', False)], ['department_id'])
+        departments = self.env['hr.department'].browse([row['department_id'] for row in department_rows])
+        department_performance = [{
+            'name': department.name,
+            'count': row['total_requisitions'],
+            'avg_cycle_time': row['average_cycle_time_all'],
+            'total_cost': row['total_cost']
+        } for department, row in zip(departments, department_rows)]
+        
+        return {
+            'period': {
+                'date_from': date_from.isoformat(),
+                'date_to': date_to.isoformat()
+            },
+            'kpis': {
+                'total_requisitions': total_requisitions,
+                'completed_requisitions': completed_requisitions,
+                'completion_rate': (completed_requisitions / total_requisitions * 100) if total_requisitions else 0,
+                'avg_cycle_time': totals['average_cycle_time_all'] if total_requisitions else 0,
+                'total_cost': totals['total_cost'],
+                'on_time_delivery_rate': (totals['on_time_deliveries'] / total_requisitions * 100) if total_requisitions else 0,
+                'emergency_count': emergency_count,
+                'emergency_rate': (emergency_count / total_requisitions * 100) if total_requisitions else 0
+            },
+            'top_products': top_products,
+            'department_performance': department_performance
+        }
     
     def _get_trend_data(self, date_from, date_to):
         """Get trend data for charts"""
-        # Get monthly data for the last 6 months
-        months = []
+        # Monthly data for the last 6 months, aggregated in one query
+        month_starts = []
         current_date = date_to
-        
         for i in range(6):
-            month_start = current_date.replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            domain = [
-                ('requisition_date', '>=', month_start),
-                ('requisition_date', '<=', month_end)
-            ]
-            
-            if self.department_id:
-                domain.append(('department_id', '=', self.department_id.id))
-            
-            analytics = self.env['manufacturing.requisition.analytics'].search(domain)
-            
+            month_starts.append(current_date.replace(day=1))
+            # Move to previous month
+            current_date = month_starts[-1] - timedelta(days=1)
+        month_starts.reverse()
+        
+        domain = [
+            ('requisition_date', '>=', month_starts[0]),
+            ('requisition_date', '<', (month_starts[-1] + timedelta(days=32)).replace(day=1))
+        ]
+        if self.department_id:
+            domain.append(('department_id', '=', self.department_id.id))
+        
+        by_month = {
+            fields.Date.to_date(row['requisition_date:month']): row
+            for row in self.env['manufacturing.requisition.analytics']._get_kpi_aggregates(
+                domain, ['requisition_date:month']
+            )
+        }
+        
+        months = []
+        for month_start in month_starts:
+            row = by_month.get(month_start, {})
             months.append({
                 'month': month_start.strftime('%B %Y'),
-                'total_requisitions': len(analytics),
-                'completed_requisitions': len(analytics.filtered(lambda x: x.state == 'completed')),
-                'total_cost': sum(analytics.mapped('total_cost')),
-                'average_cycle_time': sum(analytics.mapped('total_cycle_time')) / len(analytics) if analytics else 0
+                'total_requisitions': row.get('total_requisitions', 0),
+                'completed_requisitions': row.get('completed_requisitions', 0),
+                'total_cost': row.get('total_cost', 0),
+                'average_cycle_time': row.get('average_cycle_time_all', 0)
             })
-            
-            # Move to previous month
-            current_date = month_start - timedelta(days=1)
         
-        return list(reversed(months))
+        return months
     
     def _get_alerts(self):
         """Get dashboard alerts"""
@@ -493,60 +785,42 @@ class RequisitionDashboard(models.Model):
         
         return alerts
     
-    def _get_top_products(self, analytics):
+    def _get_top_products(self, domain):
         """Get top requested products"""
-        product_data = {}
-        
-        for record in analytics:
-            if record.product_id:
-                if record.product_id.id not in product_data:
-                    product_data[record.product_id.id] = {
-                        'product_name': record.product_id.name,
-                        'quantity': 0,
-                        'cost': 0,
-                        'count': 0
-                    }
-                
-                product_data[record.product_id.id]['quantity'] += record.quantity_required
-                product_data[record.product_id.id]['cost'] += record.total_cost
-                product_data[record.product_id.id]['count'] += 1
+        rows = self.env['manufacturing.requisition.analytics']._get_kpi_aggregates(
+            domain + [('product_id', '!=', False)], ['product_id']
+        )
         
         # Sort by quantity and return top 10
-        sorted_products = sorted(product_data.values(), key=lambda x: x['quantity'], reverse=True)
-        return sorted_products[:10]
-    
-    def _get_vendor_performance(self, analytics):
+        rows = sorted(rows, key=lambda x: x['total_quantity'], reverse=True)[:10]
+        products = self.env['product.product'].browse([row['product_id'] for row in rows])
+        return [{
+            'product_name': product.name,
+            'quantity': row['total_quantity'],
+            'cost': row['total_cost'],
+            'count': row['total_requisitions']
+        } for product, row in zip(products, rows)]
+    
+    def _get_vendor_performance(self, domain):
         """Get vendor performance data"""
-        vendor_data = {}
-        
-        for record in analytics.filtered(lambda x: x.vendor_id):
-            if record.vendor_id.id not in vendor_data:
-                vendor_data[record.vendor_id.id] = {
-                    'vendor_name': record.vendor_id.name,
-                    'total_orders': 0,
-                    'on_time_deliveries': 0,
-                    'total_cost': 0,
-                    'average_quality_score': 0,
-                    'quality_scores': []
-                }
-            
-            vendor_data[record.vendor_id.id]['total_orders'] += 1
-            vendor_data[record.vendor_id.id]['total_cost'] += record.total_cost
-            
-            if record.on_time_delivery:
-                vendor_data[record.vendor_id.id]['on_time_deliveries'] += 1
-            
-            if record.quality_score > 0:
-                vendor_data[record.vendor_id.id]['quality_scores'].append(record.quality_score)
+        rows = self.env['manufacturing.requisition.analytics']._get_kpi_aggregates(
+            domain + [('vendor_id', '!=', False)], ['vendor_id']
+        )
         
         # Calculate performance metrics
-        for vendor_id, data in vendor_data.items():
-            data['on_time_rate'] = (data['on_time_deliveries'] / data['total_orders']) * 100 if data['total_orders'] > 0 else 0
-            data['average_quality_score'] = sum(data['quality_scores']) / len(data['quality_scores']) if data['quality_scores'] else 0
-            del data['quality_scores']  # Remove raw scores
+        vendor_data = []
+        for vendor, row in zip(self.env['res.partner'].browse([row['vendor_id'] for row in rows]), rows):
+            vendor_data.append({
+                'vendor_name': vendor.name,
+                'total_orders': row['total_requisitions'],
+                'on_time_deliveries': row['on_time_deliveries'],
+                'total_cost': row['total_cost'],
+                'average_quality_score': row['average_quality_score'],
+                'on_time_rate': (row['on_time_deliveries'] / row['total_requisitions']) * 100,
+            })
         
         # Sort by on-time rate and return top 10
-        sorted_vendors = sorted(vendor_data.values(), key=lambda x: x['on_time_rate'], reverse=True)
+        sorted_vendors = sorted(vendor_data, key=lambda x: x['on_time_rate'], reverse=True)
         return sorted_vendors[:10]
     
     def action_refresh_dashboard(self):
@@ -647,4 +921,24 @@ class ShopFloorAnalytics(models.Model):
         """Refresh analytics data"""
         self._compute_analytics()
         self._compute_chart_data()
-        return True 
\ No newline at end of file
+        return True 
+
+
+# Expire cached dashboards when requisitions change
+class ManufacturingRequisition(models.Model):
+    _inherit = 'manufacturing.material.requisition'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['manufacturing.requisition.dashboard']._invalidate_dashboard_cache()
+        return records
+    
+    def write(self, vals):
+        result = super().write(vals)
+        self.env['manufacturing.requisition.dashboard']._invalidate_dashboard_cache()
+        return result
+    
+    def unlink(self):
+        self.env['manufacturing.requisition.dashboard']._invalidate_dashboard_cache()
+        return super().unlink()
\ No newline at end of file
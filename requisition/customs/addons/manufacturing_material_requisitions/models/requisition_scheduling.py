@@ -179,7 +179,7 @@ class RequisitionSchedulerRule(models.Model):
     
     def _execute_stock_based_rule(self):
         """Execute stock level based requisition creation"""
-        requisitions_created = 0
+        vals_list = []
         
         for product in self.product_ids:
             stock_qty = product.qty_available
@@ -207,10 +207,11 @@ class RequisitionSchedulerRule(models.Model):
                         'department_id': self.template_id.department_id.id or requisition_vals['department_id'],
                     })
                 
-                requisition = self.env['manufacturing.material.requisition'].create(requisition_vals)
-                requisitions_created += 1
+                vals_list.append(requisition_vals)
         
-        return requisitions_created
+        # Create all requisitions in one batch
+        requisitions = self.env['manufacturing.material.requisition'].create(vals_list)
+        return len(requisitions)
     
     def _execute_time_based_rule(self):
         """Execute time-based requisition creation"""
@@ -220,7 +221,7 @@ class RequisitionSchedulerRule(models.Model):
     
     def _execute_production_based_rule(self):
         """Execute production schedule based requisition creation"""
-        requisitions_created = 0
+        vals_list = []
         
         # Look for upcoming production orders
         future_date = fields.Date.today() + timedelta(days=self.production_forecast_days)
@@ -230,14 +231,19 @@ class RequisitionSchedulerRule(models.Model):
             ('state', 'in', ['confirmed', 'planned'])
         ])
         
+        # Compute the available quantity of all materials at once
+        products = production_orders.move_raw_ids.product_id
+        qty_available = dict(zip(products.ids, products.mapped('qty_available')))
+        
         for production in production_orders:
             # Check if materials are available
             missing_materials = []
             for move in production.move_raw_ids:
-                if move.product_uom_qty > move.product_id.qty_available:
+                available = qty_available[move.product_id.id]
+                if move.product_uom_qty > available:
                     missing_materials.append({
                         'product_id': move.product_id.id,
-                        'required_qty': move.product_uom_qty - move.product_id.qty_available,
+                        'required_qty': move.product_uom_qty - available,
                         'uom_id': move.product_uom.id
                     })
             
@@ -259,10 +265,11 @@ class RequisitionSchedulerRule(models.Model):
                     }) for material in missing_materials]
                 }
                 
-                requisition = self.env['manufacturing.material.requisition'].create(requisition_vals)
-                requisitions_created += 1
+                vals_list.append(requisition_vals)
         
-        return requisitions_created
+        # Create all requisitions in one batch
+        requisitions = self.env['manufacturing.material.requisition'].create(vals_list)
+        return len(requisitions)
     
     def _execute_consumption_based_rule(self):
         """Execute consumption pattern based requisition creation"""
@@ -130,8 +130,23 @@ class ShopFloorRequisition(models.Model):
         if vals.get('barcode_scan_log'):
             requisition._process_barcode_scans()
         
+        requisition.machine_id._notify_status_changed()
+        
         return requisition
     
+    def write(self, vals):
+        machines = self.machine_id
+        result = super().write(vals)
+        if 'state' in vals or 'machine_id' in vals:
+            (machines | self.machine_id)._notify_status_changed()
+        return result
+    
+    def unlink(self):
+        machines = self.machine_id
+        result = super().unlink()
+        machines._notify_status_changed()
+        return result
+    
     @api.model
     def create_emergency_requisition(self, machine_id, operator_id, materials, impact='production_stop'):
         """Create emergency requisition from shop floor"""
@@ -0,0 +1,2 @@
+# Tests for Manufacturing Material Requisitions module
+from . import test_product_lookup
@@ -0,0 +1,47 @@
+from odoo.tests.common import TransactionCase
+from odoo.tests import tagged
+
+@tagged('post_install', '-at_install')
+class TestProductLookup(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Product = cls.env['product.product']
+        cls.pump = cls.Product.create({
+            'name': 'Hydraulic Pump Assembly',
+            'default_code': 'HYD-PUMP-200',
+        })
+        cls.valve = cls.Product.create({
+            'name': 'Ball Valve',
+            'default_code': 'BV-050',
+        })
+
+    def setUp(self):
+        super().setUp()
+        if not self.env.registry.has_trigram:
+            self.skipTest("pg_trgm is not installed")
+
+    def test_fuzzy_search_name_typo(self):
+        """Misspelled names are found by similarity when no substring matches"""
+        self.assertFalse(self.Product.search([('name', 'ilike', 'Hydralic Pump')]))
+        
+        products = self.Product._search_fuzzy('Hydralic Pump')
+        
+        self.assertIn(self.pump, products)
+        self.assertNotIn(self.valve, products)
+
+    def test_fuzzy_search_reference_typo(self):
+        """Misspelled internal references are found by similarity"""
+        self.assertFalse(self.Product.search([('default_code', 'ilike', 'HYD-PMP-200')]))
+        
+        products = self.Product._search_fuzzy('HYD-PMP-200')
+        
+        self.assertIn(self.pump, products)
+
+    def test_fuzzy_search_substring_first(self):
+        """Substring matches come before similar products, without duplicates"""
+        products = self.Product._search_fuzzy('Hydraulic Pump')
+        
+        self.assertEqual(products[:1], self.pump)
+        self.assertEqual(len(products), len(set(products.ids)))
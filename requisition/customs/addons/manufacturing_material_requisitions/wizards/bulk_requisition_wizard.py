@@ -270,7 +270,7 @@ class BulkRequisitionWizard(models.TransientModel):
                 'type': 'ir.actions.act_window',
                 'name': _('Created Requisitions'),
                 'res_model': 'manufacturing.material.requisition',
-                'domain': [('id', 'in', [r.id for r in requisitions])],
+                'domain': [('id', 'in', requisitions.ids)],
                 'view_mode': 'tree,form',
                 'target': 'current',
             }
@@ -279,14 +279,9 @@ class BulkRequisitionWizard(models.TransientModel):
         """Create single requisition with all lines"""
         requisition_vals = self._get_base_requisition_vals()
         requisition_vals['reason'] = f'Bulk requisition - {self.creation_method}'
+        requisition_vals['line_ids'] = [(0, 0, self._get_requisition_line_vals(line)) for line in self.line_ids]
         
-        requisition = self.env['manufacturing.material.requisition'].create(requisition_vals)
-        
-        # Create lines
-        for line in self.line_ids:
-            self._create_requisition_line(requisition, line)
-        
-        return [requisition]
+        return self.env['manufacturing.material.requisition'].create(requisition_vals)
     
     def _create_grouped_by_vendor(self):
         """Create requisitions grouped by vendor"""
@@ -303,20 +298,16 @@ class BulkRequisitionWizard(models.TransientModel):
                 }
             vendor_groups[vendor_key]['lines'].append(line)
         
-        requisitions = []
+        vals_list = []
         for vendor_key, group in vendor_groups.items():
             requisition_vals = self._get_base_requisition_vals()
             vendor_name = group['vendor'].name if group['vendor'] else 'No Vendor'
             requisition_vals['reason'] = f'Bulk requisition - {vendor_name}'
-            
-            requisition = self.env['manufacturing.material.requisition'].create(requisition_vals)
-            
-            for line in group['lines']:
-                self._create_requisition_line(requisition, line)
-            
-            requisitions.append(requisition)
+            requisition_vals['line_ids'] = [(0, 0, self._get_requisition_line_vals(line)) for line in group['lines']]
+            vals_list.append(requisition_vals)
         
-        return requisitions
+        # Create all requisitions in one batch
+        return self.env['manufacturing.material.requisition'].create(vals_list)
     
     def _create_grouped_by_category(self):
         """Create requisitions grouped by product category"""
@@ -333,19 +324,15 @@ class BulkRequisitionWizard(models.TransientModel):
                 }
             category_groups[category_key]['lines'].append(line)
         
-        requisitions = []
+        vals_list = []
         for category_key, group in category_groups.items():
             requisition_vals = self._get_base_requisition_vals()
             requisition_vals['reason'] = f'Bulk requisition - {group["category"].name}'
-            
-            requisition = self.env['manufacturing.material.requisition'].create(requisition_vals)
-            
-            for line in group['lines']:
-                self._create_requisition_line(requisition, line)
-            
-            requisitions.append(requisition)
+            requisition_vals['line_ids'] = [(0, 0, self._get_requisition_line_vals(line)) for line in group['lines']]
+            vals_list.append(requisition_vals)
         
-        return requisitions
+        # Create all requisitions in one batch
+        return self.env['manufacturing.material.requisition'].create(vals_list)
     
     def _get_base_requisition_vals(self):
         """Get base requisition values"""
@@ -358,10 +345,9 @@ class BulkRequisitionWizard(models.TransientModel):
             'priority': self.priority,
         }
     
-    def _create_requisition_line(self, requisition, wizard_line):
-        """Create requisition line from wizard line"""
+    def _get_requisition_line_vals(self, wizard_line):
+        """Get requisition line values from wizard line"""
         line_vals = {
-            'requisition_id': requisition.id,
             'product_id': wizard_line.product_id.id,
             'qty_required': wizard_line.qty_required,
             'unit_price': wizard_line.unit_price,
@@ -375,7 +361,7 @@ class BulkRequisitionWizard(models.TransientModel):
         if wizard_line.bom_line_id:
             line_vals['bom_line_id'] = wizard_line.bom_line_id.id
         
-        return self.env['manufacturing.material.requisition.line'].create(line_vals)
+        return line_vals
 
 
 class BulkRequisitionLine(models.TransientModel):
@@ -3,22 +3,30 @@ import logging
 import json
 import time
 from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
 from odoo import api, models, fields, _
 from odoo.exceptions import UserError, ValidationError
 
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
+
 _logger = logging.getLogger(__name__)
 
 class OpenAIService:
     """OpenAI service provider for the OmniHR AI Platform"""
     
-    def __init__(self, api_key: str, organization: Optional[str] = None):
+    def __init__(self, api_key: str, organization: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None, rate_limit_wait: float = 0,
+                 response_cache: Optional[ResponseCache] = None):
         """Initialize OpenAI service
         
         Args:
             api_key: OpenAI API key
             organization: Optional organization ID
+            rate_limiter: Optional limiter shared with other service instances
+            rate_limit_wait: Seconds to wait for rate limit capacity before failing
+            response_cache: Optional cache serving repeated generate_text requests
         """
         self.api_key = api_key
         self.organization = organization
@@ -31,8 +39,9 @@ class OpenAIService:
             'tokens_per_minute': 90000,
             'requests_per_day': 10000
         }
-        self.request_history = []
-        self.token_usage = []
+        self.rate_limiter = rate_limiter or RateLimiter.from_limits(self.rate_limits)
+        self.rate_limit_wait = rate_limit_wait
+        self.response_cache = response_cache
         
         # Model configurations
         self.models = {
@@ -78,48 +87,34 @@ class OpenAIService:
             _logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             raise UserError(_("Failed to initialize OpenAI client: %s") % str(e))
     
-    def _check_rate_limits(self, estimated_tokens: int = 1000) -> bool:
-        """Check if request is within rate limits
+    def _check_rate_limits(self, estimated_tokens: int = 1000) -> Optional[float]:
+        """Reserve rate limit capacity for a request
+        
+        Waits up to ``rate_limit_wait`` seconds for capacity to free up.
         
         Args:
             estimated_tokens: Estimated tokens for the request
             
         Returns:
-            bool: True if within limits, False otherwise
+            float: Reservation time to pass to _log_request, None if the
+            limits are exceeded
         """
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
-        day_ago = now - timedelta(days=1)
-        
-        # Clean old entries
-        self.request_history = [req for req in self.request_history if req['timestamp'] > day_ago]
-        self.token_usage = [usage for usage in self.token_usage if usage['timestamp'] > minute_ago]
-        
-        # Check requests per minute
-        recent_requests = [req for req in self.request_history if req['timestamp'] > minute_ago]
-        if len(recent_requests) >= self.rate_limits['requests_per_minute']:
-            return False
-        
-        # Check tokens per minute
-        recent_tokens = sum(usage['tokens'] for usage in self.token_usage)
-        if recent_tokens + estimated_tokens > self.rate_limits['tokens_per_minute']:
-            return False
-        
-        # Check requests per day
-        if len(self.request_history) >= self.rate_limits['requests_per_day']:
-            return False
-        
-        return True
+        return self.rate_limiter.reserve(
+            estimated_tokens,
+            block=self.rate_limit_wait > 0,
+            timeout=self.rate_limit_wait
+        )
     
-    def _log_request(self, tokens_used: int):
+    def _log_request(self, tokens_used: int, estimated_tokens: int = 0,
+                     reserved_at: Optional[float] = None):
         """Log request for rate limiting
         
         Args:
             tokens_used: Number of tokens used in the request
+            estimated_tokens: Tokens already reserved by _check_rate_limits
+            reserved_at: Reservation time returned by _check_rate_limits
         """
-        now = datetime.now()
-        self.request_history.append({'timestamp': now})
-        self.token_usage.append({'timestamp': now, 'tokens': tokens_used})
+        self.rate_limiter.record_usage(tokens_used - estimated_tokens, reserved_at)
     
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count for text
@@ -155,8 +150,21 @@ class OpenAIService:
             if system_message:
                 estimated_tokens += self._estimate_tokens(system_message)
             
+            # Serve repeated requests from the response cache
+            cache_key = None
+            if self.response_cache:
+                cache_key = self.response_cache.make_key(
+                    'openai', model, temperature, system_message, prompt,
+                    max_tokens=max_tokens, **kwargs
+                )
+                cached_response = self.response_cache.get(cache_key, provider='openai')
+                if cached_response is not None:
+                    cached_response.update({'cached': True, 'cost': 0.0, 'response_time': 0.0})
+                    return cached_response
+            
             # Check rate limits
-            if not self._check_rate_limits(estimated_tokens):
+            reserved_at = self._check_rate_limits(estimated_tokens)
+            if reserved_at is None:
                 raise UserError(_("Rate limit exceeded. Please try again later."))
             
             # Prepare messages
@@ -184,7 +192,7 @@ class OpenAIService:
             tokens_used = response.usage.total_tokens
             
             # Log request
-            self._log_request(tokens_used)
+            self._log_request(tokens_used, estimated_tokens, reserved_at)
             
             # Calculate cost
             model_config = self.models.get(model, {})
@@ -192,7 +200,7 @@ class OpenAIService:
             output_cost = (response.usage.completion_tokens / 1000) * model_config.get('cost_per_1k_output', 0)
             total_cost = input_cost + output_cost
             
-            return {
+            result = {
                 'success': True,
                 'content': response.choices[0].message.content,
                 'model': model,
@@ -205,6 +213,11 @@ class OpenAIService:
                 'timestamp': datetime.now().isoformat()
             }
             
+            if cache_key:
+                self.response_cache.set(cache_key, result)
+            
+            return result
+            
         except Exception as e:
             _logger.error(f"OpenAI text generation failed: {str(e)}")
             return {
@@ -234,7 +247,8 @@ class OpenAIService:
             total_tokens = sum(self._estimate_tokens(text) for text in texts)
             
             # Check rate limits
-            if not self._check_rate_limits(total_tokens):
+            reserved_at = self._check_rate_limits(total_tokens)
+            if reserved_at is None:
                 raise UserError(_("Rate limit exceeded. Please try again later."))
             
             # Make API call
@@ -249,7 +263,7 @@ class OpenAIService:
             tokens_used = response.usage.total_tokens
             
             # Log request
-            self._log_request(tokens_used)
+            self._log_request(tokens_used, total_tokens, reserved_at)
             
             # Calculate cost
             model_config = self.models.get(model, {})
@@ -469,19 +483,16 @@ class OpenAIService:
                 max_tokens=10
             )
             
+            usage = self.rate_limiter.get_usage()
+            
             return {
                 'status': 'healthy' if test_response['success'] else 'unhealthy',
                 'provider': 'openai',
                 'available_models': list(self.models.keys()),
                 'rate_limit_status': {
-                    'requests_remaining': max(0, self.rate_limits['requests_per_minute'] - len([
-                        req for req in self.request_history 
-                        if req['timestamp'] > datetime.now() - timedelta(minutes=1)
-                    ])),
-                    'tokens_remaining': max(0, self.rate_limits['tokens_per_minute'] - sum([
-                        usage['tokens'] for usage in self.token_usage
-                        if usage['timestamp'] > datetime.now() - timedelta(minutes=1)
-                    ]))
+                    'requests_remaining': usage['requests_remaining'],
+                    'tokens_remaining': usage['tokens_remaining'],
+                    'daily_requests_remaining': usage['daily_requests_remaining']
                 },
                 'last_check': datetime.now().isoformat(),
                 'test_response': test_response
@@ -501,18 +512,13 @@ class OpenAIService:
             Dict containing usage stats
         """
         now = datetime.now()
-        hour_ago = now - timedelta(hours=1)
-        day_ago = now - timedelta(days=1)
-        
-        recent_requests = [req for req in self.request_history if req['timestamp'] > hour_ago]
-        daily_requests = [req for req in self.request_history if req['timestamp'] > day_ago]
-        recent_tokens = [usage for usage in self.token_usage if usage['timestamp'] > hour_ago]
+        usage = self.rate_limiter.get_usage()
         
         return {
             'provider': 'openai',
-            'requests_last_hour': len(recent_requests),
-            'requests_last_day': len(daily_requests),
-            'tokens_last_hour': sum(usage['tokens'] for usage in recent_tokens),
+            'requests_last_hour': usage['requests_last_hour'],
+            'requests_last_day': usage['requests_last_day'],
+            'tokens_last_hour': usage['tokens_last_hour'],
             'average_response_time': 0,  # Would need to track this
             'total_cost_estimate': 0,  # Would need to track this
             'timestamp': now.isoformat()
@@ -1,7 +1,7 @@
 import logging
 import json
+import math
 import time
-import statistics
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
@@ -11,46 +11,379 @@ from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch style)
+
+    Values are counted in logarithmic bins, so any quantile is within
+    ``relative_accuracy`` of the true value, two sketches merge by adding their
+    bin counts, and memory is capped at ``max_bins`` bins.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 512):
+        """Initialize quantile sketch
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+            max_bins: Maximum number of bins kept in memory
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Add a value to the sketch"""
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 1e-9:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: 'QuantileSketch'):
+        """Merge another sketch with the same accuracy into this one"""
+        if not other.count:
+            return
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        """Fold the two lowest bins together to respect ``max_bins``"""
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Estimated value (0 for an empty sketch)
+        """
+        if not self.count:
+            return 0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0)
+        cumulative = self.zero_count
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to a JSON-compatible dict"""
+        return {
+            'bins': {str(index): count for index, count in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Rebuild a sketch serialized with :meth:`to_dict`"""
+        sketch = cls()
+        sketch.bins = {int(index): count for index, count in (data.get('bins') or {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data.get('count', 0)
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+
+class MetricBucket:
+    """Aggregated request metrics for one provider over one time slot"""
+
+    MAX_DISTINCT_ERRORS = 50
+
+    __slots__ = ('requests', 'successes', 'total_response_time', 'total_cost',
+                 'total_tokens', 'errors', 'task_types', 'sketch')
+
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.total_response_time = 0.0
+        self.total_cost = 0.0
+        self.total_tokens = 0
+        self.errors = defaultdict(int)
+        self.task_types = defaultdict(int)
+        self.sketch = QuantileSketch()
+
+    def add(self, record: Dict[str, Any]):
+        """Add a request record to the bucket"""
+        self.requests += 1
+        if record['success']:
+            self.successes += 1
+        elif record['error']:
+            self._count_error(record['error'], 1)
+        self.total_response_time += record['response_time']
+        self.total_cost += record['cost']
+        self.total_tokens += record['tokens_used']
+        self.task_types[record['task_type']] += 1
+        self.sketch.add(record['response_time'])
+
+    def merge(self, other: 'MetricBucket'):
+        """Merge another bucket into this one"""
+        self.requests += other.requests
+        self.successes += other.successes
+        self.total_response_time += other.total_response_time
+        self.total_cost += other.total_cost
+        self.total_tokens += other.total_tokens
+        for error, count in other.errors.items():
+            self._count_error(error, count)
+        for task_type, count in other.task_types.items():
+            self.task_types[task_type] += count
+        self.sketch.merge(other.sketch)
+
+    def _count_error(self, error: Any, count: int):
+        error_type = type(error).__name__ if isinstance(error, Exception) else str(error)[:100]
+        if error_type not in self.errors and len(self.errors) >= self.MAX_DISTINCT_ERRORS:
+            error_type = 'other'
+        self.errors[error_type] += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the bucket to a JSON-compatible dict"""
+        return {
+            'requests': self.requests,
+            'successes': self.successes,
+            'total_response_time': self.total_response_time,
+            'total_cost': self.total_cost,
+            'total_tokens': self.total_tokens,
+            'errors': dict(self.errors),
+            'task_types': dict(self.task_types),
+            'sketch': self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MetricBucket':
+        """Rebuild a bucket serialized with :meth:`to_dict`"""
+        bucket = cls()
+        bucket.requests = data.get('requests', 0)
+        bucket.successes = data.get('successes', 0)
+        bucket.total_response_time = data.get('total_response_time', 0.0)
+        bucket.total_cost = data.get('total_cost', 0.0)
+        bucket.total_tokens = data.get('total_tokens', 0)
+        for error, count in (data.get('errors') or {}).items():
+            bucket._count_error(error, count)
+        bucket.task_types.update(data.get('task_types') or {})
+        bucket.sketch = QuantileSketch.from_dict(data.get('sketch') or {})
+        return bucket
+
+    @property
+    def failures(self) -> int:
+        return self.requests - self.successes
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.requests if self.requests else 0
+
+    @property
+    def avg_response_time(self) -> float:
+        return self.total_response_time / self.requests if self.requests else 0
+
+
+class TimeRing:
+    """Fixed-size ring of time-slotted MetricBuckets
+
+    Slot ``i`` of the ring holds period ``index % size``; a slot is reset when
+    a newer period lands on it, so memory never grows with uptime.
+    """
+
+    def __init__(self, size: int, index_of, start_of):
+        """Initialize time ring
+
+        Args:
+            size: Number of periods kept
+            index_of: Callable mapping a datetime to its integer period index
+            start_of: Callable mapping a period index to its start datetime
+        """
+        self.size = size
+        self.index_of = index_of
+        self.start_of = start_of
+        self.slots = [None] * size
+
+    def add(self, timestamp: datetime, record: Dict[str, Any]):
+        """Add a record to the period containing ``timestamp``"""
+        index = self.index_of(timestamp)
+        position = index % self.size
+        slot = self.slots[position]
+        if slot is None or slot[0] != index:
+            slot = (index, MetricBucket())
+            self.slots[position] = slot
+        slot[1].add(record)
+
+    def add_bucket(self, timestamp: datetime, bucket: MetricBucket):
+        """Merge an aggregated bucket into the period containing ``timestamp``"""
+        index = self.index_of(timestamp)
+        position = index % self.size
+        slot = self.slots[position]
+        if slot is None or slot[0] != index:
+            if slot is not None and slot[0] > index:
+                # Older than anything the ring still keeps
+                return
+            slot = (index, MetricBucket())
+            self.slots[position] = slot
+        slot[1].merge(bucket)
+
+    def buckets(self, since: datetime, until: datetime):
+        """Yield ``(index, bucket)`` for the kept periods between two datetimes"""
+        last = self.index_of(until)
+        first = max(self.index_of(since), last - self.size + 1)
+        for index in range(first, last + 1):
+            slot = self.slots[index % self.size]
+            if slot is not None and slot[0] == index:
+                yield index, slot[1]
+
+
+def _minute_index(dt):
+    return (dt.toordinal() * 24 + dt.hour) * 60 + dt.minute
+
+
+def _minute_start(index):
+    hours, minute = divmod(index, 60)
+    days, hour = divmod(hours, 24)
+    return datetime.fromordinal(days).replace(hour=hour, minute=minute)
+
+
+def _hour_index(dt):
+    return dt.toordinal() * 24 + dt.hour
+
+
+def _hour_start(index):
+    days, hour = divmod(index, 24)
+    return datetime.fromordinal(days).replace(hour=hour)
+
+
+def _week_start(index):
+    # Ordinals of Sundays are multiples of 7, matching the '%U' week numbering
+    return datetime.fromordinal(max(index * 7, 1))
+
+
+class ProviderStats:
+    """Streaming aggregates of one provider, guarded by their own lock"""
+
+    # (name, number of periods, period length, index function, start function)
+    GRANULARITIES = (
+        ('minute', 60, timedelta(minutes=1), _minute_index, _minute_start),
+        ('hourly', 24 * 31, timedelta(hours=1), _hour_index, _hour_start),
+        ('daily', 366, timedelta(days=1), lambda dt: dt.toordinal(), datetime.fromordinal),
+        ('weekly', 104, timedelta(weeks=1), lambda dt: dt.toordinal() // 7, _week_start),
+    )
+
+    def __init__(self, resolution: str = 'minute'):
+        """Initialize provider aggregates
+
+        Args:
+            resolution: Finest granularity kept; aggregates rebuilt from hourly
+                buckets use 'hourly' so short ranges are not served from an
+                empty minute ring
+        """
+        names = [granularity[0] for granularity in self.GRANULARITIES]
+        self.granularities = self.GRANULARITIES[names.index(resolution):]
+        self.lock = threading.Lock()
+        self.totals = MetricBucket()
+        self.rings = {
+            name: TimeRing(size, index_of, start_of)
+            for name, size, _length, index_of, start_of in self.granularities
+        }
+        self.response_times = deque(maxlen=1000)
+        self.success_rate_history = deque(maxlen=100)
+        self.last_updated = datetime.now()
+
+    def add(self, record: Dict[str, Any]):
+        """Add a request record (caller holds ``lock``)"""
+        self.totals.add(record)
+        for ring in self.rings.values():
+            ring.add(record['timestamp'], record)
+        self.response_times.append(record['response_time'])
+        self.success_rate_history.append(self.totals.success_rate)
+        self.last_updated = record['timestamp']
+
+    def add_bucket(self, timestamp: datetime, bucket: MetricBucket):
+        """Merge an aggregated bucket starting at ``timestamp`` (caller holds ``lock``)"""
+        self.totals.merge(bucket)
+        for ring in self.rings.values():
+            ring.add_bucket(timestamp, bucket)
+        self.last_updated = max(self.last_updated, timestamp)
+
+    def window(self, time_range: Optional[timedelta], now: datetime) -> MetricBucket:
+        """Merge the buckets covering ``time_range`` (caller holds ``lock``)
+
+        The finest granularity that spans the whole range is used; ranges longer
+        than every ring fall back to the all-time totals.
+        """
+        merged = MetricBucket()
+        if time_range is None:
+            merged.merge(self.totals)
+            return merged
+        for name, size, length, _index_of, _start_of in self.granularities:
+            if time_range <= length * size:
+                for _index, bucket in self.rings[name].buckets(now - time_range, now):
+                    merged.merge(bucket)
+                return merged
+        merged.merge(self.totals)
+        return merged
+
+
 class PerformanceMonitor:
-    """Performance monitoring service for the OmniHR AI Platform"""
-    
-    def __init__(self, max_history_size: int = 10000):
+    """Performance monitoring service for the OmniHR AI Platform
+
+    Metrics are kept as streaming aggregates: per-provider all-time totals plus
+    fixed-size rings of minute, hourly, daily and weekly buckets, each with a
+    mergeable quantile sketch of response times. Logging a request touches a
+    constant number of buckets under that provider's own lock, and reads merge
+    a bounded number of buckets, so cost and memory do not grow with uptime.
+
+    Requests are also accumulated into hourly "pending" buckets that a metrics
+    store can drain periodically (see :meth:`drain_pending`), so several worker
+    processes can persist and merge their numbers without a write per request.
+    Per provider and task type outcomes are drained the same way (see
+    :meth:`drain_outcomes`) to feed learned provider reliability.
+    """
+
+    def __init__(self, max_history_size: int = 10000, resolution: str = 'minute'):
         """Initialize performance monitor
-        
+
         Args:
-            max_history_size: Maximum number of records to keep in memory
+            max_history_size: Maximum number of raw records kept for inspection
+            resolution: Finest granularity of the provider aggregates
         """
         self.max_history_size = max_history_size
+        self.resolution = resolution
+        # Guards the provider registry and cache metrics; per-provider data
+        # is guarded by ProviderStats.lock
         self.lock = threading.Lock()
-        
-        # Performance metrics storage
+        self._system_lock = threading.Lock()
+
+        # Recent raw records (bounded, for inspection only)
         self.request_history = deque(maxlen=max_history_size)
-        self.provider_metrics = defaultdict(lambda: {
-            'total_requests': 0,
-            'successful_requests': 0,
-            'failed_requests': 0,
-            'total_response_time': 0,
-            'total_tokens': 0,
-            'total_cost': 0,
-            'error_types': defaultdict(int),
-            'response_times': deque(maxlen=1000),
-            'success_rate_history': deque(maxlen=100),
-            'last_updated': datetime.now()
-        })
-        
+        self.provider_stats = {}
+
         # System-wide metrics
-        self.system_metrics = {
-            'total_requests': 0,
-            'total_successful': 0,
-            'total_failed': 0,
-            'total_cost': 0,
-            'total_tokens': 0,
-            'uptime_start': datetime.now(),
-            'last_health_check': None,
-            'consensus_accuracy': deque(maxlen=1000),
-            'user_satisfaction': deque(maxlen=1000)
-        }
-        
+        self.system_metrics = self._new_system_metrics()
+
         # Performance thresholds
         self.thresholds = {
             'response_time_warning': 5.0,  # seconds
@@ -62,21 +395,46 @@ class PerformanceMonitor:
             'token_efficiency_warning': 0.7,  # tokens used / max tokens
             'token_efficiency_critical': 0.9
         }
-        
+
         # Alert history
         self.alerts = deque(maxlen=1000)
-        
-        # Performance trends
-        self.trends = {
-            'hourly_stats': defaultdict(lambda: defaultdict(list)),
-            'daily_stats': defaultdict(lambda: defaultdict(list)),
-            'weekly_stats': defaultdict(lambda: defaultdict(list))
+
+        # Response cache metrics
+        self.cache_metrics = defaultdict(self._new_cache_metrics)
+
+        # Hourly buckets not yet persisted, keyed by (provider, hour index)
+        self._pending = {}
+        # Outcomes not yet persisted: (provider, task type) -> [requests, successes, response time]
+        self._pending_outcomes = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _new_system_metrics() -> Dict[str, Any]:
+        return {
+            'total_requests': 0,
+            'total_successful': 0,
+            'total_failed': 0,
+            'total_cost': 0,
+            'total_tokens': 0,
+            'uptime_start': datetime.now(),
+            'last_health_check': None,
+            'consensus_accuracy': deque(maxlen=1000),
+            'user_satisfaction': deque(maxlen=1000)
         }
-    
-    def log_request(self, provider: str, task_type: str, request_data: Dict[str, Any], 
+
+    def _get_provider_stats(self, provider: str, create: bool = True) -> Optional[ProviderStats]:
+        """Get (or create) the aggregates of a provider"""
+        stats = self.provider_stats.get(provider)
+        if stats is None and create:
+            with self.lock:
+                stats = self.provider_stats.setdefault(provider, ProviderStats(self.resolution))
+        return stats
+
+    def log_request(self, provider: str, task_type: str, request_data: Dict[str, Any],
                    response_data: Dict[str, Any]):
         """Log a request and response for performance tracking
-        
+
         Args:
             provider: AI provider name
             task_type: Type of task performed
@@ -84,118 +442,233 @@ class PerformanceMonitor:
             response_data: Response information
         """
         try:
-            with self.lock:
-                timestamp = datetime.now()
-                
-                # Create request record
-                record = {
-                    'timestamp': timestamp,
-                    'provider': provider,
-                    'task_type': task_type,
-                    'success': response_data.get('success', False),
-                    'response_time': response_data.get('response_time', 0),
-                    'tokens_used': response_data.get('tokens_used', 0),
-                    'cost': response_data.get('cost', 0),
-                    'error': response_data.get('error'),
-                    'model': response_data.get('model'),
-                    'request_size': len(str(request_data)),
-                    'response_size': len(str(response_data))
-                }
-                
-                # Add to history
-                self.request_history.append(record)
-                
-                # Update provider metrics
-                self._update_provider_metrics(provider, record)
-                
-                # Update system metrics
-                self._update_system_metrics(record)
-                
-                # Update trends
-                self._update_trends(record)
-                
-                # Check for alerts
-                self._check_alerts(provider, record)
-                
+            timestamp = datetime.now()
+
+            # Create request record
+            record = {
+                'timestamp': timestamp,
+                'provider': provider,
+                'task_type': task_type,
+                'success': response_data.get('success', False),
+                'response_time': response_data.get('response_time', 0) or 0,
+                'tokens_used': response_data.get('tokens_used', 0) or 0,
+                'cost': response_data.get('cost', 0) or 0,
+                'error': response_data.get('error'),
+                'model': response_data.get('model'),
+                'request_size': len(str(request_data)),
+                'response_size': len(str(response_data))
+            }
+
+            # Add to history (deque appends are atomic)
+            self.request_history.append(record)
+
+            # Update provider metrics and trends
+            stats = self._get_provider_stats(provider)
+            with stats.lock:
+                stats.add(record)
+                success_rate = stats.totals.success_rate
+                avg_cost = stats.totals.total_cost / stats.totals.requests
+
+            # Queue for the metrics store
+            with self._pending_lock:
+                key = (provider, _hour_index(timestamp))
+                bucket = self._pending.get(key)
+                if bucket is None:
+                    bucket = self._pending[key] = MetricBucket()
+                bucket.add(record)
+                outcome = self._pending_outcomes.setdefault((provider, task_type), [0, 0, 0.0])
+                outcome[0] += 1
+                outcome[1] += 1 if record['success'] else 0
+                outcome[2] += record['response_time']
+
+            # Update system metrics
+            self._update_system_metrics(record)
+
+            # Check for alerts
+            self._check_alerts(provider, record, success_rate, avg_cost)
+
         except Exception as e:
             _logger.error(f"Failed to log request: {str(e)}")
-    
-    def _update_provider_metrics(self, provider: str, record: Dict[str, Any]):
-        """Update metrics for a specific provider
-        
+
+    def ingest_bucket(self, provider: str, period_start: datetime, bucket: MetricBucket):
+        """Merge an aggregated bucket (e.g. loaded from a metrics store)
+
+        Ingested buckets update the provider aggregates and system counters but
+        are not queued for flushing again.
+
         Args:
-            provider: Provider name
-            record: Request record
+            provider: AI provider name
+            period_start: Start of the period the bucket covers
+            bucket: Aggregated metrics
         """
-        metrics = self.provider_metrics[provider]
-        
-        # Update counters
-        metrics['total_requests'] += 1
-        if record['success']:
-            metrics['successful_requests'] += 1
-        else:
-            metrics['failed_requests'] += 1
-            if record['error']:
-                error_type = type(record['error']).__name__ if isinstance(record['error'], Exception) else str(record['error'])
-                metrics['error_types'][error_type] += 1
-        
-        # Update totals
-        metrics['total_response_time'] += record['response_time']
-        metrics['total_tokens'] += record['tokens_used']
-        metrics['total_cost'] += record['cost']
-        
-        # Update time series data
-        metrics['response_times'].append(record['response_time'])
-        success_rate = metrics['successful_requests'] / metrics['total_requests']
-        metrics['success_rate_history'].append(success_rate)
-        
-        metrics['last_updated'] = record['timestamp']
-    
-    def _update_system_metrics(self, record: Dict[str, Any]):
-        """Update system-wide metrics
-        
+        stats = self._get_provider_stats(provider)
+        with stats.lock:
+            stats.add_bucket(period_start, bucket)
+        with self._system_lock:
+            self.system_metrics['total_requests'] += bucket.requests
+            self.system_metrics['total_successful'] += bucket.successes
+            self.system_metrics['total_failed'] += bucket.failures
+            self.system_metrics['total_cost'] += bucket.total_cost
+            self.system_metrics['total_tokens'] += bucket.total_tokens
+            self.system_metrics['uptime_start'] = min(self.system_metrics['uptime_start'], period_start)
+
+    def claim_flush(self, interval: float) -> bool:
+        """Claim the next flush if ``interval`` seconds passed since the last one
+
+        Only one caller per interval gets True, so concurrent request threads
+        do not flush at the same time.
+        """
+        with self._pending_lock:
+            now = time.monotonic()
+            if now - self._last_flush < interval:
+                return False
+            self._last_flush = now
+            return True
+
+    def peek_pending(self) -> List[Dict[str, Any]]:
+        """Get a copy of the not yet persisted buckets, without draining them"""
+        with self._pending_lock:
+            return [
+                {'provider': provider, 'period_start': _hour_start(index), 'bucket': bucket.to_dict()}
+                for (provider, index), bucket in self._pending.items()
+            ]
+
+    def drain_pending(self) -> List[Dict[str, Any]]:
+        """Take the buckets accumulated since the last drain
+
+        Returns:
+            List of dicts with provider, period_start (hour) and the serialized bucket
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        return [
+            {'provider': provider, 'period_start': _hour_start(index), 'bucket': bucket.to_dict()}
+            for (provider, index), bucket in pending.items()
+        ]
+
+    def restore_pending(self, rows: List[Dict[str, Any]]):
+        """Put drained buckets back after a failed flush"""
+        with self._pending_lock:
+            for row in rows:
+                key = (row['provider'], _hour_index(row['period_start']))
+                bucket = self._pending.get(key)
+                if bucket is None:
+                    bucket = self._pending[key] = MetricBucket()
+                bucket.merge(MetricBucket.from_dict(row['bucket']))
+
+    def drain_outcomes(self) -> List[Dict[str, Any]]:
+        """Take the per provider and task type outcomes accumulated since the last drain
+
+        Returns:
+            List of dicts with provider, task_type, requests, successes and
+            total_response_time
+        """
+        with self._pending_lock:
+            outcomes, self._pending_outcomes = self._pending_outcomes, {}
+        return [
+            {
+                'provider': provider,
+                'task_type': task_type,
+                'requests': requests,
+                'successes': successes,
+                'total_response_time': total_response_time,
+            }
+            for (provider, task_type), (requests, successes, total_response_time) in outcomes.items()
+        ]
+
+    def restore_outcomes(self, outcomes: List[Dict[str, Any]]):
+        """Put drained outcomes back after a failed flush"""
+        with self._pending_lock:
+            for row in outcomes:
+                outcome = self._pending_outcomes.setdefault((row['provider'], row['task_type']), [0, 0, 0.0])
+                outcome[0] += row['requests']
+                outcome[1] += row['successes']
+                outcome[2] += row['total_response_time']
+
+    @staticmethod
+    def _new_cache_metrics() -> Dict[str, Any]:
+        return {
+            'hits': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'tokens_saved': 0,
+            'cost_avoided': 0.0
+        }
+
+    def log_cache_event(self, provider: str, hit: bool, bytes_saved: int = 0,
+                        cost_avoided: float = 0.0, tokens_saved: int = 0):
+        """Log a response cache lookup
+
         Args:
-            record: Request record
+            provider: AI provider name
+            hit: Whether the response was served from cache
+            bytes_saved: Size of the cached response
+            cost_avoided: Cost of the provider call that was avoided
+            tokens_saved: Tokens of the provider call that was avoided
         """
-        self.system_metrics['total_requests'] += 1
-        if record['success']:
-            self.system_metrics['total_successful'] += 1
-        else:
-            self.system_metrics['total_failed'] += 1
-        
-        self.system_metrics['total_cost'] += record['cost']
-        self.system_metrics['total_tokens'] += record['tokens_used']
-    
-    def _update_trends(self, record: Dict[str, Any]):
-        """Update performance trends
-        
+        try:
+            with self.lock:
+                metrics = self.cache_metrics[provider]
+                if hit:
+                    metrics['hits'] += 1
+                    metrics['bytes_saved'] += bytes_saved
+                    metrics['tokens_saved'] += tokens_saved
+                    metrics['cost_avoided'] += cost_avoided
+                else:
+                    metrics['misses'] += 1
+        except Exception as e:
+            _logger.error(f"Failed to log cache event: {str(e)}")
+
+    def get_cache_performance(self) -> Dict[str, Any]:
+        """Get response cache effectiveness
+
+        Returns:
+            Hit rate, bytes saved and avoided cost per provider and in total
+        """
+        with self.lock:
+            providers = {}
+            totals = self._new_cache_metrics()
+            for provider, metrics in self.cache_metrics.items():
+                lookups = metrics['hits'] + metrics['misses']
+                providers[provider] = dict(metrics, hit_rate=metrics['hits'] / lookups if lookups else 0)
+                for key in totals:
+                    totals[key] += metrics[key]
+            lookups = totals['hits'] + totals['misses']
+            totals['hit_rate'] = totals['hits'] / lookups if lookups else 0
+            return {
+                'providers': providers,
+                'total': totals,
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _update_system_metrics(self, record: Dict[str, Any]):
+        """Update system-wide metrics
+
         Args:
             record: Request record
         """
-        timestamp = record['timestamp']
-        provider = record['provider']
-        
-        # Hourly trends
-        hour_key = timestamp.strftime('%Y-%m-%d-%H')
-        self.trends['hourly_stats'][hour_key][provider].append(record)
-        
-        # Daily trends
-        day_key = timestamp.strftime('%Y-%m-%d')
-        self.trends['daily_stats'][day_key][provider].append(record)
-        
-        # Weekly trends
-        week_key = timestamp.strftime('%Y-W%U')
-        self.trends['weekly_stats'][week_key][provider].append(record)
-    
-    def _check_alerts(self, provider: str, record: Dict[str, Any]):
+        with self._system_lock:
+            self.system_metrics['total_requests'] += 1
+            if record['success']:
+                self.system_metrics['total_successful'] += 1
+            else:
+                self.system_metrics['total_failed'] += 1
+
+            self.system_metrics['total_cost'] += record['cost']
+            self.system_metrics['total_tokens'] += record['tokens_used']
+
+    def _check_alerts(self, provider: str, record: Dict[str, Any],
+                      success_rate: float, avg_cost: float):
         """Check for performance alerts
-        
+
         Args:
             provider: Provider name
             record: Request record
+            success_rate: Provider success rate including this record
+            avg_cost: Provider average cost per request including this record
         """
         alerts = []
-        
+
         # Response time alerts
         if record['response_time'] > self.thresholds['response_time_critical']:
             alerts.append({
@@ -215,11 +688,8 @@ class PerformanceMonitor:
                 'value': record['response_time'],
                 'threshold': self.thresholds['response_time_warning']
             })
-        
+
         # Success rate alerts
-        metrics = self.provider_metrics[provider]
-        success_rate = metrics['successful_requests'] / metrics['total_requests']
-        
         if success_rate < self.thresholds['success_rate_critical']:
             alerts.append({
                 'type': 'critical',
@@ -238,9 +708,8 @@ class PerformanceMonitor:
                 'value': success_rate,
                 'threshold': self.thresholds['success_rate_warning']
             })
-        
+
         # Cost alerts
-        avg_cost = metrics['total_cost'] / metrics['total_requests']
         if avg_cost > self.thresholds['cost_per_request_critical']:
             alerts.append({
                 'type': 'critical',
@@ -259,85 +728,57 @@ class PerformanceMonitor:
                 'value': avg_cost,
                 'threshold': self.thresholds['cost_per_request_warning']
             })
-        
+
         # Log alerts
         for alert in alerts:
             alert['timestamp'] = record['timestamp']
             self.alerts.append(alert)
             _logger.warning(f"Performance alert: {alert['message']}")
-    
-    def get_provider_performance(self, provider: str, 
+
+    def _provider_window(self, provider: str, time_range: Optional[timedelta]) -> Optional[MetricBucket]:
+        """Get a merged snapshot of a provider's metrics over ``time_range``"""
+        stats = self._get_provider_stats(provider, create=False)
+        if stats is None:
+            return None
+        with stats.lock:
+            return stats.window(time_range, datetime.now())
+
+    def get_provider_performance(self, provider: str,
                                time_range: Optional[timedelta] = None) -> Dict[str, Any]:
         """Get performance metrics for a specific provider
-        
+
         Args:
             provider: Provider name
             time_range: Optional time range for filtering
-            
+
         Returns:
             Provider performance metrics
         """
         try:
-            with self.lock:
-                if provider not in self.provider_metrics:
-                    return {
-                        'provider': provider,
-                        'error': 'Provider not found',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                
-                metrics = self.provider_metrics[provider]
-                
-                # Filter by time range if specified
-                if time_range:
-                    cutoff_time = datetime.now() - time_range
-                    filtered_records = [
-                        r for r in self.request_history 
-                        if r['provider'] == provider and r['timestamp'] > cutoff_time
-                    ]
-                else:
-                    filtered_records = [
-                        r for r in self.request_history 
-                        if r['provider'] == provider
-                    ]
-                
-                if not filtered_records:
-                    return {
-                        'provider': provider,
-                        'error': 'No data available for time range',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                
-                # Calculate metrics from filtered records
-                total_requests = len(filtered_records)
-                successful_requests = sum(1 for r in filtered_records if r['success'])
-                failed_requests = total_requests - successful_requests
-                
-                response_times = [r['response_time'] for r in filtered_records]
-                costs = [r['cost'] for r in filtered_records]
-                tokens = [r['tokens_used'] for r in filtered_records]
-                
+            bucket = self._provider_window(provider, time_range)
+            if bucket is None:
                 return {
                     'provider': provider,
-                    'time_range': str(time_range) if time_range else 'all_time',
-                    'total_requests': total_requests,
-                    'successful_requests': successful_requests,
-                    'failed_requests': failed_requests,
-                    'success_rate': successful_requests / total_requests if total_requests > 0 else 0,
-                    'average_response_time': statistics.mean(response_times) if response_times else 0,
-                    'median_response_time': statistics.median(response_times) if response_times else 0,
-                    'p95_response_time': self._percentile(response_times, 95) if response_times else 0,
-                    'p99_response_time': self._percentile(response_times, 99) if response_times else 0,
-                    'total_cost': sum(costs),
-                    'average_cost_per_request': statistics.mean(costs) if costs else 0,
-                    'total_tokens': sum(tokens),
-                    'average_tokens_per_request': statistics.mean(tokens) if tokens else 0,
-                    'error_distribution': self._get_error_distribution(filtered_records),
-                    'task_type_distribution': self._get_task_distribution(filtered_records),
-                    'performance_grade': self._calculate_performance_grade(provider, filtered_records),
+                    'error': 'Provider not found',
                     'timestamp': datetime.now().isoformat()
                 }
-                
+
+            if not bucket.requests:
+                return {
+                    'provider': provider,
+                    'error': 'No data available for time range',
+                    'timestamp': datetime.now().isoformat()
+                }
+
+            return dict(self._summarize(bucket), **{
+                'provider': provider,
+                'time_range': str(time_range) if time_range else 'all_time',
+                'error_distribution': dict(bucket.errors),
+                'task_type_distribution': dict(bucket.task_types),
+                'performance_grade': self._calculate_performance_grade(bucket),
+                'timestamp': datetime.now().isoformat()
+            })
+
         except Exception as e:
             _logger.error(f"Failed to get provider performance: {str(e)}")
             return {
@@ -345,314 +786,226 @@ class PerformanceMonitor:
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
-    
+
+    def _summarize(self, bucket: MetricBucket) -> Dict[str, Any]:
+        """Turn an aggregated bucket into the common metrics dict"""
+        return {
+            'total_requests': bucket.requests,
+            'successful_requests': bucket.successes,
+            'failed_requests': bucket.failures,
+            'success_rate': bucket.success_rate,
+            'average_response_time': bucket.avg_response_time,
+            'median_response_time': bucket.sketch.quantile(0.5),
+            'p95_response_time': bucket.sketch.quantile(0.95),
+            'p99_response_time': bucket.sketch.quantile(0.99),
+            'total_cost': bucket.total_cost,
+            'average_cost_per_request': bucket.total_cost / bucket.requests if bucket.requests else 0,
+            'total_tokens': bucket.total_tokens,
+            'average_tokens_per_request': bucket.total_tokens / bucket.requests if bucket.requests else 0,
+        }
+
     def get_system_performance(self, time_range: Optional[timedelta] = None) -> Dict[str, Any]:
         """Get system-wide performance metrics
-        
+
         Args:
             time_range: Optional time range for filtering
-            
+
         Returns:
             System performance metrics
         """
         try:
-            with self.lock:
-                # Filter by time range if specified
-                if time_range:
-                    cutoff_time = datetime.now() - time_range
-                    filtered_records = [
-                        r for r in self.request_history 
-                        if r['timestamp'] > cutoff_time
-                    ]
-                else:
-                    filtered_records = list(self.request_history)
-                
-                if not filtered_records:
-                    return {
-                        'error': 'No data available for time range',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                
-                # Calculate system metrics
-                total_requests = len(filtered_records)
-                successful_requests = sum(1 for r in filtered_records if r['success'])
-                failed_requests = total_requests - successful_requests
-                
-                response_times = [r['response_time'] for r in filtered_records]
-                costs = [r['cost'] for r in filtered_records]
-                tokens = [r['tokens_used'] for r in filtered_records]
-                
-                # Provider distribution
-                provider_counts = defaultdict(int)
-                for record in filtered_records:
-                    provider_counts[record['provider']] += 1
-                
-                # Task type distribution
-                task_counts = defaultdict(int)
-                for record in filtered_records:
-                    task_counts[record['task_type']] += 1
-                
-                uptime = datetime.now() - self.system_metrics['uptime_start']
-                
+            merged = MetricBucket()
+            provider_counts = {}
+            for provider in list(self.provider_stats):
+                bucket = self._provider_window(provider, time_range)
+                if bucket and bucket.requests:
+                    merged.merge(bucket)
+                    provider_counts[provider] = bucket.requests
+
+            if not merged.requests:
                 return {
-                    'time_range': str(time_range) if time_range else 'all_time',
-                    'uptime': str(uptime),
-                    'total_requests': total_requests,
-                    'successful_requests': successful_requests,
-                    'failed_requests': failed_requests,
-                    'success_rate': successful_requests / total_requests if total_requests > 0 else 0,
-                    'requests_per_hour': total_requests / (uptime.total_seconds() / 3600) if uptime.total_seconds() > 0 else 0,
-                    'average_response_time': statistics.mean(response_times) if response_times else 0,
-                    'median_response_time': statistics.median(response_times) if response_times else 0,
-                    'p95_response_time': self._percentile(response_times, 95) if response_times else 0,
-                    'p99_response_time': self._percentile(response_times, 99) if response_times else 0,
-                    'total_cost': sum(costs),
-                    'average_cost_per_request': statistics.mean(costs) if costs else 0,
-                    'cost_per_hour': sum(costs) / (uptime.total_seconds() / 3600) if uptime.total_seconds() > 0 else 0,
-                    'total_tokens': sum(tokens),
-                    'average_tokens_per_request': statistics.mean(tokens) if tokens else 0,
-                    'provider_distribution': dict(provider_counts),
-                    'task_type_distribution': dict(task_counts),
-                    'system_health': self._calculate_system_health(filtered_records),
+                    'error': 'No data available for time range',
                     'timestamp': datetime.now().isoformat()
                 }
-                
+
+            uptime = datetime.now() - self.system_metrics['uptime_start']
+            hours = uptime.total_seconds() / 3600
+
+            return dict(self._summarize(merged), **{
+                'time_range': str(time_range) if time_range else 'all_time',
+                'uptime': str(uptime),
+                'requests_per_hour': merged.requests / hours if hours > 0 else 0,
+                'cost_per_hour': merged.total_cost / hours if hours > 0 else 0,
+                'provider_distribution': provider_counts,
+                'task_type_distribution': dict(merged.task_types),
+                'system_health': self._calculate_system_health(merged, len(provider_counts)),
+                'cache_hits': sum(m['hits'] for m in self.cache_metrics.values()),
+                'cache_cost_avoided': sum(m['cost_avoided'] for m in self.cache_metrics.values()),
+                'timestamp': datetime.now().isoformat()
+            })
+
         except Exception as e:
             _logger.error(f"Failed to get system performance: {str(e)}")
             return {
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
-    
-    def get_performance_trends(self, period: str = 'hourly', 
+
+    def get_performance_trends(self, period: str = 'hourly',
                              days_back: int = 7) -> Dict[str, Any]:
         """Get performance trends over time
-        
+
         Args:
             period: Trend period ('hourly', 'daily', 'weekly')
-            days_back: Number of days to look back
-            
+            days_back: Number of days to look back (bounded by the ring size)
+
         Returns:
             Performance trends data
         """
         try:
-            with self.lock:
-                cutoff_time = datetime.now() - timedelta(days=days_back)
-                
-                if period == 'hourly':
-                    trend_data = self.trends['hourly_stats']
-                    time_format = '%Y-%m-%d-%H'
-                elif period == 'daily':
-                    trend_data = self.trends['daily_stats']
-                    time_format = '%Y-%m-%d'
-                elif period == 'weekly':
-                    trend_data = self.trends['weekly_stats']
-                    time_format = '%Y-W%U'
-                else:
-                    return {'error': 'Invalid period. Use hourly, daily, or weekly'}
-                
-                # Filter and process trend data
-                trends = {}
-                for time_key, provider_data in trend_data.items():
-                    try:
-                        if period == 'weekly':
-                            # Parse week format
-                            year, week = time_key.split('-W')
-                            time_obj = datetime.strptime(f"{year}-W{week}-1", "%Y-W%U-%w")
-                        else:
-                            time_obj = datetime.strptime(time_key, time_format)
-                        
-                        if time_obj >= cutoff_time:
-                            trends[time_key] = {}
-                            for provider, records in provider_data.items():
-                                if records:
-                                    success_rate = sum(1 for r in records if r['success']) / len(records)
-                                    avg_response_time = statistics.mean([r['response_time'] for r in records])
-                                    total_cost = sum(r['cost'] for r in records)
-                                    total_tokens = sum(r['tokens_used'] for r in records)
-                                    
-                                    trends[time_key][provider] = {
-                                        'requests': len(records),
-                                        'success_rate': success_rate,
-                                        'avg_response_time': avg_response_time,
-                                        'total_cost': total_cost,
-                                        'total_tokens': total_tokens
-                                    }
-                    except ValueError:
-                        continue  # Skip invalid time keys
-                
-                return {
-                    'period': period,
-                    'days_back': days_back,
-                    'trends': trends,
-                    'timestamp': datetime.now().isoformat()
-                }
-                
+            time_formats = {
+                'hourly': '%Y-%m-%d-%H',
+                'daily': '%Y-%m-%d',
+                'weekly': '%Y-W%U',
+            }
+            if period not in time_formats:
+                return {'error': 'Invalid period. Use hourly, daily, or weekly'}
+
+            now = datetime.now()
+            cutoff_time = now - timedelta(days=days_back)
+
+            trends = defaultdict(dict)
+            for provider in list(self.provider_stats):
+                stats = self._get_provider_stats(provider, create=False)
+                with stats.lock:
+                    ring = stats.rings[period]
+                    for index, bucket in ring.buckets(cutoff_time, now):
+                        time_key = ring.start_of(index).strftime(time_formats[period])
+                        trends[time_key][provider] = {
+                            'requests': bucket.requests,
+                            'success_rate': bucket.success_rate,
+                            'avg_response_time': bucket.avg_response_time,
+                            'p95_response_time': bucket.sketch.quantile(0.95),
+                            'total_cost': bucket.total_cost,
+                            'total_tokens': bucket.total_tokens
+                        }
+
+            return {
+                'period': period,
+                'days_back': days_back,
+                'trends': dict(trends),
+                'timestamp': datetime.now().isoformat()
+            }
+
         except Exception as e:
             _logger.error(f"Failed to get performance trends: {str(e)}")
             return {
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
-    
-    def get_alerts(self, severity: Optional[str] = None, 
+
+    def get_alerts(self, severity: Optional[str] = None,
                   time_range: Optional[timedelta] = None) -> List[Dict[str, Any]]:
         """Get performance alerts
-        
+
         Args:
             severity: Optional severity filter ('warning', 'critical')
             time_range: Optional time range for filtering
-            
+
         Returns:
             List of alerts
         """
         try:
-            with self.lock:
-                alerts = list(self.alerts)
-                
-                # Filter by time range
-                if time_range:
-                    cutoff_time = datetime.now() - time_range
-                    alerts = [a for a in alerts if a['timestamp'] > cutoff_time]
-                
-                # Filter by severity
-                if severity:
-                    alerts = [a for a in alerts if a['type'] == severity]
-                
-                # Sort by timestamp (newest first)
-                alerts.sort(key=lambda x: x['timestamp'], reverse=True)
-                
-                return alerts
-                
+            alerts = list(self.alerts)
+
+            # Filter by time range
+            if time_range:
+                cutoff_time = datetime.now() - time_range
+                alerts = [a for a in alerts if a['timestamp'] > cutoff_time]
+
+            # Filter by severity
+            if severity:
+                alerts = [a for a in alerts if a['type'] == severity]
+
+            # Newest first
+            alerts.reverse()
+
+            return alerts
+
         except Exception as e:
             _logger.error(f"Failed to get alerts: {str(e)}")
             return []
-    
+
     def get_provider_comparison(self, time_range: Optional[timedelta] = None) -> Dict[str, Any]:
         """Compare performance across providers
-        
+
         Args:
             time_range: Optional time range for filtering
-            
+
         Returns:
             Provider comparison data
         """
         try:
-            providers = list(self.provider_metrics.keys())
+            providers = list(self.provider_stats.keys())
             comparison = {}
-            
+
             for provider in providers:
                 performance = self.get_provider_performance(provider, time_range)
                 if 'error' not in performance:
                     comparison[provider] = {
                         'success_rate': performance['success_rate'],
                         'avg_response_time': performance['average_response_time'],
+                        'p95_response_time': performance['p95_response_time'],
                         'avg_cost_per_request': performance['average_cost_per_request'],
                         'total_requests': performance['total_requests'],
                         'performance_grade': performance['performance_grade']
                     }
-            
+
             # Calculate rankings
             rankings = {
-                'success_rate': sorted(comparison.items(), 
+                'success_rate': sorted(comparison.items(),
                                      key=lambda x: x[1]['success_rate'], reverse=True),
-                'response_time': sorted(comparison.items(), 
+                'response_time': sorted(comparison.items(),
                                       key=lambda x: x[1]['avg_response_time']),
-                'cost_efficiency': sorted(comparison.items(), 
+                'cost_efficiency': sorted(comparison.items(),
                                         key=lambda x: x[1]['avg_cost_per_request']),
-                'overall_performance': sorted(comparison.items(), 
+                'overall_performance': sorted(comparison.items(),
                                             key=lambda x: x[1]['performance_grade'], reverse=True)
             }
-            
+
             return {
                 'time_range': str(time_range) if time_range else 'all_time',
                 'comparison': comparison,
                 'rankings': rankings,
                 'timestamp': datetime.now().isoformat()
             }
-            
+
         except Exception as e:
             _logger.error(f"Failed to get provider comparison: {str(e)}")
             return {
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
-    
-    def _percentile(self, data: List[float], percentile: int) -> float:
-        """Calculate percentile of data
-        
-        Args:
-            data: List of values
-            percentile: Percentile to calculate (0-100)
-            
-        Returns:
-            Percentile value
-        """
-        if not data:
-            return 0
-        
-        sorted_data = sorted(data)
-        index = (percentile / 100) * (len(sorted_data) - 1)
-        
-        if index.is_integer():
-            return sorted_data[int(index)]
-        else:
-            lower = sorted_data[int(index)]
-            upper = sorted_data[int(index) + 1]
-            return lower + (upper - lower) * (index - int(index))
-    
-    def _get_error_distribution(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Get distribution of error types
-        
-        Args:
-            records: List of request records
-            
-        Returns:
-            Error distribution
-        """
-        error_counts = defaultdict(int)
-        for record in records:
-            if not record['success'] and record['error']:
-                error_type = type(record['error']).__name__ if isinstance(record['error'], Exception) else str(record['error'])
-                error_counts[error_type] += 1
-        return dict(error_counts)
-    
-    def _get_task_distribution(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Get distribution of task types
-        
-        Args:
-            records: List of request records
-            
-        Returns:
-            Task type distribution
-        """
-        task_counts = defaultdict(int)
-        for record in records:
-            task_counts[record['task_type']] += 1
-        return dict(task_counts)
-    
-    def _calculate_performance_grade(self, provider: str, 
-                                   records: List[Dict[str, Any]]) -> str:
+
+    def _calculate_performance_grade(self, bucket: MetricBucket) -> str:
         """Calculate performance grade for a provider
-        
+
         Args:
-            provider: Provider name
-            records: List of request records
-            
+            bucket: Aggregated metrics of the provider
+
         Returns:
             Performance grade (A, B, C, D, F)
         """
-        if not records:
+        if not bucket.requests:
             return 'N/A'
-        
+
         # Calculate metrics
-        success_rate = sum(1 for r in records if r['success']) / len(records)
-        response_times = [r['response_time'] for r in records]
-        avg_response_time = statistics.mean(response_times) if response_times else 0
-        
+        success_rate = bucket.success_rate
+        avg_response_time = bucket.avg_response_time
+
         # Grade based on success rate and response time
         score = 0
-        
+
         # Success rate component (60% of grade)
         if success_rate >= 0.95:
             score += 60
@@ -664,7 +1017,7 @@ class PerformanceMonitor:
             score += 30
         else:
             score += 20
-        
+
         # Response time component (40% of grade)
         if avg_response_time <= 2.0:
             score += 40
@@ -674,7 +1027,7 @@ class PerformanceMonitor:
             score += 20
         else:
             score += 10
-        
+
         # Convert to letter grade
         if score >= 90:
             return 'A'
@@ -686,27 +1039,27 @@ class PerformanceMonitor:
             return 'D'
         else:
             return 'F'
-    
-    def _calculate_system_health(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+
+    def _calculate_system_health(self, bucket: MetricBucket, provider_count: int) -> Dict[str, Any]:
         """Calculate overall system health
-        
+
         Args:
-            records: List of request records
-            
+            bucket: Aggregated metrics of all providers
+            provider_count: Number of providers that served requests
+
         Returns:
             System health metrics
         """
-        if not records:
+        if not bucket.requests:
             return {'status': 'unknown', 'score': 0}
-        
+
         # Calculate health metrics
-        success_rate = sum(1 for r in records if r['success']) / len(records)
-        response_times = [r['response_time'] for r in records]
-        avg_response_time = statistics.mean(response_times) if response_times else 0
-        
+        success_rate = bucket.success_rate
+        avg_response_time = bucket.avg_response_time
+
         # Calculate health score
         health_score = 0
-        
+
         # Success rate (50% of health)
         if success_rate >= 0.95:
             health_score += 50
@@ -716,7 +1069,7 @@ class PerformanceMonitor:
             health_score += 30
         else:
             health_score += 20
-        
+
         # Response time (30% of health)
         if avg_response_time <= 2.0:
             health_score += 30
@@ -726,16 +1079,15 @@ class PerformanceMonitor:
             health_score += 15
         else:
             health_score += 5
-        
+
         # Provider diversity (20% of health)
-        providers = set(r['provider'] for r in records)
-        if len(providers) >= 3:
+        if provider_count >= 3:
             health_score += 20
-        elif len(providers) >= 2:
+        elif provider_count >= 2:
             health_score += 15
         else:
             health_score += 5
-        
+
         # Determine status
         if health_score >= 90:
             status = 'excellent'
@@ -747,85 +1099,85 @@ class PerformanceMonitor:
             status = 'poor'
         else:
             status = 'critical'
-        
+
         return {
             'status': status,
             'score': health_score,
             'success_rate': success_rate,
             'avg_response_time': avg_response_time,
-            'provider_count': len(providers)
+            'provider_count': provider_count
         }
-    
+
     def reset_metrics(self, provider: Optional[str] = None):
         """Reset performance metrics
-        
+
         Args:
             provider: Optional provider to reset (if None, reset all)
         """
         try:
             with self.lock:
                 if provider:
-                    if provider in self.provider_metrics:
-                        del self.provider_metrics[provider]
+                    if provider in self.provider_stats:
+                        del self.provider_stats[provider]
                         _logger.info(f"Reset metrics for provider: {provider}")
                 else:
-                    self.provider_metrics.clear()
-                    self.system_metrics = {
-                        'total_requests': 0,
-                        'total_successful': 0,
-                        'total_failed': 0,
-                        'total_cost': 0,
-                        'total_tokens': 0,
-                        'uptime_start': datetime.now(),
-                        'last_health_check': None,
-                        'consensus_accuracy': deque(maxlen=1000),
-                        'user_satisfaction': deque(maxlen=1000)
-                    }
+                    self.provider_stats.clear()
+                    with self._system_lock:
+                        self.system_metrics = self._new_system_metrics()
                     self.request_history.clear()
                     self.alerts.clear()
-                    self.trends = {
-                        'hourly_stats': defaultdict(lambda: defaultdict(list)),
-                        'daily_stats': defaultdict(lambda: defaultdict(list)),
-                        'weekly_stats': defaultdict(lambda: defaultdict(list))
-                    }
+                    self.cache_metrics.clear()
+                    with self._pending_lock:
+                        self._pending.clear()
+                        self._pending_outcomes.clear()
                     _logger.info("Reset all performance metrics")
-                    
+
         except Exception as e:
             _logger.error(f"Failed to reset metrics: {str(e)}")
-    
+
     def export_metrics(self, format: str = 'json') -> Union[str, Dict[str, Any]]:
         """Export performance metrics
-        
+
         Args:
             format: Export format ('json', 'dict')
-            
+
         Returns:
             Exported metrics
         """
         try:
-            with self.lock:
-                export_data = {
-                    'system_metrics': dict(self.system_metrics),
-                    'provider_metrics': dict(self.provider_metrics),
-                    'recent_alerts': list(self.alerts)[-100:],  # Last 100 alerts
-                    'export_timestamp': datetime.now().isoformat()
+            with self._system_lock:
+                system_metrics = {
+                    key: list(value) if isinstance(value, deque) else value
+                    for key, value in self.system_metrics.items()
                 }
-                
-                # Convert deques to lists for JSON serialization
-                for provider, metrics in export_data['provider_metrics'].items():
-                    for key, value in metrics.items():
-                        if isinstance(value, deque):
-                            metrics[key] = list(value)
-                
-                for key, value in export_data['system_metrics'].items():
-                    if isinstance(value, deque):
-                        export_data['system_metrics'][key] = list(value)
-                
-                if format == 'json':
-                    return json.dumps(export_data, indent=2, default=str)
-                else:
-                    return export_data
-                    
+
+            provider_metrics = {}
+            for provider in list(self.provider_stats):
+                stats = self._get_provider_stats(provider, create=False)
+                with stats.lock:
+                    provider_metrics[provider] = dict(self._summarize(stats.totals), **{
+                        'error_types': dict(stats.totals.errors),
+                        'response_times': list(stats.response_times),
+                        'success_rate_history': list(stats.success_rate_history),
+                        'last_updated': stats.last_updated
+                    })
+
+            with self.lock:
+                cache_metrics = {p: dict(m) for p, m in self.cache_metrics.items()}
+
+            export_data = {
+                'system_metrics': system_metrics,
+                'provider_metrics': provider_metrics,
+                'recent_alerts': list(self.alerts)[-100:],  # Last 100 alerts
+                'cache_metrics': cache_metrics,
+                'export_timestamp': datetime.now().isoformat()
+            }
+
+            if format == 'json':
+                return json.dumps(export_data, indent=2, default=str)
+            else:
+                return export_data
+
         except Exception as e:
             _logger.error(f"Failed to export metrics: {str(e)}")
-            return {'error': str(e)} 
\ No newline at end of file
+            return {'error': str(e)}